@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import bisect
+from typing import Any, Iterable, Mapping
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 200
+SORT_KEYS = ("price", "thc", "cbd")
+_NON_THC_FILTERED_TYPES = {"vape", "oil", "pastille", "device"}
+# Page defaults in the Flower Browser template (activeTypes, activeStrains, showInStockOnly).
+DEFAULT_TYPES = ("flower", "oil", "vape", "pastille")
+DEFAULT_STRAIN_TYPES = ("Indica", "Sativa", "Hybrid")
+# Search terms at least this long are narrowed through an n-gram index before the substring check.
+_GRAM = 3
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i : i + _GRAM] for i in range(len(text) - _GRAM + 1)}
+
+
+def _as_float(value: Any) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _csv(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        parts: list[str] = []
+        for item in value:
+            parts.extend(_csv(item))
+        return parts
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+def _flag(value: Any, default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    return str(value).strip().lower() not in {"0", "false", "no", "off"}
+
+
+class CatalogIndex:
+    """Per-export query indexes over export card records (see exports.export_html).
+
+    Built once per export: posting lists for brand/type/strain type, value-sorted arrays for
+    price and THC ranges, and a trigram index that narrows substring search. Filter semantics
+    and defaults mirror applyFilters() in the Flower Browser template: `q` is a substring of
+    the card's lower-cased "strain brand producer product_id" text, and without parameters
+    only in-stock flower/oil/vape/pastille cards of the three strain types (or none) match.
+    """
+
+    def __init__(self, records: Iterable[Mapping[str, Any]]):
+        self.records: list[dict] = [dict(rec) for rec in records if isinstance(rec, Mapping)]
+        n = len(self.records)
+        self._all = frozenset(range(n))
+        self._by_brand: dict[str, set[int]] = {}
+        self._by_type: dict[str, set[int]] = {}
+        self._by_strain_type: dict[str, set[int]] = {}
+        self._by_favkey: dict[str, set[int]] = {}
+        self._removed: set[int] = set()
+        self._out: set[int] = set()
+        self._smalls: set[int] = set()
+        self._beta_flower: set[int] = set()
+        self._gamma_flower: set[int] = set()
+        self._thc_exempt: set[int] = set()
+        self._no_strain_type: set[int] = set()
+        self._price_missing: set[int] = set()
+        self._thc_missing: set[int] = set()
+        self._text: list[str] = []
+        gram_postings: dict[str, set[int]] = {}
+        prices: list[tuple[float, int]] = []
+        thcs: list[tuple[float, int]] = []
+        for idx, rec in enumerate(self.records):
+            pt = str(rec.get("pt") or "").lower()
+            strain_type = str(rec.get("strain_type") or "")
+            self._by_brand.setdefault(str(rec.get("brand") or "").strip(), set()).add(idx)
+            self._by_type.setdefault(pt, set()).add(idx)
+            if strain_type:
+                self._by_strain_type.setdefault(strain_type, set()).add(idx)
+            else:
+                self._no_strain_type.add(idx)
+            favkey = str(rec.get("favkey") or "")
+            if favkey:
+                self._by_favkey.setdefault(favkey, set()).add(idx)
+            if rec.get("removed"):
+                self._removed.add(idx)
+            if rec.get("out"):
+                self._out.add(idx)
+            if rec.get("smalls"):
+                self._smalls.add(idx)
+            irr = str(rec.get("irradiation") or "").lower()
+            if pt == "flower":
+                if "beta" in irr or "β" in irr:
+                    self._beta_flower.add(idx)
+                if "gamma" in irr or "γ" in irr:
+                    self._gamma_flower.add(idx)
+            if pt in _NON_THC_FILTERED_TYPES:
+                self._thc_exempt.add(idx)
+            price = _as_float(rec.get("price"))
+            if price is None:
+                self._price_missing.add(idx)
+            else:
+                prices.append((price, idx))
+            thc = _as_float(rec.get("thc"))
+            if thc is None:
+                self._thc_missing.add(idx)
+            else:
+                thcs.append((thc, idx))
+            text = " ".join(
+                str(rec.get(field) or "") for field in ("strain", "brand", "producer", "product_id")
+            ).lower()
+            self._text.append(text)
+            for gram in _grams(text):
+                gram_postings.setdefault(gram, set()).add(idx)
+        prices.sort()
+        thcs.sort()
+        self._price_values = [v for v, _ in prices]
+        self._price_ids = [i for _, i in prices]
+        self._thc_values = [v for v, _ in thcs]
+        self._thc_ids = [i for _, i in thcs]
+        self._gram_postings = gram_postings
+        self._rank: dict[str, list[float]] = {}
+        for key in SORT_KEYS:
+            missing = float("inf") if key == "price" else 0.0
+            self._rank[key] = [
+                v if (v := _as_float(rec.get(key))) is not None else missing for rec in self.records
+            ]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def _range(values: list[float], ids: list[int], lo: float | None, hi: float | None) -> set[int]:
+        start = 0 if lo is None else bisect.bisect_left(values, lo)
+        end = len(values) if hi is None else bisect.bisect_right(values, hi)
+        return set(ids[start:end])
+
+    def _search(self, term: str, candidates: set[int]) -> set[int]:
+        """Members of `candidates` whose search text contains `term` (already lower-cased)."""
+        for gram in sorted(_grams(term), key=lambda g: len(self._gram_postings.get(g, ()))):
+            candidates = candidates & self._gram_postings.get(gram, set())
+            if not candidates:
+                break
+        return {idx for idx in candidates if term in self._text[idx]}
+
+    @staticmethod
+    def _union(postings: Mapping[str, set[int]], keys: Iterable[str]) -> set[int]:
+        out: set[int] = set()
+        for key in keys:
+            out |= postings.get(key, set())
+        return out
+
+    def filter(self, params: Mapping[str, Any]) -> set[int]:
+        """Return record indices matching Flower Browser-style filters."""
+        result = set(self._all)
+        types = [t.lower() for t in _csv(params.get("type"))] if params.get("type") is not None else DEFAULT_TYPES
+        result &= self._union(self._by_type, types) | self._removed
+        strain_types = _csv(params.get("strain_type")) if params.get("strain_type") is not None else DEFAULT_STRAIN_TYPES
+        result &= self._union(self._by_strain_type, strain_types) | self._no_strain_type
+        brands = _csv(params.get("brand"))
+        if brands:
+            result &= self._union(self._by_brand, brands)
+        favorites = _csv(params.get("favorites"))
+        if favorites or _flag(params.get("favorites_only"), False):
+            result &= self._union(self._by_favkey, favorites)
+        if _flag(params.get("in_stock"), True):
+            result -= self._out
+        if not _flag(params.get("smalls"), True):
+            result -= self._smalls
+        if not _flag(params.get("beta"), True):
+            result -= self._beta_flower
+        if not _flag(params.get("gamma"), True):
+            result -= self._gamma_flower
+        price_min = _as_float(params.get("price_min"))
+        price_max = _as_float(params.get("price_max"))
+        if price_min is not None or price_max is not None:
+            allowed = self._range(self._price_values, self._price_ids, price_min, price_max)
+            result &= allowed | self._price_missing
+        thc_min = _as_float(params.get("thc_min"))
+        thc_max = _as_float(params.get("thc_max"))
+        if thc_min is not None or thc_max is not None:
+            allowed = self._range(self._thc_values, self._thc_ids, thc_min, thc_max)
+            result &= allowed | self._thc_missing | self._thc_exempt
+        term = str(params.get("q") or "").strip().lower()
+        if term and result:
+            result = self._search(term, result)
+        return result
+
+    def query(self, params: Mapping[str, Any]) -> dict:
+        """Filter, sort and paginate; returns {"total", "offset", "limit", "items"}."""
+        matches = self.filter(params)
+        sort_key = str(params.get("sort") or "price").strip().lower()
+        if sort_key not in self._rank:
+            sort_key = "price"
+        descending = str(params.get("order") or "asc").strip().lower() == "desc"
+        rank = self._rank[sort_key]
+        ordered = sorted(matches, key=lambda i: (rank[i], i), reverse=descending)
+        try:
+            offset = max(0, int(params.get("offset") or 0))
+        except (TypeError, ValueError):
+            offset = 0
+        try:
+            limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+        except (TypeError, ValueError):
+            limit = DEFAULT_PAGE_SIZE
+        limit = max(1, min(MAX_PAGE_SIZE, limit))
+        page = ordered[offset : offset + limit]
+        return {
+            "total": len(ordered),
+            "offset": offset,
+            "limit": limit,
+            "items": [self.records[i] for i in page],
+        }
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from parser import make_identity_key
+
+
+def index_catalog(items: Iterable[Any]) -> dict[str, dict]:
+    """Map parsed catalog items by identity key, preserving order.
+
+    Items that share an identity get a `#n` suffix so none are dropped from the replica.
+    """
+    out: dict[str, dict] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        base = make_identity_key(item)
+        key = base
+        n = 1
+        while key in out:
+            n += 1
+            key = f"{base}#{n}"
+        out[key] = item
+    return out
+
+
+def encode_catalog_rows(keyed: Iterable[tuple[str, dict]]) -> tuple[list[str], list[list]]:
+    """Compact encoding: one shared field list, then one [key, *values] row per item.
+
+    Fields an item doesn't have are sent as null, so a missing key and an explicit None read
+    back the same.
+    """
+    pairs = list(keyed)
+    fields: list[str] = []
+    positions: dict[str, int] = {}
+    for _key, item in pairs:
+        for name in item:
+            if name not in positions:
+                positions[name] = len(fields)
+                fields.append(name)
+    rows = []
+    for key, item in pairs:
+        row: list = [key] + [None] * len(fields)
+        for name, value in item.items():
+            row[positions[name] + 1] = value
+        rows.append(row)
+    return fields, rows
+
+
+def decode_catalog_rows(fields: list, rows: list) -> list[tuple[str, dict]]:
+    out = []
+    for row in rows or []:
+        if not isinstance(row, list) or not row:
+            raise ValueError("catalog row must be a non-empty list")
+        item = {str(name): value for name, value in zip(fields, row[1:]) if value is not None}
+        out.append((str(row[0]), item))
+    return out
+
+
+def apply_catalog_changes(keyed: dict[str, dict], payload: dict) -> dict[str, dict]:
+    """Apply a /api/network/catalog payload to a keyed replica and return the new replica.
+
+    A `full` payload replaces the replica; otherwise upserts replace or append by key and
+    removed keys are dropped. The input mapping is not mutated.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("catalog payload must be an object")
+    upserts = decode_catalog_rows(payload.get("fields") or [], payload.get("upserts") or [])
+    out = {} if payload.get("full") else dict(keyed)
+    for key in payload.get("removed") or []:
+        out.pop(str(key), None)
+    for key, item in upserts:
+        out[key] = item
+    return out
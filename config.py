@@ -245,6 +245,7 @@ DEFAULT_TRACKER_CONFIG = {
     "network_export_port": 8765,
     "network_access_key": "",
     "network_rate_limit_requests_per_minute": 120,
+    "network_server_mode": "threaded",
     "mixcalc_geometry": "",
     "mixcalc_stock_geometry": "",
     "stock_column_widths": {},
@@ -479,6 +480,8 @@ def _validate_tracker_config(raw: dict) -> dict:
         )
     except Exception:
         cfg["network_rate_limit_requests_per_minute"] = 0
+    server_mode = str(cfg.get("network_server_mode", "threaded") or "").strip().lower()
+    cfg["network_server_mode"] = server_mode if server_mode in ("threaded", "asyncio") else "threaded"
     if not cfg.get("data_path"):
         cfg["data_path"] = _default_tracker_data_path()
     if not cfg.get("library_data_path"):
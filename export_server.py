@@ -1,28 +1,363 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.server
 import json
+import selectors
 import socket
 import threading
 import time
+import urllib.parse
+import weakref
 from pathlib import Path
 from typing import Callable, Optional, Tuple
 
+from catalog_index import CatalogIndex
 from unread_changes import clear_unread_changes, unread_payload
 
-_EXPORT_EVENT_LOCK = threading.Lock()
-_EXPORT_EVENT_COND = threading.Condition(_EXPORT_EVENT_LOCK)
-_EXPORT_EVENT_VERSION = 0
-_EXPORT_EVENT_TS = ""
+EVENT_MAX_CLIENTS = 32
+EVENT_HEARTBEAT_S = 15.0
+EVENT_MANIFEST_POLL_S = 2.0
+_EVENT_BACKLOG = 16
+_EVENT_MAX_BUFFER = 256 * 1024
+_EVENT_MAX_DELTA = 500
+_EXPORT_CARDS_NAME = "export_cards.json"
+_BROADCASTERS: "weakref.WeakSet[ExportEventBroadcaster]" = weakref.WeakSet()
+_BROADCASTERS_LOCK = threading.Lock()
+_INLINE_CHANGES_OPEN = b'<script type="application/json" id="changesInline">'
+_INLINE_CHANGES_CLOSE = b"</script>"
 
 
 def notify_export_updated(stamp: str) -> None:
-    global _EXPORT_EVENT_VERSION, _EXPORT_EVENT_TS
-    with _EXPORT_EVENT_COND:
-        _EXPORT_EVENT_VERSION += 1
-        _EXPORT_EVENT_TS = stamp
-        _EXPORT_EVENT_COND.notify_all()
+    """Wake running broadcasters so a fresh export is published without waiting for the manifest poll."""
+    with _BROADCASTERS_LOCK:
+        targets = list(_BROADCASTERS)
+    for broadcaster in targets:
+        broadcaster.wake()
+
+
+def diff_export_cards(old: dict[str, dict], new: dict[str, dict]) -> dict:
+    """Return new/changed/removed card keys between two export card maps."""
+    added = {key: fields for key, fields in new.items() if key not in old}
+    changed = {key: fields for key, fields in new.items() if key in old and old[key] != fields}
+    removed = [key for key in old if key not in new]
+    return {"new": added, "changed": changed, "removed": removed}
+
+
+def _read_export_card_records(exports_dir: Path) -> list[dict] | None:
+    try:
+        raw = json.loads((exports_dir / _EXPORT_CARDS_NAME).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return raw if isinstance(raw, list) else None
+
+
+def _load_export_cards(exports_dir: Path) -> dict[str, dict] | None:
+    raw = _read_export_card_records(exports_dir)
+    if raw is None:
+        return None
+    cards: dict[str, dict] = {}
+    for rec in raw:
+        if isinstance(rec, dict) and rec.get("key"):
+            fields = dict(rec)
+            cards[str(fields.pop("key"))] = fields
+    return cards
+
+
+def _parse_last_event_id(value: str | None) -> int | None:
+    try:
+        return int(str(value or "").strip())
+    except ValueError:
+        return None
+
+
+class ExportEventBroadcaster:
+    """Single selector loop that fans export events out to every /events subscriber.
+
+    Subscribers are handed over by the HTTP handler after the response headers are sent, so
+    an idle browser tab costs one registered socket instead of a parked server thread.
+    """
+
+    def __init__(
+        self,
+        exports_dir: Path,
+        log: Callable[[str], None],
+        max_clients: int = EVENT_MAX_CLIENTS,
+        heartbeat_s: float = EVENT_HEARTBEAT_S,
+        manifest_poll_s: float = EVENT_MANIFEST_POLL_S,
+    ) -> None:
+        self.exports_dir = Path(exports_dir)
+        self.max_clients = max(1, int(max_clients or EVENT_MAX_CLIENTS))
+        self.heartbeat_s = max(0.05, float(heartbeat_s))
+        self.manifest_poll_s = max(0.05, float(manifest_poll_s))
+        self._log = log
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._lock = threading.Lock()
+        self._reserved = 0
+        self._pending: list[tuple[socket.socket, int | None]] = []
+        self._clients: dict[socket.socket, bytearray] = {}
+        self._backlog: collections.deque[tuple[int, bytes]] = collections.deque(maxlen=_EVENT_BACKLOG)
+        self._version = 0
+        self._exported_ms = 0
+        self._cards: dict[str, dict] = {}
+        self._manifest_stamp: tuple[int, int] | None = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def client_count(self) -> int:
+        with self._lock:
+            return self._reserved
+
+    def start(self) -> None:
+        self._poll_manifest(publish=False)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="flowertrack-export-events")
+        self._thread.start()
+        with _BROADCASTERS_LOCK:
+            _BROADCASTERS.add(self)
+
+    def stop(self) -> None:
+        with _BROADCASTERS_LOCK:
+            _BROADCASTERS.discard(self)
+        self._stop.set()
+        self.wake()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def reserve(self) -> bool:
+        """Claim a subscriber slot; callers must follow with add_client() or release()."""
+        with self._lock:
+            if self._reserved >= self.max_clients:
+                return False
+            self._reserved += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._reserved = max(0, self._reserved - 1)
+
+    def add_client(self, sock: socket.socket, last_event_id: int | None = None) -> None:
+        with self._lock:
+            self._pending.append((sock, last_event_id))
+        self.wake()
+
+    def _run(self) -> None:
+        now = time.monotonic()
+        next_heartbeat = now + self.heartbeat_s
+        next_manifest = now + self.manifest_poll_s
+        while not self._stop.is_set():
+            timeout = max(0.0, min(next_heartbeat, next_manifest) - time.monotonic())
+            try:
+                events = self._selector.select(timeout)
+            except OSError:
+                events = []
+            woke = False
+            for key, mask in events:
+                sock = key.fileobj
+                if sock is self._wake_r:
+                    self._drain_wake()
+                    woke = True
+                    continue
+                if mask & selectors.EVENT_READ:
+                    # Subscribers never send after the request line; readable means EOF or reset.
+                    try:
+                        chunk = sock.recv(1024)
+                    except BlockingIOError:
+                        chunk = b"-"
+                    except OSError:
+                        chunk = b""
+                    if not chunk:
+                        self._drop(sock)
+                        continue
+                if mask & selectors.EVENT_WRITE:
+                    self._flush(sock)
+            self._adopt_pending()
+            now = time.monotonic()
+            if woke or now >= next_manifest:
+                self._poll_manifest(publish=True)
+                next_manifest = now + self.manifest_poll_s
+            if now >= next_heartbeat:
+                self._broadcast(b": heartbeat\n\n")
+                next_heartbeat = now + self.heartbeat_s
+        for sock in list(self._clients):
+            self._drop(sock)
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for sock, _ in pending:
+            self._close_socket(sock)
+        for sock in (self._wake_r, self._wake_w):
+            try:
+                sock.close()
+            except OSError:
+                pass
+        try:
+            self._selector.close()
+        except Exception:
+            pass
+
+    def _drain_wake(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+
+    def _adopt_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for sock, last_event_id in pending:
+            try:
+                sock.setblocking(False)
+                self._clients[sock] = bytearray(b"retry: 5000\n\n" + self._replay_since(last_event_id))
+                self._selector.register(sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+            except (OSError, ValueError, KeyError):
+                self._clients.pop(sock, None)
+                self._close_socket(sock)
+                self.release()
+                continue
+            self._flush(sock)
+
+    def _replay_since(self, last_event_id: int | None) -> bytes:
+        if last_event_id is None or last_event_id >= self._version:
+            return b""
+        if self._backlog and self._backlog[0][0] <= last_event_id + 1:
+            return b"".join(frame for event_id, frame in self._backlog if event_id > last_event_id)
+        # Too far behind for deltas: tell the page to reload.
+        return self._frame(self._version, {"version": self._version, "exported_ms": self._exported_ms, "full": True})
+
+    @staticmethod
+    def _frame(event_id: int, payload: dict) -> bytes:
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {event_id}\nevent: export\ndata: {data}\n\n".encode("utf-8")
+
+    def _poll_manifest(self, publish: bool) -> None:
+        try:
+            from exports import EXPORT_MANIFEST_NAME, read_export_manifest
+        except Exception:
+            return
+        try:
+            st = (self.exports_dir / EXPORT_MANIFEST_NAME).stat()
+        except OSError:
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._manifest_stamp:
+            return
+        manifest = read_export_manifest(self.exports_dir)
+        if not manifest:
+            return
+        self._manifest_stamp = stamp
+        try:
+            version = int(manifest.get("version", 0) or 0)
+            exported_ms = int(manifest.get("exported_ms", 0) or 0)
+        except (TypeError, ValueError):
+            return
+        if version <= self._version:
+            return
+        cards = _load_export_cards(self.exports_dir)
+        payload: dict = {"version": version, "exported_ms": exported_ms}
+        if cards is None:
+            payload["full"] = True
+        else:
+            delta = diff_export_cards(self._cards, cards)
+            size = len(delta["new"]) + len(delta["changed"]) + len(delta["removed"])
+            if size > _EVENT_MAX_DELTA:
+                payload["full"] = True
+            else:
+                payload.update(delta)
+        self._version = version
+        self._exported_ms = exported_ms
+        self._cards = cards or {}
+        if not publish:
+            return
+        frame = self._frame(version, payload)
+        self._backlog.append((version, frame))
+        self._broadcast(frame)
+
+    def _broadcast(self, frame: bytes) -> None:
+        for sock, buf in list(self._clients.items()):
+            if len(buf) + len(frame) > _EVENT_MAX_BUFFER:
+                # Slow or stalled reader; it will reconnect and resume via Last-Event-ID.
+                self._drop(sock)
+                continue
+            buf += frame
+            self._flush(sock)
+
+    def _flush(self, sock: socket.socket) -> None:
+        buf = self._clients.get(sock)
+        if buf is None:
+            return
+        while buf:
+            try:
+                sent = sock.send(buf)
+            except BlockingIOError:
+                break
+            except OSError:
+                self._drop(sock)
+                return
+            del buf[:sent]
+        mask = selectors.EVENT_READ | (selectors.EVENT_WRITE if buf else 0)
+        try:
+            self._selector.modify(sock, mask)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def _drop(self, sock: socket.socket) -> None:
+        if self._clients.pop(sock, None) is None:
+            return
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        self._close_socket(sock)
+        self.release()
+
+    @staticmethod
+    def _close_socket(sock: socket.socket) -> None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
+class _ExportHTTPServer(http.server.ThreadingHTTPServer):
+    """Threading server that leaves sockets handed to the event broadcaster open."""
+
+    def shutdown_request(self, request) -> None:  # type: ignore[override]
+        detached = getattr(self, "_ft_detached", None)
+        if detached is not None and request in detached:
+            detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+
+def strip_inline_changes(raw: bytes) -> bytes:
+    """Drop the offline history copy from an export; HTTP pages fetch changes_latest.json on demand."""
+    start = raw.find(_INLINE_CHANGES_OPEN)
+    if start < 0:
+        return raw
+    body_start = start + len(_INLINE_CHANGES_OPEN)
+    end = raw.find(_INLINE_CHANGES_CLOSE, body_start)
+    if end < 0:
+        return raw
+    return raw[:body_start] + b"[]" + raw[end:]
 
 
 def _port_ready(host: str, port: int, timeout: float = 0.5) -> bool:
@@ -39,6 +374,7 @@ def start_export_server(
     log: Callable[[str], None],
     bind_host: str = "127.0.0.1",
     probe_host: str | None = None,
+    max_event_clients: int = EVENT_MAX_CLIENTS,
 ) -> Tuple[Optional[http.server.ThreadingHTTPServer], Optional[threading.Thread], Optional[int]]:
     """Start a lightweight HTTP server to serve exports; returns (httpd, thread, port) or (None, None, None) on failure."""
     exports_dir.mkdir(parents=True, exist_ok=True)
@@ -55,20 +391,93 @@ def start_export_server(
         log(f"[server] already running on port {preferred_port}")
         return None, None, preferred_port
 
+    export_page_lock = threading.Lock()
+    export_page_cache: dict[str, object] = {"key": None, "body": b""}
+    catalog_lock = threading.Lock()
+    catalog_cache: dict[str, object] = {"key": None, "index": None}
+
+    def _catalog_index() -> tuple[int, Optional[CatalogIndex]]:
+        """Return (version, index) for the latest export, rebuilding only when the cards file changes."""
+        from exports import read_export_manifest
+
+        manifest = read_export_manifest(exports_dir) or {}
+        version = int(manifest.get("version", 0) or 0)
+        try:
+            st = (exports_dir / _EXPORT_CARDS_NAME).stat()
+        except OSError:
+            return version, None
+        key = (st.st_mtime_ns, st.st_size)
+        with catalog_lock:
+            if catalog_cache["key"] == key:
+                return version, catalog_cache["index"]  # type: ignore[return-value]
+            records = _read_export_card_records(exports_dir)
+            index = CatalogIndex(records) if records is not None else None
+            catalog_cache["key"] = key
+            catalog_cache["index"] = index
+            return version, index
+
     class QuietHandler(http.server.SimpleHTTPRequestHandler):
         def _latest_export_name(self) -> str | None:
             try:
-                files = sorted(
-                    exports_dir.glob("export-*.html"),
-                    key=lambda p: p.stat().st_mtime,
-                    reverse=True,
-                )
-                if files:
-                    return files[0].name
+                from exports import latest_export_path
+
+                latest = latest_export_path(exports_dir)
+                if latest:
+                    return latest.name
             except Exception:
                 pass
             return None
 
+        def _send_export_page(self, name: str) -> bool:
+            target = exports_dir / name
+            try:
+                st = target.stat()
+            except OSError:
+                return False
+            key = (name, st.st_mtime_ns, st.st_size)
+            with export_page_lock:
+                if export_page_cache.get("key") == key:
+                    body = export_page_cache["body"]
+                else:
+                    try:
+                        body = strip_inline_changes(target.read_bytes())
+                    except OSError:
+                        return False
+                    export_page_cache["key"] = key
+                    export_page_cache["body"] = body
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+
+        def _subscribe_events(self) -> None:
+            if not broadcaster.reserve():
+                self.send_response(503)
+                self.send_header("Retry-After", "30")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "keep-alive")
+                self.end_headers()
+                self.wfile.flush()
+            except Exception:
+                broadcaster.release()
+                raise
+            detached = getattr(self.server, "_ft_detached", None)
+            if detached is None:
+                broadcaster.release()
+                return
+            detached.add(self.connection)
+            broadcaster.add_client(self.connection, _parse_last_event_id(self.headers.get("Last-Event-ID")))
+            self.close_connection = True
+
         def _send_json(self, payload: dict, status: int = 200) -> None:
             raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
             self.send_response(status)
@@ -103,40 +512,30 @@ def start_export_server(
                 if path.rstrip("/") == "/api/changes/unread":
                     self._send_json(unread_payload(), status=200)
                     return
+                if path.rstrip("/") == "/api/products":
+                    query = self.path.split("?", 1)[1] if "?" in self.path else ""
+                    params = {k: (v if len(v) > 1 else v[0]) for k, v in urllib.parse.parse_qs(query).items()}
+                    version, index = _catalog_index()
+                    if index is None:
+                        self._send_json({"ok": False, "error": "no_export"}, status=404)
+                        return
+                    result = index.query(params)
+                    result.update({"ok": True, "version": version})
+                    self._send_json(result, status=200)
+                    return
                 if path.rstrip("/") == "/events":
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/event-stream")
-                    self.send_header("Cache-Control", "no-cache")
-                    self.send_header("Connection", "keep-alive")
-                    self.end_headers()
-                    last_seen = -1
-                    while True:
-                        with _EXPORT_EVENT_COND:
-                            _EXPORT_EVENT_COND.wait(timeout=60.0)
-                            version = _EXPORT_EVENT_VERSION
-                            stamp = _EXPORT_EVENT_TS
-                        if version != last_seen:
-                            last_seen = version
-                            payload = stamp or ""
-                            try:
-                                self.wfile.write(f"event: export\ndata: {payload}\n\n".encode("utf-8"))
-                                self.wfile.flush()
-                            except Exception:
-                                break
-                        else:
-                            try:
-                                self.wfile.write(b": heartbeat\n\n")
-                                self.wfile.flush()
-                            except Exception:
-                                break
+                    self._subscribe_events()
                     return
                 if path.rstrip("/") == "/flowerbrowser":
                     latest = self._latest_export_name()
-                    if latest:
-                        self.path = f"/{latest}"
-                        return super().do_GET()
+                    if latest and self._send_export_page(latest):
+                        return
                     self.send_error(404, "No exports available yet.")
                     return
+                name = urllib.parse.unquote(path.lstrip("/"))
+                if name.startswith("export-") and name.endswith(".html") and "/" not in name:
+                    if self._send_export_page(name):
+                        return
             except Exception as e:
                 log(f"[server] handler exception: {e}")
             return super().do_GET()
@@ -168,7 +567,7 @@ def start_export_server(
     httpd = None
     for _ in range(10):
         try:
-            httpd = http.server.ThreadingHTTPServer((bind, port), handler)
+            httpd = _ExportHTTPServer((bind, port), handler)
             httpd.allow_reuse_address = True
             break
         except OSError as e:
@@ -178,6 +577,10 @@ def start_export_server(
         log("[server] failed to start export server after attempting 10 ports")
         return None, None, None
 
+    broadcaster = ExportEventBroadcaster(exports_dir, log, max_clients=max_event_clients)
+    setattr(httpd, "_ft_detached", weakref.WeakSet())
+    setattr(httpd, "_ft_events", broadcaster)
+    broadcaster.start()
     thread = threading.Thread(target=httpd.serve_forever, daemon=True)
     thread.start()
 
@@ -198,6 +601,9 @@ def start_export_server(
 def stop_export_server(httpd: Optional[http.server.ThreadingHTTPServer], thread: Optional[threading.Thread], log: Callable[[str], None]) -> None:
     """Stop the running export server if present."""
     if httpd:
+        broadcaster = getattr(httpd, "_ft_events", None)
+        if broadcaster is not None:
+            broadcaster.stop()
         try:
             httpd.shutdown()
             httpd.server_close()
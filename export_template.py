@@ -96,6 +96,7 @@ button.btn-filter{background:var(--panel);color:var(--accent)}
 button.btn-filter.active{background:var(--accent);color:var(--bg);background-image:none}
 button:hover{background:var(--hover)}
 .grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(260px,1fr));gap:16px}
+body:not(.light) img[data-theme-icon='light'],body.light img[data-theme-icon='dark']{display:none}
 .card{background:var(--panel);padding:12px;border-radius:12px;border:1px solid var(--border);position:relative;display:flex;flex-direction:column;min-height:300px;content-visibility:auto;contain-intrinsic-size:320px 320px}
 .card-new{background:#0f2616;border-color:#1f5d35}
 .card-removed{background:#2b1313;border-color:#6a1f1f}
@@ -175,10 +176,57 @@ function updateSortButtons() {
         }
     });
 }
+const WINDOW_BUFFER_ROWS = 3;
+let allCards = [];
+const cardIndex = new WeakMap();
+const cardsByKey = new Map();
+let filteredCards = [];
+let gridColumns = 1;
+let rowHeight = 340;
+let renderedStart = -1;
+let renderedEnd = -1;
+let renderQueued = false;
+function indexCard(card) {
+    // Filter index: parse data attributes once instead of on every filter/sort pass.
+    const d = card.dataset;
+    const pt = (d.pt || '').toLowerCase();
+    const irr = (d.irradiation || '').toLowerCase();
+    const meta = {
+        pt,
+        removed: d.removed === '1',
+        strainType: d.strainType || '',
+        favKey: d.favkey || '',
+        smalls: d.smalls === '1',
+        out: d.out === '1',
+        price: parseFloat(d.price),
+        thc: parseFloat(d.thc),
+        cbd: parseFloat(d.cbd),
+        brand: (d.brand || '').trim(),
+        text: ((d.strain || '') + ' ' + (d.brand || '') + ' ' + (d.producer || '') + ' ' + (d.productId || '')).toLowerCase(),
+        thcExempt: pt === 'vape' || pt === 'oil' || pt === 'pastille' || pt === 'device',
+        betaIrr: pt === 'flower' && (irr.includes('beta') || irr.includes('β')),
+        gammaIrr: pt === 'flower' && (irr.includes('gamma') || irr.includes('γ')),
+    };
+    cardIndex.set(card, meta);
+    if (d.key) cardsByKey.set(d.key, card);
+    return meta;
+}
+function cardMeta(card) {
+    return cardIndex.get(card) || indexCard(card);
+}
+function buildCardIndex() {
+    // Cards ship inside an inert <template>; only the rendered window is attached to the document.
+    const pool = document.getElementById('cardPool');
+    const source = pool ? pool.content : document.getElementById('grid');
+    allCards = source ? Array.from(source.children).filter(el => el.classList.contains('card')) : [];
+    allCards.forEach(indexCard);
+}
+function sortValue(card, key) {
+    const v = cardMeta(card)[key];
+    return Number.isFinite(v) ? v : (key === 'price' ? Number.POSITIVE_INFINITY : 0);
+}
 function sortCards(key, btn) {
     if (key === undefined || key === null) key = state.key || 'price';
-    const grid = document.getElementById("grid");
-    const cards = Array.from(grid.children);
     if (state.key === key) {
         state.asc = !state.asc;
     } else {
@@ -186,16 +234,9 @@ function sortCards(key, btn) {
         state.asc = true;
     }
     const dir = state.asc ? 1 : -1;
-    cards.sort((a, b) => {
-        const avRaw = parseFloat(a.dataset[key]);
-        const bvRaw = parseFloat(b.dataset[key]);
-        const av = Number.isFinite(avRaw) ? avRaw : (key === 'price' ? Number.POSITIVE_INFINITY : 0);
-        const bv = Number.isFinite(bvRaw) ? bvRaw : (key === 'price' ? Number.POSITIVE_INFINITY : 0);
-        return (av - bv) * dir;
-    });
-    cards.forEach(c => grid.appendChild(c));
+    allCards.sort((a, b) => (sortValue(a, key) - sortValue(b, key)) * dir);
     updateSortButtons();
-    applyVisibleLimit();
+    applyFilters();
 }
 let activeTypes = new Set(['flower','oil','vape','pastille']);
 let activeStrains = new Set(['Indica','Sativa','Hybrid']);
@@ -206,9 +247,6 @@ let showBetaIrr = true;
 let showGammaIrr = true;
 let brandFilter = new Set();
 let searchTerm = "";
-const VISIBLE_STEP = 30;
-let visibleLimit = VISIBLE_STEP;
-let filteredCards = [];
 const priceMinBound = {price_min_bound};
 const priceMaxBound = {price_max_bound};
 let priceMinSel = priceMinBound;
@@ -217,109 +255,119 @@ const thcMinBound = {thc_min_bound};
 const thcMaxBound = {thc_max_bound};
 let thcMinSel = thcMinBound;
 let thcMaxSel = thcMaxBound;
-function applyVisibleLimit() {
-    let shown = 0;
-    filteredCards.forEach(c => {
-        if (shown < visibleLimit) {
-            c.style.display = '';
-            shown += 1;
-        } else {
-            c.style.display = 'none';
-        }
-    });
-    const btn = document.getElementById('loadMore');
-    if (btn) btn.style.display = filteredCards.length > visibleLimit ? '' : 'none';
-    const count = document.getElementById('visibleCount');
-    if (count) {
-        const total = filteredCards.length;
-        count.textContent = total ? `${Math.min(visibleLimit, total)} / ${total}` : '';
-    }
-}
-function applyFilters(resetLimit = true) {
-    const grid = document.getElementById('grid');
-    const cards = Array.from(grid.children);
+function cardMatches(m, term) {
+    const priceOk = Number.isFinite(m.price) ? (m.price >= priceMinSel && m.price <= priceMaxSel) : true;
+    const thcOk = m.thcExempt ? true : (Number.isFinite(m.thc) ? (m.thc >= thcMinSel && m.thc <= thcMaxSel) : true);
+    const showType = m.removed ? true : activeTypes.has(m.pt);
+    const showStrain = (!m.strainType) ? true : activeStrains.has(m.strainType);
+    const matchesSearch = term ? m.text.includes(term) : true;
+    const brandOk = brandFilter.size > 0 ? brandFilter.has(m.brand) : true;
+    const favOk = favoritesOnly ? favorites.has(m.favKey) : true;
+    const stockOk = showInStockOnly ? !m.out : true;
+    const smallsOk = showSmalls || !m.smalls;
+    const betaOk = !m.betaIrr || showBetaIrr;
+    const gammaOk = !m.gammaIrr || showGammaIrr;
+    return showType && showStrain && matchesSearch && brandOk && priceOk && thcOk && favOk && smallsOk && stockOk && betaOk && gammaOk;
+}
+function applyFilters() {
     const term = searchTerm.trim().toLowerCase();
-    if (resetLimit) visibleLimit = VISIBLE_STEP;
-    filteredCards = [];
-    cards.forEach(c => {
-        const pt = (c.dataset.pt || '').toLowerCase();
-        const isRemoved = c.dataset.removed === '1';
-        const st = c.dataset.strainType || '';
-        const favKey = c.dataset.favkey || '';
-        const isSmalls = c.dataset.smalls === '1';
-        const priceVal = parseFloat(c.dataset.price);
-        const thcVal = parseFloat(c.dataset.thc);
-        const priceOk = Number.isFinite(priceVal) ? (priceVal >= priceMinSel && priceVal <= priceMaxSel) : true;
-        const thcOk = (pt === 'vape' || pt === 'oil' || pt === 'pastille' || pt === 'device') ? true : (Number.isFinite(thcVal) ? (thcVal >= thcMinSel && thcVal <= thcMaxSel) : true);
-        const showType = isRemoved ? true : activeTypes.has(pt);
-        const showStrain = (!st) ? true : activeStrains.has(st);
-        const text = (c.dataset.strain || '') + ' ' + (c.dataset.brand || '') + ' ' + (c.dataset.producer || '') + ' ' + (c.dataset.productId || '');
-        const matchesSearch = term ? text.toLowerCase().includes(term) : true;
-        const brandText = (c.dataset.brand || '').trim();
-        const brandOk = brandFilter.size > 0 ? brandFilter.has(brandText) : true;
-        const favOk = favoritesOnly ? favorites.has(favKey) : true;
-        const isOut = c.dataset.out === '1';
-        const stockOk = showInStockOnly ? !isOut : true;
-        const smallsOk = showSmalls || !isSmalls;
-        const irrRaw = (c.dataset.irradiation || '').toLowerCase();
-        const isFlower = pt === 'flower';
-        const isBetaIrr = irrRaw.includes('beta') || irrRaw.includes('β');
-        const isGammaIrr = irrRaw.includes('gamma') || irrRaw.includes('γ');
-        const betaOk = !isFlower || !isBetaIrr || showBetaIrr;
-        const gammaOk = !isFlower || !isGammaIrr || showGammaIrr;
-        if (showType && showStrain && matchesSearch && brandOk && priceOk && thcOk && favOk && smallsOk && stockOk && betaOk && gammaOk) {
-            filteredCards.push(c);
-        }
-        c.style.display = 'none';
-    });
-    applyVisibleLimit();
-    tryAutoFill();
+    filteredCards = allCards.filter(c => cardMatches(cardMeta(c), term));
+    renderWindow(true);
 }
 function handleSearch(el) {
     searchTerm = el.value || "";
     applyFilters();
 }
-function loadMore() {
-    visibleLimit += VISIBLE_STEP;
-    applyVisibleLimit();
-}
-let autoLoading = false;
-function triggerAutoLoad() {
-    if (autoLoading) return;
-    const btn = document.getElementById('loadMore');
-    if (!btn || btn.style.display === 'none') return;
-    autoLoading = true;
-    loadMore();
-    setTimeout(() => {
-        autoLoading = false;
-        tryAutoFill();
-    }, 120);
-}
-function tryAutoFill() {
-    const btn = document.getElementById('loadMore');
-    if (!btn || btn.style.display === 'none') return;
-    const bodyShort = document.body.scrollHeight <= (window.innerHeight + 20);
-    if (!bodyShort) return;
-    triggerAutoLoad();
-}
-function autoLoadOnScroll() {
-    const btn = document.getElementById('loadMore');
-    if (!btn || btn.style.display === 'none') return;
-    const nearBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - 300);
-    if (!nearBottom) return;
-    triggerAutoLoad();
-}
-function observeLoadMore() {
-    const sentinel = document.getElementById('loadMoreSentinel');
-    if (!sentinel || !('IntersectionObserver' in window)) return;
-    const observer = new IntersectionObserver((entries) => {
-        entries.forEach(entry => {
-            if (entry.isIntersecting) {
-                triggerAutoLoad();
-            }
-        });
-    }, { root: null, rootMargin: '400px', threshold: 0.01 });
-    observer.observe(sentinel);
+function measureGrid() {
+    const grid = document.getElementById('grid');
+    if (!grid) return;
+    const tracks = (window.getComputedStyle(grid).gridTemplateColumns || '').split(' ').filter(t => t && t !== 'none');
+    gridColumns = Math.max(1, tracks.length);
+}
+function measureRowHeight(grid) {
+    const cards = grid.children;
+    if (cards.length < 1) return false;
+    const rowsBetween = Math.floor((cards.length - 1) / gridColumns);
+    let measured = 0;
+    if (rowsBetween > 0) {
+        measured = (cards[cards.length - 1].offsetTop - cards[0].offsetTop) / rowsBetween;
+    } else {
+        const gap = parseFloat(window.getComputedStyle(grid).rowGap) || 0;
+        measured = cards[0].offsetHeight + gap;
+    }
+    if (!(measured > 0) || Math.abs(measured - rowHeight) <= 1) return false;
+    rowHeight = measured;
+    return true;
+}
+function updateVisibleCount() {
+    const count = document.getElementById('visibleCount');
+    if (!count) return;
+    const total = filteredCards.length;
+    count.textContent = total ? `${total} of ${allCards.length} products` : 'No matching products';
+}
+function renderWindow(force = false, remeasure = true) {
+    renderQueued = false;
+    const grid = document.getElementById('grid');
+    if (!grid) return;
+    const cols = gridColumns;
+    const total = filteredCards.length;
+    const totalRows = Math.ceil(total / cols);
+    const gridTop = grid.getBoundingClientRect().top + window.scrollY;
+    const viewTop = window.scrollY - gridTop;
+    const viewBottom = viewTop + window.innerHeight;
+    let firstRow = Math.max(0, Math.floor(viewTop / rowHeight) - WINDOW_BUFFER_ROWS);
+    firstRow = Math.min(firstRow, Math.max(0, totalRows - 1));
+    const lastRow = Math.max(firstRow, Math.min(totalRows - 1, Math.ceil(viewBottom / rowHeight) + WINDOW_BUFFER_ROWS));
+    const start = Math.min(total, firstRow * cols);
+    const end = Math.min(total, (lastRow + 1) * cols);
+    if (!force && start === renderedStart && end === renderedEnd) return;
+    renderedStart = start;
+    renderedEnd = end;
+    const frag = document.createDocumentFragment();
+    for (let i = start; i < end; i++) frag.appendChild(filteredCards[i]);
+    if (grid.replaceChildren) {
+        grid.replaceChildren(frag);
+    } else {
+        while (grid.firstChild) grid.removeChild(grid.firstChild);
+        grid.appendChild(frag);
+    }
+    grid.style.paddingTop = `${firstRow * rowHeight}px`;
+    grid.style.paddingBottom = `${Math.max(0, totalRows - lastRow - 1) * rowHeight}px`;
+    updateVisibleCount();
+    if (remeasure && measureRowHeight(grid)) renderWindow(true, false);
+}
+function scheduleRender() {
+    if (renderQueued) return;
+    renderQueued = true;
+    window.requestAnimationFrame(() => renderWindow(false));
+}
+function handleGridResize() {
+    measureGrid();
+    renderWindow(true);
+}
+function handleGridClick(e) {
+    const target = e.target.closest('[data-action]');
+    if (!target) return;
+    const action = target.dataset.action;
+    if (action === 'fav') toggleFavorite(target);
+    else if (action === 'basket') toggleBasketItem(target);
+    else if (action === 'image') openImageModal(target.dataset.fullsrc, target.alt);
+    else if (action === 'dismiss-removed') dismissRemovedBadge(target);
+}
+function handleGridHover(e, entering) {
+    const btn = e.target.closest('[data-action="basket"]');
+    if (!btn) return;
+    if (e.relatedTarget && btn.contains(e.relatedTarget)) return;
+    basketHover(btn, entering);
+}
+function initGridEvents() {
+    const grid = document.getElementById('grid');
+    if (!grid) return;
+    grid.addEventListener('click', handleGridClick);
+    grid.addEventListener('mouseover', (e) => handleGridHover(e, true));
+    grid.addEventListener('mouseout', (e) => handleGridHover(e, false));
+    window.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', handleGridResize);
 }
 function toggleBrandFilter(brand, checkbox) {
     if (!brand) return;
@@ -384,16 +432,15 @@ function dismissRemovedBadge(badgeEl) {
     const card = badgeEl.closest('.card');
     if (!card) return;
     card.remove();
-    filteredCards = filteredCards.filter(c => c !== card);
-    applyFilters(false);
+    allCards = allCards.filter(c => c !== card);
+    if (card.dataset.key) cardsByKey.delete(card.dataset.key);
+    applyFilters();
 }
 let favorites = new Set();
 let basketTotal = 0;
 let basketCount = 0;
 let basket = new Map();
 const DELIVERY_FEE = 4.99;
-const rawChangesB64 = "__CHANGES_JSON_B64__";
-const rawChangesJson = __CHANGES_JSON__;
 let changesData = null;
 let changesError = "";
 let historyLoaded = false;
@@ -495,11 +542,86 @@ function handleExportUpdate(stamp) {
         showUpdateBanner();
     }
 }
+function findCardByKey(key) {
+    if (!key) return null;
+    return cardsByKey.get(key) || null;
+}
+function patchCardFields(card, fields) {
+    if (!card || !fields) return;
+    if ('price' in fields) {
+        const price = Number(fields.price);
+        const hasPrice = fields.price !== null && Number.isFinite(price);
+        card.dataset.price = hasPrice ? String(price) : '';
+        const pill = findPricePill(card);
+        if (pill && hasPrice) pill.textContent = `💵 £${price.toFixed(2)}`;
+    }
+    if ('stock' in fields) {
+        const stock = String(fields.stock || '');
+        card.dataset.stock = stock;
+        const pill = findStockPill(card);
+        if (pill) pill.textContent = `📊 ${stock}`;
+    }
+    if ('stock_status' in fields) card.dataset.stockStatus = String(fields.stock_status || '');
+    if ('out' in fields) {
+        card.dataset.out = fields.out ? '1' : '0';
+        card.classList.toggle('card-out', !!fields.out);
+    }
+    if ('removed' in fields) {
+        card.dataset.removed = fields.removed ? '1' : '0';
+        if (fields.removed) ensureUnreadRemovedBadge(card);
+    }
+    indexCard(card);
+}
+function applyExportDelta(payload) {
+    const changed = (payload && payload.changed) || {};
+    const removed = (payload && payload.removed) || [];
+    const targets = [];
+    for (const key of Object.keys(changed)) {
+        const card = findCardByKey(key);
+        if (!card) return false;
+        targets.push([card, changed[key]]);
+    }
+    for (const key of removed) {
+        const card = findCardByKey(key);
+        if (card) targets.push([card, { removed: 1, out: 1 }]);
+    }
+    targets.forEach(([card, fields]) => patchCardFields(card, fields));
+    if (targets.length) applyFilters();
+    return true;
+}
+function handleExportEvent(raw) {
+    let payload = null;
+    try {
+        payload = JSON.parse(raw);
+    } catch (e) {
+        handleExportUpdate(raw);
+        return;
+    }
+    if (!payload || typeof payload !== 'object') {
+        handleExportUpdate(String(payload));
+        return;
+    }
+    const ms = Number(payload.exported_ms);
+    if (!Number.isFinite(ms)) return;
+    if (!updateBaselineSet) {
+        setExportBaseline(ms);
+        return;
+    }
+    if (ms <= latestExportMs) return;
+    const hasNew = payload.new && Object.keys(payload.new).length > 0;
+    if (payload.full || hasNew || !applyExportDelta(payload)) {
+        showUpdateBanner();
+        return;
+    }
+    setExportBaseline(ms);
+    invalidateHistory();
+    refreshUnreadState();
+}
 function startExportUpdates() {
     if (location.protocol.startsWith('http') && typeof EventSource !== 'undefined') {
         try {
             const es = new EventSource('/events');
-            es.addEventListener('export', (ev) => handleExportUpdate(ev.data));
+            es.addEventListener('export', (ev) => handleExportEvent(ev.data));
             es.onerror = () => {};
         } catch (e) {}
     }
@@ -525,16 +647,6 @@ function startExportUpdates() {
         } catch (e) {}
     }, 60000);
 }
-function decodeBase64Utf8(b64) {
-    if (!b64) return "";
-    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
-    if (typeof TextDecoder !== 'undefined') {
-        return new TextDecoder().decode(bytes);
-    }
-    let binary = "";
-    bytes.forEach(b => { binary += String.fromCharCode(b); });
-    return decodeURIComponent(escape(binary));
-}
 function isHttpMode() {
     return location.protocol.startsWith('http');
 }
@@ -586,7 +698,7 @@ function ensureUnreadRemovedBadge(card) {
     badge.setAttribute('data-unread-badge', '1');
     badge.setAttribute('title', 'Dismiss removed highlight');
     badge.textContent = 'Removed';
-    badge.onclick = function () { dismissRemovedBadge(badge); };
+    badge.setAttribute('data-action', 'dismiss-removed');
     card.appendChild(badge);
 }
 function applyUnreadVisualForCard(card) {
@@ -648,7 +760,7 @@ function unreadItemCount() {
     }
 }
 function applyUnreadStateToCards() {
-    document.querySelectorAll('.card').forEach(applyUnreadVisualForCard);
+    allCards.forEach(applyUnreadVisualForCard);
 }
 function acknowledgeUnreadOnRefresh() {
     if (!isHttpMode()) return;
@@ -682,33 +794,33 @@ async function refreshUnreadState() {
         acknowledgeUnreadOnRefresh();
     } catch (e) {}
 }
+function invalidateHistory() {
+    // Cards were patched in place, so the next history open must refetch changes_latest.json.
+    historyLoaded = false;
+    changesData = null;
+}
 function ensureChangesData() {
-    if (changesData !== null) return changesData;
-    changesData = [];
-    changesError = "";
-    try {
-        if (!rawChangesB64 || rawChangesB64 === "__CHANGES_JSON_B64__") {
-            return changesData;
-        }
-        if (rawChangesB64.length > 200000) {
-            changesError = "History payload too large for inline decode.";
-            return changesData;
-        }
-        const decoded = decodeBase64Utf8(rawChangesB64);
-        changesData = JSON.parse(decoded) || [];
-    } catch (e) {
-        changesError = e ? String(e) : "Failed to decode history data.";
-        changesData = [];
-    }
-    if ((!changesData || !changesData.length) && rawChangesJson && Array.isArray(rawChangesJson)) {
-        changesData = rawChangesJson;
-    }
-    return changesData;
+    return changesData || [];
+}
+function readInlineChanges() {
+    // Offline (file://) copy only; the server strips this block and HTTP pages use the sidecar.
+    const el = document.getElementById('changesInline');
+    const text = el ? (el.textContent || '').trim() : '';
+    if (!text) return [];
+    const parsed = JSON.parse(text);
+    return Array.isArray(parsed) ? parsed : [];
 }
 async function preloadHistory() {
     if (historyLoaded || historyLoading) return;
     historyLoading = true;
-    if (ensureChangesData().length) {
+    changesError = "";
+    if (!isHttpMode()) {
+        try {
+            changesData = readInlineChanges();
+        } catch (e) {
+            changesError = e ? String(e) : "Failed to read history data.";
+            changesData = [];
+        }
         historyLoaded = true;
         historyLoading = false;
         return;
@@ -733,20 +845,22 @@ async function preloadHistory() {
         historyLoading = false;
     }
 }
+function refreshBasketButton(card) {
+    if (!card) return;
+    const key = card.dataset.key || card.dataset.favkey || card.dataset.productId || card.dataset.strain;
+    const btn = card.querySelector('.btn-basket');
+    if (!btn) return;
+    const qty = (key && basket.has(key)) ? (basket.get(key).qty || 0) : 0;
+    if (qty > 0) {
+        btn.classList.add('added');
+        btn.textContent = `${qty} in basket`;
+    } else {
+        btn.classList.remove('added');
+        btn.textContent = 'Add to basket';
+    }
+}
 function refreshBasketButtons() {
-    document.querySelectorAll('.card').forEach(card => {
-        const key = card.dataset.key || card.dataset.favkey || card.dataset.productId || card.dataset.strain;
-        const btn = card.querySelector('.btn-basket');
-        if (!btn) return;
-        const qty = (key && basket.has(key)) ? (basket.get(key).qty || 0) : 0;
-        if (qty > 0) {
-            btn.classList.add('added');
-            btn.textContent = `${qty} in basket`;
-        } else {
-            btn.classList.remove('added');
-            btn.textContent = 'Add to basket';
-        }
-    });
+    allCards.forEach(refreshBasketButton);
 }
 function loadBasket() {
     try {
@@ -812,7 +926,7 @@ function updateBasketUI() {
 function basketHover(btn, entering) {
     if (!btn) return;
     if (!entering) {
-        refreshBasketButtons();
+        refreshBasketButton(btn.closest('.card'));
         return;
     }
     const card = btn.closest('.card');
@@ -1286,11 +1400,6 @@ function applyTheme(saved) {
         btn.title = useLight ? 'Light theme' : 'Dark theme';
         btn.setAttribute('aria-label', useLight ? 'Light theme' : 'Dark theme');
     }
-    // Swap type icons to match theme
-    document.querySelectorAll('[data-theme-icon]').forEach(img => {
-        const theme = img.getAttribute('data-theme-icon');
-        img.style.display = theme === (useLight ? 'light' : 'dark') ? '' : 'none';
-    });
 }
 function toggleTheme() {
     let current = 'dark';
@@ -1315,8 +1424,8 @@ function buildBrandMenu() {
     const menu = document.getElementById('brandMenu');
     if (!menu) return;
     const brands = new Set();
-    document.querySelectorAll('.card').forEach(c => {
-        const brand = (c.dataset.brand || '').trim();
+    allCards.forEach(c => {
+        const brand = cardMeta(c).brand;
         if (brand) brands.add(brand);
     });
     const items = Array.from(brands).sort((a, b) => a.localeCompare(b));
@@ -1343,6 +1452,9 @@ document.addEventListener('DOMContentLoaded', () => {
         saved = localStorage.getItem('ft_theme');
     } catch (e) {}
     initExportTimestamp();
+    buildCardIndex();
+    measureGrid();
+    initGridEvents();
     applyTheme(saved === 'light');
     loadFilterPrefs();
     loadFavorites();
@@ -1350,7 +1462,7 @@ document.addEventListener('DOMContentLoaded', () => {
     showInStockOnly = true;
     let instockBtn = document.querySelector('[data-filter-instock]');
     if (instockBtn) instockBtn.classList.add('active');
-    document.querySelectorAll('.card').forEach(applyFavState);
+    allCards.forEach(applyFavState);
     updateBasketUI();
     refreshBasketButtons();
     updateSortButtons();
@@ -1481,11 +1593,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     buildBrandMenu();
     document.addEventListener('click', closeBrandMenu);
-    window.addEventListener('scroll', autoLoadOnScroll);
     applyFilters();
-    observeLoadMore();
-    setTimeout(tryAutoFill, 100);
-    preloadHistory();
     startExportUpdates();
     refreshUnreadState();
 });
@@ -1554,12 +1662,12 @@ document.addEventListener('DOMContentLoaded', () => {
     <button id="themeToggle" onclick="toggleTheme()">☀️</button>
   </div>
 </div>
-<div class='grid' id='grid'>
+<div class='grid' id='grid'></div>
+<template id='cardPool'>
 __CARDS__
-</div>
+</template>
 <div class='load-more'>
-  <button id='loadMore' onclick='loadMore()'>Load more</button>
   <span class='small' id='visibleCount'></span>
 </div>
-<div id='loadMoreSentinel' style='height:1px'></div>
+<script type="application/json" id="changesInline">__CHANGES_JSON__</script>
 </body></html>"""
@@ -6,6 +6,7 @@ import json
 import math
 import os
 import re
+import threading
 import time
 import urllib.parse
 import webbrowser
@@ -32,6 +33,10 @@ _ASSET_CACHE: dict[str, str] | None = None
 _ASSETS_DIR: Optional[Path] = None
 _EXPORTS_DIR: Optional[Path] = None
 EXPORT_WARN_MB = 10.0
+EXPORT_MANIFEST_NAME = "export_manifest.json"
+_MANIFEST_LOCK = threading.Lock()
+_MANIFEST_CACHE: dict[str, tuple[tuple[int, int], dict]] = {}
+_SCAN_CACHE: dict[str, tuple[int, Optional[str]]] = {}
 
 
 def _ensure_assets_dir(default: Optional[Path] = None) -> None:
@@ -237,9 +242,9 @@ def _render_card_html(
       data-smalls='{1 if it.get("is_smalls") else 0}'
       data-removed='{1 if it.get("is_removed") else 0}'
       data-out='{1 if is_out else 0}'>
-    <button class='fav-btn' onclick='toggleFavorite(this)' title='Favorite this item'>★</button>
+    <button class='fav-btn' data-action='fav' title='Favorite this item'>★</button>
     {image_html if image_html else ("<img class='type-badge' data-theme-icon='dark' loading='lazy' decoding='async' src='" + esc_attr(type_icon_dark) + "' alt='" + esc_attr(it.get('product_type') or '') + "' />") if type_icon_dark else ""}
-    {"" if image_html else ("<img class='type-badge' data-theme-icon='light' loading='lazy' decoding='async' src='" + esc_attr(type_icon_light) + "' alt='" + esc_attr(it.get('product_type') or '') + "' style='display:none;' />") if type_icon_light else ""}
+    {"" if image_html else ("<img class='type-badge' data-theme-icon='light' loading='lazy' decoding='async' src='" + esc_attr(type_icon_light) + "' alt='" + esc_attr(it.get('product_type') or '') + "' />") if type_icon_light else ""}
     {"" if image_html else (("<img class='strain-badge' loading='lazy' decoding='async' src='" + esc_attr(strain_badge_src) + "' alt='" + esc_attr(it.get('strain_type') or '') + "' />") if strain_badge_src else "")}
     <div style='display:flex;flex-direction:column;align-items:flex-start;gap:4px;'>
       {price_badge}
@@ -264,7 +269,7 @@ def _render_card_html(
     <div class='small'>🌞THC: {esc(disp_thc)}</div>
     <div class='small'>🌙CBD: {esc(disp_cbd)}</div>
     <div class='card-actions'>
-      <button class='btn-basket' onclick='toggleBasketItem(this)' onmouseenter='basketHover(this,true)' onmouseleave='basketHover(this,false)'>Add to basket</button>
+      <button class='btn-basket' data-action='basket'>Add to basket</button>
     </div>
   </div>
  </div>
@@ -286,6 +291,7 @@ def export_html(data, path, fetch_images=False):
     _ensure_assets_dir()
     out_path = Path(path)
     cards: list[str] = []
+    card_records: list[dict] = []
 
     def get_badge_src(strain_type: str | None, product_type: str | None) -> str | None:
         """Return a data URI for the strain badge image if available."""
@@ -417,7 +423,7 @@ def export_html(data, path, fetch_images=False):
                 + esc_attr(alt_text)
                 + "' data-fullsrc='"
                 + esc_attr(image_url)
-                + "' onclick='openImageModal(this.dataset.fullsrc, this.alt)' />"
+                + "' data-action='image' />"
             )
         type_icon_light = get_type_icon(it.get('product_type'), "light")
         strain_badge_src = get_badge_src(it.get('strain_type'), it.get('product_type'))
@@ -520,6 +526,28 @@ def export_html(data, path, fetch_images=False):
             card_classes += " card-out"
         if has_type_icon:
             card_classes += " has-type-icon"
+        card_records.append(
+            {
+                "key": card_key,
+                "price": price if isinstance(price, (int, float)) else None,
+                "stock": stock_text,
+                "stock_status": stock_upper,
+                "out": 1 if is_out else 0,
+                "removed": 1 if it.get("is_removed") else 0,
+                "pt": (it.get("product_type") or "").lower(),
+                "strain_type": it.get("strain_type") or "",
+                "brand": brand or "",
+                "producer": it.get("producer") or "",
+                "strain": it.get("strain") or "",
+                "title": heading,
+                "product_id": str(it.get("product_id") or ""),
+                "thc": thc_pct if isinstance(thc_pct, (int, float)) else None,
+                "cbd": cbd_pct if isinstance(cbd_pct, (int, float)) else None,
+                "smalls": 1 if it.get("is_smalls") else 0,
+                "irradiation": it.get("irradiation_type") or "",
+                "favkey": fav_key,
+            }
+        )
         cards.append(
             _render_card_html(
                 it=it,
@@ -586,22 +614,25 @@ def export_html(data, path, fetch_images=False):
         except Exception:
             history_entries = []
     history_json = "[]"
-    history_b64 = ""
     try:
         history_json = json.dumps(history_entries, ensure_ascii=False)
-        history_b64 = base64.b64encode(history_json.encode("utf-8")).decode("ascii")
     except Exception:
         history_json = "[]"
-        history_b64 = ""
-    # Avoid closing the script tag when embedding raw JSON.
-    history_json_safe = history_json.replace("</", "<\\/")
-    html_text = html_text.replace("__CHANGES_JSON_B64__", history_b64)
+    # Single inert copy for file:// viewing; served pages strip it and fetch the sidecar on demand.
+    # Escaping "<" keeps the JSON valid while making "</script>" and "<!--" impossible inside the block.
+    history_json_safe = history_json.replace("<", "\\u003c")
     html_text = html_text.replace("__CHANGES_JSON__", history_json_safe)
     try:
         history_file = out_path.with_name("changes_latest.json")
         history_file.write_text(history_json, encoding="utf-8")
     except Exception:
         pass
+    try:
+        # Compact per-card fields: diffed into /events deltas and indexed for /api/products.
+        cards_file = out_path.with_name("export_cards.json")
+        cards_file.write_text(json.dumps(card_records, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    except Exception:
+        pass
     in_stock = 0
     low_stock = 0
     out_stock = 0
@@ -649,12 +680,106 @@ def export_html(data, path, fetch_images=False):
     html_text = html_text.replace("{thc_min_bound}", str(thc_min_bound))
     html_text = html_text.replace("{thc_max_bound}", str(thc_max_bound))
     out_path.write_text(html_text, encoding="utf-8")
+    return {"exported_ms": exported_ms, "item_count": total_products}
+
+
+# ---------------- EXPORT MANIFEST ----------------
+
+
+def _manifest_path(exports_dir: Path) -> Path:
+    return Path(exports_dir) / EXPORT_MANIFEST_NAME
+
+
+def read_export_manifest(exports_dir: Optional[Path] = None) -> dict | None:
+    """Return the export manifest, re-reading the file only when another writer replaced it."""
+    d = Path(exports_dir or _EXPORTS_DIR or ".")
+    path = _manifest_path(d)
     try:
-        from export_server import notify_export_updated
-        notify_export_updated(str(exported_ms))
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cache_key = str(d)
+    with _MANIFEST_LOCK:
+        cached = _MANIFEST_CACHE.get(cache_key)
+        if cached and cached[0] == stamp:
+            return dict(cached[1])
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
     except Exception:
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    with _MANIFEST_LOCK:
+        _MANIFEST_CACHE[cache_key] = (stamp, manifest)
+    return dict(manifest)
+
+
+def _write_export_manifest(exports_dir: Path, path: Path, summary: dict | None) -> dict:
+    previous = read_export_manifest(exports_dir) or {}
+    try:
+        size = path.stat().st_size
+    except OSError:
+        size = 0
+    summary = summary or {}
+    manifest = {
+        "latest": path.name,
+        "version": int(previous.get("version", 0) or 0) + 1,
+        "size": size,
+        "item_count": int(summary.get("item_count", 0) or 0),
+        "exported_ms": int(summary.get("exported_ms", 0) or int(time.time() * 1000)),
+        "exported_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+    }
+    target = _manifest_path(exports_dir)
+    # Per-process tmp name so the scraper and tracker processes never share a temp file.
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, target)
+    try:
+        st = target.stat()
+        with _MANIFEST_LOCK:
+            _MANIFEST_CACHE[str(Path(exports_dir))] = ((st.st_mtime_ns, st.st_size), manifest)
+    except OSError:
         pass
-    
+    return manifest
+
+
+def _scan_latest_export(d: Path) -> Optional[str]:
+    """Legacy fallback for export dirs without a manifest; rescans only when the directory changes."""
+    try:
+        dir_stamp = d.stat().st_mtime_ns
+    except OSError:
+        return None
+    cache_key = str(d)
+    with _MANIFEST_LOCK:
+        cached = _SCAN_CACHE.get(cache_key)
+        if cached and cached[0] == dir_stamp:
+            return cached[1]
+    name = None
+    try:
+        files = sorted(d.glob("export-*.html"), key=lambda p: p.stat().st_mtime, reverse=True)
+        if files:
+            name = files[0].name
+    except Exception:
+        name = None
+    with _MANIFEST_LOCK:
+        _SCAN_CACHE[cache_key] = (dir_stamp, name)
+    return name
+
+
+def latest_export_path(exports_dir: Optional[Path] = None) -> Optional[Path]:
+    """Return the newest export, preferring the manifest over a directory scan."""
+    d = Path(exports_dir or _EXPORTS_DIR or ".")
+    manifest = read_export_manifest(d)
+    name = str(manifest.get("latest") or "") if manifest else ""
+    if name:
+        candidate = d / name
+        if candidate.exists():
+            return candidate
+    name = _scan_latest_export(d)
+    return (d / name) if name else None
+
+
 def export_html_auto(
     data, exports_dir: Optional[Path] = None, open_file: bool = False, fetch_images=False, max_files: int = 1
 ):
@@ -665,7 +790,16 @@ def export_html_auto(
     ts = datetime.now().astimezone().strftime('%Y-%m-%d_%H-%M-%S%z')
     fname = f"export-{ts}.html"
     path = d / fname
-    export_html(data, path, fetch_images=fetch_images)
+    summary = export_html(data, path, fetch_images=fetch_images)
+    try:
+        _write_export_manifest(d, path, summary)
+    except Exception as exc:
+        log_event("exports.manifest_failed", {"error": str(exc)})
+    try:
+        from export_server import notify_export_updated
+        notify_export_updated(str((summary or {}).get("exported_ms", "")))
+    except Exception:
+        pass
     cleanup_html_exports(d, max_files=max_files)
     if open_file:
         try:
@@ -679,10 +813,15 @@ def export_html_auto(
 
 
 def cleanup_html_exports(exports_dir: Optional[Path] = None, max_files: int = 20) -> None:
-    """Keep only the newest `max_files` HTML exports."""
+    """Keep only the newest `max_files` HTML exports, never removing the manifest's latest."""
     try:
         d = Path(exports_dir or _EXPORTS_DIR or ".")
+        manifest = read_export_manifest(d) or {}
+        protected = str(manifest.get("latest") or "")
         files = sorted(d.glob("export-*.html"), key=lambda p: p.stat().st_mtime, reverse=True)
+        if protected and any(p.name == protected for p in files):
+            files = [p for p in files if p.name != protected]
+            max_files = max(0, max_files - 1)
         for old in files[max_files:]:
             try:
                 old.unlink()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+Stamp = Optional[Tuple[int, int]]
+
+
+def file_stamp(path: Path | str) -> Stamp:
+    """(mtime_ns, size) of `path`, or None when it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+class FileWatcher:
+    """Watches one file from a background thread and reports each settled change once.
+
+    Polls the file's (mtime_ns, size) stamp, backing off from `min_interval` to
+    `max_interval` while nothing changes and dropping back to the fast rate after a change.
+    A burst of writes is coalesced: `on_change(stamp)` fires once the stamp has held still
+    for `settle` seconds. The callback runs on the watcher thread, so UI callers should hand
+    off to their event loop.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        on_change: Callable[[Stamp], None],
+        min_interval: float = 0.25,
+        max_interval: float = 2.0,
+        settle: float = 0.15,
+    ):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.min_interval = max(0.01, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.settle = max(0.0, float(settle))
+        self._stamp = file_stamp(self.path)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FileWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="flowertrack-file-watch")
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def set_path(self, path: Path | str) -> None:
+        """Watch a different file; its current state is the new baseline."""
+        with self._lock:
+            self.path = Path(path)
+            self._stamp = file_stamp(self.path)
+        self._wake.set()
+
+    def acknowledge(self) -> None:
+        """Take the file's current state as seen, e.g. after writing it ourselves."""
+        with self._lock:
+            self._stamp = file_stamp(self.path)
+
+    def _run(self) -> None:
+        interval = self.min_interval
+        while not self._stopped.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            with self._lock:
+                path, seen = self.path, self._stamp
+            current = file_stamp(path)
+            if current == seen:
+                interval = min(self.max_interval, interval * 2)
+                continue
+            # Let a burst of writes (tmp + replace, backups, several saves) finish first.
+            while self.settle and not self._stopped.wait(self.settle):
+                latest = file_stamp(path)
+                if latest == current:
+                    break
+                current = latest
+            with self._lock:
+                if path != self.path or self._stamp != seen:
+                    # Retargeted or acknowledged meanwhile; re-evaluate from the new baseline.
+                    interval = self.min_interval
+                    continue
+                self._stamp = current
+            interval = self.min_interval
+            try:
+                self.on_change(current)
+            except Exception:
+                pass
@@ -3,14 +3,19 @@ import json
 import os
 import shutil
 import sys
+import threading
 import tkinter as tk
 from pathlib import Path
 from tkinter import Tk, Toplevel, StringVar, BooleanVar, ttk, messagebox, filedialog
 from theme import apply_style_theme, compute_colors, set_titlebar_dark, set_palette_overrides
 from ui_window_chrome import apply_dark_titlebar
+from ui_tree_rows import tree_rows
 from logger import log_event
 from config import load_library_config, save_library_config, load_tracker_config, save_tracker_config
 from resources import resource_path
+from library_sync import assign_entry_ids, new_entry_id
+from network_mode import is_client
+from network_sync import push_library_entries
 
 
 APP_ROOT = Path(os.getenv("APPDATA", Path.home())) / "FlowerTrack"
@@ -86,7 +91,11 @@ class FlowerLibraryApp:
         except Exception as exc:
             log_event("flowerlibrary.icon.load_failed", str(exc), file_name="app.log")
 
-        self.entries: list[dict] = load_entries()
+        self.entries: list[dict] = assign_entry_ids(load_entries())
+        # Client mode: ids edited or deleted since the last successful sync with the host.
+        self._dirty_ids: set[str] = set()
+        self._deleted_entries: dict[str, dict] = {}
+        self._entry_sync_inflight = False
         self.settings = load_settings()
         self.window_geometry = self.settings.get("window_geometry", "")
         self.screen_resolution = str(self.settings.get("screen_resolution", "")).strip()
@@ -502,10 +511,17 @@ class FlowerLibraryApp:
             if entry is None:
                 return
             if mode == "add":
+                entry["id"] = new_entry_id()
                 self.entries.append(entry)
             else:
                 if index is not None:
+                    # Keep the entry's identity, and the revision the edit was based on.
+                    current = self.entries[index]
+                    entry["id"] = current.get("id") or new_entry_id()
+                    if "rev" in current:
+                        entry["rev"] = current["rev"]
                     self.entries[index] = entry
+            self._dirty_ids.add(entry["id"])
             self.refresh_table()
             self._persist_entries()
             close_window()
@@ -533,7 +549,11 @@ class FlowerLibraryApp:
         if not selection:
             return
         index = self.tree.index(selection[0])
-        del self.entries[index]
+        removed = self.entries.pop(index)
+        entry_id = str(removed.get("id") or "")
+        if entry_id:
+            self._dirty_ids.discard(entry_id)
+            self._deleted_entries[entry_id] = {"id": entry_id, **({"rev": removed["rev"]} if "rev" in removed else {})}
         self.refresh_table()
         self._persist_entries()
 
@@ -554,12 +574,13 @@ class FlowerLibraryApp:
             messagebox.showinfo("Exported", f"Library exported to:\n{path}")
 
     def refresh_table(self) -> None:
-        for item in self.tree.get_children():
-            self.tree.delete(item)
         changed = False
-        for entry in self.entries:
+        rows = []
+        seen: set[str] = set()
+        for n, entry in enumerate(self.entries):
             if "overall" not in entry:
                 entry["overall"] = self._compute_overall(entry)
+                self._dirty_ids.add(entry["id"])
                 changed = True
             values = [
                 entry.get("brand", ""),
@@ -578,7 +599,13 @@ class FlowerLibraryApp:
                 entry.get("overall", ""),
                 "🔎",
             ]
-            self.tree.insert("", "end", values=values)
+            # Rows are keyed by entry id so a refresh only touches entries that changed.
+            iid = str(entry.get("id") or "")
+            if not iid or iid in seen:
+                iid = f"row-{n}"
+            seen.add(iid)
+            rows.append((iid, values, ()))
+        tree_rows(self.tree).sync(rows)
 
         if changed:
             self._persist_entries()
@@ -586,6 +613,75 @@ class FlowerLibraryApp:
     def _persist_entries(self) -> None:
         save_entries(self.entries)
         self._persist_settings()
+        self._sync_dirty_entries()
+
+    def _sync_dirty_entries(self) -> None:
+        """Client mode: send only the entries edited or deleted since the last sync to the host."""
+        if self._entry_sync_inflight or not (self._dirty_ids or self._deleted_entries) or not is_client():
+            return
+        try:
+            cfg = load_tracker_config(TRACKER_CONFIG_FILE)
+            host = str(cfg.get("network_host") or "").strip()
+            port = int(cfg.get("network_port") or 0)
+            access_key = str(cfg.get("network_access_key") or "")
+        except Exception as exc:
+            log_event("flowerlibrary.sync.config_failed", str(exc), file_name="app.log")
+            return
+        if not host or not port:
+            return
+        upserts = [dict(entry) for entry in self.entries if entry.get("id") in self._dirty_ids]
+        deletes = list(self._deleted_entries.values())
+        self._dirty_ids = set()
+        self._deleted_entries = {}
+        self._entry_sync_inflight = True
+
+        def worker() -> None:
+            reply = push_library_entries(host, port, upserts, deletes, access_key=access_key)
+            try:
+                self.root.after(0, lambda: self._finish_entry_sync(reply, upserts, deletes))
+            except Exception:
+                pass
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _finish_entry_sync(self, reply: dict | None, upserts: list[dict], deletes: list[dict]) -> None:
+        self._entry_sync_inflight = False
+        conflicts = reply.get("conflicts") if isinstance(reply, dict) else None
+        if not isinstance(reply, dict) or not (reply.get("ok") or isinstance(conflicts, list)):
+            # Host unreachable: keep the edits queued for the next save.
+            local_ids = {entry.get("id") for entry in self.entries}
+            self._dirty_ids.update(entry["id"] for entry in upserts if entry["id"] in local_ids)
+            for delete in deletes:
+                self._deleted_entries.setdefault(delete["id"], delete)
+            log_event("flowerlibrary.sync.failed", str((reply or {}).get("error", "unreachable")), file_name="app.log")
+            return
+        if reply.get("ok"):
+            stored = {str(entry.get("id")): entry for entry in reply.get("entries") or [] if isinstance(entry, dict)}
+            for entry in self.entries:
+                if entry.get("id") in stored:
+                    entry["rev"] = stored[entry["id"]].get("rev")
+        else:
+            # Edited on another device meanwhile: the host's version wins. The rest of the
+            # batch was not applied, so queue it again on top of the host's entries.
+            host_entries = {str(entry.get("id")): entry for entry in conflicts if isinstance(entry, dict)}
+            positions = {entry.get("id"): n for n, entry in enumerate(self.entries)}
+            for entry_id, entry in host_entries.items():
+                if entry_id in positions:
+                    self.entries[positions[entry_id]] = entry
+                else:
+                    self.entries.append(entry)
+            self._dirty_ids.update(e["id"] for e in upserts if e["id"] not in host_entries and e["id"] in positions)
+            for delete in deletes:
+                if delete["id"] not in host_entries:
+                    self._deleted_entries.setdefault(delete["id"], delete)
+            self._dirty_ids.difference_update(host_entries)
+            self.refresh_table()
+            messagebox.showwarning(
+                "Flower Library",
+                "Some entries were changed on another device and have been reloaded from the host.",
+            )
+        save_entries(self.entries)
+        self._sync_dirty_entries()
 
     def _persist_settings(self) -> None:
         save_settings(self.settings)
@@ -1,14 +1,23 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
+import copy
 import json
 import shutil
+import threading
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 from app_core import APP_DIR
+from tracker_ops import apply_tracker_ops, diff_tracker_documents
 
-SCHEMA_VERSION = 1
+if TYPE_CHECKING:
+    from usage_index import DailyUsageIndex
+
+# 2: logs are stored compact, without the fields _normalize_log_entry derives on load.
+SCHEMA_VERSION = 2
+# Journaled ops after which the tracker snapshot is rewritten in the background.
+JOURNAL_COMPACT_OPS = 200
 
 @dataclass
 class Flower:
@@ -66,16 +75,103 @@ def _normalize_log_entry(log: dict) -> dict:
     return log
 
 
+def compact_log_entry(log: dict) -> dict:
+    """Copy of `log` without the fields _normalize_log_entry would rebuild identically.
+
+    Drops `grams` when it mirrors `grams_used`, `date`/`time_display` when they are the two
+    halves of `time`, and the 1.0/0.0 defaults of `efficiency`, `thc_mg` and `cbd_mg`.
+    Everything else, including `remaining` and `is_cbd_dominant`, is kept as recorded.
+    """
+    if not isinstance(log, dict):
+        return log
+    out = dict(log)
+    if "grams" in out and "grams_used" in out and out["grams"] == out["grams_used"]:
+        del out["grams"]
+    time_text = out.get("time")
+    if isinstance(time_text, str) and " " in time_text:
+        parts = time_text.split(" ")
+        if "date" in out and out["date"] == parts[0]:
+            del out["date"]
+        if "time_display" in out and out["time_display"] == parts[-1]:
+            del out["time_display"]
+    for key, default in (("efficiency", 1.0), ("thc_mg", 0.0), ("cbd_mg", 0.0)):
+        if key in out and out[key] == default and not isinstance(out[key], bool):
+            del out[key]
+    return out
+
+
+def compact_tracker_data(data: dict) -> dict:
+    """Shallow copy of a tracker document with its logs in the compact on-disk form."""
+    if not isinstance(data, dict) or not isinstance(data.get("logs"), list):
+        return data
+    out = dict(data)
+    out["logs"] = [compact_log_entry(log) for log in data["logs"]]
+    return out
+
+
+def expand_tracker_data(data: dict) -> dict:
+    """Rebuild the derived log fields of a compact tracker document in place."""
+    if isinstance(data, dict) and isinstance(data.get("logs"), list):
+        data["logs"] = [_normalize_log_entry(log) for log in data["logs"]]
+    return data
+
+
 def _migrate_tracker_data(data: dict) -> dict:
     if not isinstance(data, dict):
         return {"schema_version": SCHEMA_VERSION, "logs": data if isinstance(data, list) else []}
     schema_version = int(data.get("schema_version", 0) or 0)
     if schema_version < SCHEMA_VERSION:
+        # v1 -> v2 needs no rewrite: full logs are a valid compact document, and the next
+        # save writes them compact.
         data["schema_version"] = SCHEMA_VERSION
     return data
 
 
+def tracker_journal_path(target: Path) -> Path:
+    """Append-only op journal kept next to a tracker data snapshot."""
+    return target.with_name(target.stem + ".journal.jsonl")
+
+
+def _read_tracker_journal(target: Path) -> Tuple[int, List[dict]]:
+    """Return (base seq, op lines) from a tracker journal; a torn last line ends the replay."""
+    base = 0
+    ops: List[dict] = []
+    try:
+        text = tracker_journal_path(target).read_text(encoding="utf-8")
+    except OSError:
+        return base, ops
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            break
+        if not isinstance(entry, dict):
+            break
+        if "base_seq" in entry:
+            base = int(entry.get("base_seq") or 0)
+        else:
+            ops.append(entry)
+    return base, ops
+
+
+def _replay_tracker_journal(data: dict, target: Path, logger: Optional[Callable[[str], None]] = None) -> dict:
+    applied = int(data.pop("journal_seq", 0) or 0)
+    _base, ops = _read_tracker_journal(target)
+    pending = [op for op in ops if int(op.get("seq") or 0) > applied]
+    for op in pending:
+        try:
+            data = apply_tracker_ops(data, [op])
+        except ValueError as exc:
+            if logger:
+                logger(f"Stopped replaying tracker journal at seq {op.get('seq')}: {exc}")
+            break
+    return data
+
+
 def load_tracker_data(path: Path | None = None, logger: Optional[Callable[[str], None]] = None) -> dict:
+    """Load the tracker snapshot and replay any journaled ops written after it."""
     target = Path(path) if path else TRACKER_DATA_FILE
     if not target.exists():
         return {"schema_version": SCHEMA_VERSION, "logs": []}
@@ -84,9 +180,9 @@ def load_tracker_data(path: Path | None = None, logger: Optional[Callable[[str],
         if isinstance(raw, list):
             raw = {"logs": raw}
         data = _migrate_tracker_data(raw)
-        if isinstance(data, dict) and isinstance(data.get('logs'), list):
-            data['logs'] = [_normalize_log_entry(log) for log in data['logs']]
-        return data
+        if isinstance(data, dict):
+            data = _replay_tracker_journal(data, target, logger)
+        return expand_tracker_data(data)
     except Exception as exc:
         if logger:
             logger(f"Failed to load tracker data from {target}: {exc}")
@@ -111,13 +207,28 @@ def _backup_tracker_data(target: Path, max_backups: int = 5) -> None:
         pass
 
 
-def save_tracker_data(data: dict, path: Path | None = None, logger: Optional[Callable[[str], None]] = None) -> None:
+def save_tracker_data(
+    data: dict,
+    path: Path | None = None,
+    logger: Optional[Callable[[str], None]] = None,
+    journal_seq: Optional[int] = None,
+) -> None:
+    """Write a full tracker snapshot.
+
+    Without `journal_seq` the snapshot supersedes the journal, which is removed. With it the
+    snapshot records which journaled ops it already contains, so the journal can be trimmed
+    afterwards (see TrackerJournal.compact).
+    """
     target = Path(path) if path else TRACKER_DATA_FILE
     try:
         payload = data
         if isinstance(data, dict):
-            payload = dict(data)
-            payload.setdefault("schema_version", SCHEMA_VERSION)
+            payload = compact_tracker_data(data)
+            # Logs are written compact whatever version the document came in as.
+            payload["schema_version"] = SCHEMA_VERSION
+            payload.pop("journal_seq", None)
+            if journal_seq is not None:
+                payload["journal_seq"] = int(journal_seq)
         target.parent.mkdir(parents=True, exist_ok=True)
         _backup_tracker_data(target)
         tmp = target.with_suffix(target.suffix + ".tmp")
@@ -128,10 +239,121 @@ def save_tracker_data(data: dict, path: Path | None = None, logger: Optional[Cal
                 pass
         tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
         tmp.replace(target)
+        if journal_seq is None:
+            try:
+                tracker_journal_path(target).unlink()
+            except FileNotFoundError:
+                pass
     except Exception as exc:
         if logger:
             logger(f"Failed to save tracker data: {exc}")
 
+
+class TrackerJournal:
+    """Snapshot + append-only journal persistence for one tracker data file.
+
+    save() diffs the document against the last persisted one and appends the resulting
+    tracker ops to the journal as JSON lines, so logging a dose writes one line. Once
+    `compact_after` ops have accumulated, a background thread rewrites the snapshot and
+    trims the journal; load_tracker_data replays whatever the snapshot doesn't contain yet.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compact_after: int = JOURNAL_COMPACT_OPS,
+        logger: Optional[Callable[[str], None]] = None,
+    ):
+        self.path = Path(path)
+        self.journal_path = tracker_journal_path(self.path)
+        self.compact_after = max(1, int(compact_after))
+        self.logger = logger
+        self._persisted: Optional[dict] = None
+        self._seq = 0
+        self._journaled = 0
+        self._compacting = False
+        # mtime of the last snapshot written here, so the app can tell it from external writes.
+        self.snapshot_mtime: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def reset(self, data: dict) -> None:
+        """Adopt `data` (as just loaded from disk) as the persisted document."""
+        with self._lock:
+            base, ops = _read_tracker_journal(self.path)
+            self._seq = max([base] + [int(op.get("seq") or 0) for op in ops])
+            self._journaled = len(ops)
+            # The app edits log dicts in place, so keep a private copy to diff against.
+            self._persisted = copy.deepcopy(data)
+
+    def save(self, data: dict) -> None:
+        if isinstance(data, dict) and data.get("schema_version") != SCHEMA_VERSION:
+            # Match what save_tracker_data writes, so the stamp isn't journaled as a removal.
+            data = dict(data, schema_version=SCHEMA_VERSION)
+        with self._lock:
+            if self._persisted is None or not self.path.exists():
+                self._write_snapshot(data)
+                self._seq = 0
+                return
+            ops = diff_tracker_documents(self._persisted, data)
+            if not ops:
+                return
+            lines = []
+            for op in ops:
+                self._seq += 1
+                entry = dict(op, seq=self._seq)
+                if isinstance(entry.get("log"), dict):
+                    entry["log"] = compact_log_entry(entry["log"])
+                lines.append(json.dumps(entry, ensure_ascii=False))
+            try:
+                with open(self.journal_path, "a", encoding="utf-8") as handle:
+                    handle.write("\n".join(lines) + "\n")
+            except OSError as exc:
+                if self.logger:
+                    self.logger(f"Failed to append tracker journal: {exc}")
+                # Fall back to a full snapshot so nothing is lost.
+                self._write_snapshot(data)
+                return
+            self._persisted = apply_tracker_ops(self._persisted, ops)
+            self._journaled += len(ops)
+            if self._journaled >= self.compact_after and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, daemon=True, name="flowertrack-journal-compact").start()
+
+    def _write_snapshot(self, data: dict) -> None:
+        save_tracker_data(data, path=self.path, logger=self.logger)
+        self._persisted = copy.deepcopy(data)
+        self._journaled = 0
+        self._note_snapshot()
+
+    def _note_snapshot(self) -> None:
+        try:
+            self.snapshot_mtime = self.path.stat().st_mtime
+        except OSError:
+            self.snapshot_mtime = None
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot; ops appended meanwhile stay in the journal."""
+        with self._lock:
+            doc, seq = self._persisted, self._seq
+        try:
+            if doc is None:
+                return
+            save_tracker_data(doc, path=self.path, logger=self.logger, journal_seq=seq)
+            with self._lock:
+                self._note_snapshot()
+                _base, ops = _read_tracker_journal(self.path)
+                keep = [op for op in ops if int(op.get("seq") or 0) > seq]
+                lines = [json.dumps({"base_seq": seq})] + [json.dumps(op, ensure_ascii=False) for op in keep]
+                tmp = self.journal_path.with_suffix(self.journal_path.suffix + ".tmp")
+                tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+                tmp.replace(self.journal_path)
+                self._journaled = len(keep)
+        except Exception as exc:
+            if self.logger:
+                self.logger(f"Failed to compact tracker journal: {exc}")
+        finally:
+            self._compacting = False
+
 def is_cbd_dominant(flower: Flower | None) -> bool:
     if flower is None:
         return False
@@ -167,10 +389,11 @@ def log_dose_entry(
     grams_used: float,
     roa: str,
     roa_options: Dict[str, float],
+    usage_index: Optional["DailyUsageIndex"] = None,
 ) -> Tuple[float, dict]:
     """
     Log a dose for a flower; updates flower remaining and returns (remaining, log_entry).
-    roa_options maps ROA to efficiency (0-1).
+    roa_options maps ROA to efficiency (0-1). A usage_index over `logs` is updated in step.
     """
     if name not in flowers:
         raise ValueError("Selected flower is not in stock.")
@@ -198,4 +421,6 @@ def log_dose_entry(
         "is_cbd_dominant": is_cbd_dominant(flower),
     }
     logs.append(log_entry)
+    if usage_index is not None:
+        usage_index.append(log_entry)
     return remaining, log_entry
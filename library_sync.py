@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any, Iterable, Optional
+
+_MISSING: Any = object()
+
+
+class MergeConflict(ValueError):
+    """Both sides changed the same library entry field differently."""
+
+
+def library_entry_key(entry: dict) -> str:
+    """Identity of a library entry: its stable id, else brand + strain (case and whitespace insensitive)."""
+    entry_id = str(entry.get("id") or "").strip()
+    if entry_id:
+        return f"id:{entry_id}"
+    return _name_key(entry)
+
+
+def _name_key(entry: dict) -> str:
+    brand = " ".join(str(entry.get("brand") or "").split()).lower()
+    strain = " ".join(str(entry.get("strain") or "").split()).lower()
+    return f"{brand}|{strain}"
+
+
+def index_library(entries: Iterable[Any]) -> dict[str, dict]:
+    """Map library entries by identity, preserving order; repeats get a `#n` suffix."""
+    out: dict[str, dict] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        base = library_entry_key(entry)
+        key = base
+        n = 1
+        while key in out:
+            n += 1
+            key = f"{base}#{n}"
+        out[key] = entry
+    return out
+
+
+def _merge_value(key: str, base: Any, current: Any, mine: Any) -> Any:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    raise MergeConflict(f"{key}: changed on both sides")
+
+
+def _merge_entry(key: str, base: Any, current: Any, mine: Any) -> Any:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    if not all(isinstance(v, dict) for v in (base, current, mine)):
+        # Edited on one side, deleted (or added twice) on the other.
+        raise MergeConflict(f"{key}: changed on both sides")
+    out: dict = {}
+    for field in list(current) + [f for f in mine if f not in current]:
+        if field == "rev":
+            # Revisions are restamped by the host after the merge.
+            continue
+        value = _merge_value(
+            f"{key}.{field}", base.get(field, _MISSING), current.get(field, _MISSING), mine.get(field, _MISSING)
+        )
+        if value is not _MISSING:
+            out[field] = value
+    return out
+
+
+def merge_library_entries(base: list, current: list, mine: list) -> list[dict]:
+    """Three-way merge of a client's library list (`mine`) onto `current`, both derived from `base`.
+
+    Entries are matched by library_entry_key(): their stable `id`, falling back to brand/strain
+    only for entries without one. Edits to different entries, or to different fields of one
+    entry, merge cleanly. Raises MergeConflict when both sides changed the same field.
+    """
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    by_base, by_current, by_mine = index_library(base), index_library(current), index_library(mine)
+    out = []
+    for key in list(by_current) + [k for k in by_mine if k not in by_current]:
+        merged = _merge_entry(key, by_base.get(key, _MISSING), by_current.get(key, _MISSING), by_mine.get(key, _MISSING))
+        if merged is not _MISSING:
+            out.append(merged)
+    return out
+
+
+def new_entry_id() -> str:
+    return uuid.uuid4().hex
+
+
+def entry_revision(entry: Any) -> int:
+    try:
+        return int(entry.get("rev") or 0) if isinstance(entry, dict) else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def assign_entry_ids(entries: Iterable[Any], previous: Iterable[Any] = ()) -> list[dict]:
+    """Give every entry a stable `id`, returning a new list (entries that change are copied).
+
+    An entry without an id takes the id of a not-yet-claimed `previous` entry with the same
+    brand/strain, so lists written by older clients keep their identities; otherwise it gets
+    a fresh one.
+    """
+    items = [entry for entry in entries if isinstance(entry, dict)]
+    claimed = {str(entry.get("id")) for entry in items if entry.get("id")}
+    by_name: dict[str, list[str]] = {}
+    for entry in previous:
+        if isinstance(entry, dict) and entry.get("id") and str(entry["id"]) not in claimed:
+            by_name.setdefault(_name_key(entry), []).append(str(entry["id"]))
+    out = []
+    for entry in items:
+        if not entry.get("id"):
+            reuse = by_name.get(_name_key(entry))
+            entry = dict(entry, id=reuse.pop(0) if reuse else new_entry_id())
+        out.append(entry)
+    return out
+
+
+def _content(entry: dict) -> dict:
+    return {key: value for key, value in entry.items() if key != "rev"}
+
+
+def stamp_library_revisions(
+    previous: Iterable[Any], entries: list[dict], revision: int
+) -> tuple[list[dict], int, list[str]]:
+    """Stamp entries that are new or changed since `previous` with revision + 1.
+
+    Entries must already carry ids. Returns (entries, library revision, ids removed); the
+    revision only advances when something changed.
+    """
+    before = {str(entry["id"]): entry for entry in previous if isinstance(entry, dict) and entry.get("id")}
+    stamped = revision + 1
+    changed = False
+    out = []
+    for entry in entries:
+        old = before.get(str(entry["id"]))
+        if old is not None and _content(old) == _content(entry):
+            rev = entry_revision(old)
+            out.append(entry if entry_revision(entry) == rev else dict(entry, rev=rev))
+            continue
+        out.append(dict(entry, rev=stamped))
+        changed = True
+    kept = {str(entry["id"]) for entry in out}
+    removed = [entry_id for entry_id in before if entry_id not in kept]
+    if changed or removed:
+        return out, stamped, removed
+    return out, revision, removed
+
+
+def apply_library_entry_edits(
+    entries: list[dict], upserts: list[dict], deletes: list[dict]
+) -> tuple[Optional[list[dict]], list[dict]]:
+    """Apply per-entry upserts and deletes to an id-keyed library list.
+
+    Each upsert or delete may carry the `rev` the client based it on; when the stored entry
+    has since moved to another revision (and differs), the edit conflicts. Returns
+    (new entries, []) or (None, current versions of the conflicting entries), applying nothing
+    on conflict. Deleting an unknown id is a no-op.
+    """
+    by_id = {str(entry["id"]): entry for entry in entries}
+    conflicts = []
+    for edit, is_delete in [(u, False) for u in upserts] + [(d, True) for d in deletes]:
+        current = by_id.get(str(edit.get("id") or ""))
+        if current is None or "rev" not in edit or entry_revision(edit) == entry_revision(current):
+            continue
+        if is_delete or _content(edit) != _content(current):
+            conflicts.append(current)
+    if conflicts:
+        return None, conflicts
+    out = list(entries)
+    positions = {str(entry["id"]): n for n, entry in enumerate(out)}
+    for edit in upserts:
+        entry_id = str(edit.get("id") or "") or new_entry_id()
+        entry = dict(edit, id=entry_id)
+        if entry_id in positions:
+            out[positions[entry_id]] = entry
+        else:
+            positions[entry_id] = len(out)
+            out.append(entry)
+    dropped = {str(edit.get("id") or "") for edit in deletes}
+    return [entry for entry in out if str(entry["id"]) not in dropped], []
+
+
+def apply_library_changes(entries: list[dict], payload: dict) -> list[dict]:
+    """Apply a /api/network/library-entries changes payload to a local replica (new list).
+
+    A `full` payload replaces the replica; otherwise deleted ids are dropped, then changed
+    entries replace their id in place or are appended.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("library changes payload must be an object")
+    changed = payload.get("entries") or []
+    if not isinstance(changed, list) or not all(isinstance(entry, dict) and entry.get("id") for entry in changed):
+        raise ValueError("library changes must be entries with ids")
+    if payload.get("full"):
+        return list(changed)
+    deleted = {str(entry_id) for entry_id in payload.get("deleted") or []}
+    out = [entry for entry in entries if str(entry.get("id")) not in deleted]
+    positions = {str(entry.get("id")): n for n, entry in enumerate(out)}
+    for entry in changed:
+        n = positions.get(str(entry["id"]))
+        if n is None:
+            positions[str(entry["id"])] = len(out)
+            out.append(entry)
+        else:
+            out[n] = entry
+    return out
+
+
+def diff_library_entries(replica: list[dict], local: list[dict], base_revision: int) -> tuple[list[dict], list[dict]]:
+    """Entry edits that carry a library edited offline (`local`) onto the host's `replica`.
+
+    `local` was loaded at `base_revision`. New local entries and local edits of entries still
+    at the same revision on the host become upserts; replica entries missing locally become
+    deletes unless they were added or changed on the host after `base_revision`. Where the
+    host has moved an entry on, its version is kept.
+    """
+    hosted = {str(entry.get("id")): entry for entry in replica if isinstance(entry, dict) and entry.get("id")}
+    upserts = []
+    seen = set()
+    for entry in local:
+        if not isinstance(entry, dict) or not entry.get("id"):
+            continue
+        entry_id = str(entry["id"])
+        seen.add(entry_id)
+        current = hosted.get(entry_id)
+        if current is None:
+            if not entry_revision(entry):
+                upserts.append(entry)
+        elif entry_revision(entry) == entry_revision(current) and _content(entry) != _content(current):
+            upserts.append(entry)
+    deletes = [
+        {"id": entry_id, "rev": entry_revision(entry)}
+        for entry_id, entry in hosted.items()
+        if entry_id not in seen and entry_revision(entry) <= base_revision
+    ]
+    return upserts, deletes
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import json
+import shutil
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+
+from inventory import SCHEMA_VERSION, compact_log_entry, expand_tracker_data
+
+# Months kept in tracker_data.json: the current one plus the twelve before it, which
+# covers the longest stats period (365 days) from today.
+ARCHIVE_KEEP_MONTHS = 13
+_MANIFEST = "index.json"
+
+
+def tracker_archive_dir(target: Path) -> Path:
+    """Directory of month-partitioned log archives kept next to a tracker data file."""
+    return Path(target).with_name(Path(target).stem + ".archive")
+
+
+def archive_cutoff(today: date, keep_months: int = ARCHIVE_KEEP_MONTHS) -> date:
+    """First day still kept live; logs dated before it are archived."""
+    months = today.year * 12 + (today.month - 1) - max(1, int(keep_months)) + 1
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def archived_row_id(month: str, position: int) -> str:
+    """Row id of the log at `position` in an archived month file, as the log views use it."""
+    return f"archived-{month}-{position}"
+
+
+def parse_archived_row_id(row_id: str) -> Optional[tuple[str, int]]:
+    """(month, position) from archived_row_id(), or None for any other row id."""
+    prefix, _, rest = str(row_id).partition("-")
+    month, _, position = rest.rpartition("-")
+    if prefix != "archived" or len(month) != 7 or not position.isdigit():
+        return None
+    return month, int(position)
+
+
+def _log_day(log: dict) -> Optional[date]:
+    key = log.get("date") if isinstance(log, dict) else None
+    if not isinstance(key, str):
+        return None
+    try:
+        day = date.fromisoformat(key)
+    except ValueError:
+        return None
+    # Only canonical keys are archived, so a month file holds exactly its own dates.
+    return day if day.isoformat() == key else None
+
+
+def _marker(log: dict) -> str:
+    """Identity of a log for duplicate checks: its compact form, serialized."""
+    return json.dumps(compact_log_entry(log), sort_keys=True)
+
+
+def _grams(log: dict) -> float:
+    try:
+        return float(log.get("grams_used", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _write_json(path: Path, payload: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+class TrackerLogArchive:
+    """Old tracker logs, one JSON file per month, plus a manifest of per-day usage totals.
+
+    Only the manifest is read up front; it carries per-day THC grams by flower and CBD grams,
+    so averages and day totals over old history don't need the logs themselves. Month files
+    are read the first time a stats period, export or day view reaches into them.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.directory = tracker_archive_dir(self.path)
+        self._manifest: Optional[dict] = None
+        self._months: dict[str, list] = {}
+
+    def _load_manifest(self) -> dict:
+        if self._manifest is None:
+            manifest: dict = {"months": {}}
+            try:
+                raw = json.loads((self.directory / _MANIFEST).read_text(encoding="utf-8"))
+                if isinstance(raw, dict) and isinstance(raw.get("months"), dict):
+                    manifest = raw
+            except (OSError, ValueError):
+                pass
+            self._manifest = manifest
+        return self._manifest
+
+    def months(self) -> list[str]:
+        return sorted(self._load_manifest()["months"])
+
+    def month_info(self, month: str) -> dict:
+        """Manifest entry for `month`: log "count", per-day totals, and log counts by "flowers"/"roas".
+
+        Archives written before the flower/ROA counts were added lack those two keys.
+        """
+        info = self._load_manifest()["months"].get(month)
+        return info if isinstance(info, dict) else {}
+
+    def day_totals(self) -> dict[str, dict]:
+        """{date: {"thc": {flower: grams}, "cbd": grams, "cbd_count": n}} across every archived month."""
+        out: dict[str, dict] = {}
+        for month in self._load_manifest()["months"].values():
+            days = month.get("days") if isinstance(month, dict) else None
+            if isinstance(days, dict):
+                out.update(days)
+        return out
+
+    def _read_month(self, month: str) -> Optional[list]:
+        try:
+            raw = json.loads((self.directory / f"{month}.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError):
+            return None
+        logs = raw.get("logs") if isinstance(raw, dict) else None
+        return logs if isinstance(logs, list) else None
+
+    def month_logs(self, month: str) -> list:
+        """Logs archived for `month` (YYYY-MM), expanded; cached after the first read."""
+        logs = self._months.get(month)
+        if logs is None:
+            if month not in self._load_manifest()["months"]:
+                return []
+            logs = self._months[month] = expand_tracker_data({"logs": self._read_month(month) or []})["logs"]
+        return logs
+
+    def log_at(self, month: str, position: int) -> Optional[dict]:
+        logs = self.month_logs(month)
+        return logs[position] if 0 <= position < len(logs) else None
+
+    def logs_between(self, start: date, end: date) -> list:
+        """Archived logs dated start..end inclusive, reading only the months that overlap."""
+        first, last = start.isoformat()[:7], end.isoformat()[:7]
+        out = []
+        for month in self.months():
+            if first <= month <= last:
+                for log in self.month_logs(month):
+                    day = _log_day(log)
+                    if day is not None and start <= day <= end:
+                        out.append(log)
+        return out
+
+    def logs_on_day(self, day: date) -> list:
+        key = day.isoformat()
+        if key[:7] not in self._load_manifest()["months"]:
+            return []
+        return [log for log in self.month_logs(key[:7]) if log.get("date") == key]
+
+    def rows_on_day(self, day: date) -> list[tuple[str, dict]]:
+        """(row id, log) pairs for `day`; the ids name the log's place in its month file."""
+        key = day.isoformat()
+        return [
+            (archived_row_id(key[:7], n), log)
+            for n, log in enumerate(self.month_logs(key[:7]))
+            if log.get("date") == key
+        ]
+
+    def archive(self, logs: list, before: date, is_cbd: Callable[[dict], bool]) -> list:
+        """Move logs dated before `before` into their month files; returns the logs kept live.
+
+        Month files are written before the manifest, and the caller saves the tracker file
+        without the moved logs afterwards. Each log already present in its month file is
+        matched at most once and not added again, so a run interrupted before that save is
+        safe to repeat.
+        """
+        cutoff = before.isoformat()
+        months = {log["date"][:7] for log in logs if _log_day(log) is not None and log["date"] < cutoff}
+        if not months:
+            return logs
+        stored_by_month = {month: self._read_month(month) for month in months}
+        moved: dict[str, list] = {}
+        kept = []
+        for log in logs:
+            # Logs of a month whose file can't be read stay live rather than risk overwriting it.
+            if _log_day(log) is not None and log["date"] < cutoff and stored_by_month[log["date"][:7]] is not None:
+                moved.setdefault(log["date"][:7], []).append(log)
+            else:
+                kept.append(log)
+        if not moved:
+            return logs
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+        for month, new_logs in sorted(moved.items()):
+            stored = stored_by_month[month]
+            # Only logs the month file held before this call count as already archived;
+            # identical doses within the batch are all kept.
+            seen = Counter(_marker(log) for log in stored)
+            for log in new_logs:
+                marker = _marker(log)
+                if seen[marker] > 0:
+                    seen[marker] -= 1
+                else:
+                    stored.append(compact_log_entry(log))
+            _write_json(self.directory / f"{month}.json", {"schema_version": SCHEMA_VERSION, "month": month, "logs": stored})
+            self._months.pop(month, None)
+            manifest["months"][month] = self._summarize(stored, is_cbd)
+        _write_json(self.directory / _MANIFEST, manifest)
+        return kept
+
+    def update_log(self, month: str, position: int, log: Optional[dict], is_cbd: Callable[[dict], bool]) -> None:
+        """Replace the archived log at `position` in `month` with `log`, or delete it when None.
+
+        The month file and its manifest entry (count and day totals) are rewritten; a month
+        left empty is dropped. Raises OSError when the month file can't be read or written or
+        no longer holds that position.
+        """
+        stored = self._read_month(month) if month in self._load_manifest()["months"] else None
+        if stored is None or not 0 <= position < len(stored):
+            raise OSError(f"Archived log {position} of month {month} not found")
+        if log is None:
+            del stored[position]
+        else:
+            stored[position] = compact_log_entry(log)
+        manifest = self._load_manifest()
+        _write_json(self.directory / f"{month}.json", {"schema_version": SCHEMA_VERSION, "month": month, "logs": stored})
+        self._months.pop(month, None)
+        if stored:
+            manifest["months"][month] = self._summarize(stored, is_cbd)
+        else:
+            manifest["months"].pop(month, None)
+        _write_json(self.directory / _MANIFEST, manifest)
+        if not stored:
+            try:
+                (self.directory / f"{month}.json").unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _summarize(logs: list, is_cbd: Callable[[dict], bool]) -> dict:
+        days: dict[str, dict] = {}
+        flowers: dict[str, int] = {}
+        roas: dict[str, int] = {}
+        for log in expand_tracker_data({"logs": [dict(log) for log in logs]})["logs"]:
+            flower = str(log.get("flower", "")).strip()
+            flowers[flower] = flowers.get(flower, 0) + 1
+            roa = str(log.get("roa") or "Unknown")
+            roas[roa] = roas.get(roa, 0) + 1
+            totals = days.setdefault(log["date"], {"thc": {}, "cbd": 0.0, "cbd_count": 0})
+            if is_cbd(log):
+                totals["cbd"] += _grams(log)
+                totals["cbd_count"] += 1
+            else:
+                name = str(log.get("flower", "")).strip()
+                totals["thc"][name] = totals["thc"].get(name, 0.0) + _grams(log)
+        return {"count": len(logs), "days": days, "flowers": flowers, "roas": roas}
+
+    def all_logs(self) -> list:
+        """Every archived log, oldest month first; raises OSError if a month file can't be read."""
+        out = []
+        for month in self.months():
+            logs = self._read_month(month)
+            if logs is None:
+                raise OSError(f"Unreadable log archive month {month}")
+            out.extend(expand_tracker_data({"logs": logs})["logs"])
+        return out
+
+    def logs_missing_from(self, logs: list) -> list:
+        """Every archived log not already in `logs`, oldest month first; raises OSError like all_logs().
+
+        Each log in `logs` matches at most one archived copy, as in archive(), so a restore
+        interrupted after the tracker file took the archived logs but before clear() adds
+        nothing twice when repeated.
+        """
+        present = Counter(_marker(log) for log in logs if isinstance(log, dict))
+        out = []
+        for log in self.all_logs():
+            marker = _marker(log)
+            if present[marker] > 0:
+                present[marker] -= 1
+            else:
+                out.append(log)
+        return out
+
+    def clear(self) -> None:
+        """Remove the archive once its logs are back in the tracker file."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._manifest = None
+        self._months = {}
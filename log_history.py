@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import date
+from typing import Callable, Optional
+
+from log_archive import TrackerLogArchive
+
+
+def _day(key: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(key)
+    except (TypeError, ValueError):
+        return None
+
+
+def _roa(log: dict) -> str:
+    return str(log.get("roa") or "Unknown")
+
+
+def _flower(log: dict) -> str:
+    return str(log.get("flower", "")).strip()
+
+
+def _newest_first(rows: list) -> list:
+    return sorted(rows, key=lambda row: str(row[1].get("time", "")), reverse=True)
+
+
+class _Segment:
+    """One day of live logs or one archived month in a query, loaded on first access."""
+
+    __slots__ = ("order", "size", "_load", "_rows")
+
+    def __init__(self, order: str, size: Optional[int], load: Callable[[], list]):
+        self.order = order
+        # Known up front from the indexes, or None until the segment is loaded.
+        self.size = size
+        self._load = load
+        self._rows: Optional[list] = None
+
+    def rows(self) -> list:
+        if self._rows is None:
+            self._rows = self._load()
+            self.size = len(self._rows)
+        return self._rows
+
+
+class LogQuery:
+    """Filtered full-history log rows, newest first, addressable by offset.
+
+    Rows are (iid, log) pairs: "live-<position>" for logs in the tracker file and
+    "archived-<month>-<n>" for archived ones. Only the segments an offset range touches are
+    materialized, so paging through the recent end never reads old archive months.
+    """
+
+    def __init__(self, segments: list[_Segment]):
+        self._segments = sorted(segments, key=lambda seg: seg.order, reverse=True)
+        self._starts: Optional[list[int]] = None
+
+    def _offsets(self) -> list[int]:
+        if self._starts is None:
+            starts, total = [], 0
+            for seg in self._segments:
+                starts.append(total)
+                total += seg.size if seg.size is not None else len(seg.rows())
+            self._starts = starts
+            self._total = total
+        return self._starts
+
+    def __len__(self) -> int:
+        self._offsets()
+        return self._total
+
+    def rows(self, offset: int, limit: int) -> list[tuple[str, dict]]:
+        starts = self._offsets()
+        first = offset = max(0, offset)
+        out: list[tuple[str, dict]] = []
+        n = bisect_right(starts, offset) - 1
+        while n >= 0 and n < len(self._segments) and len(out) < limit:
+            seg = self._segments[n]
+            expected = seg.size
+            rows = seg.rows()
+            if len(rows) != expected:
+                # The manifest count was off (e.g. an unreadable month file); re-page.
+                self._starts = None
+                return self.rows(first, limit)
+            begin = max(0, offset - starts[n])
+            out.extend(rows[begin : begin + limit - len(out)])
+            offset = starts[n] + len(rows)
+            n += 1
+        return out
+
+
+class LogHistory:
+    """Indexes over every dose, live and archived, for the full-history log browser.
+
+    Live logs are grouped by day, by flower and by ROA once per build; archived months are
+    picked (and usually counted) from the archive manifest without reading the month files.
+    """
+
+    def __init__(self, logs: list, archive: Optional[TrackerLogArchive] = None):
+        self.logs = logs
+        self.archive = archive
+        self._by_day: dict[str, list[int]] = {}
+        self._by_flower: dict[str, dict[str, list[int]]] = {}
+        self._by_roa: dict[str, dict[str, list[int]]] = {}
+        for pos, log in enumerate(logs):
+            if not isinstance(log, dict):
+                continue
+            key = str(log.get("date") or "")
+            self._by_day.setdefault(key, []).append(pos)
+            self._by_flower.setdefault(_flower(log), {}).setdefault(key, []).append(pos)
+            self._by_roa.setdefault(_roa(log), {}).setdefault(key, []).append(pos)
+
+    def _archive_months(self) -> list[str]:
+        return self.archive.months() if self.archive is not None else []
+
+    def flowers(self) -> list[str]:
+        names = set(self._by_flower)
+        for month in self._archive_months():
+            names.update(self.archive.month_info(month).get("flowers") or {})
+        return sorted((name for name in names if name), key=str.lower)
+
+    def roas(self) -> list[str]:
+        names = set(self._by_roa)
+        for month in self._archive_months():
+            names.update(self.archive.month_info(month).get("roas") or {})
+        return sorted(names, key=str.lower)
+
+    def query(
+        self,
+        flower: Optional[str] = None,
+        roa: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> LogQuery:
+        return LogQuery(self._live_segments(flower, roa, start, end) + self._archived_segments(flower, roa, start, end))
+
+    def _live_segments(self, flower, roa, start, end) -> list[_Segment]:
+        days = self._by_day
+        if flower is not None:
+            days = self._by_flower.get(flower, {})
+        if roa is not None:
+            by_roa = self._by_roa.get(roa, {})
+            if flower is None:
+                days = by_roa
+            else:
+                # Intersect day by day, walking whichever index has fewer days.
+                small, large = (days, by_roa) if len(days) <= len(by_roa) else (by_roa, days)
+                days = {}
+                for key, positions in small.items():
+                    other = large.get(key)
+                    if other:
+                        wanted = set(other)
+                        both = [pos for pos in positions if pos in wanted]
+                        if both:
+                            days[key] = both
+        segments = []
+        for key, positions in days.items():
+            day = _day(key)
+            if (start is not None or end is not None) and (
+                day is None or (start is not None and day < start) or (end is not None and day > end)
+            ):
+                continue
+            # Unparseable dates sort after (older than) everything else.
+            order = day.isoformat() if day is not None else ""
+            segments.append(_Segment(order, len(positions), lambda positions=positions: self._live_rows(positions)))
+        return segments
+
+    def _live_rows(self, positions: list[int]) -> list:
+        return _newest_first([(f"live-{pos}", self.logs[pos]) for pos in positions])
+
+    def _archived_segments(self, flower, roa, start, end) -> list[_Segment]:
+        first = start.isoformat()[:7] if start is not None else None
+        last = end.isoformat()[:7] if end is not None else None
+        segments = []
+        for month in self._archive_months():
+            if (first is not None and month < first) or (last is not None and month > last):
+                continue
+            info = self.archive.month_info(month)
+            flowers, roas = info.get("flowers"), info.get("roas")
+            size = info.get("count")
+            if flower is not None and isinstance(flowers, dict):
+                if not flowers.get(flower):
+                    continue
+                size = flowers[flower]
+            if roa is not None and isinstance(roas, dict):
+                if not roas.get(roa):
+                    continue
+                size = roas[roa]
+            partial = (first == month and start.day > 1) or last == month
+            exact = (
+                not partial
+                and (flower is None or roa is None)
+                and (flower is None or isinstance(flowers, dict))
+                and (roa is None or isinstance(roas, dict))
+            )
+            if not exact:
+                # The manifest can't give an exact count; load the month once it's reached.
+                size = None
+            segments.append(
+                _Segment(
+                    month + "-99",
+                    size if isinstance(size, int) else None,
+                    lambda month=month: self._archived_rows(month, flower, roa, start, end),
+                )
+            )
+        return segments
+
+    def _archived_rows(self, month, flower, roa, start, end) -> list:
+        rows = []
+        for n, log in enumerate(self.archive.month_logs(month)):
+            if flower is not None and _flower(log) != flower:
+                continue
+            if roa is not None and _roa(log) != roa:
+                continue
+            if start is not None or end is not None:
+                day = _day(str(log.get("date") or ""))
+                if day is None or (start is not None and day < start) or (end is not None and day > end):
+                    continue
+            rows.append((f"archived-{month}-{n}", log))
+        return _newest_first(rows)
@@ -15,6 +15,7 @@ from theme import (
 )
 import ctypes
 from config import load_tracker_config, save_tracker_config
+from inventory import load_tracker_data, save_tracker_data
 from resources import resource_path
 from ui_window_chrome import apply_dark_titlebar
 
@@ -56,7 +57,7 @@ def load_tracker_flowers() -> list[dict]:
     try:
         tracker_file = resolve_tracker_file()
         if tracker_file.exists():
-            data = json.loads(tracker_file.read_text(encoding="utf-8"))
+            data = load_tracker_data(tracker_file)
             flowers = data.get("flowers")
             if isinstance(flowers, list):
                 return [f for f in flowers if float(f.get("grams_remaining", 0) or 0) > 0]
@@ -225,10 +226,7 @@ def log_dose():
         messagebox.showinfo("Cannot log", "Logging requires flowers from tracker stock with remaining grams.")
         return
 
-    try:
-        data = json.loads(TRACKER_FILE.read_text(encoding="utf-8")) if TRACKER_FILE.exists() else {}
-    except Exception:
-        data = {}
+    data = load_tracker_data(TRACKER_FILE) if TRACKER_FILE.exists() else {}
     flowers = data.get("flowers") if isinstance(data, dict) else None
     if not isinstance(flowers, list):
         messagebox.showinfo("Cannot log", "Tracker data not available.")
@@ -319,11 +317,11 @@ def log_dose():
         "mix_ratio": float(target_ratio),
     })
 
-    try:
-        TRACKER_FILE.parent.mkdir(parents=True, exist_ok=True)
-        TRACKER_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    except Exception as e:
-        messagebox.showerror("Save failed", f"Could not save tracker data: {e}")
+    errors: list[str] = []
+    # A full save also folds in and clears the tracker's dose journal.
+    save_tracker_data(data, TRACKER_FILE, logger=errors.append)
+    if errors:
+        messagebox.showerror("Save failed", errors[0])
         return
 
     try:
@@ -374,10 +372,7 @@ def add_to_stock():
         messagebox.showinfo("Cannot blend", "Blending to stock requires flowers from tracker stock.")
         return
 
-    try:
-        data = json.loads(TRACKER_FILE.read_text(encoding="utf-8")) if TRACKER_FILE.exists() else {}
-    except Exception:
-        data = {}
+    data = load_tracker_data(TRACKER_FILE) if TRACKER_FILE.exists() else {}
     flowers = data.get("flowers") if isinstance(data, dict) else None
     if not isinstance(flowers, list):
         messagebox.showinfo("Cannot blend", "Tracker data not available.")
@@ -432,11 +427,11 @@ def add_to_stock():
             }
         )
 
-    try:
-        TRACKER_FILE.parent.mkdir(parents=True, exist_ok=True)
-        TRACKER_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    except Exception as e:
-        messagebox.showerror("Save failed", f"Could not save tracker data: {e}")
+    errors: list[str] = []
+    # A full save also folds in and clears the tracker's dose journal.
+    save_tracker_data(data, TRACKER_FILE, logger=errors.append)
+    if errors:
+        messagebox.showerror("Save failed", errors[0])
         return
 
     try:
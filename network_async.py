@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import http
+import http.client
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from network_sync import CHANGE_WAIT_RECHECK_S, KEEPALIVE_IDLE_S, WAIT_PATH
+
+# Connections beyond this are answered with 503 and closed.
+MAX_CONNECTIONS = 256
+# Worker threads for file-backed endpoint work; requests queue on a semaphore in front of them.
+IO_WORKERS = 4
+MAX_BODY_BYTES = 64 * 1024 * 1024
+_HEADER_LIMIT = 64 * 1024
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, error: str):
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+
+class AsyncNetworkServer:
+    """Single event-loop HTTP/1.1 front-end for a network data service.
+
+    Connections are plain coroutines, so idle keep-alive sockets and held long-polls cost a
+    task rather than an OS thread. Endpoint work that touches files runs in a small executor.
+    Exposes shutdown()/server_close() like the threaded server so callers can stop either.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        log: Callable[[str], None],
+        max_connections: int = MAX_CONNECTIONS,
+        io_workers: int = IO_WORKERS,
+        max_body_bytes: int = MAX_BODY_BYTES,
+    ):
+        self.service = service
+        self.log = log
+        self.max_connections = max(1, int(max_connections))
+        self.io_workers = max(1, int(io_workers))
+        self.max_body_bytes = max(0, int(max_body_bytes))
+        self.server_address: Optional[Tuple[str, int]] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="flowertrack-network-io")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._io_slots: Optional[asyncio.Semaphore] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, bind: str, port: int, attempts: int = 20) -> Tuple[threading.Thread, int]:
+        self._thread = threading.Thread(
+            target=self._run, args=(bind, port, attempts), daemon=True, name="flowertrack-network-async"
+        )
+        self._thread.start()
+        if not self._ready.wait(10.0):
+            raise RuntimeError("asyncio server did not start")
+        if self._error is not None or self.server_address is None:
+            raise RuntimeError(str(self._error or "failed to bind"))
+        return self._thread, int(self.server_address[1])
+
+    def _run(self, bind: str, port: int, attempts: int) -> None:
+        try:
+            asyncio.run(self._main(bind, port, attempts))
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self._ready.set()
+
+    async def _main(self, bind: str, port: int, attempts: int) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._io_slots = asyncio.Semaphore(self.io_workers)
+        server = None
+        for _ in range(max(1, attempts)):
+            try:
+                server = await asyncio.start_server(self._handle_connection, bind, port, limit=_HEADER_LIMIT)
+                break
+            except OSError as exc:
+                self.log(f"[network] port {port} unavailable on {bind}: {exc}")
+                port += 1
+        if server is None:
+            return
+        self.server_address = (bind, port)
+        self._ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            for task in list(self._tasks):
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            await server.wait_closed()
+
+    def shutdown(self) -> None:
+        loop = self._loop
+        if loop is not None and self._stop is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+
+    def server_close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    async def _run_io(self, func: Callable[..., Any], *args: Any) -> Any:
+        assert self._io_slots is not None
+        async with self._io_slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+        try:
+            peer = writer.get_extra_info("peername")
+            client_ip = str(peer[0] if peer else "").strip()
+        except Exception:
+            client_ip = ""
+        try:
+            if len(self._tasks) > self.max_connections:
+                await self._respond(writer, 503, {"ok": False, "error": "server_busy"}, {}, keep_alive=False)
+                return
+            while not self._stop.is_set():
+                if not await self._serve_request(reader, writer, client_ip):
+                    break
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        except Exception as exc:
+            try:
+                self.log(f"[network] connection error from {client_ip}: {exc}")
+            except Exception:
+                pass
+        finally:
+            if task is not None:
+                self._tasks.discard(task)
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _serve_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client_ip: str) -> bool:
+        """Serve one request; returns whether the connection may be reused."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_IDLE_S)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return False
+        except asyncio.LimitOverrunError:
+            await self._respond(writer, 431, {"ok": False, "error": "headers_too_large"}, {}, keep_alive=False)
+            return False
+        request_line, _, header_block = head.partition(b"\r\n")
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            await self._respond(writer, 400, {"ok": False, "error": "bad_request"}, {}, keep_alive=False)
+            return False
+        method, target, version = parts
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+        connection = str(headers.get("Connection", "") or "").lower()
+        keep_alive = "keep-alive" in connection if version == "HTTP/1.0" else "close" not in connection
+        try:
+            status, payload = await self._dispatch(method, target, headers, reader, client_ip)
+        except _BadRequest as exc:
+            status, payload = exc.status, {"ok": False, "error": exc.error}
+            keep_alive = False
+        if status == 403:
+            # The request body was not read, so this connection cannot be reused.
+            keep_alive = False
+        await self._respond(writer, status, payload, headers, keep_alive)
+        try:
+            self.log(f'[network] "{method} {target} {version}" {status} -')
+        except Exception:
+            pass
+        return keep_alive
+
+    async def _dispatch(
+        self,
+        method: str,
+        target: str,
+        headers: Any,
+        reader: asyncio.StreamReader,
+        client_ip: str,
+    ) -> Tuple[int, Any]:
+        if method not in {"GET", "PUT", "POST"}:
+            raise _BadRequest(501, "unsupported_method")
+        denied = self.service.admit(client_ip, headers)
+        if denied is not None:
+            if denied[0] == 429:
+                # Drain the body so the connection stays usable after a rate-limit refusal.
+                await self._read_body(headers, reader)
+            return denied
+        path, _, query = target.partition("?")
+        path = path.rstrip("/")
+        body = await self._read_body(headers, reader)
+        if method == "GET" and path == WAIT_PATH:
+            return 200, await self._wait(client_ip, query)
+        return await self._run_io(self.service.handle, method, path, query, body, client_ip, headers)
+
+    async def _read_body(self, headers: Any, reader: asyncio.StreamReader) -> bytes:
+        if "chunked" in str(headers.get("Transfer-Encoding", "") or "").lower():
+            raise _BadRequest(501, "chunked_not_supported")
+        try:
+            length = int(headers.get("Content-Length", "0") or "0")
+        except ValueError:
+            raise _BadRequest(400, "bad_content_length") from None
+        if length < 0:
+            raise _BadRequest(400, "bad_content_length")
+        if length > self.max_body_bytes:
+            raise _BadRequest(413, "payload_too_large")
+        if length == 0:
+            return b""
+        try:
+            return await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_IDLE_S)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            raise _BadRequest(400, "incomplete_body") from None
+
+    async def _wait(self, client_ip: str, query: str) -> dict:
+        seen, hold_s = self.service.wait_args(query)
+        feed = self.service.change_feed
+        loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+
+        def _wake() -> None:
+            loop.call_soon_threadsafe(woken.set)
+
+        feed.add_listener(_wake)
+        try:
+            deadline = loop.time() + hold_s
+            while True:
+                # A held long-poll still counts as a connected client.
+                self.service.touch_client(client_ip)
+                woken.clear()
+                payload = await self._run_io(functools.partial(feed.check, **seen))
+                remaining = deadline - loop.time()
+                if payload["changed"] or feed.closed or remaining <= 0:
+                    return payload
+                try:
+                    await asyncio.wait_for(woken.wait(), min(remaining, CHANGE_WAIT_RECHECK_S))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            feed.remove_listener(_wake)
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        request_headers: Any,
+        keep_alive: bool,
+    ) -> None:
+        status, headers, raw = self.service.render(status, payload, request_headers)
+        try:
+            reason = http.HTTPStatus(status).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + raw)
+        # Backpressure: don't read the next request until a slow client has taken this one.
+        await writer.drain()
+
+
+def start_async_server(
+    service: Any,
+    bind: str,
+    port: int,
+    log: Callable[[str], None],
+) -> Tuple[AsyncNetworkServer, threading.Thread, int]:
+    server = AsyncNetworkServer(service, log)
+    try:
+        thread, chosen_port = server.start(bind, port)
+    except Exception:
+        server.server_close()
+        raise
+    return server, thread, chosen_port
@@ -0,0 +1,532 @@
+"""Headless load test for the host-mode network data server.
+
+Starts start_network_data_server on loopback in a child process against synthetic tracker and
+library files, drives it with simulated clients that follow the desktop client's request
+pattern, and reports throughput, latency percentiles, error/429 rates and server RSS.
+
+    py network_loadtest.py --clients 20 --duration 30 --logs 5000 --library 300
+    py network_loadtest.py --clients 50 --pattern watch --server-mode asyncio --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from network_sync import _atomic_write_json, start_network_data_server, stop_network_data_server
+
+_ROAS = ("Vaped", "Eaten", "Smoked")
+
+
+def build_synthetic_data(directory: Path, logs: int, library: int, flowers: int = 20) -> tuple[Path, Path]:
+    """Write tracker/library files shaped like real app data; returns their paths."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(1234)
+    names = [f"Load Test Flower {i}" for i in range(max(1, flowers))]
+    stock = [
+        {
+            "name": name,
+            "thc_pct": round(rng.uniform(15.0, 30.0), 1),
+            "cbd_pct": round(rng.uniform(0.0, 2.0), 1),
+            "grams_remaining": round(rng.uniform(0.0, 30.0), 2),
+        }
+        for name in names
+    ]
+    start = datetime(2024, 1, 1, 8, 0)
+    entries = []
+    for i in range(max(0, logs)):
+        stamp = start + timedelta(minutes=97 * i)
+        entries.append(_synthetic_log(rng, stamp, rng.choice(names)))
+    tracker_path = directory / "tracker_data.json"
+    library_path = directory / "library_data.json"
+    _atomic_write_json(tracker_path, {"schema_version": 1, "flowers": stock, "logs": entries})
+    _atomic_write_json(
+        library_path,
+        [
+            {
+                "brand": f"Brand {i % 40}",
+                "strain": f"Strain {i}",
+                "origin": rng.choice(("Canada", "Portugal", "Netherlands")),
+                "cultivator": f"Cultivator {i % 15}",
+                "packager": f"Packager {i % 9}",
+                "thc": round(rng.uniform(15.0, 30.0), 1),
+                "cbd": round(rng.uniform(0.0, 2.0), 1),
+                "rating": rng.randint(1, 5),
+                "notes": "Synthetic library entry used by network_loadtest.",
+            }
+            for i in range(max(0, library))
+        ],
+    )
+    return tracker_path, library_path
+
+
+def _synthetic_log(rng: random.Random, stamp: datetime, flower: str) -> dict:
+    grams = round(rng.uniform(0.05, 0.3), 3)
+    thc_mg = round(grams * 1000 * 0.22, 2)
+    return {
+        "date": stamp.date().isoformat(),
+        "time": stamp.strftime("%Y-%m-%d %H:%M"),
+        "time_display": stamp.strftime("%H:%M"),
+        "flower": flower,
+        "roa": rng.choice(_ROAS),
+        "grams": grams,
+        "grams_used": grams,
+        "efficiency": 1.0,
+        "thc_mg": thc_mg,
+        "cbd_mg": 0.0,
+        "remaining": 10.0,
+        "is_cbd_dominant": False,
+    }
+
+
+def process_rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, or None where it cannot be read."""
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Counters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            handle = ctypes.windll.kernel32.OpenProcess(0x1000 | 0x0010, False, int(pid))
+            if not handle:
+                return None
+            try:
+                counters = _Counters()
+                counters.cb = ctypes.sizeof(counters)
+                if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                    return None
+                return int(counters.WorkingSetSize)
+            finally:
+                ctypes.windll.kernel32.CloseHandle(handle)
+        except Exception:
+            return None
+    try:
+        for line in Path(f"/proc/{int(pid)}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except Exception:
+        return None
+    return None
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(len(sorted_values), rank) - 1]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[int, int] = {}
+        self.errors = 0
+        self.requests = 0
+
+    def record(self, label: str, latency_s: float, status: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.latencies.setdefault(label, []).append(latency_s)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status == 0 or (status >= 400 and status not in (409, 429)):
+                self.errors += 1
+
+    def summary(self, elapsed_s: float) -> dict:
+        with self._lock:
+            # Long-poll waits are held by design and would swamp the overall percentiles.
+            everything = sorted(v for label, values in self.latencies.items() if label != "wait" for v in values)
+            endpoints = {}
+            for label, values in sorted(self.latencies.items()):
+                ordered = sorted(values)
+                endpoints[label] = {
+                    "count": len(ordered),
+                    "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                    "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                    "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                }
+            total = max(1, self.requests)
+            return {
+                "requests": self.requests,
+                "throughput_rps": round(self.requests / max(elapsed_s, 1e-9), 2),
+                "p50_ms": round(percentile(everything, 50) * 1000, 2),
+                "p95_ms": round(percentile(everything, 95) * 1000, 2),
+                "p99_ms": round(percentile(everything, 99) * 1000, 2),
+                "error_rate": round(self.errors / total, 4),
+                "rate_limited_rate": round(self.statuses.get(429, 0) / total, 4),
+                "conflict_rate": round(self.statuses.get(409, 0) / total, 4),
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "endpoints": endpoints,
+            }
+
+
+class _LoadClient:
+    """One simulated desktop client with its own keep-alive connection(s)."""
+
+    def __init__(
+        self,
+        index: int,
+        port: int,
+        stats: LoadStats,
+        access_key: str,
+        pattern: str,
+        poll_interval_s: float,
+        push_interval_s: float,
+        source_ip: str = "",
+    ):
+        self.index = index
+        self.port = port
+        self.stats = stats
+        self.access_key = access_key
+        self.pattern = pattern
+        self.poll_interval_s = poll_interval_s
+        self.push_interval_s = push_interval_s
+        self.source_ip = source_ip
+        self.rng = random.Random(index)
+        self.epoch = ""
+        self.seq = 0
+        self.library_version = -1
+        self.mtime = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        source = (self.source_ip, 0) if self.source_ip else None
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout, source_address=source)
+
+    def request(
+        self,
+        label: str,
+        method: str,
+        path: str,
+        payload: Any = None,
+        conn: Optional[http.client.HTTPConnection] = None,
+        timeout: float = 10.0,
+    ) -> tuple[int, Any, Optional[http.client.HTTPConnection]]:
+        headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+        if self.access_key:
+            headers["X-FlowerTrack-Key"] = self.access_key
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+        if conn is None:
+            conn = self._connect(timeout)
+        started = time.perf_counter()
+        status = 0
+        data: Any = None
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+            status = int(resp.status)
+            if raw and str(resp.getheader("Content-Encoding", "") or "").lower() == "gzip":
+                raw = gzip.decompress(raw)
+            data = json.loads(raw.decode("utf-8")) if raw else None
+            if resp.will_close:
+                conn.close()
+                conn = None
+        except Exception:
+            conn.close()
+            conn = None
+        self.stats.record(label, time.perf_counter() - started, status)
+        return status, data, conn
+
+    def _call(self, label: str, method: str, path: str, payload: Any = None) -> tuple[int, Any]:
+        status, data, self._conn = self.request(label, method, path, payload, conn=self._conn)
+        return status, data
+
+    def _sync_ops(self) -> None:
+        query = urllib.parse.urlencode({"since": self.seq, "epoch": self.epoch})
+        status, data = self._call("tracker-ops", "GET", f"/api/network/tracker-ops?{query}")
+        if status == 200 and isinstance(data, dict):
+            self.epoch = str(data.get("epoch") or self.epoch)
+            self.seq = int(data.get("seq", self.seq))
+
+    def _push(self) -> None:
+        stamp = datetime.now()
+        log = _synthetic_log(self.rng, stamp, f"Load Test Flower {self.index % 20}")
+        body = {"ops": [{"op": "append_log", "log": log}], "base_seq": self.seq, "epoch": self.epoch}
+        status, data = self._call("push-ops", "POST", "/api/network/tracker-ops", body)
+        if status == 200 and isinstance(data, dict):
+            self.seq = int(data.get("seq", self.seq))
+        elif status == 409:
+            self._sync_ops()
+
+    def _watch(self, stop_at: float) -> None:
+        conn = None
+        while time.monotonic() < stop_at:
+            hold = max(0.5, min(25.0, stop_at - time.monotonic()))
+            query = urllib.parse.urlencode(
+                {"tracker": self.seq, "epoch": self.epoch, "library": self.library_version, "timeout": hold}
+            )
+            status, data, conn = self.request("wait", "GET", f"/api/network/wait?{query}", conn=conn, timeout=hold + 5)
+            if status != 200 or not isinstance(data, dict):
+                time.sleep(0.5)
+                continue
+            self.library_version = int(data.get("library_version", self.library_version))
+            if data.get("changed"):
+                status, data, conn = self.request(
+                    "tracker-ops",
+                    "GET",
+                    "/api/network/tracker-ops?" + urllib.parse.urlencode({"since": self.seq, "epoch": self.epoch}),
+                    conn=conn,
+                )
+                if status == 200 and isinstance(data, dict):
+                    self.epoch = str(data.get("epoch") or self.epoch)
+                    self.seq = int(data.get("seq", self.seq))
+        if conn is not None:
+            conn.close()
+
+    def run(self, stop_at: float) -> None:
+        self._call("ping", "GET", "/api/network/ping")
+        self._call("tracker-data", "GET", "/api/network/tracker-data")
+        self._call("library-data", "GET", "/api/network/library-data")
+        self._sync_ops()
+        watcher = None
+        if self.pattern == "watch":
+            watcher = threading.Thread(target=self._watch, args=(stop_at,), daemon=True)
+            watcher.start()
+        next_poll = time.monotonic() + self.rng.uniform(0, self.poll_interval_s)
+        next_push = time.monotonic() + self.rng.uniform(0, self.push_interval_s) if self.push_interval_s > 0 else None
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            if self.pattern == "poll" and now >= next_poll:
+                status, data = self._call("tracker-meta", "GET", "/api/network/tracker-meta")
+                if status == 200 and isinstance(data, dict):
+                    mtime = data.get("mtime")
+                    if mtime != self.mtime:
+                        self.mtime = mtime
+                        self._sync_ops()
+                next_poll = now + self.poll_interval_s
+            if next_push is not None and now >= next_push:
+                self._push()
+                next_push = now + self.push_interval_s * self.rng.uniform(0.5, 1.5)
+            wake = min(t for t in (next_poll if self.pattern == "poll" else stop_at, next_push or stop_at, stop_at))
+            time.sleep(max(0.0, min(0.25, wake - time.monotonic())))
+        if watcher is not None:
+            watcher.join(timeout=30.0)
+        if self._conn is not None:
+            self._conn.close()
+
+
+# First argument that makes this script run the child server process instead of a test.
+_SERVE_FLAG = "--serve"
+
+
+def _serve(args: argparse.Namespace) -> int:
+    tracker_path, library_path = Path(args.tracker), Path(args.library_file)
+    httpd, thread, port = start_network_data_server(
+        bind_host="127.0.0.1",
+        preferred_port=args.port,
+        tracker_data_path=tracker_path,
+        library_data_path=library_path,
+        log=(lambda msg: print(msg, file=sys.stderr, flush=True)) if args.verbose else (lambda _msg: None),
+        access_key=args.access_key,
+        allow_public_clients=False,
+        rate_limit_requests_per_minute=args.rate_limit,
+        server_mode=args.server_mode,
+    )
+    if not httpd or not port:
+        return 1
+    print(f"PORT {port}", flush=True)
+    try:
+        # The parent closes our stdin to stop the server.
+        sys.stdin.read()
+    finally:
+        stop_network_data_server(httpd, thread, lambda _msg: None)
+    return 0
+
+
+def run_load_test(
+    clients: int = 10,
+    duration_s: float = 20.0,
+    logs: int = 2000,
+    library: int = 200,
+    pattern: str = "poll",
+    poll_interval_s: float = 1.0,
+    push_interval_s: float = 10.0,
+    server_mode: str = "threaded",
+    rate_limit: int = 0,
+    port: int = 18766,
+    distinct_source_ips: bool = False,
+    verbose: bool = False,
+) -> dict:
+    access_key = "loadtest-key"
+    with tempfile.TemporaryDirectory(prefix="flowertrack-loadtest-") as tmp:
+        tracker_path, library_path = build_synthetic_data(Path(tmp), logs, library)
+        cmd = [
+            sys.executable,
+            os.path.abspath(__file__),
+            _SERVE_FLAG,
+            "--tracker",
+            str(tracker_path),
+            "--library-file",
+            str(library_path),
+            "--port",
+            str(port),
+            "--access-key",
+            access_key,
+            "--rate-limit",
+            str(rate_limit),
+            "--server-mode",
+            server_mode,
+        ]
+        if verbose:
+            cmd.append("--verbose")
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            line = proc.stdout.readline() if proc.stdout else ""
+            if not line.startswith("PORT "):
+                raise RuntimeError("load-test server failed to start")
+            chosen_port = int(line.split()[1])
+            stats = LoadStats()
+            rss_samples: list[int] = []
+            idle_rss = process_rss_bytes(proc.pid)
+            started = time.monotonic()
+            stop_at = started + max(1.0, float(duration_s))
+            sims = [
+                _LoadClient(
+                    i,
+                    chosen_port,
+                    stats,
+                    access_key,
+                    pattern,
+                    poll_interval_s,
+                    push_interval_s,
+                    # Rate limits are per client address; 127.0.0.x are all loopback on Linux.
+                    source_ip=f"127.0.0.{2 + (i % 250)}" if distinct_source_ips else "",
+                )
+                for i in range(max(1, clients))
+            ]
+            threads = [threading.Thread(target=sim.run, args=(stop_at,), daemon=True) for sim in sims]
+            for thread in threads:
+                thread.start()
+            while any(thread.is_alive() for thread in threads):
+                rss = process_rss_bytes(proc.pid)
+                if rss:
+                    rss_samples.append(rss)
+                time.sleep(0.5)
+            elapsed = time.monotonic() - started
+        finally:
+            if proc.stdin:
+                proc.stdin.close()
+            try:
+                proc.wait(timeout=10.0)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        report = stats.summary(elapsed)
+        report.update(
+            {
+                "clients": max(1, clients),
+                "duration_s": round(elapsed, 2),
+                "pattern": pattern,
+                "server_mode": server_mode,
+                "tracker_logs": logs,
+                "library_entries": library,
+                "tracker_file_bytes": tracker_path.stat().st_size if tracker_path.exists() else 0,
+                "server_rss_idle_mb": round(idle_rss / 1048576, 1) if idle_rss else None,
+                "server_rss_peak_mb": round(max(rss_samples) / 1048576, 1) if rss_samples else None,
+            }
+        )
+        return report
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"clients={report['clients']} pattern={report['pattern']} server={report['server_mode']} "
+        f"duration={report['duration_s']}s logs={report['tracker_logs']} library={report['library_entries']}",
+        f"requests={report['requests']} throughput={report['throughput_rps']} req/s "
+        f"errors={report['error_rate']:.2%} 429={report['rate_limited_rate']:.2%} 409={report['conflict_rate']:.2%}",
+    ]
+    lines.append(f"latency p50={report['p50_ms']}ms p95={report['p95_ms']}ms p99={report['p99_ms']}ms")
+    for label, row in report["endpoints"].items():
+        lines.append(
+            f"  {label:<14} n={row['count']:<7} p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms"
+        )
+    lines.append(f"server rss idle={report['server_rss_idle_mb']}MB peak={report['server_rss_peak_mb']}MB")
+    return "\n".join(lines)
+
+
+def _serve_parser() -> argparse.ArgumentParser:
+    # Arguments of the child server process; internal, so kept out of the public --help.
+    serve = argparse.ArgumentParser(prog=f"network_loadtest.py {_SERVE_FLAG}")
+    serve.add_argument("--tracker", required=True)
+    serve.add_argument("--library-file", required=True)
+    serve.add_argument("--port", type=int, default=18766)
+    serve.add_argument("--access-key", default="")
+    serve.add_argument("--rate-limit", type=int, default=0)
+    serve.add_argument("--server-mode", default="threaded")
+    serve.add_argument("--verbose", action="store_true")
+    return serve
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == [_SERVE_FLAG]:
+        return _serve(_serve_parser().parse_args(argv[1:]))
+    parser = argparse.ArgumentParser(description="FlowerTrack host-mode network load test")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--logs", type=int, default=2000, help="synthetic tracker log entries")
+    parser.add_argument("--library", type=int, default=200, help="synthetic library entries")
+    parser.add_argument("--pattern", choices=("poll", "watch"), default="poll", help="tracker-meta polling or long-poll")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between tracker-meta polls")
+    parser.add_argument("--push-interval", type=float, default=10.0, help="mean seconds between pushes (0 = none)")
+    parser.add_argument("--server-mode", choices=("threaded", "asyncio"), default="threaded")
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per minute per client address")
+    parser.add_argument("--port", type=int, default=18766)
+    parser.add_argument("--distinct-source-ips", action="store_true", help="give each client its own 127.0.0.x")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="echo server access log to stderr")
+    args = parser.parse_args(argv)
+    report = run_load_test(
+        clients=args.clients,
+        duration_s=args.duration,
+        logs=args.logs,
+        library=args.library,
+        pattern=args.pattern,
+        poll_interval_s=args.poll_interval,
+        push_interval_s=args.push_interval,
+        server_mode=args.server_mode,
+        rate_limit=args.rate_limit,
+        port=args.port,
+        distinct_source_ips=args.distinct_source_ips,
+        verbose=args.verbose,
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
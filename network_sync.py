@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-import functools
+import gzip
+import hashlib
 import hmac
+import http.client
 import http.server
 import ipaddress
 import json
@@ -9,18 +11,67 @@ import os
 import socket
 import threading
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
+import uuid
+import weakref
+from collections import OrderedDict, deque
 from pathlib import Path
 from typing import Any, Callable, Optional, Tuple
 
+from catalog_sync import encode_catalog_rows, index_catalog
+from library_sync import (
+    MergeConflict as LibraryMergeConflict,
+    apply_library_entry_edits,
+    assign_entry_ids,
+    entry_revision,
+    merge_library_entries,
+    stamp_library_revisions,
+)
+from tracker_ops import INDEXED_OPS, MergeConflict, apply_tracker_ops, diff_tracker_documents, merge_tracker_documents
+
 _WRITE_LOCK = threading.RLock()
 
 DEFAULT_NETWORK_PORT = 8766
 DEFAULT_EXPORT_PORT = 8765
 DEFAULT_BIND_HOST = "0.0.0.0"
 DEFAULT_REMOTE_HOST = "127.0.0.1"
+# Ops retained for /api/network/tracker-ops; clients further behind get a snapshot.
+TRACKER_OPS_RETAINED = 2000
+# Catalog item changes retained for /api/network/catalog; older replicas get the full catalog.
+CATALOG_CHANGES_RETAINED = 5000
+# Deleted library entry ids retained for /api/network/library-entries; older replicas get the full list.
+LIBRARY_TOMBSTONES_RETAINED = 2000
+# Recent document versions kept as merge bases for writes made against an older version.
+DOCUMENT_HISTORY_RETAINED = 16
+# Long-poll /api/network/wait: maximum hold time, and how often a held request re-checks the
+# data files for writes made outside this server (e.g. the library window saving directly).
+CHANGE_WAIT_MAX_S = 25.0
+CHANGE_WAIT_RECHECK_S = 2.0
+# JSON bodies at least this large are gzipped for clients that accept it.
+GZIP_MIN_BYTES = 1024
+# Idle keep-alive connections are closed by the server after this many seconds.
+KEEPALIVE_IDLE_S = 30.0
+_POOL_MAX_IDLE_PER_HOST = 4
+_POOL_LOCK = threading.Lock()
+_CONNECTION_POOL: dict[tuple[str, int], list[http.client.HTTPConnection]] = {}
+# Last body per (host, port, path) for If-None-Match revalidation of full-document GETs.
+_ETAG_LOCK = threading.Lock()
+_ETAG_CACHE: dict[tuple[str, int, str], tuple[str, bytes]] = {}
+# Last X-FlowerTrack-Version read (GET) or written (PUT) per (host, port, path); sent as If-Match
+# on full-document writes.
+_VERSION_LOCK = threading.Lock()
+_VERSION_CACHE: dict[tuple[str, int, str], str] = {}
+
+_CHANGE_FEEDS: "weakref.WeakSet[_ChangeFeed]" = weakref.WeakSet()
+
+
+def notify_network_data_changed() -> None:
+    """Wake long-polling clients after the host app writes tracker or library data itself."""
+    for feed in list(_CHANGE_FEEDS):
+        try:
+            feed.poke()
+        except Exception:
+            pass
 
 
 def _atomic_write_json(path: Path, data: Any) -> None:
@@ -39,6 +90,530 @@ def _read_json(path: Path, default: Any) -> Any:
         return default
 
 
+def _empty_tracker_document() -> dict:
+    return {"schema_version": 1, "logs": []}
+
+
+def _stat_key(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = path.stat()
+        return (int(st.st_mtime_ns), int(st.st_size))
+    except OSError:
+        return None
+
+
+class _EncodedPayload:
+    __slots__ = ("key", "raw", "gz", "etag")
+
+    def __init__(self, key: Optional[tuple[int, int]], raw: bytes):
+        self.key = key
+        self.raw = raw
+        self.gz = gzip.compress(raw, compresslevel=6) if len(raw) >= GZIP_MIN_BYTES else None
+        self.etag = '"' + hashlib.sha1(raw).hexdigest()[:20] + '"'
+
+
+class _VersionedPayload:
+    """A cached payload together with the document version it was read at."""
+
+    __slots__ = ("payload", "version")
+
+    def __init__(self, payload: _EncodedPayload, version: str):
+        self.payload = payload
+        self.version = version
+
+
+def _parse_if_match(value: Any) -> str:
+    """Version token from an If-Match header ("" when absent)."""
+    token = str(value or "").strip()
+    if token.startswith("W/"):
+        token = token[2:]
+    return token.strip('"')
+
+
+class _EncodedFileCache:
+    """Pre-encoded (and pre-gzipped) JSON response bytes for a data file, keyed by its stat.
+
+    Readers never take _WRITE_LOCK: writers replace the file atomically, so a read sees either
+    the old or the new content, and a stale entry is re-keyed on the next stat.
+    """
+
+    def __init__(self, path: Path, default: Callable[[], Any], normalize: Callable[[Any], Any]):
+        self.path = Path(path)
+        self._default = default
+        self._normalize = normalize
+        self._lock = threading.Lock()
+        self._entry: Optional[_EncodedPayload] = None
+        self._generation = 0
+
+    def get(self) -> _EncodedPayload:
+        key = _stat_key(self.path)
+        entry = self._entry
+        if entry is not None and entry.key == key:
+            return entry
+        with self._lock:
+            generation = self._generation
+        data = self._normalize(_read_json(self.path, self._default()))
+        entry = _EncodedPayload(key, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            # Don't cache a read that raced with a write (mtime granularity can hide it).
+            if generation == self._generation:
+                self._entry = entry
+        return entry
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+def _normalize_tracker_payload(data: Any) -> dict:
+    if isinstance(data, list):
+        return {"schema_version": 1, "logs": data}
+    return data if isinstance(data, dict) else _empty_tracker_document()
+
+
+def _normalize_library_payload(data: Any) -> list:
+    return data if isinstance(data, list) else []
+
+
+class _TrackerOpLog:
+    """Sequenced tracker ops for delta sync; has its own lock, writers also hold _WRITE_LOCK.
+
+    Writes that bypass the ops endpoint (full PUTs, or the host app saving the file directly)
+    are picked up by diffing the cached document against the file whenever its stat changes.
+    """
+
+    def __init__(self, path: Path, max_ops: int = TRACKER_OPS_RETAINED):
+        self.path = Path(path)
+        # Sequence numbers restart with the server; the epoch tells clients to resync.
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._ops: deque[tuple[int, dict]] = deque(maxlen=max(1, int(max_ops)))
+        self._doc: Optional[dict] = None
+        self._stat: Optional[tuple[int, int]] = None
+        self._history: deque[tuple[int, dict]] = deque(maxlen=DOCUMENT_HISTORY_RETAINED)
+        self._lock = threading.RLock()
+
+    def _record(self, ops: list[dict]) -> None:
+        for op in ops:
+            self.seq += 1
+            self._ops.append((self.seq, op))
+
+    def _remember(self, doc: dict) -> None:
+        if not self._history or self._history[-1][0] != self.seq:
+            self._history.append((self.seq, doc))
+
+    def _ops_after(self, since: int) -> Optional[list[dict]]:
+        oldest = self._ops[0][0] if self._ops else self.seq + 1
+        if since < oldest - 1 or since > self.seq:
+            return None
+        return [op for seq, op in self._ops if seq > since]
+
+    def document(self) -> dict:
+        with self._lock:
+            key = _stat_key(self.path)
+            if self._doc is not None and key == self._stat:
+                return self._doc
+            doc = _normalize_tracker_payload(_read_json(self.path, _empty_tracker_document()))
+            if self._doc is not None:
+                self._record(diff_tracker_documents(self._doc, doc))
+            self._doc = doc
+            self._stat = key
+            self._remember(doc)
+            return doc
+
+    def position(self) -> Tuple[str, int]:
+        with self._lock:
+            self.document()
+            return self.epoch, self.seq
+
+    def version_key(self) -> Tuple[str, Optional[tuple[int, int]]]:
+        """Version token for If-Match (the op position, which advances on every change) and the file stat it describes."""
+        with self._lock:
+            self.document()
+            return f"{self.epoch}.{self.seq}", self._stat
+
+    def _base_document(self, seq: int) -> Optional[dict]:
+        for known_seq, doc in reversed(self._history):
+            if known_seq == seq:
+                return doc
+        return None
+
+    def store(self, doc: dict, ops: Optional[list[dict]] = None) -> None:
+        with self._lock:
+            previous = self.document()
+            _atomic_write_json(self.path, doc)
+            self._record(ops if ops is not None else diff_tracker_documents(previous, doc))
+            self._doc = doc
+            self._stat = _stat_key(self.path)
+            self._remember(doc)
+
+    def store_versioned(self, doc: dict, if_match: str) -> Tuple[int, dict]:
+        """Full-document write guarded by a version token; merges onto newer versions when it can."""
+        with self._lock:
+            current = self.document()
+            version = f"{self.epoch}.{self.seq}"
+            if if_match in ("*", version):
+                self.store(doc)
+                return 200, {"ok": True, "version": f"{self.epoch}.{self.seq}", "merged": False}
+            epoch, _, seq = if_match.rpartition(".")
+            base = self._base_document(int(seq)) if epoch == self.epoch and seq.isdigit() else None
+            if base is None:
+                return 409, {"ok": False, "error": "version_conflict", "version": version}
+            try:
+                merged = merge_tracker_documents(base, current, doc)
+            except MergeConflict as exc:
+                return 409, {"ok": False, "error": "version_conflict", "version": version, "detail": str(exc)}
+            self.store(merged)
+            return 200, {"ok": True, "version": f"{self.epoch}.{self.seq}", "merged": True}
+
+    def changes_since(self, since: int, epoch: str) -> dict:
+        with self._lock:
+            doc = self.document()
+            ops = self._ops_after(since) if epoch == self.epoch else None
+            payload: dict[str, Any] = {"ok": True, "epoch": self.epoch, "seq": self.seq}
+        if ops is None:
+            payload["snapshot"] = doc
+        else:
+            payload["ops"] = ops
+        return payload
+
+    def apply(self, ops: list[dict], base_seq: int, epoch: str) -> Tuple[int, dict]:
+        with self._lock:
+            return self._apply_locked(ops, base_seq, epoch)
+
+    def _apply_locked(self, ops: list[dict], base_seq: int, epoch: str) -> Tuple[int, dict]:
+        doc = self.document()
+        if epoch != self.epoch:
+            return 409, {"ok": False, "error": "epoch_mismatch", "epoch": self.epoch, "seq": self.seq}
+        intervening = self._ops_after(base_seq)
+        if intervening is None or (intervening and any(op.get("op") in INDEXED_OPS for op in ops)):
+            # Index-based edits are only safe against the exact state the client diffed, so
+            # rebase them through a three-way merge from that state when it is still known.
+            base = self._base_document(base_seq) if intervening is not None else None
+            if base is None:
+                return 409, {"ok": False, "error": "stale_ops", "epoch": self.epoch, "seq": self.seq}
+            try:
+                merged = merge_tracker_documents(base, doc, apply_tracker_ops(base, ops))
+            except MergeConflict as exc:
+                return 409, {
+                    "ok": False,
+                    "error": "stale_ops",
+                    "epoch": self.epoch,
+                    "seq": self.seq,
+                    "detail": str(exc),
+                }
+            except ValueError as exc:
+                return 400, {"ok": False, "error": "invalid_ops", "detail": str(exc)}
+            rebased = diff_tracker_documents(doc, merged)
+            self.store(merged, rebased)
+            return 200, {"ok": True, "epoch": self.epoch, "seq": self.seq, "ops": intervening + rebased}
+        try:
+            new_doc = apply_tracker_ops(doc, ops)
+        except ValueError as exc:
+            return 400, {"ok": False, "error": "invalid_ops", "detail": str(exc)}
+        self.store(new_doc, ops)
+        return 200, {"ok": True, "epoch": self.epoch, "seq": self.seq, "ops": intervening + ops}
+
+
+class _LibraryDocument:
+    """Library list with stable entry ids and per-entry revisions.
+
+    The library revision is bumped by every change and stamped as `rev` on the entries that
+    changed, so clients can fetch only what changed since the revision they hold. Writes that
+    bypass the server are noticed by stat; entries they add are given ids in place.
+    """
+
+    def __init__(self, path: Path, max_tombstones: int = LIBRARY_TOMBSTONES_RETAINED):
+        self.path = Path(path)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.revision = 0
+        self._floor = 0
+        self._doc: Optional[list] = None
+        self._stat: Optional[tuple[int, int]] = None
+        self._history: deque[tuple[int, list]] = deque(maxlen=DOCUMENT_HISTORY_RETAINED)
+        self._tombstones: deque[tuple[int, str]] = deque()
+        self._max_tombstones = max(1, int(max_tombstones))
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        return self.revision
+
+    def document(self) -> list:
+        with self._lock:
+            key = _stat_key(self.path)
+            if self._doc is not None and key == self._stat:
+                return self._doc
+            raw = _normalize_library_payload(_read_json(self.path, []))
+            entries = assign_entry_ids(raw, self._doc or [])
+            if self._doc is None:
+                # Revisions persist in the file; carry on from the highest one.
+                self.revision = max((entry_revision(entry) for entry in entries), default=0)
+                previous = [entry for entry in entries if entry_revision(entry)]
+            else:
+                previous = self._doc
+            entries, revision, removed = stamp_library_revisions(previous, entries, self.revision)
+            if entries != raw and _stat_key(self.path) == key:
+                _atomic_write_json(self.path, entries)
+                key = _stat_key(self.path)
+            first = self._doc is None
+            self._stat = key
+            self._commit(entries, revision, removed)
+            if first:
+                self._floor = self.revision
+                self._remember()
+            return self._doc
+
+    def _commit(self, entries: list, revision: int, removed: list[str]) -> None:
+        self._doc = entries
+        if revision == self.revision:
+            return
+        self.revision = revision
+        for entry_id in removed:
+            self._tombstones.append((revision, entry_id))
+        while len(self._tombstones) > self._max_tombstones:
+            self._floor = self._tombstones.popleft()[0]
+        self._remember()
+
+    def _remember(self) -> None:
+        if not self._history or self._history[-1][0] != self.revision:
+            self._history.append((self.revision, self._doc))
+
+    def position(self) -> int:
+        with self._lock:
+            self.document()
+            return self.revision
+
+    def version_key(self) -> Tuple[str, Optional[tuple[int, int]]]:
+        with self._lock:
+            self.document()
+            return f"{self.epoch}.{self.revision}", self._stat
+
+    def _store(self, entries: list) -> None:
+        stamped, revision, removed = stamp_library_revisions(self._doc or [], entries, self.revision)
+        _atomic_write_json(self.path, stamped)
+        self._stat = _stat_key(self.path)
+        self._commit(stamped, revision, removed)
+
+    def store_versioned(self, entries: list, if_match: str) -> Tuple[int, dict]:
+        with self._lock:
+            current = self.document()
+            token = f"{self.epoch}.{self.revision}"
+            if if_match in ("*", token):
+                self._store(assign_entry_ids(entries, current))
+                return 200, {"ok": True, "version": f"{self.epoch}.{self.revision}", "merged": False}
+            epoch, _, version = if_match.rpartition(".")
+            base = None
+            if epoch == self.epoch and version.isdigit():
+                base = next((doc for v, doc in reversed(self._history) if v == int(version)), None)
+            if base is None:
+                return 409, {"ok": False, "error": "version_conflict", "version": token}
+            try:
+                merged = merge_library_entries(base, current, assign_entry_ids(entries, base))
+            except LibraryMergeConflict as exc:
+                return 409, {"ok": False, "error": "version_conflict", "version": token, "detail": str(exc)}
+            self._store(merged)
+            return 200, {"ok": True, "version": f"{self.epoch}.{self.revision}", "merged": True}
+
+    def changes_since(self, since: int, epoch: str) -> dict:
+        """Entries changed and ids deleted after revision `since`, or the whole list when out of range."""
+        with self._lock:
+            entries = self.document()
+            payload: dict[str, Any] = {"ok": True, "epoch": self.epoch, "revision": self.revision}
+            if epoch != self.epoch or since < self._floor or since > self.revision:
+                payload.update({"full": True, "entries": entries, "deleted": []})
+                return payload
+            payload.update(
+                {
+                    "full": False,
+                    "entries": [entry for entry in entries if entry_revision(entry) > since],
+                    "deleted": list(dict.fromkeys(entry_id for rev, entry_id in self._tombstones if rev > since)),
+                }
+            )
+            return payload
+
+    def apply_edits(self, upserts: list[dict], deletes: list[dict]) -> Tuple[int, dict]:
+        """Upsert/delete individual entries; 409 with the current entries if any were edited meanwhile."""
+        with self._lock:
+            current = self.document()
+            entries, conflicts = apply_library_entry_edits(current, upserts, deletes)
+            if entries is None:
+                return 409, {"ok": False, "error": "entry_conflict", "revision": self.revision, "conflicts": conflicts}
+            self._store(entries)
+            touched = {str(edit.get("id") or "") for edit in upserts}
+            # Upserts without an id were given one; return every entry stamped by this write.
+            stamped = [
+                entry
+                for entry in self._doc or []
+                if str(entry["id"]) in touched or entry_revision(entry) == self.revision
+            ]
+            return 200, {"ok": True, "epoch": self.epoch, "revision": self.revision, "entries": stamped}
+
+
+class _CatalogLog:
+    """Versioned, identity-keyed view of the host's last parse for /api/network/catalog.
+
+    The scraper writes the file from its own process, so changes are found by stat: each
+    new file content becomes one version, recording which identity keys changed.
+    """
+
+    def __init__(self, path: Path, max_changes: int = CATALOG_CHANGES_RETAINED):
+        self.path = Path(path)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.version = 0
+        self._floor = 0
+        self._items: dict[str, dict] = {}
+        self._changes: deque[tuple[int, str]] = deque()
+        self._max_changes = max(1, int(max_changes))
+        self._stat: Optional[tuple[int, int]] = None
+        self._lock = threading.RLock()
+
+    def refresh(self) -> int:
+        with self._lock:
+            stat_key = _stat_key(self.path)
+            if stat_key == self._stat and self.version > 0:
+                return self.version
+            self._stat = stat_key
+            data = _read_json(self.path, [])
+            keyed = index_catalog(data if isinstance(data, list) else [])
+            self.version += 1
+            if self.version == 1:
+                self._floor = 1
+            else:
+                changed = [key for key, item in keyed.items() if self._items.get(key) != item]
+                changed += [key for key in self._items if key not in keyed]
+                for key in changed:
+                    self._changes.append((self.version, key))
+                while len(self._changes) > self._max_changes:
+                    self._floor = self._changes.popleft()[0]
+            self._items = keyed
+            return self.version
+
+    def changes_since(self, since: int, epoch: str) -> dict:
+        with self._lock:
+            version = self.refresh()
+            payload: dict[str, Any] = {"ok": True, "epoch": self.epoch, "version": version}
+            if epoch != self.epoch or since < self._floor or since > version:
+                fields, rows = encode_catalog_rows(self._items.items())
+                payload.update({"full": True, "fields": fields, "upserts": rows, "removed": []})
+                return payload
+            keys = list(dict.fromkeys(key for seq, key in self._changes if seq > since))
+            fields, rows = encode_catalog_rows((key, self._items[key]) for key in keys if key in self._items)
+            payload.update(
+                {
+                    "full": False,
+                    "fields": fields,
+                    "upserts": rows,
+                    "removed": [key for key in keys if key not in self._items],
+                }
+            )
+            return payload
+
+
+class _ChangeFeed:
+    """Wakes held /api/network/wait requests when tracker ops, library data or the catalog change."""
+
+    def __init__(
+        self,
+        tracker_ops: _TrackerOpLog,
+        library: _LibraryDocument,
+        catalog: Optional[_CatalogLog] = None,
+    ):
+        self._tracker_ops = tracker_ops
+        self._catalog = catalog
+        self._library = library
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._closed = False
+        self._listeners: set[Callable[[], None]] = set()
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Register a non-blocking callback run on every poke/close (used by the asyncio server)."""
+        with self._cond:
+            self._listeners.add(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        with self._cond:
+            self._listeners.discard(callback)
+
+    def _notify(self) -> None:
+        self._cond.notify_all()
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception:
+                pass
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed
+
+    def poke(self) -> None:
+        with self._cond:
+            self._generation += 1
+            self._notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._notify()
+
+    def versions(self) -> Tuple[str, int, int, int]:
+        epoch, seq = self._tracker_ops.position()
+        catalog_version = self._catalog.refresh() if self._catalog is not None else 0
+        return epoch, seq, self._library.position(), catalog_version
+
+    def check(
+        self,
+        tracker_seq: int,
+        epoch: str,
+        library_version: int,
+        catalog_version: Optional[int] = None,
+    ) -> dict:
+        """Compare a client's last-seen versions with the current ones.
+
+        catalog_version None means the client doesn't replicate the catalog.
+        """
+        cur_epoch, cur_seq, cur_library, cur_catalog = self.versions()
+        changed = cur_epoch != epoch or cur_seq != tracker_seq or cur_library != library_version
+        if catalog_version is not None and cur_catalog != catalog_version:
+            changed = True
+        return {
+            "ok": True,
+            "changed": changed,
+            "epoch": cur_epoch,
+            "tracker_seq": cur_seq,
+            "library_version": cur_library,
+            "catalog_version": cur_catalog,
+        }
+
+    def wait(
+        self,
+        tracker_seq: int,
+        epoch: str,
+        library_version: int,
+        timeout: float,
+        on_tick: Optional[Callable[[], None]] = None,
+        catalog_version: Optional[int] = None,
+    ) -> dict:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            if on_tick is not None:
+                on_tick()
+            with self._cond:
+                generation = self._generation
+                closed = self._closed
+            payload = self.check(tracker_seq, epoch, library_version, catalog_version)
+            remaining = deadline - time.monotonic()
+            if payload["changed"] or closed or remaining <= 0:
+                return payload
+            with self._cond:
+                if self._generation == generation and not self._closed:
+                    self._cond.wait(min(remaining, CHANGE_WAIT_RECHECK_S))
+
+
 def _port_ready(host: str, port: int, timeout: float = 0.5) -> bool:
     try:
         with socket.create_connection((host, port), timeout=timeout):
@@ -47,45 +622,85 @@ def _port_ready(host: str, port: int, timeout: float = 0.5) -> bool:
         return False
 
 
-def start_network_data_server(
-    bind_host: str,
-    preferred_port: int,
-    tracker_data_path: Path,
-    library_data_path: Path,
-    log: Callable[[str], None],
-    access_key: str = "",
-    allow_public_clients: bool = False,
-    rate_limit_requests_per_minute: int = 0,
-    rate_limit_window_seconds: float = 60.0,
-    audit_log_burst: int = 8,
-    audit_log_window_seconds: float = 30.0,
-) -> Tuple[Optional[http.server.ThreadingHTTPServer], Optional[threading.Thread], Optional[int]]:
-    """Start host-mode JSON API server for shared tracker/library data."""
-    bind = (bind_host or DEFAULT_BIND_HOST).strip() or DEFAULT_BIND_HOST
-    port = int(preferred_port or DEFAULT_NETWORK_PORT)
-    expected_key = str(access_key or "").strip()
-    # Keep this relatively short so host UI reflects disconnects quickly.
-    client_ttl_s = 10.0
-    rate_limit = max(0, int(rate_limit_requests_per_minute or 0))
-    try:
-        rate_window_s = max(1.0, float(rate_limit_window_seconds or 60.0))
-    except Exception:
-        rate_window_s = 60.0
-    try:
-        audit_burst = max(1, int(audit_log_burst or 8))
-    except Exception:
-        audit_burst = 8
-    try:
-        audit_window_s = max(1.0, float(audit_log_window_seconds or 30.0))
-    except Exception:
-        audit_window_s = 30.0
+NETWORK_SERVER_MODES = ("threaded", "asyncio")
+WAIT_PATH = "/api/network/wait"
+
+
+class _NetworkDataService:
+    """Endpoint logic, access control and per-client state shared by both server front-ends."""
+
+    def __init__(
+        self,
+        tracker_data_path: Path,
+        library_data_path: Path,
+        log: Callable[[str], None],
+        access_key: str = "",
+        allow_public_clients: bool = False,
+        rate_limit_requests_per_minute: int = 0,
+        rate_limit_window_seconds: float = 60.0,
+        audit_log_burst: int = 8,
+        audit_log_window_seconds: float = 30.0,
+        max_tracked_clients: int = 1024,
+        max_audit_entries: int = 1024,
+        catalog_path: Optional[Path] = None,
+    ):
+        self.tracker_data_path = Path(tracker_data_path)
+        self.library_data_path = Path(library_data_path)
+        self.log = log
+        self.expected_key = str(access_key or "").strip()
+        self.allow_public_clients = bool(allow_public_clients)
+        # Keep this relatively short so host UI reflects disconnects quickly.
+        self.client_ttl_s = 10.0
+        self.rate_limit = max(0, int(rate_limit_requests_per_minute or 0))
+        try:
+            self.rate_window_s = max(1.0, float(rate_limit_window_seconds or 60.0))
+        except Exception:
+            self.rate_window_s = 60.0
+        try:
+            self.audit_burst = max(1, int(audit_log_burst or 8))
+        except Exception:
+            self.audit_burst = 8
+        try:
+            self.audit_window_s = max(1.0, float(audit_log_window_seconds or 30.0))
+        except Exception:
+            self.audit_window_s = 30.0
+        # Token bucket: `rate_limit` requests of burst, refilled evenly across the window.
+        self.refill_per_s = (self.rate_limit / self.rate_window_s) if self.rate_limit > 0 else 0.0
+        self.max_clients = max(1, int(max_tracked_clients or 1024))
+        self.max_audit = max(1, int(max_audit_entries or 1024))
+        self.clients: OrderedDict[str, float] = OrderedDict()
+        self.clients_lock = threading.Lock()
+        self.rate_buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self.rate_lock = threading.Lock()
+        self.audit_state: OrderedDict[str, dict] = OrderedDict()
+        self.audit_lock = threading.Lock()
+        self.tracker_ops = _TrackerOpLog(self.tracker_data_path)
+        self.catalog = _CatalogLog(Path(catalog_path)) if catalog_path else None
+        self.library = _LibraryDocument(self.library_data_path)
+        self.change_feed = _ChangeFeed(self.tracker_ops, self.library, self.catalog)
+        self.tracker_payloads = _EncodedFileCache(
+            self.tracker_data_path, _empty_tracker_document, _normalize_tracker_payload
+        )
+        self.library_payloads = _EncodedFileCache(self.library_data_path, list, _normalize_library_payload)
 
-    def _client_allowed(host: str) -> bool:
+    def attach(self, server: Any) -> None:
+        """Expose client/rate/audit state under the attribute names the host UI reads."""
+        server._ft_clients = self.clients
+        server._ft_clients_lock = self.clients_lock
+        server._ft_client_ttl = float(self.client_ttl_s)
+        server._ft_rate_buckets = self.rate_buckets
+        server._ft_rate_lock = self.rate_lock
+        server._ft_audit_state = self.audit_state
+        server._ft_audit_lock = self.audit_lock
+        server._ft_change_feed = self.change_feed
+        server._ft_sweeper_stop = threading.Event()
+
+    def client_allowed(self, host: str) -> bool:
         try:
             addr = ipaddress.ip_address((host or "").strip())
         except Exception:
             return False
-        if allow_public_clients:
+        if self.allow_public_clients:
             return True
         # Allow non-public addresses (private + link-local + loopback + CGNAT, etc).
         # This intentionally blocks globally-routable addresses unless explicitly enabled.
@@ -93,207 +708,386 @@ def start_network_data_server(
             return True
         return False
 
-    class Handler(http.server.BaseHTTPRequestHandler):
-        def _audit_deny(self, reason: str, detail: str = "") -> None:
-            # Keep denied-request logs bounded per reason+client to avoid log floods.
-            try:
-                client_ip = str(self.client_address[0] or "").strip()
-            except Exception:
-                client_ip = "unknown"
-            key = f"{client_ip}|{reason}"
-            now = time.monotonic()
-            lock = getattr(self.server, "_ft_audit_lock", None)
-            state = getattr(self.server, "_ft_audit_state", None)
-            if lock is None or state is None:
-                try:
-                    log(f"[network] denied {reason} from {client_ip}{detail}")
-                except Exception:
-                    pass
-                return
-            with lock:
-                bucket = state.get(key)
-                if not isinstance(bucket, dict):
-                    bucket = {"start": now, "count": 0, "suppressed": 0}
-                start = float(bucket.get("start", now))
-                count = int(bucket.get("count", 0))
-                suppressed = int(bucket.get("suppressed", 0))
-                if (now - start) > audit_window_s:
-                    if suppressed > 0:
-                        try:
-                            log(
-                                f"[network] denied {reason} from {client_ip}: suppressed {suppressed} similar events"
-                            )
-                        except Exception:
-                            pass
-                    bucket = {"start": now, "count": 0, "suppressed": 0}
-                    count = 0
-                if count < audit_burst:
+    def audit_deny(self, client_ip: str, reason: str, detail: str = "") -> None:
+        # Keep denied-request logs bounded per reason+client to avoid log floods.
+        client_ip = client_ip or "unknown"
+        key = f"{client_ip}|{reason}"
+        now = time.monotonic()
+        with self.audit_lock:
+            state = self.audit_state
+            bucket = state.get(key)
+            if not isinstance(bucket, dict):
+                bucket = {"start": now, "count": 0, "suppressed": 0}
+                while len(state) >= self.max_audit:
+                    state.popitem(last=False)
+            start = float(bucket.get("start", now))
+            count = int(bucket.get("count", 0))
+            suppressed = int(bucket.get("suppressed", 0))
+            if (now - start) > self.audit_window_s:
+                if suppressed > 0:
                     try:
-                        log(f"[network] denied {reason} from {client_ip}{detail}")
+                        self.log(f"[network] denied {reason} from {client_ip}: suppressed {suppressed} similar events")
                     except Exception:
                         pass
-                    bucket["count"] = count + 1
-                else:
-                    bucket["suppressed"] = int(bucket.get("suppressed", 0)) + 1
-                state[key] = bucket
-
-        def _check_rate_limit(self) -> bool:
-            if rate_limit <= 0:
-                return True
-            client_ip = ""
-            try:
-                client_ip = str(self.client_address[0] or "").strip()
-            except Exception:
-                client_ip = ""
-            if not client_ip:
-                return True
+                bucket = {"start": now, "count": 0, "suppressed": 0}
+                count = 0
+            if count < self.audit_burst:
+                try:
+                    self.log(f"[network] denied {reason} from {client_ip}{detail}")
+                except Exception:
+                    pass
+                bucket["count"] = count + 1
+            else:
+                bucket["suppressed"] = int(bucket.get("suppressed", 0)) + 1
+            state[key] = bucket
+            state.move_to_end(key)
+
+    def rate_limited(self, client_ip: str) -> Optional[int]:
+        """Take a token for client_ip; returns retry-after seconds when the bucket is empty."""
+        if self.rate_limit <= 0 or not client_ip:
+            return None
+        now = time.monotonic()
+        with self.rate_lock:
+            buckets = self.rate_buckets
+            bucket = buckets.get(client_ip)
+            if bucket is None:
+                while len(buckets) >= self.max_clients:
+                    buckets.popitem(last=False)
+                bucket = [float(self.rate_limit), now]
+                buckets[client_ip] = bucket
+            else:
+                buckets.move_to_end(client_ip)
+                bucket[0] = min(float(self.rate_limit), bucket[0] + (now - bucket[1]) * self.refill_per_s)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                return max(1, int(((1.0 - bucket[0]) / self.refill_per_s) + 0.999))
+            bucket[0] -= 1.0
+        return None
+
+    def touch_client(self, client_ip: str) -> None:
+        try:
             now = time.monotonic()
-            lock = getattr(self.server, "_ft_rate_lock", None)
-            buckets = getattr(self.server, "_ft_rate_buckets", None)
-            if lock is None or buckets is None:
-                return True
-            with lock:
-                hits = buckets.get(client_ip, [])
-                cutoff = now - rate_window_s
-                hits = [ts for ts in hits if float(ts) >= cutoff]
-                if len(hits) >= rate_limit:
-                    buckets[client_ip] = hits
-                    retry_after = max(1, int((hits[0] + rate_window_s) - now)) if hits else int(rate_window_s)
-                    self._send_json(
-                        {"ok": False, "error": "rate_limited", "retry_after_seconds": retry_after},
-                        status=429,
-                    )
-                    return False
-                hits.append(now)
-                buckets[client_ip] = hits
-            return True
+            with self.clients_lock:
+                clients = self.clients
+                # Stale entries are pruned by the sweeper, not on every request.
+                if client_ip not in clients:
+                    while len(clients) >= self.max_clients:
+                        clients.popitem(last=False)
+                clients[client_ip] = now
+                clients.move_to_end(client_ip)
+        except Exception:
+            pass
 
-        def _touch_client(self) -> None:
-            try:
-                client_ip = str(self.client_address[0] or "").strip()
-                now = time.monotonic()
-                lock = getattr(self.server, "_ft_clients_lock", None)
-                clients = getattr(self.server, "_ft_clients", None)
-                if lock is None or clients is None:
-                    return
-                with lock:
-                    # prune stale entries on each touch
-                    stale = [ip for ip, ts in clients.items() if (now - float(ts)) > float(client_ttl_s)]
-                    for ip in stale:
-                        clients.pop(ip, None)
-                    clients[client_ip] = now
-            except Exception:
-                pass
+    def admit(self, client_ip: str, headers: Any) -> Optional[Tuple[int, dict]]:
+        """Run access checks and rate limiting; returns the error response for a refused request."""
+        if not self.client_allowed(client_ip):
+            self.audit_deny(client_ip, "client_not_allowed")
+            return 403, {"ok": False, "error": "client_not_allowed"}
+        if not self.expected_key:
+            # No key configured: only allow strict localhost access.
+            if client_ip not in {"127.0.0.1", "::1"}:
+                self.audit_deny(client_ip, "missing_access_key")
+                return 403, {"ok": False, "error": "missing_access_key"}
+        else:
+            got_key = str(headers.get("X-FlowerTrack-Key", "") or "").strip()
+            if not got_key or not hmac.compare_digest(got_key, self.expected_key):
+                self.audit_deny(client_ip, "invalid_access_key", f" (provided_key_len={len(got_key)})")
+                return 403, {"ok": False, "error": "invalid_access_key"}
+        self.touch_client(client_ip)
+        retry_after = self.rate_limited(client_ip)
+        if retry_after is not None:
+            return 429, {"ok": False, "error": "rate_limited", "retry_after_seconds": retry_after}
+        return None
 
-        def _send_forbidden(self, reason: str) -> None:
-            self._send_json({"ok": False, "error": reason}, status=403)
+    @staticmethod
+    def wait_args(query: str) -> Tuple[dict, float]:
+        """Parse /api/network/wait parameters into (last-seen versions for check(), hold seconds)."""
+        params = urllib.parse.parse_qs(query)
 
-        def _check_access(self) -> bool:
-            client_ip = ""
+        def _int_param(name: str) -> int:
             try:
-                client_ip = str(self.client_address[0] or "").strip()
-            except Exception:
-                client_ip = ""
-            if not _client_allowed(client_ip):
-                self._audit_deny("client_not_allowed")
-                self._send_forbidden("client_not_allowed")
-                return False
-            if not expected_key:
-                # No key configured: only allow strict localhost access.
-                if client_ip not in {"127.0.0.1", "::1"}:
-                    self._audit_deny("missing_access_key")
-                    self._send_forbidden("missing_access_key")
-                    return False
-                self._touch_client()
-                return True
-            got_key = str(self.headers.get("X-FlowerTrack-Key", "") or "").strip()
-            if not got_key or not hmac.compare_digest(got_key, expected_key):
-                detail = f" (provided_key_len={len(got_key)})"
-                self._audit_deny("invalid_access_key", detail)
-                self._send_forbidden("invalid_access_key")
-                return False
-            self._touch_client()
-            return True
+                return int((params.get(name) or ["-1"])[0])
+            except ValueError:
+                return -1
 
-        def _send_json(self, payload: Any, status: int = 200) -> None:
-            raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-            self.send_response(status)
-            self.send_header("Content-Type", "application/json; charset=utf-8")
-            self.send_header("Cache-Control", "no-store")
-            self.send_header("Content-Length", str(len(raw)))
-            self.end_headers()
-            self.wfile.write(raw)
+        try:
+            hold_s = float((params.get("timeout") or [CHANGE_WAIT_MAX_S])[0])
+        except ValueError:
+            hold_s = CHANGE_WAIT_MAX_S
+        seen = {
+            "tracker_seq": _int_param("tracker"),
+            "epoch": str((params.get("epoch") or [""])[0]),
+            "library_version": _int_param("library"),
+            # Clients that don't replicate the catalog omit it and aren't woken by it.
+            "catalog_version": _int_param("catalog") if "catalog" in params else None,
+        }
+        return seen, min(CHANGE_WAIT_MAX_S, max(0.0, hold_s))
 
-        def _read_json_body(self) -> Any:
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: str,
+        body: bytes,
+        client_ip: str,
+        headers: Any = None,
+    ) -> Tuple[int, Any]:
+        """Serve every endpoint except the long-poll; may block on file I/O."""
+        if method == "GET":
+            return self._handle_get(path, query)
+        data: Any = None
+        if body:
             try:
-                raw_len = int(self.headers.get("Content-Length", "0") or "0")
+                data = json.loads(body.decode("utf-8"))
             except Exception:
-                raw_len = 0
-            body = self.rfile.read(raw_len) if raw_len > 0 else b""
-            if not body:
-                return None
+                data = None
+        if method == "PUT":
+            if_match = _parse_if_match(headers.get("If-Match") if headers is not None else "")
+            return self._handle_put(path, data, client_ip, if_match)
+        if method == "POST":
+            return self._handle_post(path, data, client_ip)
+        return 404, {"ok": False, "error": "not_found"}
+
+    def _handle_get(self, path: str, query: str) -> Tuple[int, Any]:
+        if path == "/api/network/ping":
+            return 200, {"ok": True, "ts": time.time()}
+        if path == "/api/network/tracker-meta":
             try:
-                return json.loads(body.decode("utf-8"))
+                mtime = float(os.path.getmtime(self.tracker_data_path))
             except Exception:
-                return None
+                mtime = 0.0
+            return 200, {"ok": True, "mtime": mtime}
+        if path == "/api/network/tracker-ops":
+            params = urllib.parse.parse_qs(query)
+            try:
+                since = int((params.get("since") or ["0"])[0])
+            except ValueError:
+                since = 0
+            epoch = str((params.get("epoch") or [""])[0])
+            return 200, self.tracker_ops.changes_since(since, epoch)
+        if path == "/api/network/tracker-data":
+            return 200, self._versioned(self.tracker_ops, self.tracker_payloads)
+        if path == "/api/network/catalog":
+            if self.catalog is None:
+                return 404, {"ok": False, "error": "catalog_unavailable"}
+            params = urllib.parse.parse_qs(query)
+            try:
+                since = int((params.get("since") or ["0"])[0])
+            except ValueError:
+                since = 0
+            return 200, self.catalog.changes_since(since, str((params.get("epoch") or [""])[0]))
+        if path == "/api/network/library-data":
+            return 200, self._versioned(self.library, self.library_payloads)
+        if path == "/api/network/library-entries":
+            params = urllib.parse.parse_qs(query)
+            try:
+                since = int((params.get("since") or ["0"])[0])
+            except ValueError:
+                since = 0
+            return 200, self.library.changes_since(since, str((params.get("epoch") or [""])[0]))
+        return 404, {"ok": False, "error": "not_found"}
 
-        def do_GET(self) -> None:  # noqa: N802
-            if not self._check_access():
-                return
-            if not self._check_rate_limit():
-                return
-            path = self.path.split("?", 1)[0].rstrip("/")
-            if path == "/api/network/ping":
-                self._send_json({"ok": True, "ts": time.time()}, status=200)
-                return
-            if path == "/api/network/tracker-meta":
-                with _WRITE_LOCK:
+    @staticmethod
+    def _versioned(document: Any, cache: _EncodedFileCache) -> _VersionedPayload:
+        for _ in range(3):
+            version, stat = document.version_key()
+            entry = cache.get()
+            # Retry if the file changed between reading the version and the bytes.
+            if entry.key == stat:
+                break
+        return _VersionedPayload(entry, version)
+
+    def _handle_put(self, path: str, body: Any, client_ip: str, if_match: str = "") -> Tuple[int, Any]:
+        if path == "/api/network/tracker-data":
+            if not isinstance(body, dict):
+                self.audit_deny(client_ip, "invalid_tracker_payload", f" (type={type(body).__name__})")
+                return 400, {"ok": False, "error": "invalid_tracker_payload"}
+            if not if_match:
+                return 428, {"ok": False, "error": "if_match_required", "version": self.tracker_ops.version_key()[0]}
+            with _WRITE_LOCK:
+                status, payload = self.tracker_ops.store_versioned(body, if_match)
+                self.tracker_payloads.invalidate()
+        elif path == "/api/network/library-data":
+            if not isinstance(body, list):
+                self.audit_deny(client_ip, "invalid_library_payload", f" (type={type(body).__name__})")
+                return 400, {"ok": False, "error": "invalid_library_payload"}
+            if not if_match:
+                return 428, {"ok": False, "error": "if_match_required", "version": self.library.version_key()[0]}
+            with _WRITE_LOCK:
+                status, payload = self.library.store_versioned(body, if_match)
+                self.library_payloads.invalidate()
+        else:
+            return 404, {"ok": False, "error": "not_found"}
+        if status == 200:
+            self.change_feed.poke()
+        return status, payload
+
+    def _handle_post(self, path: str, body: Any, client_ip: str) -> Tuple[int, Any]:
+        if path == "/api/network/tracker-ops":
+            ops = body.get("ops") if isinstance(body, dict) else None
+            if not isinstance(ops, list):
+                self.audit_deny(client_ip, "invalid_tracker_ops", f" (type={type(body).__name__})")
+                return 400, {"ok": False, "error": "invalid_ops"}
+            try:
+                base_seq = int(body.get("base_seq", -1))
+            except (TypeError, ValueError):
+                base_seq = -1
+            with _WRITE_LOCK:
+                status, payload = self.tracker_ops.apply(ops, base_seq, str(body.get("epoch") or ""))
+            if status == 200:
+                self.tracker_payloads.invalidate()
+                self.change_feed.poke()
+            return status, payload
+        if path == "/api/network/library-entries":
+            upserts = body.get("upserts", []) if isinstance(body, dict) else None
+            deletes = body.get("deletes", []) if isinstance(body, dict) else None
+            if not (
+                isinstance(upserts, list)
+                and isinstance(deletes, list)
+                and all(isinstance(item, dict) for item in upserts + deletes)
+            ):
+                self.audit_deny(client_ip, "invalid_library_entries", f" (type={type(body).__name__})")
+                return 400, {"ok": False, "error": "invalid_library_entries"}
+            with _WRITE_LOCK:
+                status, payload = self.library.apply_edits(upserts, deletes)
+                self.library_payloads.invalidate()
+            if status == 200:
+                self.change_feed.poke()
+            return status, payload
+        return 404, {"ok": False, "error": "not_found"}
+
+    @staticmethod
+    def render(status: int, payload: Any, headers: Any) -> Tuple[int, list[tuple[str, str]], bytes]:
+        """Encode a handler result into (status, headers, body), applying gzip and ETag rules."""
+        accept = str(headers.get("Accept-Encoding", "") or "").lower()
+        accepts_gzip = any(part.split(";", 1)[0].strip() == "gzip" for part in accept.split(","))
+        out: list[tuple[str, str]] = [("Content-Type", "application/json; charset=utf-8")]
+        if isinstance(payload, _VersionedPayload):
+            out.append(("X-FlowerTrack-Version", payload.version))
+            payload = payload.payload
+        elif isinstance(payload, dict) and status in (200, 409, 428) and isinstance(payload.get("version"), str):
+            out.append(("X-FlowerTrack-Version", payload["version"]))
+        if isinstance(payload, _EncodedPayload):
+            if_none_match = str(headers.get("If-None-Match", "") or "")
+            if payload.etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return 304, out[1:] + [("ETag", payload.etag), ("Cache-Control", "no-cache")], b""
+            raw = payload.raw
+            gz = payload.gz
+            out += [("Cache-Control", "no-cache"), ("ETag", payload.etag)]
+        else:
+            raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            gz = None
+            if len(raw) >= GZIP_MIN_BYTES and accepts_gzip:
+                gz = gzip.compress(raw, compresslevel=6)
+            out.append(("Cache-Control", "no-store"))
+        out.append(("Vary", "Accept-Encoding"))
+        if gz is not None and accepts_gzip:
+            raw = gz
+            out.append(("Content-Encoding", "gzip"))
+        out.append(("Content-Length", str(len(raw))))
+        return status, out, raw
+
+    def sweep(self) -> None:
+        # All three maps are kept in last-touched order, so expired entries sit at the front.
+        now = time.monotonic()
+        with self.clients_lock:
+            clients = self.clients
+            while clients and (now - next(iter(clients.values()))) > self.client_ttl_s:
+                clients.popitem(last=False)
+        with self.rate_lock:
+            buckets = self.rate_buckets
+            # A bucket idle for a full window has refilled; dropping it changes nothing.
+            while buckets and (now - next(iter(buckets.values()))[1]) >= self.rate_window_s:
+                buckets.popitem(last=False)
+        with self.audit_lock:
+            state = self.audit_state
+            while state:
+                key, bucket = next(iter(state.items()))
+                if (now - float(bucket.get("start", now))) <= self.audit_window_s:
+                    break
+                state.popitem(last=False)
+                suppressed = int(bucket.get("suppressed", 0))
+                if suppressed > 0:
+                    client_ip, _, reason = key.partition("|")
                     try:
-                        mtime = float(os.path.getmtime(tracker_data_path))
+                        self.log(f"[network] denied {reason} from {client_ip}: suppressed {suppressed} similar events")
                     except Exception:
-                        mtime = 0.0
-                self._send_json({"ok": True, "mtime": mtime}, status=200)
-                return
-            if path == "/api/network/tracker-data":
-                with _WRITE_LOCK:
-                    data = _read_json(tracker_data_path, {"schema_version": 1, "logs": []})
-                if isinstance(data, list):
-                    data = {"schema_version": 1, "logs": data}
-                self._send_json(data, status=200)
+                        pass
+
+    def start_sweeper(self, stop: threading.Event, interval_s: float) -> None:
+        def _sweeper() -> None:
+            while not stop.wait(interval_s):
+                try:
+                    self.sweep()
+                except Exception:
+                    pass
+
+        threading.Thread(target=_sweeper, daemon=True, name="flowertrack-network-sweeper").start()
+
+
+def _make_threaded_handler(service: _NetworkDataService, log: Callable[[str], None]) -> type:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        # Keep-alive: every response carries Content-Length, and idle sockets time out.
+        protocol_version = "HTTP/1.1"
+        timeout = KEEPALIVE_IDLE_S
+
+        def _client_ip(self) -> str:
+            try:
+                return str(self.client_address[0] or "").strip()
+            except Exception:
+                return ""
+
+        def _send(self, status: int, payload: Any) -> None:
+            status, headers, raw = service.render(status, payload, self.headers)
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            if raw:
+                self.wfile.write(raw)
+
+        def _dispatch(self, method: str) -> None:
+            client_ip = self._client_ip()
+            denied = service.admit(client_ip, self.headers)
+            if denied is not None:
+                # The request body was not read, so this connection cannot be reused.
+                self.close_connection = True
+                self._send(*denied)
                 return
-            if path == "/api/network/library-data":
-                with _WRITE_LOCK:
-                    data = _read_json(library_data_path, [])
-                self._send_json(data if isinstance(data, list) else [], status=200)
+            path, _, query = self.path.partition("?")
+            path = path.rstrip("/")
+            if method == "GET" and path == WAIT_PATH:
+                seen, hold_s = service.wait_args(query)
+                payload = service.change_feed.wait(
+                    seen["tracker_seq"],
+                    seen["epoch"],
+                    seen["library_version"],
+                    hold_s,
+                    # A held long-poll still counts as a connected client.
+                    on_tick=lambda: service.touch_client(client_ip),
+                    catalog_version=seen["catalog_version"],
+                )
+                self._send(200, payload)
                 return
-            self._send_json({"ok": False, "error": "not_found"}, status=404)
+            body = b""
+            if method != "GET":
+                try:
+                    raw_len = int(self.headers.get("Content-Length", "0") or "0")
+                except Exception:
+                    raw_len = 0
+                body = self.rfile.read(raw_len) if raw_len > 0 else b""
+            self._send(*service.handle(method, path, query, body, client_ip, self.headers))
+
+        def do_GET(self) -> None:  # noqa: N802
+            self._dispatch("GET")
 
         def do_PUT(self) -> None:  # noqa: N802
-            if not self._check_access():
-                return
-            if not self._check_rate_limit():
-                return
-            path = self.path.split("?", 1)[0].rstrip("/")
-            body = self._read_json_body()
-            if path == "/api/network/tracker-data":
-                if not isinstance(body, dict):
-                    self._audit_deny("invalid_tracker_payload", f" (type={type(body).__name__})")
-                    self._send_json({"ok": False, "error": "invalid_tracker_payload"}, status=400)
-                    return
-                with _WRITE_LOCK:
-                    _atomic_write_json(tracker_data_path, body)
-                self._send_json({"ok": True}, status=200)
-                return
-            if path == "/api/network/library-data":
-                if not isinstance(body, list):
-                    self._audit_deny("invalid_library_payload", f" (type={type(body).__name__})")
-                    self._send_json({"ok": False, "error": "invalid_library_payload"}, status=400)
-                    return
-                with _WRITE_LOCK:
-                    _atomic_write_json(library_data_path, body)
-                self._send_json({"ok": True}, status=200)
-                return
-            self._send_json({"ok": False, "error": "not_found"}, status=404)
+            self._dispatch("PUT")
+
+        def do_POST(self) -> None:  # noqa: N802
+            self._dispatch("POST")
 
         def log_message(self, fmt: str, *args: object) -> None:
             try:
@@ -301,44 +1095,103 @@ def start_network_data_server(
             except Exception:
                 pass
 
-    httpd: Optional[http.server.ThreadingHTTPServer] = None
-    chosen_port: Optional[int] = None
-    for _ in range(20):
-        try:
-            httpd = http.server.ThreadingHTTPServer((bind, port), Handler)
-            httpd.allow_reuse_address = True
-            chosen_port = port
-            break
-        except OSError as exc:
-            log(f"[network] port {port} unavailable on {bind}: {exc}")
-            port += 1
-    if not httpd or not chosen_port:
-        log("[network] failed to start data server")
-        return None, None, None
+    return Handler
+
+
+def start_network_data_server(
+    bind_host: str,
+    preferred_port: int,
+    tracker_data_path: Path,
+    library_data_path: Path,
+    log: Callable[[str], None],
+    access_key: str = "",
+    allow_public_clients: bool = False,
+    rate_limit_requests_per_minute: int = 0,
+    rate_limit_window_seconds: float = 60.0,
+    audit_log_burst: int = 8,
+    audit_log_window_seconds: float = 30.0,
+    max_tracked_clients: int = 1024,
+    max_audit_entries: int = 1024,
+    sweep_interval_seconds: float = 30.0,
+    server_mode: str = "threaded",
+    catalog_path: Optional[Path] = None,
+) -> Tuple[Optional[Any], Optional[threading.Thread], Optional[int]]:
+    """Start host-mode JSON API server for shared tracker/library data.
+
+    server_mode "asyncio" serves from a single event loop (see network_async); if it cannot
+    start, the threaded server is used instead. catalog_path (the host's last parse) enables
+    /api/network/catalog replication.
+    """
+    bind = (bind_host or DEFAULT_BIND_HOST).strip() or DEFAULT_BIND_HOST
+    port = int(preferred_port or DEFAULT_NETWORK_PORT)
     try:
-        setattr(httpd, "_ft_clients", {})
-        setattr(httpd, "_ft_clients_lock", threading.Lock())
-        setattr(httpd, "_ft_client_ttl", float(client_ttl_s))
-        setattr(httpd, "_ft_rate_buckets", {})
-        setattr(httpd, "_ft_rate_lock", threading.Lock())
-        setattr(httpd, "_ft_audit_state", {})
-        setattr(httpd, "_ft_audit_lock", threading.Lock())
+        sweep_s = max(0.05, float(sweep_interval_seconds or 30.0))
     except Exception:
-        pass
+        sweep_s = 30.0
+    service = _NetworkDataService(
+        tracker_data_path,
+        library_data_path,
+        log,
+        access_key=access_key,
+        allow_public_clients=allow_public_clients,
+        rate_limit_requests_per_minute=rate_limit_requests_per_minute,
+        rate_limit_window_seconds=rate_limit_window_seconds,
+        audit_log_burst=audit_log_burst,
+        audit_log_window_seconds=audit_log_window_seconds,
+        max_tracked_clients=max_tracked_clients,
+        max_audit_entries=max_audit_entries,
+        catalog_path=catalog_path,
+    )
 
-    thread = threading.Thread(target=httpd.serve_forever, daemon=True, name="flowertrack-network-server")
-    thread.start()
+    server: Optional[Any] = None
+    thread: Optional[threading.Thread] = None
+    chosen_port: Optional[int] = None
+    if str(server_mode or "").strip().lower() == "asyncio":
+        try:
+            from network_async import start_async_server
+
+            server, thread, chosen_port = start_async_server(service, bind, port, log)
+        except Exception as exc:
+            log(f"[network] asyncio server unavailable, using threaded server: {exc}")
+            server = thread = chosen_port = None
+    if server is None:
+        handler = _make_threaded_handler(service, log)
+        for _ in range(20):
+            try:
+                server = http.server.ThreadingHTTPServer((bind, port), handler)
+                server.allow_reuse_address = True
+                chosen_port = port
+                break
+            except OSError as exc:
+                log(f"[network] port {port} unavailable on {bind}: {exc}")
+                port += 1
+        if not server or not chosen_port:
+            log("[network] failed to start data server")
+            return None, None, None
+        thread = threading.Thread(target=server.serve_forever, daemon=True, name="flowertrack-network-server")
+        thread.start()
+    service.attach(server)
+    _CHANGE_FEEDS.add(service.change_feed)
+    service.start_sweeper(server._ft_sweeper_stop, sweep_s)
     log(f"[network] data server running at http://{bind}:{chosen_port}")
-    return httpd, thread, chosen_port
+    return server, thread, chosen_port
 
 
 def stop_network_data_server(
-    httpd: Optional[http.server.ThreadingHTTPServer],
+    httpd: Optional[Any],
     thread: Optional[threading.Thread],
     log: Callable[[str], None],
 ) -> None:
     if not httpd:
         return
+    sweeper_stop = getattr(httpd, "_ft_sweeper_stop", None)
+    if sweeper_stop is not None:
+        sweeper_stop.set()
+    feed = getattr(httpd, "_ft_change_feed", None)
+    if feed is not None:
+        # Release held long-poll requests so their handler threads exit promptly.
+        feed.close()
+        _CHANGE_FEEDS.discard(feed)
     try:
         httpd.shutdown()
         httpd.server_close()
@@ -347,6 +1200,30 @@ def stop_network_data_server(
     log("[network] data server stopped")
 
 
+def _pool_get(host: str, port: int, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+    with _POOL_LOCK:
+        idle = _CONNECTION_POOL.get((host, port))
+        conn = idle.pop() if idle else None
+    if conn is None:
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+    conn.timeout = timeout
+    if conn.sock is not None:
+        try:
+            conn.sock.settimeout(timeout)
+        except OSError:
+            conn.close()
+    return conn, True
+
+
+def _pool_put(host: str, port: int, conn: http.client.HTTPConnection) -> None:
+    with _POOL_LOCK:
+        idle = _CONNECTION_POOL.setdefault((host, port), [])
+        if len(idle) < _POOL_MAX_IDLE_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+
 def _request_json(
     method: str,
     host: str,
@@ -355,39 +1232,104 @@ def _request_json(
     payload: Any = None,
     timeout: float = 4.0,
     access_key: str = "",
+    revalidate: bool = False,
+    if_match: Optional[str] = None,
 ) -> Any:
-    base = f"http://{host}:{int(port)}{path}"
     body = None
-    headers = {}
+    headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+    if if_match:
+        headers["If-Match"] = if_match if if_match == "*" else f'"{if_match}"'
+    cache_key = (host, int(port), path)
+    cached: Optional[tuple[str, bytes]] = None
+    if revalidate:
+        with _ETAG_LOCK:
+            cached = _ETAG_CACHE.get(cache_key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
     key = str(access_key or "").strip()
     if key:
         headers["X-FlowerTrack-Key"] = key
     if payload is not None:
         body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
         headers["Content-Type"] = "application/json; charset=utf-8"
-    req = urllib.request.Request(base, data=body, method=method, headers=headers)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            raw = resp.read()
-    except urllib.error.HTTPError as exc:
+    port = int(port)
+    for attempt in range(2):
+        conn, reused = _pool_get(host, port, timeout)
         try:
-            raw = exc.read()
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            raw = resp.read()
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            # A pooled socket the host already closed: reconnect once.
+            if reused and attempt == 0:
+                continue
+            raise
         except Exception:
-            raw = b""
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            _pool_put(host, port, conn)
+        break
+    if raw and str(resp.getheader("Content-Encoding", "") or "").lower() == "gzip":
+        raw = gzip.decompress(raw)
+    status = int(resp.status or 0)
+    version = resp.getheader("X-FlowerTrack-Version")
+    # Only a document this client has read or successfully written is a safe base for the
+    # next write; the version carried by a conflict or error reply is not.
+    if version and ((method == "GET" and (200 <= status < 300 or status == 304)) or (method == "PUT" and 200 <= status < 300)):
+        with _VERSION_LOCK:
+            _VERSION_CACHE[cache_key] = str(version)
+    if revalidate:
+        if status == 304 and cached:
+            raw = cached[1]
+            status = 200
+        elif status == 200 and resp.getheader("ETag"):
+            with _ETAG_LOCK:
+                _ETAG_CACHE[cache_key] = (str(resp.getheader("ETag")), raw)
+    if status >= 400:
         if raw:
             try:
                 payload = json.loads(raw.decode("utf-8"))
                 if isinstance(payload, dict):
-                    payload["_http_status"] = int(getattr(exc, "code", 0) or 0)
+                    payload["_http_status"] = status
                 return payload
             except Exception:
                 pass
-        return {"ok": False, "error": "http_error", "_http_status": int(getattr(exc, "code", 0) or 0)}
+        return {"ok": False, "error": "http_error", "_http_status": status}
     if not raw:
         return None
     return json.loads(raw.decode("utf-8"))
 
 
+def last_network_version(host: str, port: int, path: str) -> str:
+    """Version token of the last tracker-data/library-data response from this host ("" if none)."""
+    with _VERSION_LOCK:
+        return _VERSION_CACHE.get((host, int(port), path), "")
+
+
+def _write_precondition(
+    host: str, port: int, path: str, if_match: Optional[str], timeout: float, access_key: str
+) -> str:
+    """If-Match for a full-document write: `if_match`, else the last version read or written.
+
+    With no version known yet the document is fetched first; "" when that fails too, and the
+    write is not sent.
+    """
+    if if_match:
+        return str(if_match)
+    version = last_network_version(host, port, path)
+    if not version:
+        try:
+            _request_json("GET", host, port, path, timeout=timeout, access_key=access_key, revalidate=True)
+        except Exception:
+            return ""
+        version = last_network_version(host, port, path)
+    return version
+
+
 def network_ping(host: str, port: int, timeout: float = 2.0, access_key: str = "") -> bool:
     try:
         payload = _request_json("GET", host, port, "/api/network/ping", timeout=timeout, access_key=access_key)
@@ -405,6 +1347,7 @@ def fetch_tracker_data(host: str, port: int, timeout: float = 4.0, access_key: s
             "/api/network/tracker-data",
             timeout=timeout,
             access_key=access_key,
+            revalidate=True,
         )
         if isinstance(payload, dict) and bool(payload.get("ok")) is False and isinstance(payload.get("error"), str):
             return None
@@ -432,16 +1375,153 @@ def fetch_tracker_meta(host: str, port: int, timeout: float = 2.0, access_key: s
     return None
 
 
-def push_tracker_data(host: str, port: int, data: dict, timeout: float = 4.0, access_key: str = "") -> bool:
+def fetch_tracker_ops(
+    host: str,
+    port: int,
+    since: int,
+    epoch: str = "",
+    timeout: float = 4.0,
+    access_key: str = "",
+) -> dict | None:
+    """Return {"epoch", "seq", "ops"} after `since`, or {"epoch", "seq", "snapshot"} when too far behind."""
+    query = urllib.parse.urlencode({"since": int(since), "epoch": str(epoch or "")})
+    try:
+        payload = _request_json(
+            "GET",
+            host,
+            port,
+            f"/api/network/tracker-ops?{query}",
+            timeout=timeout,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict) and payload.get("ok") and ("ops" in payload or "snapshot" in payload):
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def push_tracker_ops(
+    host: str,
+    port: int,
+    ops: list[dict],
+    base_seq: int,
+    epoch: str,
+    timeout: float = 4.0,
+    access_key: str = "",
+) -> dict | None:
+    """Post ops diffed against `base_seq`; the reply lists every op after it, ours included."""
+    try:
+        payload = _request_json(
+            "POST",
+            host,
+            port,
+            "/api/network/tracker-ops",
+            payload={"ops": ops, "base_seq": int(base_seq), "epoch": str(epoch or "")},
+            timeout=timeout,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict):
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def wait_for_network_change(
+    host: str,
+    port: int,
+    tracker_seq: int,
+    epoch: str,
+    library_version: int,
+    wait_s: float = CHANGE_WAIT_MAX_S,
+    access_key: str = "",
+    catalog_version: Optional[int] = None,
+) -> dict | None:
+    """Block until the host's tracker op seq, library or catalog version differs from ours, or wait_s elapses.
+
+    Returns {"changed", "epoch", "tracker_seq", "library_version", "catalog_version"}, an
+    {"ok": False, "error"} payload for HTTP errors (404 from hosts without the endpoint), or
+    None when unreachable. Pass catalog_version=None to ignore catalog changes.
+    """
+    params: dict[str, Any] = {
+        "tracker": int(tracker_seq),
+        "epoch": str(epoch or ""),
+        "library": int(library_version),
+        "timeout": wait_s,
+    }
+    if catalog_version is not None:
+        params["catalog"] = int(catalog_version)
+    query = urllib.parse.urlencode(params)
+    try:
+        payload = _request_json(
+            "GET",
+            host,
+            port,
+            f"/api/network/wait?{query}",
+            timeout=float(wait_s) + 5.0,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict) and (payload.get("error") or "tracker_seq" in payload):
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def fetch_catalog_changes(
+    host: str,
+    port: int,
+    since: int = 0,
+    epoch: str = "",
+    timeout: float = 8.0,
+    access_key: str = "",
+) -> dict | None:
+    """Return catalog changes after version `since` (see catalog_sync.apply_catalog_changes)."""
+    query = urllib.parse.urlencode({"since": int(since), "epoch": str(epoch or "")})
+    try:
+        payload = _request_json(
+            "GET",
+            host,
+            port,
+            f"/api/network/catalog?{query}",
+            timeout=timeout,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict) and payload.get("ok") and "upserts" in payload:
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def push_tracker_data(
+    host: str,
+    port: int,
+    data: dict,
+    timeout: float = 4.0,
+    access_key: str = "",
+    if_match: Optional[str] = None,
+) -> bool:
+    """PUT the full tracker document against `if_match` (default: the last version read or written).
+
+    The host merges onto a newer version when the edits don't overlap; False on conflict, or
+    when no base version could be fetched.
+    """
+    path = "/api/network/tracker-data"
+    precondition = _write_precondition(host, port, path, if_match, timeout, access_key)
+    if not precondition:
+        return False
     try:
         payload = _request_json(
             "PUT",
             host,
             port,
-            "/api/network/tracker-data",
+            path,
             payload=data,
             timeout=timeout,
             access_key=access_key,
+            if_match=precondition,
         )
         return bool(isinstance(payload, dict) and payload.get("ok"))
     except Exception:
@@ -457,6 +1537,7 @@ def fetch_library_data(host: str, port: int, timeout: float = 4.0, access_key: s
             "/api/network/library-data",
             timeout=timeout,
             access_key=access_key,
+            revalidate=True,
         )
         if isinstance(payload, dict) and bool(payload.get("ok")) is False and isinstance(payload.get("error"), str):
             return None
@@ -467,16 +1548,90 @@ def fetch_library_data(host: str, port: int, timeout: float = 4.0, access_key: s
     return None
 
 
-def push_library_data(host: str, port: int, data: list[dict], timeout: float = 4.0, access_key: str = "") -> bool:
+def fetch_library_changes(
+    host: str,
+    port: int,
+    since: int = 0,
+    epoch: str = "",
+    timeout: float = 4.0,
+    access_key: str = "",
+) -> dict | None:
+    """Return library entries changed after revision `since` (see library_sync.apply_library_changes)."""
+    query = urllib.parse.urlencode({"since": int(since), "epoch": str(epoch or "")})
+    try:
+        payload = _request_json(
+            "GET",
+            host,
+            port,
+            f"/api/network/library-entries?{query}",
+            timeout=timeout,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict) and payload.get("ok") and isinstance(payload.get("entries"), list):
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def push_library_entries(
+    host: str,
+    port: int,
+    upserts: list[dict],
+    deletes: list[dict],
+    timeout: float = 4.0,
+    access_key: str = "",
+) -> dict | None:
+    """POST individual entry upserts and deletes ({"id", "rev"}); each `rev` is the revision edited.
+
+    Returns the host's reply: {"ok": True, "revision", "entries"} with the stored entries, or
+    {"ok": False, "error": "entry_conflict", "conflicts"} carrying the host's current versions.
+    None when the host could not be reached.
+    """
+    try:
+        payload = _request_json(
+            "POST",
+            host,
+            port,
+            "/api/network/library-entries",
+            payload={"upserts": list(upserts), "deletes": list(deletes)},
+            timeout=timeout,
+            access_key=access_key,
+        )
+        if isinstance(payload, dict):
+            return payload
+    except Exception:
+        return None
+    return None
+
+
+def push_library_data(
+    host: str,
+    port: int,
+    data: list[dict],
+    timeout: float = 4.0,
+    access_key: str = "",
+    if_match: Optional[str] = None,
+) -> bool:
+    """PUT the full library document against `if_match` (default: the last version read or written).
+
+    The host merges onto a newer version when the edits don't overlap; False on conflict, or
+    when no base version could be fetched.
+    """
+    path = "/api/network/library-data"
+    precondition = _write_precondition(host, port, path, if_match, timeout, access_key)
+    if not precondition:
+        return False
     try:
         payload = _request_json(
             "PUT",
             host,
             port,
-            "/api/network/library-data",
+            path,
             payload=data,
             timeout=timeout,
             access_key=access_key,
+            if_match=precondition,
         )
         return bool(isinstance(payload, dict) and payload.get("ok"))
     except Exception:
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+# Writes for the same key submitted within this window collapse into one.
+SAVE_DEBOUNCE_SECONDS = 0.3
+# A key saved continuously is still written at least this often.
+SAVE_MAX_DELAY_SECONDS = 2.0
+
+
+class PersistenceWorker:
+    """Runs file writes on one background thread, debounced per key.
+
+    The UI thread snapshots its state and calls submit(key, write); `write` does the
+    serialization and I/O later on the worker. A newer submit for the same key replaces the
+    pending one and pushes its deadline back by `delay`, up to `max_delay` after the first
+    unsaved submit. Exceptions from `write` go to `on_error(key, exc)` on the worker thread.
+    """
+
+    def __init__(
+        self,
+        delay: float = SAVE_DEBOUNCE_SECONDS,
+        max_delay: float = SAVE_MAX_DELAY_SECONDS,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ):
+        self.delay = max(0.0, float(delay))
+        self.max_delay = max(self.delay, float(max_delay))
+        self.on_error = on_error
+        self._cond = threading.Condition()
+        # key -> [write, due, first_submitted]
+        self._pending: dict[str, list] = {}
+        self._running: Optional[str] = None
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: str, write: Callable[[], None], delay: Optional[float] = None) -> None:
+        now = time.monotonic()
+        wait = self.delay if delay is None else max(0.0, float(delay))
+        with self._cond:
+            stopped = self._stopped
+            if not stopped:
+                job = self._pending.get(key)
+                first = job[2] if job else now
+                self._pending[key] = [write, min(now + wait, first + self.max_delay), first]
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True, name="flowertrack-persist")
+                    self._thread.start()
+                self._cond.notify_all()
+        if stopped:
+            # Too late for the worker; don't drop the write.
+            self._run(key, write)
+
+    def pending(self, key: Optional[str] = None) -> bool:
+        """True while a write (for `key`, or any) is queued or in progress."""
+        with self._cond:
+            if key is None:
+                return bool(self._pending) or self._running is not None
+            return key in self._pending or self._running == key
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything pending now; returns False if that didn't finish within `timeout`."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            for job in self._pending.values():
+                job[1] = 0.0
+            self._cond.notify_all()
+            if self._thread is None and self._pending:
+                # Nothing to hand the jobs to (stopped worker); run them here.
+                jobs, self._pending = self._pending, {}
+                for key, job in jobs.items():
+                    self._run(key, job[0])
+            while self._pending or self._running is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Flush pending writes and stop the worker thread."""
+        done = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        return done
+
+    def _run(self, key: str, write: Callable[[], None]) -> None:
+        try:
+            write()
+        except Exception as exc:
+            if self.on_error:
+                try:
+                    self.on_error(key, exc)
+                except Exception:
+                    pass
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped and not self._pending:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    due = [key for key, job in self._pending.items() if job[1] <= now]
+                    if due:
+                        key = min(due, key=lambda k: self._pending[k][1])
+                        write = self._pending.pop(key)[0]
+                        self._running = key
+                        break
+                    wait = min((job[1] for job in self._pending.values()), default=None)
+                    self._cond.wait(None if wait is None else max(0.0, wait - now))
+            try:
+                self._run(key, write)
+            finally:
+                with self._cond:
+                    self._running = None
+                    self._cond.notify_all()
@@ -0,0 +1,142 @@
+import json
+import os
+import socket
+from pathlib import Path
+from urllib import request
+
+import exports
+from catalog_index import CatalogIndex
+from export_server import start_export_server, stop_export_server
+
+
+def _rec(key, **fields):
+    base = {
+        "key": key,
+        "price": 10.0,
+        "thc": 20.0,
+        "cbd": 1.0,
+        "pt": "flower",
+        "strain_type": "Hybrid",
+        "brand": "Brand",
+        "producer": "Producer",
+        "strain": "Strain",
+        "product_id": key,
+        "out": 0,
+        "removed": 0,
+        "smalls": 0,
+        "irradiation": "",
+        "favkey": f"fav-{key}",
+    }
+    base.update(fields)
+    return base
+
+
+def _index():
+    return CatalogIndex(
+        [
+            _rec("a", price=30.0, thc=25.0, brand="Alpha", strain="Lemon Haze"),
+            _rec("b", price=10.0, thc=18.0, brand="Beta", strain="Blue Dream", out=1),
+            _rec("c", price=None, thc=None, pt="oil", strain_type="", brand="Alpha", strain="Oil One"),
+            _rec("d", price=20.0, thc=30.0, brand="Beta", strain="Lemon Kush", smalls=1, irradiation="Gamma"),
+            _rec("e", price=5.0, pt="vape", thc=80.0, strain_type="Indica", removed=1, strain="Old Vape"),
+        ]
+    )
+
+
+def _keys(result):
+    return [item["key"] for item in result["items"]]
+
+
+def test_query_defaults_sort_by_price_with_missing_last():
+    # Like the page, out-of-stock cards are hidden unless in_stock is turned off.
+    assert _keys(_index().query({})) == ["e", "d", "a", "c"]
+    assert _keys(_index().query({"in_stock": "0"})) == ["e", "b", "d", "a", "c"]
+    assert _keys(_index().query({"sort": "thc", "order": "desc"}))[:2] == ["e", "d"]
+
+
+def test_defaults_match_the_page():
+    index = CatalogIndex(
+        [
+            _rec("f"),
+            _rec("g", pt="device"),
+            _rec("h", strain_type="Ruderalis"),
+            _rec("i", pt="device", removed=1),
+        ]
+    )
+    assert _keys(index.query({})) == ["f", "i"]
+    assert _keys(index.query({"type": "flower,device", "strain_type": "Hybrid,Ruderalis"})) == ["f", "g", "h", "i"]
+
+
+def test_filters_match_browser_semantics():
+    index = _index()
+    assert _keys(index.query({"type": "flower"})) == ["e", "d", "a"]  # removed items ignore type filter
+    assert _keys(index.query({"brand": "Alpha"})) == ["a", "c"]
+    assert _keys(index.query({"in_stock": "1", "type": "flower"})) == ["e", "d", "a"]
+    assert _keys(index.query({"in_stock": "0", "type": "flower"})) == ["e", "b", "d", "a"]
+    assert _keys(index.query({"smalls": "0", "gamma": "0"})) == ["e", "a", "c"]
+    assert _keys(index.query({"strain_type": "Indica"})) == ["e", "c"]  # no strain type passes
+    assert _keys(index.query({"price_min": "8", "price_max": "25"})) == ["d", "c"]
+    assert _keys(index.query({"thc_min": "20", "thc_max": "26"})) == ["e", "a", "c"]
+    assert _keys(index.query({"favorites": "fav-a,fav-d"})) == ["d", "a"]
+    assert _keys(index.query({"favorites_only": "1"})) == []
+
+
+def test_search_is_a_substring_match_like_the_page():
+    index = _index()
+    assert _keys(index.query({"q": "lem"})) == ["d", "a"]
+    assert _keys(index.query({"q": "Lemon Ku"})) == ["d"]
+    assert _keys(index.query({"q": "kush"})) == ["d"]
+    assert _keys(index.query({"q": "ush be"})) == ["d"]  # spans strain and brand
+    assert _keys(index.query({"q": "on"})) == ["d", "a", "c"]  # shorter than the n-gram index
+    # Words out of order aren't a substring, as on the page.
+    assert index.query({"q": "kush lemon"})["total"] == 0
+    assert _keys(CatalogIndex([_rec("x", strain="OGKush")]).query({"q": "kush"})) == ["x"]
+    assert index.query({"q": "zzz"})["total"] == 0
+
+
+def test_pagination_clamps_limits():
+    result = _index().query({"in_stock": "0", "offset": "1", "limit": "2"})
+    assert result["total"] == 5
+    assert _keys(result) == ["b", "d"]
+    assert _index().query({"limit": "100000"})["limit"] == 200
+
+
+def _free_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    try:
+        return int(sock.getsockname()[1])
+    finally:
+        sock.close()
+
+
+def test_products_endpoint_serves_latest_export(tmp_path):
+    old_appdata = os.environ.get("APPDATA")
+    os.environ["APPDATA"] = str(tmp_path)
+    exports_dir = Path(tmp_path) / "Exports"
+    httpd = thread = None
+    try:
+        items = [
+            {"product_id": "1", "brand": "Alpha", "strain": "Lemon", "product_type": "flower", "price": 12.0},
+            {"product_id": "2", "brand": "Beta", "strain": "Grape", "product_type": "oil", "price": 40.0},
+        ]
+        exports.export_html_auto(items, exports_dir=exports_dir)
+        httpd, thread, port = start_export_server(_free_port(), exports_dir, lambda _m: None)
+        with request.urlopen(f"http://127.0.0.1:{port}/api/products?type=oil&sort=price", timeout=5) as resp:
+            payload = json.loads(resp.read().decode("utf-8"))
+        assert payload["ok"] is True
+        assert payload["version"] == 1
+        assert payload["total"] == 1
+        assert payload["items"][0]["brand"] == "Beta"
+
+        exports.export_html_auto(items[:1], exports_dir=exports_dir)
+        with request.urlopen(f"http://127.0.0.1:{port}/api/products", timeout=5) as resp:
+            payload = json.loads(resp.read().decode("utf-8"))
+        assert payload["version"] == 2
+        assert [item["strain"] for item in payload["items"]] == ["Lemon"]
+    finally:
+        stop_export_server(httpd, thread, lambda _m: None)
+        if old_appdata is None:
+            os.environ.pop("APPDATA", None)
+        else:
+            os.environ["APPDATA"] = old_appdata
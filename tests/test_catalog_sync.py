@@ -0,0 +1,41 @@
+import pytest
+
+from catalog_sync import apply_catalog_changes, decode_catalog_rows, encode_catalog_rows, index_catalog
+
+
+def _item(strain, price=10.0, **extra):
+    item = {"producer": "P", "brand": "B", "strain": strain, "grams": 10, "product_type": "flower", "price": price}
+    item.update(extra)
+    return item
+
+
+def test_index_catalog_keeps_duplicate_identities():
+    keyed = index_catalog([_item("A"), _item("A"), "junk"])
+    assert len(keyed) == 2
+    assert any(key.endswith("#2") for key in keyed)
+
+
+def test_encode_decode_roundtrip_uses_shared_field_table():
+    keyed = index_catalog([_item("A"), _item("B", stock="IN STOCK")])
+    fields, rows = encode_catalog_rows(keyed.items())
+    assert fields.count("strain") == 1
+    assert all(len(row) == len(fields) + 1 for row in rows)
+    assert dict(decode_catalog_rows(fields, rows)) == keyed
+
+
+def test_apply_catalog_changes_upserts_removes_and_replaces():
+    keyed = index_catalog([_item("A"), _item("B")])
+    key_a, key_b = list(keyed)
+    fields, rows = encode_catalog_rows([(key_a, _item("A", price=12.0))])
+    delta = {"full": False, "fields": fields, "upserts": rows, "removed": [key_b]}
+
+    updated = apply_catalog_changes(keyed, delta)
+    assert updated == {key_a: _item("A", price=12.0)}
+    assert keyed[key_b] == _item("B")
+
+    fields, rows = encode_catalog_rows(index_catalog([_item("C")]).items())
+    assert list(apply_catalog_changes(updated, {"full": True, "fields": fields, "upserts": rows}).values()) == [
+        _item("C")
+    ]
+    with pytest.raises(ValueError):
+        apply_catalog_changes(keyed, {"fields": fields, "upserts": ["bad"]})
@@ -0,0 +1,184 @@
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from urllib import request
+
+import exports
+from export_server import diff_export_cards, start_export_server, stop_export_server
+
+
+def _free_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    try:
+        return int(sock.getsockname()[1])
+    finally:
+        sock.close()
+
+
+def _item(product_id: str, price: float = 10.0, stock: str = "IN STOCK") -> dict:
+    return {
+        "product_id": product_id,
+        "producer": "Brand",
+        "brand": "Brand",
+        "strain": f"Strain {product_id}",
+        "product_type": "flower",
+        "price": price,
+        "stock_status": stock,
+    }
+
+
+def _subscribe(port: int, last_event_id: int | None = None) -> socket.socket:
+    sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    headers = "GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n"
+    if last_event_id is not None:
+        headers += f"Last-Event-ID: {last_event_id}\r\n"
+    sock.sendall((headers + "\r\n").encode("ascii"))
+    return sock
+
+
+def _read_until(sock: socket.socket, needle: bytes, timeout: float = 5.0) -> bytes:
+    buf = b""
+    deadline = time.monotonic() + timeout
+    while needle not in buf and time.monotonic() < deadline:
+        sock.settimeout(max(0.05, deadline - time.monotonic()))
+        try:
+            chunk = sock.recv(65536)
+        except socket.timeout:
+            break
+        if not chunk:
+            break
+        buf += chunk
+    return buf
+
+
+def _export_events(raw: bytes) -> list[dict]:
+    events = []
+    for block in raw.decode("utf-8").split("\n\n"):
+        lines = block.strip().splitlines()
+        if "event: export" not in lines:
+            continue
+        fields = dict(line.split(": ", 1) for line in lines if ": " in line and not line.startswith(":"))
+        payload = json.loads(fields["data"])
+        payload["_id"] = int(fields["id"])
+        events.append(payload)
+    return events
+
+
+def _with_appdata(tmp_path):
+    old = os.environ.get("APPDATA")
+    os.environ["APPDATA"] = str(tmp_path)
+    return old
+
+
+def _restore_appdata(old):
+    if old is None:
+        os.environ.pop("APPDATA", None)
+    else:
+        os.environ["APPDATA"] = old
+
+
+def test_diff_export_cards_reports_new_changed_removed():
+    old = {"a": {"price": 1}, "b": {"price": 2}}
+    new = {"a": {"price": 1}, "b": {"price": 3}, "c": {"price": 4}}
+    delta = diff_export_cards(old, new)
+    assert delta["new"] == {"c": {"price": 4}}
+    assert delta["changed"] == {"b": {"price": 3}}
+    assert delta["removed"] == []
+    assert diff_export_cards(new, {})["removed"] == ["a", "b", "c"]
+
+
+def test_events_stream_sends_card_delta(tmp_path):
+    old_appdata = _with_appdata(tmp_path)
+    exports_dir = Path(tmp_path) / "Exports"
+    exports.export_html_auto([_item("A"), _item("B")], exports_dir=exports_dir)
+    httpd = thread = None
+    sock = None
+    try:
+        httpd, thread, port = start_export_server(_free_port(), exports_dir, lambda _m: None)
+        sock = _subscribe(port)
+        assert b"200" in _read_until(sock, b"retry:")
+        exports.export_html_auto([_item("A", price=12.5), _item("C")], exports_dir=exports_dir)
+        events = _export_events(_read_until(sock, b"event: export"))
+        assert len(events) == 1
+        delta = events[0]
+        assert delta["_id"] == 2
+        assert delta["version"] == 2
+        assert [fields["price"] for fields in delta["changed"].values()] == [12.5]
+        assert len(delta["new"]) == 1
+        assert len(delta["removed"]) == 1
+    finally:
+        if sock:
+            sock.close()
+        stop_export_server(httpd, thread, lambda _m: None)
+        _restore_appdata(old_appdata)
+
+
+def test_events_resume_from_last_event_id(tmp_path):
+    old_appdata = _with_appdata(tmp_path)
+    exports_dir = Path(tmp_path) / "Exports"
+    exports.export_html_auto([_item("A")], exports_dir=exports_dir)
+    httpd = thread = None
+    sock = None
+    try:
+        httpd, thread, port = start_export_server(_free_port(), exports_dir, lambda _m: None)
+        exports.export_html_auto([_item("A", stock="OUT OF STOCK")], exports_dir=exports_dir)
+        broadcaster = getattr(httpd, "_ft_events")
+        deadline = time.monotonic() + 5
+        while broadcaster.version < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        sock = _subscribe(port, last_event_id=1)
+        events = _export_events(_read_until(sock, b"event: export"))
+        assert [e["_id"] for e in events] == [2]
+        assert list(events[0]["changed"].values())[0]["out"] == 1
+
+        sock.close()
+        sock = _subscribe(port, last_event_id=0)
+        events = _export_events(_read_until(sock, b"event: export"))
+        assert events and events[0]["full"] is True
+    finally:
+        if sock:
+            sock.close()
+        stop_export_server(httpd, thread, lambda _m: None)
+        _restore_appdata(old_appdata)
+
+
+def test_events_client_limit_returns_503(tmp_path):
+    old_appdata = _with_appdata(tmp_path)
+    exports_dir = Path(tmp_path) / "Exports"
+    httpd = thread = None
+    socks = []
+    try:
+        httpd, thread, port = start_export_server(
+            _free_port(), exports_dir, lambda _m: None, max_event_clients=1
+        )
+        socks.append(_subscribe(port))
+        assert b" 200 " in _read_until(socks[0], b"retry:")
+        socks.append(_subscribe(port))
+        assert b" 503 " in _read_until(socks[1], b"\r\n\r\n")
+        # The parked subscriber must not hold a server thread hostage.
+        with request.urlopen(f"http://127.0.0.1:{port}/api/changes/unread", timeout=5) as resp:
+            assert resp.status == 200
+        socks[0].close()
+        deadline = time.monotonic() + 5
+        while getattr(httpd, "_ft_events").client_count() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert getattr(httpd, "_ft_events").client_count() == 0
+    finally:
+        for sock in socks:
+            sock.close()
+        stop_export_server(httpd, thread, lambda _m: None)
+        _restore_appdata(old_appdata)
+
+
+def test_template_refetches_history_after_applying_a_delta():
+    from export_template import HTML_TEMPLATE
+
+    handler = HTML_TEMPLATE.split("function handleExportEvent(raw) {", 1)[1].split("\nfunction ", 1)[0]
+    delta_path = handler.split("!applyExportDelta(payload)", 1)[1]
+    assert delta_path.index("setExportBaseline(ms);") < delta_path.index("invalidateHistory();")
+    reset = HTML_TEMPLATE.split("function invalidateHistory() {", 1)[1].split("\n}", 1)[0]
+    assert "historyLoaded = false;" in reset
+    assert "changesData = null;" in reset
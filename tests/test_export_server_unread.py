@@ -139,3 +139,34 @@ def test_flowerbrowser_route_serves_latest_export(tmp_path):
             os.environ.pop("APPDATA", None)
         else:
             os.environ["APPDATA"] = old_appdata
+
+
+def test_served_export_strips_inline_history(tmp_path):
+    appdata = Path(tmp_path)
+    exports_dir = appdata / "FlowerTrack" / "Exports"
+    exports_dir.mkdir(parents=True, exist_ok=True)
+    page = exports_dir / "export-2026-01-01_00-00-00+0000.html"
+    page.write_text(
+        '<html><body>CARDS<script type="application/json" id="changesInline">[{"timestamp": "t"}]</script></body></html>',
+        encoding="utf-8",
+    )
+
+    old_appdata = os.environ.get("APPDATA")
+    os.environ["APPDATA"] = str(appdata)
+    httpd = None
+    thread = None
+    try:
+        httpd, thread, port = start_export_server(_free_port(), exports_dir, lambda _m: None)
+        assert port
+        for route in ("/flowerbrowser", f"/{page.name}"):
+            with request.urlopen(f"http://127.0.0.1:{port}{route}", timeout=5) as resp:
+                html = resp.read().decode("utf-8")
+            assert "CARDS" in html
+            assert 'id="changesInline">[]</script>' in html
+        assert "timestamp" in page.read_text(encoding="utf-8")
+    finally:
+        stop_export_server(httpd, thread, lambda _m: None)
+        if old_appdata is None:
+            os.environ.pop("APPDATA", None)
+        else:
+            os.environ["APPDATA"] = old_appdata
@@ -30,14 +30,37 @@ class ExportHistoryTests(unittest.TestCase):
                 else:
                     os.environ["APPDATA"] = old_appdata
             html_text = path.read_text(encoding="utf-8")
-            line = next((ln for ln in html_text.splitlines() if "const rawChangesJson =" in ln), "")
-            self.assertTrue(line, "rawChangesJson line missing")
-            raw = line.split("=", 1)[1].strip().rstrip(";")
-            self.assertTrue(raw.startswith("["), "rawChangesJson should be an array literal")
+            marker = '<script type="application/json" id="changesInline">'
+            self.assertEqual(html_text.count(marker), 1, "inline history block missing or duplicated")
+            raw = html_text.split(marker, 1)[1].split("</script>", 1)[0]
+            self.assertTrue(raw.startswith("["), "inline history should be an array literal")
             parsed = json.loads(raw)
             self.assertTrue(parsed)
             self.assertEqual(parsed[0].get("timestamp"), "2026-02-06T10:02:09+00:00")
+            self.assertNotIn("__CHANGES_JSON_B64__", html_text)
 
+    def test_inline_history_cannot_close_script_tag(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            appdata = Path(tmp)
+            logs_dir = appdata / "FlowerTrack" / "logs"
+            logs_dir.mkdir(parents=True, exist_ok=True)
+            (logs_dir / "changes.ndjson").write_text(
+                json.dumps({"timestamp": "t", "note": "</script><!--"}) + "\n",
+                encoding="utf-8",
+            )
+            old_appdata = os.environ.get("APPDATA")
+            os.environ["APPDATA"] = str(appdata)
+            try:
+                path = exports.export_html_auto([], exports_dir=appdata / "Exports", open_file=False)
+            finally:
+                if old_appdata is None:
+                    os.environ.pop("APPDATA", None)
+                else:
+                    os.environ["APPDATA"] = old_appdata
+            html_text = path.read_text(encoding="utf-8")
+            marker = '<script type="application/json" id="changesInline">'
+            raw = html_text.split(marker, 1)[1].split("</script>", 1)[0]
+            self.assertEqual(json.loads(raw)[0]["note"], "</script><!--")
 
 if __name__ == "__main__":
     unittest.main()
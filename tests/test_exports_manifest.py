@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import exports
+
+
+def _item() -> dict:
+    return {
+        "brand": "Brand",
+        "producer": "Producer",
+        "strain": "Strain",
+        "price": 10.0,
+        "grams": 10.0,
+        "product_type": "flower",
+        "stock_status": "IN STOCK",
+    }
+
+
+class ExportManifestTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.appdata = Path(self._tmp.name)
+        self.exports_dir = self.appdata / "Exports"
+        self._old_appdata = os.environ.get("APPDATA")
+        os.environ["APPDATA"] = str(self.appdata)
+
+    def tearDown(self):
+        if self._old_appdata is None:
+            os.environ.pop("APPDATA", None)
+        else:
+            os.environ["APPDATA"] = self._old_appdata
+        self._tmp.cleanup()
+
+    def test_export_auto_writes_manifest(self):
+        path = exports.export_html_auto([_item()], exports_dir=self.exports_dir)
+        manifest = json.loads((self.exports_dir / exports.EXPORT_MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(manifest["latest"], path.name)
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(manifest["item_count"], 1)
+        self.assertEqual(manifest["size"], path.stat().st_size)
+        self.assertGreater(manifest["exported_ms"], 0)
+        self.assertEqual(exports.latest_export_path(self.exports_dir), path)
+
+    def test_manifest_version_increments_and_cleanup_keeps_latest(self):
+        exports.export_html_auto([_item()], exports_dir=self.exports_dir)
+        stale = self.exports_dir / "export-2099-01-01_00-00-00+0000.html"
+        stale.write_text("<html>stale</html>", encoding="utf-8")
+        os.utime(stale, (4102444800, 4102444800))
+        second = self.exports_dir / "export-second.html"
+        exports.export_html(self._items(), second)
+        exports._write_export_manifest(self.exports_dir, second, {"item_count": 2})
+        exports.cleanup_html_exports(self.exports_dir, max_files=1)
+        self.assertTrue(second.exists())
+        self.assertFalse(stale.exists())
+        manifest = exports.read_export_manifest(self.exports_dir)
+        self.assertEqual(manifest["version"], 2)
+        self.assertEqual(manifest["latest"], second.name)
+
+    def test_latest_falls_back_to_scan_without_manifest(self):
+        self.exports_dir.mkdir(parents=True)
+        old = self.exports_dir / "export-a.html"
+        new = self.exports_dir / "export-b.html"
+        old.write_text("old", encoding="utf-8")
+        new.write_text("new", encoding="utf-8")
+        os.utime(old, (1000, 1000))
+        os.utime(new, (2000, 2000))
+        self.assertEqual(exports.latest_export_path(self.exports_dir), new)
+
+    def test_manifest_reread_after_external_replace(self):
+        path = exports.export_html_auto([_item()], exports_dir=self.exports_dir)
+        self.assertEqual(exports.read_export_manifest(self.exports_dir)["latest"], path.name)
+        other = self.exports_dir / "export-other.html"
+        other.write_text("other", encoding="utf-8")
+        manifest_path = self.exports_dir / exports.EXPORT_MANIFEST_NAME
+        manifest_path.write_text(json.dumps({"latest": other.name, "version": 9, "extra": "x" * 64}), encoding="utf-8")
+        self.assertEqual(exports.latest_export_path(self.exports_dir), other)
+
+    def _items(self) -> list[dict]:
+        return [_item(), dict(_item(), strain="Other")]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,11 +28,14 @@ class ExportTests(unittest.TestCase):
             self.assertTrue(path.exists())
             text = path.read_text(encoding="utf-8")
             self.assertIn("Strain", text)
-            self.assertIn("loadMoreSentinel", text)
-            self.assertIn("const VISIBLE_STEP = 30", text)
+            self.assertIn("<template id='cardPool'>", text)
+            self.assertIn("function renderWindow(", text)
+            self.assertIn("data-action='basket'", text)
+            self.assertNotIn("onclick='toggleFavorite", text)
             self.assertIn("loading='lazy'", text)
             self.assertIn("data-in-stock='1'", text)
-            self.assertIn("rawChangesB64", text)
+            self.assertIn('id="changesInline"', text)
+            self.assertNotIn("rawChangesB64", text)
             self.assertNotIn("markViewedButton", text)
             self.assertIn("/api/changes/ack", text)
 
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from file_watcher import FileWatcher, file_stamp
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_burst_of_writes_is_reported_once(tmp_path):
+    path = tmp_path / "tracker_data.json"
+    path.write_text("{}", encoding="utf-8")
+    seen = []
+    fired = threading.Event()
+
+    def changed(stamp):
+        seen.append(stamp)
+        fired.set()
+
+    watcher = FileWatcher(path, changed, min_interval=0.02, max_interval=0.05, settle=0.2).start()
+    try:
+        for n in range(5):
+            path.write_text("{" + " " * (n + 1) + "}", encoding="utf-8")
+            time.sleep(0.03)
+        assert fired.wait(3.0)
+        time.sleep(0.3)
+        assert seen == [file_stamp(path)]
+    finally:
+        watcher.stop()
+
+
+def test_acknowledged_writes_and_retargets_are_not_reported(tmp_path):
+    path = tmp_path / "a.json"
+    other = tmp_path / "b.json"
+    path.write_text("{}", encoding="utf-8")
+    other.write_text("{}", encoding="utf-8")
+    seen = []
+    watcher = FileWatcher(path, seen.append, min_interval=0.02, max_interval=0.05, settle=0.0)
+    path.write_text('{"own": 1}', encoding="utf-8")
+    watcher.acknowledge()
+    watcher.set_path(other)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        assert seen == []
+        other.write_text('{"outside": 1}', encoding="utf-8")
+        assert _wait_for(lambda: seen == [file_stamp(other)])
+    finally:
+        watcher.stop()
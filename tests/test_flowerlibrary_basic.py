@@ -45,3 +45,47 @@ def test_save_entries_writes_and_backup(tmp_path, monkeypatch):
     assert data_file.with_suffix(".json.bak").exists()
     assert not data_file.with_suffix(".json.tmp").exists()
     assert json.loads(data_file.read_text(encoding="utf-8")) == entries
+
+
+def test_persist_sends_only_dirty_entries_in_client_mode(tmp_path, monkeypatch):
+    import types
+
+    import flowerlibrary as fl
+
+    monkeypatch.setattr(fl, "DATA_FILE", tmp_path / "library_data.json")
+    monkeypatch.setattr(fl, "is_client", lambda: True)
+    monkeypatch.setattr(
+        fl, "load_tracker_config", lambda _path: {"network_host": "10.0.0.2", "network_port": 8766, "network_access_key": "k"}
+    )
+    sent = []
+
+    def _push(host, port, upserts, deletes, access_key=""):
+        sent.append((upserts, deletes))
+        return {"ok": True, "revision": 9, "entries": [dict(entry, rev=9) for entry in upserts]}
+
+    monkeypatch.setattr(fl, "push_library_entries", _push)
+
+    class _InlineThread:
+        def __init__(self, target, daemon=False):
+            self._target = target
+
+        def start(self):
+            self._target()
+
+    monkeypatch.setattr(fl.threading, "Thread", _InlineThread)
+    app = types.SimpleNamespace(
+        entries=[{"id": "a", "brand": "A", "rev": 3}, {"id": "b", "brand": "B", "rev": 4}],
+        _dirty_ids={"b"},
+        _deleted_entries={"c": {"id": "c", "rev": 2}},
+        _entry_sync_inflight=False,
+        root=types.SimpleNamespace(after=lambda _ms, func: func()),
+    )
+    app._sync_dirty_entries = lambda: fl.FlowerLibraryApp._sync_dirty_entries(app)
+    app._finish_entry_sync = lambda *args: fl.FlowerLibraryApp._finish_entry_sync(app, *args)
+
+    app._sync_dirty_entries()
+
+    assert sent == [([{"id": "b", "brand": "B", "rev": 4}], [{"id": "c", "rev": 2}])]
+    assert app.entries[1]["rev"] == 9 and app.entries[0]["rev"] == 3
+    assert not app._dirty_ids and not app._deleted_entries
+    assert json.loads((tmp_path / "library_data.json").read_text(encoding="utf-8")) == app.entries
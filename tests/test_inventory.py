@@ -1,8 +1,21 @@
+import json
 import unittest
 import tempfile
 from pathlib import Path
 
-from inventory import Flower, add_stock_entry, log_dose_entry, is_cbd_dominant, _normalize_log_entry, save_tracker_data, load_tracker_data
+from inventory import (
+    SCHEMA_VERSION,
+    Flower,
+    TrackerJournal,
+    add_stock_entry,
+    log_dose_entry,
+    is_cbd_dominant,
+    _normalize_log_entry,
+    save_tracker_data,
+    load_tracker_data,
+    compact_log_entry,
+    tracker_journal_path,
+)
 
 
 class InventoryTests(unittest.TestCase):
@@ -62,7 +75,102 @@ class InventoryTests(unittest.TestCase):
             data_path.unlink()
             loaded = load_tracker_data(path=data_path)
             self.assertEqual(loaded.get("logs"), [])
-            self.assertEqual(loaded.get("schema_version"), 1)
+            self.assertEqual(loaded.get("schema_version"), SCHEMA_VERSION)
+
+    def test_logs_are_saved_compact_and_expanded_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "tracker_data.json"
+            flowers = {"A": Flower(name="A", thc_pct=20.0, cbd_pct=1.0, grams_remaining=1.0)}
+            logs = []
+            _remaining, entry = log_dose_entry(flowers, logs, "A", 0.1, "Vaped", {"Vaped": 0.6})
+            legacy = {
+                "date": "2024-01-01",
+                "time": "2024-01-02 08:00",
+                "time_display": "08:00",
+                "flower": "B",
+                "grams": 0.2,
+                "grams_used": 0.25,
+                "efficiency": 1.0,
+                "thc_mg": 0.0,
+                "cbd_mg": 0.0,
+            }
+            logs.append(legacy)
+            save_tracker_data({"schema_version": 1, "logs": logs}, path=data_path)
+
+            raw = json.loads(data_path.read_text(encoding="utf-8"))
+            self.assertEqual(raw["schema_version"], SCHEMA_VERSION)
+            stored = raw["logs"][0]
+            for key in ("grams", "date", "time_display"):
+                self.assertNotIn(key, stored)
+            self.assertEqual(stored["remaining"], entry["remaining"])
+            self.assertIn("is_cbd_dominant", stored)
+            # Fields that disagree with what would be derived are kept.
+            self.assertEqual(raw["logs"][1], {"date": "2024-01-01", "time": "2024-01-02 08:00", "flower": "B", "grams": 0.2, "grams_used": 0.25})
+            self.assertEqual(compact_log_entry({"efficiency": True}), {"efficiency": True})
+
+            self.assertEqual(load_tracker_data(path=data_path)["logs"], logs)
+
+    def test_journal_appends_ops_and_replays_on_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "tracker_data.json"
+            doc = {"flowers": [{"name": "A", "grams_remaining": 2.0}], "logs": [], "dark_mode": True}
+            save_tracker_data(doc, path=data_path)
+            snapshot = data_path.read_text(encoding="utf-8")
+            journal = TrackerJournal(data_path, compact_after=100)
+            journal.reset(load_tracker_data(path=data_path))
+
+            doc["logs"].append({"date": "2026-01-01", "time": "2026-01-01 10:00", "grams_used": 0.1})
+            doc["flowers"][0]["grams_remaining"] = 1.9
+            journal.save(doc)
+            doc["logs"][0]["grams_used"] = 0.2
+            doc["dark_mode"] = False
+            journal.save(doc)
+
+            # The snapshot is untouched; the ops went to the journal, one JSON line each.
+            self.assertEqual(data_path.read_text(encoding="utf-8"), snapshot)
+            lines = tracker_journal_path(data_path).read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 4)
+            loaded = load_tracker_data(path=data_path)
+            self.assertEqual(loaded["logs"][0]["grams_used"], 0.2)
+            self.assertEqual(loaded["flowers"], [{"name": "A", "grams_remaining": 1.9}])
+            self.assertFalse(loaded["dark_mode"])
+
+            # A torn final line is ignored.
+            with open(tracker_journal_path(data_path), "a", encoding="utf-8") as handle:
+                handle.write('{"op": "append_log", "seq"')
+            self.assertEqual(len(load_tracker_data(path=data_path)["logs"]), 1)
+
+    def test_journal_compaction_folds_ops_into_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "tracker_data.json"
+            doc = {"flowers": [], "logs": []}
+            save_tracker_data(doc, path=data_path)
+            journal = TrackerJournal(data_path, compact_after=3)
+            journal.reset(load_tracker_data(path=data_path))
+            for n in range(2):
+                doc["logs"].append({"date": "2026-01-01", "grams_used": float(n)})
+                journal.save(doc)
+            journal.compact()
+            self.assertEqual(len(load_tracker_data(path=data_path)["logs"]), 2)
+            raw = json.loads(data_path.read_text(encoding="utf-8"))
+            self.assertEqual(len(raw["logs"]), 2)
+            self.assertEqual(raw["journal_seq"], 2)
+
+            # Ops after the compaction replay on top of it; a fresh journal continues the sequence.
+            doc["logs"].append({"date": "2026-01-02", "grams_used": 5.0})
+            journal.save(doc)
+            restarted = TrackerJournal(data_path)
+            loaded = load_tracker_data(path=data_path)
+            restarted.reset(loaded)
+            self.assertEqual([log["grams_used"] for log in loaded["logs"]], [0.0, 1.0, 5.0])
+            self.assertNotIn("journal_seq", loaded)
+            doc["logs"].pop(0)
+            restarted.save(doc)
+            self.assertEqual([log["grams_used"] for log in load_tracker_data(path=data_path)["logs"]], [1.0, 5.0])
+
+            # A full save supersedes the journal.
+            save_tracker_data(doc, path=data_path)
+            self.assertFalse(tracker_journal_path(data_path).exists())
 
 
 if __name__ == "__main__":
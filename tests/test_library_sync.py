@@ -0,0 +1,85 @@
+import pytest
+
+from library_sync import (
+    MergeConflict,
+    apply_library_changes,
+    apply_library_entry_edits,
+    assign_entry_ids,
+    diff_library_entries,
+    index_library,
+    library_entry_key,
+    merge_library_entries,
+    stamp_library_revisions,
+)
+
+
+def test_entry_key_ignores_case_and_spacing():
+    assert library_entry_key({"brand": " Big  Brand", "strain": "OG"}) == library_entry_key(
+        {"brand": "big brand", "strain": "og "}
+    )
+    assert len(index_library([{"brand": "B", "strain": "S"}, {"brand": "b", "strain": "s"}])) == 2
+
+
+def test_merge_combines_edits_to_different_entries_and_fields():
+    base = [{"brand": "B", "strain": "One", "rating": 3, "notes": ""}, {"brand": "B", "strain": "Two"}]
+    current = [{"brand": "B", "strain": "One", "rating": 5, "notes": ""}, {"brand": "B", "strain": "Two"}]
+    mine = [{"brand": "B", "strain": "One", "rating": 3, "notes": "nice"}, {"brand": "C", "strain": "Three"}]
+    assert merge_library_entries(base, current, mine) == [
+        {"brand": "B", "strain": "One", "rating": 5, "notes": "nice"},
+        {"brand": "C", "strain": "Three"},
+    ]
+
+
+def test_merge_raises_when_same_field_changes_on_both_sides():
+    base = [{"brand": "B", "strain": "One", "rating": 3}]
+    with pytest.raises(MergeConflict):
+        merge_library_entries(
+            base, [{"brand": "B", "strain": "One", "rating": 4}], [{"brand": "B", "strain": "One", "rating": 1}]
+        )
+    with pytest.raises(MergeConflict):
+        merge_library_entries(base, [], [{"brand": "B", "strain": "One", "rating": 1}])
+
+
+def test_assign_entry_ids_reuses_ids_by_name():
+    previous = [{"id": "x1", "brand": "B", "strain": "One"}, {"id": "x2", "brand": "B", "strain": "Two"}]
+    entries = assign_entry_ids([{"brand": "b", "strain": "one "}, {"brand": "C", "strain": "New"}], previous)
+    assert entries[0]["id"] == "x1"
+    assert entries[1]["id"] not in ("x1", "x2")
+    assert library_entry_key(entries[0]) == "id:x1"
+
+
+def test_stamp_revisions_only_touches_changed_entries():
+    previous = [{"id": "a", "v": 1, "rev": 3}, {"id": "b", "v": 1, "rev": 4}, {"id": "c", "rev": 2}]
+    entries, revision, removed = stamp_library_revisions(previous, [{"id": "a", "v": 1}, {"id": "b", "v": 2}], 4)
+    assert entries == [{"id": "a", "v": 1, "rev": 3}, {"id": "b", "v": 2, "rev": 5}]
+    assert (revision, removed) == (5, ["c"])
+    assert stamp_library_revisions(entries, entries, 5) == (entries, 5, [])
+
+
+def test_entry_edits_conflict_on_stale_revision():
+    entries = [{"id": "a", "v": 1, "rev": 2}, {"id": "b", "v": 1, "rev": 1}]
+    out, conflicts = apply_library_entry_edits(entries, [{"id": "a", "v": 2, "rev": 2}, {"v": 9}], [{"id": "b"}])
+    assert conflicts == []
+    assert [e["v"] for e in out] == [2, 9]
+    assert out[1]["id"]
+    out, conflicts = apply_library_entry_edits(entries, [{"id": "a", "v": 3, "rev": 1}], [{"id": "b", "rev": 0}])
+    assert out is None
+    assert conflicts == entries
+
+
+def test_apply_changes_and_diff_round_trip():
+    replica = [{"id": "a", "v": 1, "rev": 1}, {"id": "b", "v": 1, "rev": 1}]
+    assert apply_library_changes(replica, {"full": False, "entries": [{"id": "c", "rev": 2}], "deleted": ["a"]}) == [
+        {"id": "b", "v": 1, "rev": 1},
+        {"id": "c", "rev": 2},
+    ]
+    assert apply_library_changes(replica, {"full": True, "entries": []}) == []
+    with pytest.raises(ValueError):
+        apply_library_changes(replica, {"entries": [{"v": 1}]})
+
+    # Offline edit of a, new entry d; b deleted locally; c was added on the host meanwhile.
+    host = replica + [{"id": "c", "v": 1, "rev": 2}]
+    local = [{"id": "a", "v": 5, "rev": 1}, {"id": "d", "v": 1}]
+    upserts, deletes = diff_library_entries(host, local, base_revision=1)
+    assert upserts == local
+    assert deletes == [{"id": "b", "rev": 1}]
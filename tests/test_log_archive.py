@@ -0,0 +1,127 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from inventory import _normalize_log_entry
+from log_archive import TrackerLogArchive, archive_cutoff, parse_archived_row_id, tracker_archive_dir
+from usage_index import DailyUsageIndex
+
+
+def _is_cbd(log):
+    return bool(log.get("is_cbd_dominant"))
+
+
+def _log(day, flower, grams, **extra):
+    # Archived logs come back expanded, so build them in that form.
+    return _normalize_log_entry(dict({"time": f"{day} 10:00", "flower": flower, "grams_used": grams}, **extra))
+
+
+def test_archive_cutoff_keeps_a_full_year():
+    assert archive_cutoff(date(2026, 10, 18)) == date(2025, 10, 1)
+    assert archive_cutoff(date(2026, 1, 5)) == date(2025, 1, 1)
+    assert archive_cutoff(date(2026, 1, 5), keep_months=1) == date(2026, 1, 1)
+
+
+def test_archive_moves_old_months_and_reads_them_lazily(tmp_path):
+    path = tmp_path / "tracker_data.json"
+    logs = [
+        _log("2024-01-03", "A", 0.1),
+        _log("2024-01-03", "C", 0.3, is_cbd_dominant=True),
+        _log("2024-02-10", "B", 0.2),
+        dict(_log("2024-01-04", "A", 1.0), date="bad"),
+        _log("2025-06-01", "A", 0.4),
+    ]
+    archive = TrackerLogArchive(path)
+    kept = archive.archive(list(logs), date(2025, 1, 1), _is_cbd)
+    assert kept == [logs[3], logs[4]]
+    assert sorted(p.name for p in tracker_archive_dir(path).iterdir()) == ["2024-01.json", "2024-02.json", "index.json"]
+
+    # Running again (e.g. after a crash before the tracker file was saved) adds nothing twice.
+    assert archive.archive(list(logs), date(2025, 1, 1), _is_cbd) == kept
+
+    fresh = TrackerLogArchive(path)
+    assert fresh.months() == ["2024-01", "2024-02"]
+    assert fresh._months == {}
+    totals = fresh.day_totals()
+    assert totals["2024-01-03"] == {"thc": {"A": 0.1}, "cbd": 0.3, "cbd_count": 1}
+    assert fresh.logs_on_day(date(2024, 2, 10)) == [logs[2]]
+    assert list(fresh._months) == ["2024-02"]
+    assert fresh.logs_between(date(2024, 1, 1), date(2024, 1, 31)) == logs[:2]
+    assert fresh.logs_on_day(date(2023, 5, 1)) == []
+
+    index = DailyUsageIndex(_is_cbd, kept)
+    index.set_archived(totals)
+    assert abs(index.thc_grams("2024-02-10", lambda name: True) - 0.2) < 1e-9
+    assert index.cbd_grams(date(2024, 1, 3)) == 0.3
+    assert sorted(index.daily_totals(lambda name: True, start=date(2024, 1, 1))) == [0.1, 0.2, 0.4]
+    assert index.daily_totals(lambda name: name != "B", start=date(2024, 2, 1), end=date(2024, 12, 31)) == []
+
+    assert fresh.all_logs() == logs[:3]
+    fresh.clear()
+    assert not tracker_archive_dir(path).exists()
+    assert fresh.months() == []
+
+
+def test_archive_keeps_identical_doses_in_one_batch(tmp_path):
+    path = tmp_path / "tracker_data.json"
+    log = _log("2024-03-05", "A", 0.1)
+    archive = TrackerLogArchive(path)
+    assert archive.archive([log, dict(log)], date(2025, 1, 1), _is_cbd) == []
+    assert TrackerLogArchive(path).all_logs() == [log, log]
+
+    # A repeat run matches each stored copy once; a third identical dose is still added.
+    assert archive.archive([log, dict(log), dict(log)], date(2025, 1, 1), _is_cbd) == []
+    fresh = TrackerLogArchive(path)
+    assert fresh.all_logs() == [log, log, log]
+    assert fresh.month_info("2024-03")["count"] == 3
+
+
+def test_archived_logs_can_be_edited_and_deleted_in_place(tmp_path):
+    path = tmp_path / "tracker_data.json"
+    logs = [_log("2024-01-03", "A", 0.1), _log("2024-01-03", "B", 0.2), _log("2024-02-10", "C", 0.3)]
+    archive = TrackerLogArchive(path)
+    archive.archive(list(logs), date(2025, 1, 1), _is_cbd)
+
+    rows = archive.rows_on_day(date(2024, 1, 3))
+    assert [row_id for row_id, _log in rows] == ["archived-2024-01-0", "archived-2024-01-1"]
+    assert parse_archived_row_id(rows[1][0]) == ("2024-01", 1)
+    assert parse_archived_row_id("3") is None
+
+    edited = dict(rows[1][1], grams_used=0.5)
+    archive.update_log("2024-01", 1, edited, _is_cbd)
+    fresh = TrackerLogArchive(path)
+    assert fresh.log_at("2024-01", 1)["grams_used"] == 0.5
+    assert fresh.day_totals()["2024-01-03"]["thc"] == {"A": 0.1, "B": 0.5}
+
+    fresh.update_log("2024-01", 0, None, _is_cbd)
+    fresh.update_log("2024-02", 0, None, _is_cbd)
+    fresh = TrackerLogArchive(path)
+    assert fresh.months() == ["2024-01"]
+    assert fresh.month_info("2024-01")["count"] == 1
+    assert fresh.all_logs() == [edited]
+    assert not (tracker_archive_dir(path) / "2024-02.json").exists()
+    with pytest.raises(OSError):
+        fresh.update_log("2024-01", 5, None, _is_cbd)
+
+
+def test_host_restore_repeated_before_clear_adds_nothing_twice(tmp_path, monkeypatch):
+    import ui_tracker
+    from inventory import load_tracker_data
+
+    path = tmp_path / "tracker_data.json"
+    old = [_log("2024-01-03", "A", 0.1), _log("2024-01-03", "A", 0.1), _log("2024-02-10", "B", 0.2)]
+    live = [_log("2025-06-01", "A", 0.4)]
+    archive = TrackerLogArchive(path)
+    archive.archive(old + live, date(2025, 1, 1), _is_cbd)
+    # The restore saves the tracker file, then the archive clear "fails" (as on a crash).
+    monkeypatch.setattr(archive, "clear", lambda: None)
+    monkeypatch.setattr(ui_tracker, "notify_network_data_changed", lambda: None)
+    app = SimpleNamespace(data_path=str(path), _log_archive=lambda: archive)
+
+    restore = ui_tracker.CannabisTracker._restore_archived_logs
+    assert restore(app, {"logs": list(live)})["logs"] == old + live
+    assert archive.logs_missing_from(old + live) == []
+    data = restore(app, load_tracker_data(path=path))
+    assert data["logs"] == old + live
+    assert load_tracker_data(path=path)["logs"] == old + live
@@ -0,0 +1,86 @@
+from datetime import date
+
+from inventory import _normalize_log_entry
+from log_archive import TrackerLogArchive
+from log_history import LogHistory
+
+
+def _log(time, flower, roa="Vaped", grams=0.1):
+    return _normalize_log_entry({"time": time, "flower": flower, "roa": roa, "grams_used": grams})
+
+
+def _is_cbd(_log):
+    return False
+
+
+def _history(tmp_path):
+    archived = [
+        _log("2024-01-03 09:00", "A"),
+        _log("2024-01-20 21:00", "B", roa="Eaten"),
+        _log("2024-02-10 12:00", "A", roa="Eaten"),
+    ]
+    live = [
+        _log("2025-06-01 08:00", "A"),
+        _log("2025-06-01 20:00", "B"),
+        _log("2025-06-03 10:00", "A", roa="Eaten"),
+        _log("2025-06-02 10:00", "C"),
+    ]
+    archive = TrackerLogArchive(tmp_path / "tracker_data.json")
+    archive.archive(archived, date(2025, 1, 1), _is_cbd)
+    return LogHistory(live, TrackerLogArchive(tmp_path / "tracker_data.json")), live, archived
+
+
+def _times(rows):
+    return [log["time"] for _iid, log in rows]
+
+
+def test_pages_newest_first_and_reads_archive_months_only_when_reached(tmp_path):
+    history, live, archived = _history(tmp_path)
+    query = history.query()
+    assert len(query) == 7
+    assert history.archive._months == {}
+
+    page = query.rows(0, 3)
+    assert [iid for iid, _log in page] == ["live-2", "live-3", "live-1"]
+    assert history.archive._months == {}
+
+    assert _times(query.rows(3, 10)) == [
+        "2025-06-01 08:00",
+        "2024-02-10 12:00",
+        "2024-01-20 21:00",
+        "2024-01-03 09:00",
+    ]
+    assert query.rows(6, 5)[0][0] == "archived-2024-01-0"
+    assert query.rows(7, 5) == []
+    assert history.flowers() == ["A", "B", "C"]
+    assert history.roas() == ["Eaten", "Vaped"]
+
+
+def test_filters_use_flower_roa_and_date_indexes(tmp_path):
+    history, _live, _archived = _history(tmp_path)
+
+    by_flower = history.query(flower="A")
+    assert len(by_flower) == 4
+    # Counted from the manifest: matching archive months aren't read to size the result.
+    assert history.archive._months == {}
+    assert _times(by_flower.rows(0, 10)) == [
+        "2025-06-03 10:00",
+        "2025-06-01 08:00",
+        "2024-02-10 12:00",
+        "2024-01-03 09:00",
+    ]
+
+    both = history.query(flower="A", roa="Eaten")
+    assert _times(both.rows(0, 10)) == ["2025-06-03 10:00", "2024-02-10 12:00"]
+    # Both months have "A" and "Eaten" logs, so only reading them tells whether any are both.
+    assert sorted(history.archive._months) == ["2024-01", "2024-02"]
+    assert len(history.query(flower="B", roa="Vaped")) == 1
+
+    ranged = history.query(start=date(2024, 1, 10), end=date(2025, 6, 1))
+    assert _times(ranged.rows(0, 10)) == [
+        "2025-06-01 20:00",
+        "2025-06-01 08:00",
+        "2024-02-10 12:00",
+        "2024-01-20 21:00",
+    ]
+    assert len(history.query(flower="missing")) == 0
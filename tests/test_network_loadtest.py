@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from network_loadtest import build_synthetic_data, main, percentile, run_load_test
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_build_synthetic_data_sizes(tmp_path):
+    tracker_path, library_path = build_synthetic_data(tmp_path, logs=25, library=7)
+    tracker = json.loads(tracker_path.read_text(encoding="utf-8"))
+    assert len(tracker["logs"]) == 25
+    assert tracker["flowers"]
+    assert len(json.loads(library_path.read_text(encoding="utf-8"))) == 7
+
+
+def test_run_load_test_reports_latency_and_rates():
+    report = run_load_test(clients=3, duration_s=1.5, logs=50, library=10, push_interval_s=0.5, port=18866)
+    assert report["requests"] > 0
+    assert report["error_rate"] == 0.0
+    assert {"ping", "tracker-meta", "push-ops"} <= set(report["endpoints"])
+    assert report["p50_ms"] <= report["p99_ms"]
+
+
+def test_help_hides_the_child_server_entry_point(capsys):
+    with pytest.raises(SystemExit):
+        main(["--help"])
+    out = capsys.readouterr().out
+    assert "{serve}" not in out and "SUPPRESS" not in out and "--serve " not in out
+    assert "--clients" in out
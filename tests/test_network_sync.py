@@ -3,16 +3,26 @@ import socket
 import threading
 from pathlib import Path
 
+import pytest
+
 from network_sync import (
+    fetch_library_changes,
     fetch_library_data,
     fetch_tracker_data,
+    fetch_tracker_ops,
+    last_network_version,
     network_ping,
     push_library_data,
+    push_library_entries,
     push_tracker_data,
+    push_tracker_ops,
     start_network_data_server,
     stop_network_data_server,
+    wait_for_network_change,
 )
 
+server_modes = pytest.mark.parametrize("server_mode", ["threaded", "asyncio"])
+
 
 def _free_port() -> int:
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -23,6 +33,10 @@ def _free_port() -> int:
         sock.close()
 
 
+def _without_ids(entries):
+    return [{k: v for k, v in entry.items() if k not in ("id", "rev")} for entry in entries or []]
+
+
 def _start_server(tmp_path: Path, access_key: str = "", **kwargs):
     tracker_data_path = tmp_path / "tracker_data.json"
     library_data_path = tmp_path / "library_data.json"
@@ -39,10 +53,11 @@ def _start_server(tmp_path: Path, access_key: str = "", **kwargs):
     return httpd, thread, int(port or 0), tracker_data_path, library_data_path
 
 
-def test_network_sync_connect_and_roundtrip(tmp_path):
+@server_modes
+def test_network_sync_connect_and_roundtrip(tmp_path, server_mode):
     httpd = thread = None
     try:
-        httpd, thread, port, tracker_path, library_path = _start_server(tmp_path)
+        httpd, thread, port, tracker_path, library_path = _start_server(tmp_path, server_mode=server_mode)
         assert port > 0
         assert network_ping("127.0.0.1", port, timeout=1.0)
 
@@ -52,19 +67,178 @@ def test_network_sync_connect_and_roundtrip(tmp_path):
 
         library_payload = [{"brand": "Brand", "strain": "Strain"}]
         assert push_library_data("127.0.0.1", port, library_payload, timeout=1.0)
-        assert fetch_library_data("127.0.0.1", port, timeout=1.0) == library_payload
+        assert _without_ids(fetch_library_data("127.0.0.1", port, timeout=1.0)) == library_payload
 
         assert json.loads(tracker_path.read_text(encoding="utf-8")) == tracker_payload
-        assert json.loads(library_path.read_text(encoding="utf-8")) == library_payload
+        assert _without_ids(json.loads(library_path.read_text(encoding="utf-8"))) == library_payload
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+def test_tracker_ops_delta_sync_and_snapshot_fallback(tmp_path):
+    httpd = thread = None
+    try:
+        httpd, thread, port, tracker_path, _ = _start_server(tmp_path)
+        seed = {"schema_version": 1, "logs": [{"id": "A"}]}
+        assert push_tracker_data("127.0.0.1", port, seed, timeout=1.0)
+
+        first = fetch_tracker_ops("127.0.0.1", port, since=0, timeout=1.0)
+        assert first["snapshot"] == seed
+        epoch, seq = first["epoch"], first["seq"]
+
+        reply = push_tracker_ops(
+            "127.0.0.1", port, [{"op": "append_log", "log": {"id": "B"}}], base_seq=seq, epoch=epoch, timeout=1.0
+        )
+        assert reply["ok"] is True and reply["seq"] == seq + 1
+        assert json.loads(tracker_path.read_text(encoding="utf-8"))["logs"] == [{"id": "A"}, {"id": "B"}]
+
+        delta = fetch_tracker_ops("127.0.0.1", port, since=seq, epoch=epoch, timeout=1.0)
+        assert delta["ops"] == [{"op": "append_log", "log": {"id": "B"}}]
+        assert "snapshot" not in delta
+
+        # Index-based ops against a stale base are rebased through a merge when they don't overlap.
+        rebased = push_tracker_ops(
+            "127.0.0.1", port, [{"op": "delete_log", "index": 0}], base_seq=seq, epoch=epoch, timeout=1.0
+        )
+        assert rebased["ok"] is True and rebased["seq"] == seq + 2
+        assert rebased["ops"] == [{"op": "append_log", "log": {"id": "B"}}, {"op": "delete_log", "index": 0}]
+        assert json.loads(tracker_path.read_text(encoding="utf-8"))["logs"] == [{"id": "B"}]
+
+        # ...and refused rather than misapplied when they do.
+        stale = push_tracker_ops(
+            "127.0.0.1", port, [{"op": "edit_log", "index": 0, "log": {"id": "X"}}], base_seq=seq, epoch=epoch, timeout=1.0
+        )
+        assert stale["ok"] is False and stale["error"] == "stale_ops"
+
+        # Writes that bypass the ops endpoint still show up as deltas.
+        tracker_path.write_text(json.dumps({"schema_version": 1, "logs": [{"id": "B"}, {"id": "C"}]}))
+        external = fetch_tracker_ops("127.0.0.1", port, since=seq + 2, epoch=epoch, timeout=1.0)
+        assert external["ops"] == [{"op": "append_log", "log": {"id": "C"}}]
+
+        assert "snapshot" in fetch_tracker_ops("127.0.0.1", port, since=seq, epoch="other", timeout=1.0)
     finally:
         stop_network_data_server(httpd, thread, lambda _m: None)
 
 
-def test_network_sync_access_key_required_when_configured(tmp_path):
+@server_modes
+def test_wait_for_network_change_wakes_on_push(tmp_path, server_mode):
+    import time as _time
+
+    httpd = thread = None
+    try:
+        httpd, thread, port, _, _ = _start_server(tmp_path, server_mode=server_mode)
+        state = wait_for_network_change("127.0.0.1", port, -1, "", -1, wait_s=1.0)
+        assert state["changed"] is True
+
+        # Nothing changed: the request is held until the timeout.
+        started = _time.monotonic()
+        idle = wait_for_network_change(
+            "127.0.0.1", port, state["tracker_seq"], state["epoch"], state["library_version"], wait_s=0.5
+        )
+        assert idle["changed"] is False
+        assert _time.monotonic() - started >= 0.4
+
+        woke: list[dict] = []
+        waiter = threading.Thread(
+            target=lambda: woke.append(
+                wait_for_network_change(
+                    "127.0.0.1", port, state["tracker_seq"], state["epoch"], state["library_version"], wait_s=10.0
+                )
+            ),
+            daemon=True,
+        )
+        started = _time.monotonic()
+        waiter.start()
+        _time.sleep(0.2)
+        assert push_library_data("127.0.0.1", port, [{"brand": "B"}], timeout=1.0)
+        waiter.join(timeout=5.0)
+        assert woke and woke[0]["changed"] is True
+        assert woke[0]["library_version"] != state["library_version"]
+        assert _time.monotonic() - started < 5.0
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+@server_modes
+def test_network_server_keeps_connection_alive_and_gzips_large_bodies(tmp_path, server_mode):
+    import gzip
+    import http.client
+
+    httpd = thread = None
+    try:
+        httpd, thread, port, _, _ = _start_server(tmp_path, server_mode=server_mode)
+        tracker_payload = {"schema_version": 1, "logs": [{"id": i, "flower": "Example"} for i in range(200)]}
+        assert push_tracker_data("127.0.0.1", port, tracker_payload, timeout=1.0)
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2.0)
+        try:
+            conn.request("GET", "/api/network/ping")
+            first = conn.getresponse()
+            first.read()
+            assert not first.will_close
+            sock = conn.sock
+
+            conn.request("GET", "/api/network/tracker-data", headers={"Accept-Encoding": "gzip"})
+            resp = conn.getresponse()
+            body = resp.read()
+            assert conn.sock is sock
+            assert resp.getheader("Content-Encoding") == "gzip"
+            assert json.loads(gzip.decompress(body)) == tracker_payload
+        finally:
+            conn.close()
+
+        # The pooled client transparently decompresses.
+        assert fetch_tracker_data("127.0.0.1", port, timeout=1.0) == tracker_payload
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+@server_modes
+def test_full_document_gets_are_cached_and_revalidated(tmp_path, server_mode):
+    import http.client
+
+    httpd = thread = None
+    try:
+        httpd, thread, port, tracker_path, _ = _start_server(tmp_path, server_mode=server_mode)
+        tracker_payload = {"schema_version": 1, "logs": [{"id": "A"}]}
+        assert push_tracker_data("127.0.0.1", port, tracker_payload, timeout=1.0)
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2.0)
+        try:
+            conn.request("GET", "/api/network/tracker-data")
+            resp = conn.getresponse()
+            resp.read()
+            etag = resp.getheader("ETag")
+            assert etag
+
+            conn.request("GET", "/api/network/tracker-data", headers={"If-None-Match": etag})
+            not_modified = conn.getresponse()
+            assert not_modified.status == 304
+            assert not_modified.read() == b""
+
+            updated = {"schema_version": 1, "logs": [{"id": "A"}, {"id": "B"}]}
+            assert push_tracker_data("127.0.0.1", port, updated, timeout=1.0)
+            conn.request("GET", "/api/network/tracker-data", headers={"If-None-Match": etag})
+            changed = conn.getresponse()
+            assert changed.status == 200
+            assert json.loads(changed.read()) == updated
+            assert changed.getheader("ETag") != etag
+        finally:
+            conn.close()
+
+        # Client helper revalidates and still returns the document on 304.
+        assert fetch_tracker_data("127.0.0.1", port, timeout=1.0)["logs"][-1] == {"id": "B"}
+        assert fetch_tracker_data("127.0.0.1", port, timeout=1.0)["logs"][-1] == {"id": "B"}
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+@server_modes
+def test_network_sync_access_key_required_when_configured(tmp_path, server_mode):
     httpd = thread = None
     try:
         access_key = "test-network-key"
-        httpd, thread, port, _, _ = _start_server(tmp_path, access_key=access_key)
+        httpd, thread, port, _, _ = _start_server(tmp_path, access_key=access_key, server_mode=server_mode)
         assert port > 0
         assert not network_ping("127.0.0.1", port, timeout=1.0, access_key="")
         assert network_ping("127.0.0.1", port, timeout=1.0, access_key=access_key)
@@ -85,13 +259,15 @@ def test_conflicting_network_writes_remain_consistent(tmp_path):
         library_a = [{"source": "A", "strain": "One"}]
         library_b = [{"source": "B", "strain": "Two"}]
 
+        fetch_tracker_data("127.0.0.1", port, timeout=1.0, access_key=access_key)
+        tracker_base = last_network_version("127.0.0.1", port, "/api/network/tracker-data")
         barrier = threading.Barrier(3)
         results: list[bool] = []
         result_lock = threading.Lock()
 
         def _write_tracker(payload: dict) -> None:
             barrier.wait()
-            ok = push_tracker_data("127.0.0.1", port, payload, timeout=2.0, access_key=access_key)
+            ok = push_tracker_data("127.0.0.1", port, payload, timeout=2.0, access_key=access_key, if_match=tracker_base)
             with result_lock:
                 results.append(ok)
 
@@ -107,17 +283,20 @@ def test_conflicting_network_writes_remain_consistent(tmp_path):
 
         assert len(results) == 2
         assert all(results)
+        # Both writers start from the same base version, so the later write merges onto
+        # the earlier one and neither dose is lost.
         tracker_final = fetch_tracker_data("127.0.0.1", port, timeout=1.0, access_key=access_key)
-        assert tracker_final == tracker_a or tracker_final == tracker_b
-        tracker_raw = json.loads(tracker_path.read_text(encoding="utf-8"))
-        assert tracker_raw == tracker_a or tracker_raw == tracker_b
+        assert sorted(log["source"] for log in tracker_final["logs"]) == ["A", "B"]
+        assert json.loads(tracker_path.read_text(encoding="utf-8")) == tracker_final
 
+        fetch_library_data("127.0.0.1", port, timeout=1.0, access_key=access_key)
+        library_base = last_network_version("127.0.0.1", port, "/api/network/library-data")
         barrier = threading.Barrier(3)
         results.clear()
 
         def _write_library(payload: list[dict]) -> None:
             barrier.wait()
-            ok = push_library_data("127.0.0.1", port, payload, timeout=2.0, access_key=access_key)
+            ok = push_library_data("127.0.0.1", port, payload, timeout=2.0, access_key=access_key, if_match=library_base)
             with result_lock:
                 results.append(ok)
 
@@ -133,10 +312,9 @@ def test_conflicting_network_writes_remain_consistent(tmp_path):
 
         assert len(results) == 2
         assert all(results)
-        library_final = fetch_library_data("127.0.0.1", port, timeout=1.0, access_key=access_key)
-        assert library_final == library_a or library_final == library_b
-        library_raw = json.loads(library_path.read_text(encoding="utf-8"))
-        assert library_raw == library_a or library_raw == library_b
+        library_final = _without_ids(fetch_library_data("127.0.0.1", port, timeout=1.0, access_key=access_key))
+        assert sorted(entry["source"] for entry in library_final) == ["A", "B"]
+        assert _without_ids(json.loads(library_path.read_text(encoding="utf-8"))) == library_final
     finally:
         stop_network_data_server(httpd, thread, lambda _m: None)
 
@@ -162,6 +340,41 @@ def test_network_sync_rate_limit_blocks_and_recovers(tmp_path):
         stop_network_data_server(httpd, thread, lambda _m: None)
 
 
+def test_network_sweeper_evicts_idle_rate_and_audit_state(tmp_path):
+    import time as _time
+
+    httpd = thread = None
+    logs: list[str] = []
+    try:
+        httpd, thread, port = start_network_data_server(
+            bind_host="127.0.0.1",
+            preferred_port=_free_port(),
+            tracker_data_path=tmp_path / "tracker_data.json",
+            library_data_path=tmp_path / "library_data.json",
+            log=logs.append,
+            access_key="secret-key",
+            rate_limit_requests_per_minute=5,
+            rate_limit_window_seconds=1.0,
+            audit_log_burst=1,
+            audit_log_window_seconds=1.0,
+            sweep_interval_seconds=0.1,
+        )
+        assert network_ping("127.0.0.1", int(port), timeout=1.0, access_key="secret-key")
+        assert not network_ping("127.0.0.1", int(port), timeout=1.0, access_key="wrong")
+        assert not network_ping("127.0.0.1", int(port), timeout=1.0, access_key="wrong")
+        assert len(httpd._ft_rate_buckets) == 1
+        assert len(httpd._ft_audit_state) == 1
+
+        deadline = _time.monotonic() + 3.0
+        while (httpd._ft_rate_buckets or httpd._ft_audit_state) and _time.monotonic() < deadline:
+            _time.sleep(0.05)
+        assert not httpd._ft_rate_buckets
+        assert not httpd._ft_audit_state
+        assert any("suppressed 1 similar events" in m for m in logs)
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
 def test_network_denied_access_logs_are_bounded(tmp_path):
     httpd = thread = None
     logs: list[str] = []
@@ -215,3 +428,245 @@ def test_network_invalid_payload_type_is_audited(tmp_path):
         assert any("denied invalid_tracker_payload" in str(m) for m in logs)
     finally:
         stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+def test_asyncio_server_holds_many_long_polls_and_closes_denied_connections(tmp_path):
+    import http.client
+
+    httpd = thread = None
+    try:
+        httpd, thread, port, _, _ = _start_server(tmp_path, access_key="k", server_mode="asyncio")
+        assert type(httpd).__name__ == "AsyncNetworkServer"
+        state = wait_for_network_change("127.0.0.1", port, -1, "", -1, wait_s=1.0, access_key="k")
+        before = threading.active_count()
+        results: list[dict] = []
+        waiters = [
+            threading.Thread(
+                target=lambda: results.append(
+                    wait_for_network_change(
+                        "127.0.0.1",
+                        port,
+                        state["tracker_seq"],
+                        state["epoch"],
+                        state["library_version"],
+                        wait_s=10.0,
+                        access_key="k",
+                    )
+                ),
+                daemon=True,
+            )
+            for _ in range(30)
+        ]
+        for waiter in waiters:
+            waiter.start()
+        import time as _time
+
+        _time.sleep(0.5)
+        # Held requests live on the event loop: no server thread per connection.
+        assert threading.active_count() <= before + len(waiters) + 4
+        assert push_library_data("127.0.0.1", port, [{"brand": "B"}], timeout=2.0, access_key="k")
+        for waiter in waiters:
+            waiter.join(timeout=5.0)
+        assert len(results) == len(waiters)
+        assert all(result["changed"] for result in results)
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2.0)
+        try:
+            conn.request("GET", "/api/network/ping")
+            denied = conn.getresponse()
+            denied.read()
+            assert denied.status == 403
+            assert denied.will_close
+        finally:
+            conn.close()
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+def test_catalog_replication_sends_deltas_and_wakes_waiters(tmp_path):
+    import time as _time
+
+    from catalog_sync import apply_catalog_changes
+    from network_sync import fetch_catalog_changes
+
+    catalog_path = tmp_path / "last_parse.json"
+    items = [
+        {"producer": "P", "brand": "B", "strain": f"S{i}", "grams": 10, "price": 10.0 + i} for i in range(5)
+    ]
+    catalog_path.write_text(json.dumps(items), encoding="utf-8")
+    httpd = thread = None
+    try:
+        httpd, thread, port, _, _ = _start_server(tmp_path, catalog_path=catalog_path)
+        full = fetch_catalog_changes("127.0.0.1", port, since=0, timeout=2.0)
+        assert full["full"] is True
+        replica = apply_catalog_changes({}, full)
+        assert list(replica.values()) == items
+
+        state = wait_for_network_change("127.0.0.1", port, -1, "", -1, wait_s=1.0, catalog_version=full["version"])
+        assert state["catalog_version"] == full["version"]
+
+        woke: list[dict] = []
+        waiter = threading.Thread(
+            target=lambda: woke.append(
+                wait_for_network_change(
+                    "127.0.0.1",
+                    port,
+                    state["tracker_seq"],
+                    state["epoch"],
+                    state["library_version"],
+                    wait_s=10.0,
+                    catalog_version=full["version"],
+                )
+            ),
+            daemon=True,
+        )
+        waiter.start()
+        _time.sleep(0.2)
+        # The scraper writes the file from another process; the feed picks it up by stat.
+        changed = [dict(item) for item in items[1:]]
+        changed[0]["price"] = 99.0
+        catalog_path.write_text(json.dumps(changed), encoding="utf-8")
+        waiter.join(timeout=6.0)
+        assert woke and woke[0]["changed"] is True
+        assert woke[0]["catalog_version"] > full["version"]
+
+        delta = fetch_catalog_changes("127.0.0.1", port, since=full["version"], epoch=full["epoch"], timeout=2.0)
+        assert delta["full"] is False
+        assert len(delta["upserts"]) == 1
+        assert len(delta["removed"]) == 1
+        replica = apply_catalog_changes(replica, delta)
+        assert sorted(replica.values(), key=lambda it: it["strain"]) == changed
+
+        # Unknown epoch: the replica is rebuilt from a full payload.
+        assert fetch_catalog_changes("127.0.0.1", port, since=full["version"], epoch="other", timeout=2.0)["full"]
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+def test_versioned_document_writes_merge_or_conflict(tmp_path):
+    import http.client
+
+    import network_sync
+
+    httpd = thread = None
+    try:
+        httpd, thread, port, tracker_path, library_path = _start_server(tmp_path)
+        base = {"schema_version": 1, "flowers": [{"name": "F", "grams_remaining": 10.0}], "logs": [{"id": "A"}]}
+        assert push_tracker_data("127.0.0.1", port, base, timeout=1.0, if_match="*")
+        assert fetch_tracker_data("127.0.0.1", port, timeout=1.0) == base
+        v1 = last_network_version("127.0.0.1", port, "/api/network/tracker-data")
+        assert v1
+
+        # Two clients log a dose from the same base version: both doses survive.
+        first = {"schema_version": 1, "flowers": [{"name": "F", "grams_remaining": 9.5}], "logs": [{"id": "A"}, {"id": "B"}]}
+        second = {"schema_version": 1, "flowers": [{"name": "F", "grams_remaining": 9.0}], "logs": [{"id": "A"}, {"id": "C"}]}
+        assert push_tracker_data("127.0.0.1", port, first, timeout=1.0, if_match=v1)
+        assert push_tracker_data("127.0.0.1", port, second, timeout=1.0, if_match=v1)
+        merged = json.loads(tracker_path.read_text(encoding="utf-8"))
+        assert merged["logs"] == [{"id": "A"}, {"id": "B"}, {"id": "C"}]
+        assert merged["flowers"] == [{"name": "F", "grams_remaining": 8.5}]
+
+        # Without an explicit base the last version seen from the host is used.
+        edited = dict(merged, logs=[{"id": "A", "note": "edited"}, {"id": "B"}, {"id": "C"}])
+        assert push_tracker_data("127.0.0.1", port, edited, timeout=1.0)
+
+        # Overlapping edits from a stale version are refused.
+        clash = dict(base, logs=[{"id": "A", "note": "clash"}])
+        assert not push_tracker_data("127.0.0.1", port, clash, timeout=1.0, if_match=v1)
+        assert json.loads(tracker_path.read_text(encoding="utf-8")) == edited
+
+        # A client whose last read was v1: the conflict reply's version isn't taken as its new
+        # base, so retrying the same write keeps failing instead of overwriting.
+        key = ("127.0.0.1", port, "/api/network/tracker-data")
+        with network_sync._VERSION_LOCK:
+            network_sync._VERSION_CACHE[key] = v1
+        assert not push_tracker_data("127.0.0.1", port, clash, timeout=1.0)
+        assert last_network_version(*key) == v1
+        assert not push_tracker_data("127.0.0.1", port, clash, timeout=1.0)
+        assert json.loads(tracker_path.read_text(encoding="utf-8")) == edited
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2.0)
+        try:
+            conn.request("PUT", "/api/network/library-data", body=b"[]", headers={"Content-Type": "application/json"})
+            missing = conn.getresponse()
+            assert missing.status == 428
+            assert json.loads(missing.read())["error"] == "if_match_required"
+            current = missing.getheader("X-FlowerTrack-Version")
+
+            body = json.dumps([{"brand": "B", "strain": "One", "rating": 3}]).encode("utf-8")
+            conn.request("PUT", "/api/network/library-data", body=body, headers={"If-Match": f'"{current}"'})
+            ok = conn.getresponse()
+            assert ok.status == 200
+            lib_v1 = json.loads(ok.read())["version"]
+
+            edit_a = [{"brand": "B", "strain": "One", "rating": 5}]
+            edit_b = [{"brand": "B", "strain": "One", "rating": 3}, {"brand": "C", "strain": "Two"}]
+            for edit in (edit_a, edit_b):
+                conn.request(
+                    "PUT", "/api/network/library-data", body=json.dumps(edit).encode("utf-8"),
+                    headers={"If-Match": f'"{lib_v1}"'},
+                )
+                resp = conn.getresponse()
+                assert resp.status == 200
+                resp.read()
+            assert _without_ids(json.loads(library_path.read_text(encoding="utf-8"))) == [
+                {"brand": "B", "strain": "One", "rating": 5},
+                {"brand": "C", "strain": "Two"},
+            ]
+
+            conflicting = [{"brand": "B", "strain": "One", "rating": 1}]
+            conn.request(
+                "PUT", "/api/network/library-data", body=json.dumps(conflicting).encode("utf-8"),
+                headers={"If-Match": f'"{lib_v1}"'},
+            )
+            conflict = conn.getresponse()
+            payload = json.loads(conflict.read())
+            assert conflict.status == 409
+            assert payload["error"] == "version_conflict"
+            assert payload["version"] == conflict.getheader("X-FlowerTrack-Version") != lib_v1
+        finally:
+            conn.close()
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
+
+
+def test_library_entries_sync_by_revision(tmp_path):
+    httpd = thread = None
+    try:
+        httpd, thread, port, _tracker_path, library_path = _start_server(tmp_path)
+        library = [{"brand": "A", "strain": "One"}, {"brand": "B", "strain": "Two"}]
+        assert push_library_data("127.0.0.1", port, library, timeout=1.0, if_match="*")
+
+        full = fetch_library_changes("127.0.0.1", port, timeout=1.0)
+        assert full["full"] is True
+        assert _without_ids(full["entries"]) == library
+        assert all(entry["id"] and entry["rev"] == full["revision"] for entry in full["entries"])
+        one, two = full["entries"]
+
+        reply = push_library_entries("127.0.0.1", port, [dict(one, rating=7)], [], timeout=1.0)
+        assert reply["ok"] and [entry["id"] for entry in reply["entries"]] == [one["id"]]
+        changes = fetch_library_changes("127.0.0.1", port, since=full["revision"], epoch=full["epoch"], timeout=1.0)
+        assert changes["full"] is False and changes["deleted"] == []
+        assert [(entry["id"], entry["rating"]) for entry in changes["entries"]] == [(one["id"], 7)]
+
+        # An edit based on an older revision of the entry is refused with the host's version.
+        stale = push_library_entries("127.0.0.1", port, [dict(one, rating=1)], [], timeout=1.0)
+        assert stale["error"] == "entry_conflict"
+        assert stale["conflicts"][0]["rating"] == 7
+
+        reply = push_library_entries("127.0.0.1", port, [], [{"id": two["id"], "rev": two["rev"]}], timeout=1.0)
+        assert reply["ok"]
+        latest = fetch_library_changes(
+            "127.0.0.1", port, since=changes["revision"], epoch=changes["epoch"], timeout=1.0
+        )
+        assert latest["entries"] == [] and latest["deleted"] == [two["id"]]
+
+        # Entries written to the file directly are given ids and show up as changes.
+        on_disk = json.loads(library_path.read_text(encoding="utf-8"))
+        library_path.write_text(json.dumps(on_disk + [{"brand": "C", "strain": "Three"}]), encoding="utf-8")
+        external = fetch_library_changes("127.0.0.1", port, since=latest["revision"], epoch=latest["epoch"], timeout=1.0)
+        assert [entry["brand"] for entry in external["entries"]] == ["C"]
+        assert external["entries"][0]["id"]
+        assert all(entry.get("id") for entry in json.loads(library_path.read_text(encoding="utf-8")))
+    finally:
+        stop_network_data_server(httpd, thread, lambda _m: None)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from persistence import PersistenceWorker
+
+
+def test_saves_for_a_key_are_debounced_to_the_latest():
+    writes = []
+    worker = PersistenceWorker(delay=0.1, max_delay=1.0)
+    for n in range(5):
+        worker.submit("tracker", lambda n=n: writes.append(("tracker", n)))
+    worker.submit("config", lambda: writes.append(("config", 0)))
+    assert worker.pending("tracker")
+    time.sleep(0.3)
+    assert sorted(writes) == [("config", 0), ("tracker", 4)]
+    assert not worker.pending()
+    worker.stop()
+
+
+def test_continuous_saves_are_written_by_max_delay():
+    writes = []
+    worker = PersistenceWorker(delay=0.1, max_delay=0.25)
+    deadline = time.monotonic() + 0.6
+    n = 0
+    while time.monotonic() < deadline:
+        worker.submit("tracker", lambda n=n: writes.append(n))
+        n += 1
+        time.sleep(0.02)
+    assert writes, "a key saved continuously must still be written"
+    worker.stop()
+    assert writes[-1] == n - 1
+
+
+def test_flush_writes_now_and_errors_are_reported():
+    errors = []
+    done = threading.Event()
+
+    def fail():
+        raise OSError("disk full")
+
+    worker = PersistenceWorker(delay=10.0, on_error=lambda key, exc: errors.append((key, str(exc))))
+    worker.submit("config", fail)
+    worker.submit("tracker", done.set)
+    assert worker.flush(timeout=2.0)
+    assert done.is_set()
+    assert errors == [("config", "disk full")]
+
+    # After stop, late saves run inline rather than being dropped.
+    assert worker.stop()
+    late = []
+    worker.submit("tracker", lambda: late.append(1))
+    assert late == [1]
@@ -0,0 +1,80 @@
+import pytest
+
+from tracker_ops import MergeConflict, apply_tracker_ops, diff_tracker_documents, merge_tracker_documents
+
+
+def _doc(logs, **extra):
+    base = {"schema_version": 1, "flowers": [{"name": "A", "grams_remaining": 5.0}], "logs": logs}
+    base.update(extra)
+    return base
+
+
+def test_new_dose_diffs_to_append_and_stock_ops():
+    old = _doc([{"id": 1}, {"id": 2}])
+    new = _doc([{"id": 1}, {"id": 2}, {"id": 3}])
+    new["flowers"] = [{"name": "A", "grams_remaining": 4.5}]
+    ops = diff_tracker_documents(old, new)
+    assert [op["op"] for op in ops] == ["append_log", "set_stock"]
+    assert apply_tracker_ops(old, ops) == new
+
+
+@pytest.mark.parametrize(
+    "new_logs",
+    [
+        [{"id": 1}, {"id": 3}],
+        [{"id": 1}, {"id": 9}, {"id": 2}, {"id": 3}],
+        [{"id": 1}, {"id": 2, "grams": 0.2}, {"id": 3}],
+        [],
+    ],
+)
+def test_diff_roundtrips_edits_inserts_and_deletes(new_logs):
+    old = _doc([{"id": 1}, {"id": 2}, {"id": 3}])
+    new = _doc(new_logs)
+    ops = diff_tracker_documents(old, new)
+    assert apply_tracker_ops(old, ops) == new
+
+
+def test_settings_patch_sets_and_unsets_keys():
+    old = _doc([], dark_mode=True, legacy=1)
+    new = _doc([], dark_mode=False)
+    ops = diff_tracker_documents(old, new)
+    assert ops == [{"op": "patch_settings", "settings": {"dark_mode": False}, "unset": ["legacy"]}]
+    assert apply_tracker_ops(old, ops) == new
+
+
+def test_apply_does_not_mutate_input_and_rejects_bad_ops():
+    old = _doc([{"id": 1}])
+    apply_tracker_ops(old, [{"op": "edit_log", "index": 0, "log": {"id": 2}}])
+    assert old["logs"] == [{"id": 1}]
+    with pytest.raises(ValueError):
+        apply_tracker_ops(old, [{"op": "delete_log", "index": 4}])
+    with pytest.raises(ValueError):
+        apply_tracker_ops(old, [{"op": "patch_settings", "settings": {"logs": []}}])
+    with pytest.raises(ValueError):
+        apply_tracker_ops(old, [{"op": "drop_table"}])
+
+
+def test_merge_keeps_concurrent_appends_and_combines_stock():
+    base = _doc([{"id": 1}], flowers=[{"name": "F", "grams_remaining": 5.0}])
+    current = _doc([{"id": 1}, {"id": 2}], flowers=[{"name": "F", "grams_remaining": 4.5}])
+    mine = _doc([{"id": 1}, {"id": 3}], flowers=[{"name": "F", "grams_remaining": 4.0}, {"name": "G", "grams_remaining": 1.0}])
+    merged = merge_tracker_documents(base, current, mine)
+    assert merged["logs"] == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert merged["flowers"] == [{"name": "F", "grams_remaining": 3.5}, {"name": "G", "grams_remaining": 1.0}]
+
+
+def test_merge_applies_disjoint_edits_and_settings():
+    base = _doc([{"id": 1}, {"id": 2}, {"id": 3}], dark_mode=True, target=1.0)
+    current = _doc([{"id": 1, "note": "x"}, {"id": 2}, {"id": 3}], dark_mode=False, target=1.0)
+    mine = _doc([{"id": 1}, {"id": 2}], dark_mode=True, target=2.0)
+    merged = merge_tracker_documents(base, current, mine)
+    assert merged["logs"] == [{"id": 1, "note": "x"}, {"id": 2}]
+    assert merged["dark_mode"] is False and merged["target"] == 2.0
+
+
+def test_merge_raises_on_overlapping_changes():
+    base = _doc([{"id": 1}], dark_mode=True)
+    with pytest.raises(MergeConflict):
+        merge_tracker_documents(base, _doc([{"id": 1, "a": 1}], dark_mode=True), _doc([{"id": 1, "b": 1}], dark_mode=True))
+    with pytest.raises(MergeConflict):
+        merge_tracker_documents(base, _doc([{"id": 1}], dark_mode=False), _doc([{"id": 1}], dark_mode="auto"))
@@ -0,0 +1,113 @@
+import ui_scheduler
+from ui_scheduler import TkScheduler
+
+
+class FakeRoot:
+    """A Tk root stand-in with a manual clock: after() callbacks run when the clock reaches them."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.jobs = {}
+        self.next_id = 0
+        self.wakeups = 0
+        self.hidden = False
+        self.bindings = {}
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.jobs[self.next_id] = (self.now + ms / 1000.0, callback)
+        return self.next_id
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def state(self):
+        return "withdrawn" if self.hidden else "normal"
+
+    def bind(self, sequence, callback, add=None):
+        self.bindings[sequence] = callback
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            pending = [(due, job) for job, (due, _cb) in self.jobs.items() if due <= end]
+            if not pending:
+                break
+            due, job = min(pending)
+            self.now = max(self.now, due)
+            callback = self.jobs.pop(job)[1]
+            self.wakeups += 1
+            callback()
+        self.now = end
+
+
+def test_tasks_share_one_timer_and_run_at_their_own_intervals():
+    root = FakeRoot()
+    runs = []
+    scheduler = TkScheduler(root, clock=root.clock)
+    scheduler.add("fast", lambda: runs.append("fast"), 1.0)
+    scheduler.add("slow", lambda: runs.append("slow"), 2.0)
+    assert len(root.jobs) == 1
+    root.advance(4.01)
+    assert runs.count("fast") == 4 and runs.count("slow") == 2
+    # Deadlines that coincide run in one wakeup.
+    assert root.wakeups == 4
+    stats = scheduler.stats()
+    assert stats["fast"]["runs"] == 4 and stats["slow"]["interval"] == 2.0
+
+    scheduler.remove("fast")
+    root.advance(2.0)
+    assert runs.count("fast") == 4
+    scheduler.stop()
+    assert root.jobs == {}
+
+
+def test_hidden_window_slows_tasks_and_mapping_catches_up():
+    root = FakeRoot()
+    runs = []
+    scheduler = TkScheduler(root, clock=root.clock)
+    scheduler.add("clock", lambda: runs.append(root.now), 1.0, idle_interval=10.0)
+    root.advance(1.0)
+    root.hidden = True
+    root.advance(1.0)
+    count = len(runs)
+    root.advance(9.0)
+    assert len(runs) == count
+    root.hidden = False
+    root.bindings["<Map>"](type("Event", (), {"widget": root})())
+    root.advance(0.01)
+    assert len(runs) == count + 1
+
+
+def test_failing_and_slow_tasks_are_logged_once(monkeypatch):
+    root = FakeRoot()
+    events = []
+    monkeypatch.setattr(ui_scheduler, "log_event", lambda event, detail=None, **_kw: events.append((event, detail)))
+
+    def fail():
+        raise RuntimeError("boom")
+
+    durations = [0.3, 0.3, 0.3, 0.01, 0.4]
+
+    def slow():
+        root.now += durations.pop(0) if durations else 0.01
+
+    scheduler = TkScheduler(root, clock=root.clock)
+    scheduler.add("fail", fail, 1.0)
+    scheduler.add("slow", slow, 2.0, delay=0.5)
+    root.advance(6.0)
+    assert scheduler.stats()["slow"]["runs"] >= 3
+    assert scheduler.stats()["fail"]["runs"] >= 2
+    assert events == [
+        ("ui.scheduler.slow_task", {"task": "slow", "ms": 300}),
+        ("ui.scheduler.task_failed", {"task": "fail", "error": "boom"}),
+    ]
+
+    # A fast run resets the flag, so the task is logged again when it next turns slow.
+    root.advance(6.0)
+    assert durations == []
+    assert events[-1] == ("ui.scheduler.slow_task", {"task": "slow", "ms": 400})
+    assert [event for event, _detail in events].count("ui.scheduler.slow_task") == 2
@@ -54,6 +54,7 @@ def test_request_client_network_poll_connect_fetches_data(monkeypatch):
     dummy._consume_client_network_result = lambda payload: consumed.append(payload)
 
     monkeypatch.setattr(ui_tracker, "fetch_tracker_meta", lambda *args, **kwargs: {"ok": True, "mtime": 42.0})
+    monkeypatch.setattr(ui_tracker, "fetch_tracker_ops", lambda *args, **kwargs: None)
     monkeypatch.setattr(
         ui_tracker,
         "fetch_tracker_data",
@@ -70,6 +71,43 @@ def test_request_client_network_poll_connect_fetches_data(monkeypatch):
     assert dummy._client_poll_inflight is False
 
 
+def test_consume_client_network_result_replays_ops_onto_synced_document():
+    dummy, events = _build_client_dummy()
+    dummy._network_sync_doc = {"schema_version": 1, "logs": [{"id": "L1"}]}
+    dummy._network_ops_seq = 3
+    dummy._network_ops_epoch = "e1"
+
+    ui_tracker.CannabisTracker._consume_client_network_result(
+        dummy,
+        {
+            "ok": True,
+            "mtime": 60.0,
+            "ops_since": 3,
+            "ops_seq": 4,
+            "ops_epoch": "e1",
+            "ops": [{"op": "append_log", "log": {"id": "L2"}}],
+        },
+    )
+
+    assert dummy._network_ops_seq == 4
+    assert events["apply"] == [({"schema_version": 1, "logs": [{"id": "L1"}, {"id": "L2"}]}, 60.0)]
+
+
+def test_consume_client_network_result_drops_ops_after_local_push():
+    dummy, events = _build_client_dummy()
+    dummy._network_sync_doc = {"schema_version": 1, "logs": [{"id": "L1"}, {"id": "L2"}]}
+    dummy._network_ops_seq = 5
+    dummy._network_ops_epoch = "e1"
+
+    ui_tracker.CannabisTracker._consume_client_network_result(
+        dummy,
+        {"ok": True, "mtime": 60.0, "ops_since": 4, "ops_seq": 5, "ops_epoch": "e1", "ops": [{"op": "append_log", "log": {"id": "L2"}}]},
+    )
+
+    assert dummy._network_ops_seq == 5
+    assert events["apply"] == []
+
+
 def test_consume_client_network_result_disconnect_timeout_closes(monkeypatch):
     dummy, events = _build_client_dummy()
     dummy._client_disconnect_since = 0.0
@@ -119,3 +157,35 @@ def test_consume_client_network_result_ignores_non_client_mode():
 
     assert dummy._client_missed_pings == 4
     assert events["apply"] == []
+
+
+def test_refresh_network_catalog_applies_deltas_to_local_replica(monkeypatch):
+    from catalog_sync import encode_catalog_rows
+
+    dummy, _events = _build_client_dummy()
+    dummy._network_catalog_items = None
+    dummy._network_catalog_version = 0
+    dummy._network_catalog_epoch = ""
+    dummy._network_catalog_ok = False
+    saved: list[list[dict]] = []
+    calls: list[tuple] = []
+    fields, rows = encode_catalog_rows([("k1", {"strain": "A"}), ("k2", {"strain": "B"})])
+    replies = [
+        {"ok": True, "epoch": "e1", "version": 4, "full": True, "fields": fields, "upserts": rows, "removed": []},
+        {"ok": True, "epoch": "e1", "version": 5, "full": False, "fields": [], "upserts": [], "removed": ["k1"]},
+    ]
+
+    def _fetch(host, port, since=0, epoch="", **kwargs):
+        calls.append((since, epoch))
+        return replies.pop(0)
+
+    monkeypatch.setattr(ui_tracker, "fetch_catalog_changes", _fetch)
+    monkeypatch.setattr(ui_tracker, "save_last_parse", lambda _path, items: saved.append(items))
+
+    ui_tracker.CannabisTracker._refresh_network_catalog(dummy)
+    ui_tracker.CannabisTracker._refresh_network_catalog(dummy)
+
+    assert calls == [(0, ""), (4, "e1")]
+    assert saved == [[{"strain": "A"}, {"strain": "B"}], [{"strain": "B"}]]
+    assert dummy._network_catalog_version == 5
+    assert dummy._network_catalog_ok is True
@@ -0,0 +1,87 @@
+import random
+
+from ui_tree_rows import TreeRows, tree_rows
+
+
+class FakeTree:
+    """Just enough of ttk.Treeview for top-level rows, counting the calls that change it."""
+
+    def __init__(self):
+        self.order = []
+        self.items = {}
+        self.calls = []
+
+    def get_children(self, item=""):
+        return tuple(self.order)
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.calls.append(("insert", iid))
+        self.order.append(iid)
+        self.items[iid] = (tuple(values), tuple(tags))
+
+    def item(self, iid, values=(), tags=()):
+        self.calls.append(("item", iid))
+        self.items[iid] = (tuple(values), tuple(tags))
+
+    def delete(self, *iids):
+        self.calls.append(("delete",) + iids)
+        for iid in iids:
+            self.order.remove(iid)
+            del self.items[iid]
+
+    def move(self, iid, parent, index):
+        # Tk counts `index` among the other children, i.e. remove then insert.
+        self.calls.append(("move", iid))
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def tag_configure(self, name, **options):
+        self.calls.append(("tag", name))
+
+
+def _rows(names, grams=None):
+    grams = grams or {}
+    return [(name, (name, f"{grams.get(name, 1.0):.3f}"), ("plain",)) for name in names]
+
+
+def test_sync_touches_only_what_changed():
+    tree = FakeTree()
+    rows = tree_rows(tree)
+    assert tree_rows(tree) is rows
+    assert rows.sync(_rows(["a", "b", "c"]))
+    assert tree.order == ["a", "b", "c"]
+
+    tree.calls.clear()
+    assert not rows.sync(_rows(["a", "b", "c"]))
+    assert tree.calls == []
+
+    assert rows.sync(_rows(["a", "c", "d"], grams={"c": 0.5}))
+    assert tree.calls == [("delete", "b"), ("item", "c"), ("insert", "d")]
+    assert tree.items["c"] == (("c", "0.500"), ("plain",))
+
+    # Re-sorting after one row changed moves that row only.
+    tree.calls.clear()
+    rows.sync(_rows(["c", "a", "d"], grams={"c": 0.5}))
+    assert tree.calls == [("move", "c")]
+    assert tree.order == ["c", "a", "d"]
+
+
+def test_reorder_reaches_any_permutation():
+    rng = random.Random(7)
+    for _ in range(200):
+        tree = FakeTree()
+        rows = TreeRows(tree)
+        names = [str(n) for n in range(rng.randint(0, 12))]
+        rows.sync(_rows(names))
+        wanted = rng.sample(names, len(names))
+        rows.sync(_rows(wanted))
+        assert tree.order == wanted
+
+
+def test_tags_are_configured_once_per_option_change():
+    tree = FakeTree()
+    rows = TreeRows(tree)
+    assert rows.tag("fg", foreground="#fff") == "fg"
+    rows.tag("fg", foreground="#fff")
+    rows.tag("fg", foreground="#000")
+    assert tree.calls == [("tag", "fg"), ("tag", "fg")]
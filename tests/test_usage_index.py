@@ -0,0 +1,60 @@
+from datetime import date
+
+from usage_index import DailyUsageIndex
+
+
+def _is_cbd(log):
+    return bool(log.get("is_cbd_dominant"))
+
+
+def _logs():
+    return [
+        {"date": "2024-01-01", "flower": "A", "grams_used": 0.1},
+        {"date": "2024-01-01", "flower": "C", "grams_used": 0.3, "is_cbd_dominant": True},
+        {"date": "2024-01-02", "flower": "B", "grams_used": 0.2},
+        {"date": "2024-01-01", "flower": "B", "grams_used": 0.05},
+        {"date": "bad", "flower": "A", "grams_used": 1.0},
+    ]
+
+
+def test_day_totals_and_counted_flowers():
+    index = DailyUsageIndex(_is_cbd, _logs())
+    assert index.day_indices(date(2024, 1, 1)) == [0, 1, 3]
+    assert abs(index.thc_grams("2024-01-01", lambda name: True) - 0.15) < 1e-9
+    assert abs(index.thc_grams("2024-01-01", lambda name: name != "B") - 0.1) < 1e-9
+    assert index.cbd_grams(date(2024, 1, 1)) == 0.3
+    assert sorted(index.daily_totals(lambda name: name == "B")) == [0.05, 0.2]
+    # Unbounded totals include days whose date doesn't parse; bounded ones skip them.
+    assert len(index.daily_totals(lambda name: True)) == 3
+    assert len(index.daily_totals(lambda name: True, start=date(2024, 1, 2))) == 1
+    assert index.daily_totals() == [0.3]
+    assert index.indices_between(date(2024, 1, 1), date(2024, 1, 2)) == [0, 1, 2, 3]
+
+
+def test_incremental_updates_match_a_rebuild():
+    logs = _logs()
+    index = DailyUsageIndex(_is_cbd, logs)
+    logs.append({"date": "2024-01-02", "flower": "A", "grams_used": 0.4})
+    index.append(logs[-1])
+    before = dict(logs[0])
+    logs[0].update(flower="C", is_cbd_dominant=True, grams_used=0.2)
+    index.replace(0, before, logs[0])
+    removed = logs.pop(1)
+    index.delete(1, removed)
+
+    fresh = DailyUsageIndex(_is_cbd, logs)
+    for day in ("2024-01-01", "2024-01-02", "bad"):
+        assert index.day_indices(day) == fresh.day_indices(day)
+        assert abs(index.thc_grams(day, lambda name: True) - fresh.thc_grams(day, lambda name: True)) < 1e-9
+        assert abs(index.cbd_grams(day) - fresh.cbd_grams(day)) < 1e-9
+    assert index.sync(logs) is index
+    assert index.day_indices("2024-01-02") == [1, 4]
+
+
+def test_sync_rebuilds_when_logs_change_behind_its_back():
+    logs = _logs()
+    index = DailyUsageIndex(_is_cbd, logs)
+    logs.append({"date": "2024-01-03", "flower": "A", "grams_used": 0.5})
+    assert index.sync(logs).day_indices("2024-01-03") == [5]
+    other = [{"date": "2024-02-01", "flower": "A", "grams_used": 0.1}]
+    assert index.sync(other).day_indices("2024-01-01") == []
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+
+import usage_stats
+from usage_stats import UsageSeries, downsample, log_minute, rolling_average
+
+
+@pytest.fixture(autouse=True, params=["array", "numpy"])
+def backend(request, monkeypatch):
+    """Run every test on the array-module path and, when NumPy is installed, the NumPy path."""
+    if request.param == "numpy":
+        monkeypatch.setattr(usage_stats, "np", pytest.importorskip("numpy"))
+    else:
+        monkeypatch.setattr(usage_stats, "np", None)
+    return request.param
+
+
+def _log(time, grams, cbd=False):
+    return {"time": time, "date": time[:10], "grams_used": grams, "is_cbd_dominant": cbd}
+
+
+def _is_cbd(log):
+    return bool(log.get("is_cbd_dominant"))
+
+
+def test_log_minute_parses_canonical_and_loose_times():
+    assert log_minute("0001-01-01 00:01") == 1440 + 1
+    assert log_minute("2026-01-02 03:04") == log_minute("2026-1-2 3:04")
+    assert log_minute("2026-01-02 25:00") is None
+    assert log_minute("not a time") is None
+    assert log_minute(None) is None
+
+
+def test_series_queries_match_the_logs():
+    logs = [
+        _log("2026-03-02 20:00", 0.2),
+        _log("2026-03-01 08:00", 0.1),
+        _log("2026-03-01 08:00", 0.3, cbd=True),
+        _log("2026-03-01 12:30", 0.4),
+        _log("bad", 5.0),
+        _log("2026-03-05 09:15", 0.05),
+    ]
+    series = UsageSeries.from_logs(logs, _is_cbd)
+    assert len(series) == 5
+    assert list(series.minutes) == sorted(series.minutes)
+
+    span = series.between(date(2026, 3, 1), date(2026, 3, 2))
+    assert len(span) == 4
+    thc, cbd = span.totals()
+    assert abs(thc - 0.7) < 1e-9 and abs(cbd - 0.3) < 1e-9
+    assert span.dose_stats() == (0.1, 0.4, (0.2 + 0.1 + 0.3 + 0.4) / 4)
+    # Gaps: 0 (same minute), 4h30m, 31h30m; the zero gap is left out of the average.
+    assert span.interval_stats() == ((4.5 + 31.5) * 3600 / 2, 31.5 * 3600)
+
+    assert series.daily_totals(date(2026, 2, 28), date(2026, 3, 5)) == [0.0, 0.5, 0.2, 0.0, 0.0, 0.05]
+    assert series.daily_totals(date(2026, 3, 1), date(2026, 3, 2), cbd=True) == [0.3, 0.0]
+    assert UsageSeries().interval_stats() == (None, None)
+    assert UsageSeries().dose_stats() is None
+
+
+def test_untimed_logs_count_for_grams_and_doses_only():
+    logs = [
+        _log("2026-03-01 08:00", 0.1),
+        _log("2026-03-01 20:00", 0.3),
+        {"time": "later", "date": "2026-03-01", "grams_used": 0.9, "is_cbd_dominant": False},
+        {"time": "", "date": "2026-03-02", "grams_used": 0.05, "is_cbd_dominant": True},
+        {"time": "", "date": "", "grams_used": 4.0},
+    ]
+    series = UsageSeries.from_logs(logs, _is_cbd)
+    assert len(series) == 4
+    day = series.between(date(2026, 3, 1), date(2026, 3, 1))
+    assert len(day) == 3
+    thc, cbd = day.totals()
+    assert abs(thc - 1.3) < 1e-9 and cbd == 0.0
+    assert day.dose_stats() == (0.1, 0.9, (0.1 + 0.3 + 0.9) / 3)
+    assert day.interval_stats() == (12 * 3600, 12 * 3600)
+    assert day.daily_totals(date(2026, 3, 1), date(2026, 3, 1)) == [0.1 + 0.3]
+    # Only untimed doses on this day: the time arrays are empty.
+    untimed_only = series.between(date(2026, 3, 2), date(2026, 3, 2))
+    assert untimed_only.totals() == (0.0, 0.05)
+    assert untimed_only.dose_stats() == (0.05, 0.05, 0.05)
+    assert untimed_only.interval_stats() == (None, None)
+    assert untimed_only.daily_totals(date(2026, 3, 2), date(2026, 3, 2), cbd=True) == [0.0]
+
+    merged = UsageSeries.from_logs(logs[3:4], _is_cbd).merge(UsageSeries.from_logs(logs[:3], _is_cbd))
+    assert list(merged.untimed_grams) == [0.9, 0.05]
+
+
+def test_merge_keeps_time_order():
+    old = UsageSeries.from_logs([_log("2025-01-01 10:00", 0.1), _log("2025-01-03 10:00", 0.3)], _is_cbd)
+    new = UsageSeries.from_logs([_log("2025-01-02 10:00", 0.2)], _is_cbd)
+    merged = old.merge(new)
+    assert list(merged.grams) == [0.1, 0.2, 0.3]
+
+
+def test_rolling_average_and_downsample():
+    assert rolling_average([1.0, 2.0, 3.0, 4.0], 2) == [1.0, 1.5, 2.5, 3.5]
+    assert rolling_average([], 7) == []
+    assert downsample([1.0, 2.0, 3.0], 5) == [1.0, 2.0, 3.0]
+    assert downsample([1.0, 3.0, 5.0, 7.0, 9.0], 2) == [3.0, 8.0]
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+# Operation kinds exchanged over /api/network/tracker-ops.
+OP_APPEND_LOG = "append_log"
+OP_INSERT_LOG = "insert_log"
+OP_EDIT_LOG = "edit_log"
+OP_DELETE_LOG = "delete_log"
+OP_SET_STOCK = "set_stock"
+OP_PATCH_SETTINGS = "patch_settings"
+INDEXED_OPS = frozenset({OP_INSERT_LOG, OP_EDIT_LOG, OP_DELETE_LOG})
+_DOCUMENT_KEYS = ("flowers", "logs")
+
+
+def _as_document(data: Any) -> dict:
+    if isinstance(data, dict):
+        return data
+    if isinstance(data, list):
+        return {"schema_version": 1, "logs": data}
+    return {}
+
+
+def diff_tracker_documents(old: Any, new: Any) -> list[dict]:
+    """Return the ops that turn tracker document `old` into `new`.
+
+    Logs are compared by common prefix/suffix, so a new dose becomes one append_log op and an
+    edit or delete in the middle of the history touches only the affected entries.
+    """
+    old_doc = _as_document(old)
+    new_doc = _as_document(new)
+    ops: list[dict] = []
+    old_logs = list(old_doc.get("logs") or [])
+    new_logs = list(new_doc.get("logs") or [])
+    limit = min(len(old_logs), len(new_logs))
+    prefix = 0
+    while prefix < limit and old_logs[prefix] == new_logs[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < (limit - prefix) and old_logs[-1 - suffix] == new_logs[-1 - suffix]:
+        suffix += 1
+    old_mid = old_logs[prefix : len(old_logs) - suffix]
+    new_mid = new_logs[prefix : len(new_logs) - suffix]
+    common = min(len(old_mid), len(new_mid))
+    for i in range(common):
+        ops.append({"op": OP_EDIT_LOG, "index": prefix + i, "log": new_mid[i]})
+    for _ in range(len(old_mid) - common):
+        ops.append({"op": OP_DELETE_LOG, "index": prefix + common})
+    for i in range(common, len(new_mid)):
+        if suffix == 0:
+            ops.append({"op": OP_APPEND_LOG, "log": new_mid[i]})
+        else:
+            ops.append({"op": OP_INSERT_LOG, "index": prefix + i, "log": new_mid[i]})
+    if old_doc.get("flowers") != new_doc.get("flowers"):
+        ops.append({"op": OP_SET_STOCK, "flowers": list(new_doc.get("flowers") or [])})
+    changed: dict[str, Any] = {}
+    unset: list[str] = []
+    for key in sorted(set(old_doc) | set(new_doc)):
+        if key in _DOCUMENT_KEYS:
+            continue
+        if key not in new_doc:
+            unset.append(key)
+        elif key not in old_doc or old_doc[key] != new_doc[key]:
+            changed[key] = new_doc[key]
+    if changed or unset:
+        op: dict[str, Any] = {"op": OP_PATCH_SETTINGS, "settings": changed}
+        if unset:
+            op["unset"] = unset
+        ops.append(op)
+    return ops
+
+
+def _op_index(op: dict, upper: int) -> int:
+    index = op.get("index")
+    if isinstance(index, bool) or not isinstance(index, int) or index < 0 or index >= upper:
+        raise ValueError(f"{op.get('op')}: index out of range")
+    return index
+
+
+def _op_log(op: dict) -> dict:
+    log = op.get("log")
+    if not isinstance(log, dict):
+        raise ValueError(f"{op.get('op')}: log entry must be an object")
+    return dict(log)
+
+
+def apply_tracker_ops(doc: Any, ops: Iterable[dict]) -> dict:
+    """Apply ops to a tracker document and return the new document.
+
+    The input document and its log entries are never mutated. Raises ValueError on a
+    malformed op so callers can reject the whole batch.
+    """
+    out = dict(_as_document(doc))
+    logs = list(out.get("logs") or [])
+    for op in ops:
+        if not isinstance(op, dict):
+            raise ValueError("op must be an object")
+        kind = op.get("op")
+        if kind == OP_APPEND_LOG:
+            logs.append(_op_log(op))
+        elif kind == OP_INSERT_LOG:
+            logs.insert(_op_index(op, len(logs) + 1), _op_log(op))
+        elif kind == OP_EDIT_LOG:
+            logs[_op_index(op, len(logs))] = _op_log(op)
+        elif kind == OP_DELETE_LOG:
+            del logs[_op_index(op, len(logs))]
+        elif kind == OP_SET_STOCK:
+            flowers = op.get("flowers")
+            if not isinstance(flowers, list):
+                raise ValueError("set_stock: flowers must be a list")
+            out["flowers"] = [dict(f) for f in flowers if isinstance(f, dict)]
+        elif kind == OP_PATCH_SETTINGS:
+            settings = op.get("settings") or {}
+            unset = op.get("unset") or []
+            if not isinstance(settings, dict) or not isinstance(unset, list):
+                raise ValueError("patch_settings: invalid payload")
+            for key, value in settings.items():
+                if key in _DOCUMENT_KEYS:
+                    raise ValueError(f"patch_settings: cannot set {key}")
+                out[str(key)] = value
+            for key in unset:
+                if key not in _DOCUMENT_KEYS:
+                    out.pop(str(key), None)
+        else:
+            raise ValueError(f"unknown op: {kind!r}")
+    out["logs"] = logs
+    return out
+
+
+class MergeConflict(ValueError):
+    """Both sides changed the same part of a tracker document."""
+
+
+_MISSING: Any = object()
+
+
+def _change_region(base: list, other: list) -> tuple[int, int, list]:
+    """Return (start, end, replacement): `other` is base[:start] + replacement + base[end:]."""
+    limit = min(len(base), len(other))
+    prefix = 0
+    while prefix < limit and base[prefix] == other[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < (limit - prefix) and base[-1 - suffix] == other[-1 - suffix]:
+        suffix += 1
+    return prefix, len(base) - suffix, other[prefix : len(other) - suffix]
+
+
+def _merge_logs(base: list, current: list, mine: list) -> list:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    cs, ce, crep = _change_region(base, current)
+    ms, me, mrep = _change_region(base, mine)
+    if cs == ce == ms == me:
+        # Both sides added entries at the same point (two doses logged together): keep both.
+        return base[:cs] + crep + mrep + base[cs:]
+    if ce <= ms:
+        return base[:cs] + crep + base[ce:ms] + mrep + base[me:]
+    if me <= cs:
+        return base[:ms] + mrep + base[me:cs] + crep + base[ce:]
+    raise MergeConflict("log edits overlap")
+
+
+def _merge_value(key: str, base: Any, current: Any, mine: Any) -> Any:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    if key == "grams_remaining" and all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in (base, current, mine)
+    ):
+        # Concurrent doses from the same flower both come off the remaining stock.
+        return max(0.0, current + (mine - base))
+    raise MergeConflict(f"{key}: changed on both sides")
+
+
+def _merge_record(base: Any, current: Any, mine: Any, label: str) -> Any:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    if not all(isinstance(v, dict) for v in (base, current, mine)):
+        raise MergeConflict(f"{label}: changed on both sides")
+    out: dict = {}
+    for key in list(current) + [k for k in mine if k not in current]:
+        value = _merge_value(key, base.get(key, _MISSING), current.get(key, _MISSING), mine.get(key, _MISSING))
+        if value is not _MISSING:
+            out[key] = value
+    return out
+
+
+def _flowers_by_name(flowers: Any) -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    for flower in flowers or []:
+        name = flower.get("name") if isinstance(flower, dict) else None
+        if not isinstance(name, str) or name in out:
+            raise MergeConflict("flowers cannot be matched by name")
+        out[name] = flower
+    return out
+
+
+def _merge_flowers(base: list, current: list, mine: list) -> list:
+    if mine == base:
+        return current
+    if current == base or current == mine:
+        return mine
+    by_base, by_current, by_mine = _flowers_by_name(base), _flowers_by_name(current), _flowers_by_name(mine)
+    out = []
+    for name in list(by_current) + [n for n in by_mine if n not in by_current]:
+        merged = _merge_record(
+            by_base.get(name, _MISSING), by_current.get(name, _MISSING), by_mine.get(name, _MISSING), name
+        )
+        if merged is not _MISSING:
+            out.append(merged)
+    return out
+
+
+def merge_tracker_documents(base: Any, current: Any, mine: Any) -> dict:
+    """Three-way merge of a client's document (`mine`) onto `current`, both derived from `base`.
+
+    Log edits merge when they touch different parts of the history, and entries appended by
+    both sides are all kept. Flowers merge per name and field; concurrent changes to a
+    flower's grams_remaining are combined. Raises MergeConflict when both sides changed the
+    same thing differently.
+    """
+    base_doc, current_doc, my_doc = _as_document(base), _as_document(current), _as_document(mine)
+    out: dict = {}
+    for key in list(current_doc) + [k for k in my_doc if k not in current_doc]:
+        if key in _DOCUMENT_KEYS:
+            continue
+        value = _merge_value(
+            key, base_doc.get(key, _MISSING), current_doc.get(key, _MISSING), my_doc.get(key, _MISSING)
+        )
+        if value is not _MISSING:
+            out[key] = value
+    flowers = _merge_flowers(
+        list(base_doc.get("flowers") or []), list(current_doc.get("flowers") or []), list(my_doc.get("flowers") or [])
+    )
+    if flowers or "flowers" in current_doc or "flowers" in my_doc:
+        out["flowers"] = flowers
+    out["logs"] = _merge_logs(
+        list(base_doc.get("logs") or []), list(current_doc.get("logs") or []), list(my_doc.get("logs") or [])
+    )
+    return out
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable, Optional
+
+from logger import log_event
+
+# Tasks whose deadlines fall this close together run in the same wakeup.
+COALESCE_SECONDS = 0.05
+# Without an explicit idle interval, tasks run this many times less often while hidden.
+IDLE_SLOWDOWN = 5.0
+# A single run slower than this is written to the app log.
+SLOW_TASK_SECONDS = 0.25
+
+
+class _Task:
+    __slots__ = ("name", "callback", "interval", "jitter", "idle_interval", "due", "runs", "total", "longest", "last", "error", "slow")
+
+    def __init__(self, name, callback, interval, jitter, idle_interval, due):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.jitter = jitter
+        self.idle_interval = idle_interval
+        self.due = due
+        self.runs = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.last = 0.0
+        self.error = ""
+        self.slow = False
+
+
+class TkScheduler:
+    """Runs a Tk root's periodic tasks from one `after` timer.
+
+    Each task has its own interval plus up to `jitter` seconds of random delay, so tasks
+    drift apart instead of waking together forever; tasks that do fall due together run in
+    one wakeup. While `is_idle()` holds (by default: the root is withdrawn to the tray or
+    iconified) a task waits `idle_interval` instead, and mapping the root again runs every
+    task promptly. Run times are kept per task (see stats()); a task is logged when it turns
+    slow or starts failing, not on every such run.
+    """
+
+    def __init__(
+        self,
+        root,
+        is_idle: Optional[Callable[[], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.root = root
+        self._is_idle = is_idle or self._root_hidden
+        self._clock = clock
+        self._tasks: dict[str, _Task] = {}
+        self._job = None
+        self._job_due: Optional[float] = None
+        self._running = False
+        self._stopped = False
+        self._idle = False
+        try:
+            root.bind("<Map>", self._on_map, add="+")
+        except Exception:
+            pass
+
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        interval: float,
+        jitter: float = 0.0,
+        idle_interval: Optional[float] = None,
+        delay: Optional[float] = None,
+    ) -> None:
+        """Run `callback` every `interval` seconds, first after `delay` (default: one interval).
+
+        Adding a name that is already registered replaces that task.
+        """
+        interval = max(0.01, float(interval))
+        idle = interval * IDLE_SLOWDOWN if idle_interval is None else max(interval, float(idle_interval))
+        first = interval if delay is None else max(0.0, float(delay))
+        self._tasks[name] = _Task(name, callback, interval, max(0.0, float(jitter)), idle, self._clock() + first)
+        self._schedule()
+
+    def remove(self, name: str) -> None:
+        if self._tasks.pop(name, None) is not None:
+            self._schedule()
+
+    def has(self, name: str) -> bool:
+        return name in self._tasks
+
+    def wake(self, name: Optional[str] = None) -> None:
+        """Run one task (or all of them) at the next wakeup."""
+        now = self._clock()
+        for task in self._tasks.values():
+            if name is None or task.name == name:
+                task.due = min(task.due, now)
+        self._schedule()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._cancel()
+        self._tasks = {}
+
+    def stats(self) -> dict[str, dict]:
+        """Per task: runs, total/longest/last run time in seconds, and the current interval."""
+        return {
+            task.name: {
+                "runs": task.runs,
+                "total": task.total,
+                "longest": task.longest,
+                "last": task.last,
+                "interval": task.idle_interval if self._idle else task.interval,
+            }
+            for task in self._tasks.values()
+        }
+
+    def _root_hidden(self) -> bool:
+        try:
+            return self.root.state() in ("withdrawn", "iconic")
+        except Exception:
+            return False
+
+    def _on_map(self, event) -> None:
+        if getattr(event, "widget", self.root) is self.root and self._idle:
+            self._idle = False
+            self.wake()
+
+    def _cancel(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = None
+        self._job_due = None
+
+    def _schedule(self) -> None:
+        if self._running or self._stopped:
+            return
+        if not self._tasks:
+            self._cancel()
+            return
+        due = min(task.due for task in self._tasks.values())
+        if self._job is not None and self._job_due is not None and self._job_due <= due:
+            return
+        self._cancel()
+        delay_ms = max(0, int((due - self._clock()) * 1000))
+        try:
+            self._job = self.root.after(delay_ms, self._tick)
+            self._job_due = due
+        except Exception:
+            self._job = None
+
+    def _tick(self) -> None:
+        self._job = None
+        self._job_due = None
+        if self._stopped:
+            return
+        idle = bool(self._is_idle())
+        now = self._clock()
+        if self._idle and not idle:
+            # Back from the tray: pull idle-length deadlines in to the normal interval.
+            for task in self._tasks.values():
+                task.due = min(task.due, now + task.interval)
+        self._idle = idle
+        self._running = True
+        try:
+            due = sorted(
+                (task for task in self._tasks.values() if task.due <= now + COALESCE_SECONDS),
+                key=lambda task: task.due,
+            )
+            for task in due:
+                if self._tasks.get(task.name) is not task:
+                    continue  # removed or replaced by an earlier task this tick
+                self._run(task)
+        finally:
+            self._running = False
+        self._schedule()
+
+    def _run(self, task: _Task) -> None:
+        started = self._clock()
+        try:
+            task.callback()
+        except Exception as exc:
+            # Log a failing task once per distinct error rather than on every run.
+            if str(exc) != task.error:
+                task.error = str(exc)
+                log_event("ui.scheduler.task_failed", {"task": task.name, "error": task.error})
+        else:
+            task.error = ""
+        elapsed = self._clock() - started
+        task.runs += 1
+        task.total += elapsed
+        task.last = elapsed
+        task.longest = max(task.longest, elapsed)
+        # Likewise a task that stays slow is logged when it turns slow, not on every run.
+        if elapsed < SLOW_TASK_SECONDS:
+            task.slow = False
+        elif not task.slow:
+            task.slow = True
+            log_event("ui.scheduler.slow_task", {"task": task.name, "ms": round(elapsed * 1000)})
+        interval = task.idle_interval if self._idle else task.interval
+        task.due = self._clock() + interval + (random.uniform(0.0, task.jitter) if task.jitter else 0.0)
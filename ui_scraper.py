@@ -16,7 +16,7 @@ from pathlib import Path
 from datetime import datetime, timezone
 from queue import Queue, Empty
 from capture import install_playwright_browsers, CaptureWorker
-from exports import export_html_auto, export_size_warning, init_exports, set_exports_dir
+from exports import export_html_auto, export_size_warning, init_exports, latest_export_path, set_exports_dir
 from export_server import start_export_server as srv_start_export_server, stop_export_server as srv_stop_export_server
 from ui_settings import open_settings_window
 from app_core import (  # shared globals/imports
@@ -42,7 +42,7 @@ from app_core import (  # shared globals/imports
     SCRAPER_STATE_FILE,
 )
 from config import decrypt_secret, encrypt_secret, load_capture_config, save_capture_config, load_tracker_config
-from scraper_state import write_scraper_state, get_last_change, get_last_scrape
+from scraper_state import write_scraper_state, get_last_change, get_last_scrape, read_scraper_state
 from parser import (
     parse_api_payloads,
     make_item_key,
@@ -57,6 +57,8 @@ from logger import UILogger
 from notifications import NotificationService
 from theme import apply_style_theme, set_titlebar_dark, compute_colors, set_palette_overrides
 from ui_window_chrome import apply_dark_titlebar
+from ui_scheduler import TkScheduler
+from file_watcher import file_stamp
 from resources import resource_path
 from history_viewer import open_history_window
 from ui_scraper_status import (
@@ -246,7 +248,11 @@ class App(tk.Tk):
         except Exception:
             pass
         self.apply_theme()
-        self.after(2000, self._refresh_theme_from_config)
+        # One timer for the window's periodic work (created after the <Map> binding above,
+        # which would otherwise replace the scheduler's).
+        self.scheduler = TkScheduler(self)
+        self.scheduler.add("theme", self._refresh_theme_from_config, 2.0, jitter=0.3, idle_interval=10.0)
+        self.scheduler.add("state_labels", self._refresh_state_labels, 5.0, jitter=0.5, idle_interval=30.0)
         self._apply_log_window_visibility()
         # Ensure dark titlebar sticks (especially in frozen builds)
         try:
@@ -260,7 +266,7 @@ class App(tk.Tk):
         else:
             self.after(0, self._show_scraper_window)
         self.after(50, self._apply_log_window_visibility)
-        self.after(500, self._poll_external_commands)
+        self.scheduler.add("external_commands", self._poll_external_commands, 0.8, jitter=0.1, idle_interval=1.5, delay=0.5)
 
     def _show_scraper_window(self) -> None:
         try:
@@ -287,10 +293,6 @@ class App(tk.Tk):
                 self._apply_external_command(payload)
         except Exception as exc:
             self._debug_log(f"Suppressed exception: {exc}")
-        try:
-            self.after(800, self._poll_external_commands)
-        except Exception as exc:
-            self._debug_log(f"Suppressed exception: {exc}")
 
     def _read_external_command(self) -> dict | None:
         path = SCRAPER_COMMAND_FILE
@@ -531,11 +533,7 @@ class App(tk.Tk):
             return
         self._ensure_export_server()
         try:
-            latest_path = None
-            exports_dir = Path(EXPORTS_DIR_DEFAULT)
-            html_files = sorted(exports_dir.glob("export-*.html"), key=lambda p: p.stat().st_mtime, reverse=True)
-            if html_files:
-                latest_path = html_files[0]
+            latest_path = latest_export_path(Path(EXPORTS_DIR_DEFAULT))
             if latest_path and url.startswith("http://"):
                 self._open_url_with_fallback(url, latest_path)
             else:
@@ -545,13 +543,9 @@ class App(tk.Tk):
 
     def _latest_export_url(self) -> str | None:
         """Return URL (or file://) for latest export, preferring local server."""
-        exports_dir = Path(EXPORTS_DIR_DEFAULT)
-        if not exports_dir.exists():
+        latest = latest_export_path(Path(EXPORTS_DIR_DEFAULT))
+        if not latest:
             return None
-        html_files = sorted(exports_dir.glob("export-*.html"), key=lambda p: p.stat().st_mtime, reverse=True)
-        if not html_files:
-            return None
-        latest = html_files[0]
         if getattr(self, "server_port", None) and _port_ready("127.0.0.1", self.server_port):
             return f"http://127.0.0.1:{self.server_port}/flowerbrowser"
         return latest.as_uri()
@@ -1499,6 +1493,7 @@ class App(tk.Tk):
         # Always hide instead of exiting; capture continues running
         self._minimize_to_tray()
     def _exit_app(self):
+        self.scheduler.stop()
         try:
             # mark scraper stopped
             self._write_scraper_state("stopped")
@@ -1657,7 +1652,7 @@ class App(tk.Tk):
         threading.Thread(target=worker, daemon=True).start()
         if not self._polling:
             self._polling = True
-        self.after(50, self.poll)
+        self.scheduler.add("capture_queue", self.poll, 0.05, idle_interval=0.05, delay=0.05)
     def _stage_parse(self) -> list[dict]:
         """Parse stage (data already collected); returns a stable list snapshot."""
         items = list(self.data)
@@ -1773,6 +1768,10 @@ class App(tk.Tk):
         self._polling = False
 
     def poll(self):
+        if not self._polling:
+            # Processing finished (or gave up) on the previous run.
+            self.scheduler.remove("capture_queue")
+            return
         try:
             while True:
                 msg = self.q.get_nowait()
@@ -1821,21 +1820,6 @@ class App(tk.Tk):
                     return
         except Empty:
             pass
-        if self._polling:
-            self.after(50, self.poll)
-        # Update last change label periodically
-        try:
-            ts = get_last_change(SCRAPER_STATE_FILE)
-            if ts:
-                self.last_change_label.config(text=f"Last change detected: {ts}")
-        except Exception as exc:
-            self._debug_log(f"Suppressed exception: {exc}")
-        try:
-            ts = get_last_scrape(SCRAPER_STATE_FILE)
-            if ts:
-                self.last_scrape_label.config(text=f"Last successful scrape: {ts}")
-        except Exception as exc:
-            self._debug_log(f"Suppressed exception: {exc}")
     def _get_export_items(self):
         combined = list(self.data)
         if getattr(self, "removed_data", None):
@@ -2173,6 +2157,11 @@ class App(tk.Tk):
         except Exception as exc:
             self._debug_log(f"Suppressed exception: {exc}")
     def _refresh_theme_from_config(self):
+        # Theme and palette both live in the shared config; don't re-read it while unchanged.
+        stamp = file_stamp(CONFIG_FILE)
+        if stamp is not None and stamp == getattr(self, "_theme_config_stamp", None):
+            return
+        self._theme_config_stamp = stamp
         try:
             desired = bool(self._load_dark_mode())
             palette_changed = self._refresh_palette_overrides_from_config()
@@ -2181,10 +2170,18 @@ class App(tk.Tk):
                 self.apply_theme()
         except Exception as exc:
             self._debug_log(f"Suppressed exception: {exc}")
-        try:
-            self.after(2000, self._refresh_theme_from_config)
-        except Exception as exc:
-            self._debug_log(f"Suppressed exception: {exc}")
+
+    def _refresh_state_labels(self) -> None:
+        """Show last change/scrape times recorded in the scraper state file, read once per change."""
+        stamp = file_stamp(SCRAPER_STATE_FILE)
+        if stamp is None or stamp == getattr(self, "_state_labels_stamp", None):
+            return
+        self._state_labels_stamp = stamp
+        state = read_scraper_state(SCRAPER_STATE_FILE)
+        if state.get("last_change"):
+            self.last_change_label.config(text=f"Last change detected: {state['last_change']}")
+        if state.get("last_scrape"):
+            self.last_scrape_label.config(text=f"Last successful scrape: {state['last_scrape']}")
 
     def _refresh_palette_overrides_from_config(self) -> bool:
         try:
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import copy
 import json
 import csv
 import os
@@ -73,6 +74,8 @@ from ui_tracker_stock import (
     refresh_stock as _stock_refresh_stock,
     sort_stock as _stock_sort_stock,
 )
+from ui_tracker_chart import build_usage_chart as _chart_build_usage_chart
+from ui_tracker_history import open_log_history as _history_open_log_history
 from ui_tracker_log import (
     change_day as _log_change_day,
     delete_log_entry as _log_delete_log_entry,
@@ -87,28 +90,48 @@ from inventory import (
     TRACKER_DATA_FILE,
     TRACKER_LIBRARY_FILE,
     TRACKER_CONFIG_FILE,
+    TrackerJournal,
+    compact_tracker_data,
+    expand_tracker_data,
     load_tracker_data,
     save_tracker_data,
+    tracker_journal_path,
 )
-from storage import load_last_parse
+from storage import load_last_parse, save_last_parse
 from inventory import is_cbd_dominant
-from exports import export_html_auto, export_size_warning
+from exports import export_html_auto, export_size_warning, latest_export_path
 from export_server import start_export_server as srv_start_export_server, stop_export_server as srv_stop_export_server
 from config import load_tracker_config, save_tracker_config
 from inventory import Flower
+from usage_index import DailyUsageIndex
+from usage_stats import UsageSeries
+from log_history import LogHistory
+from log_archive import TrackerLogArchive, archive_cutoff, parse_archived_row_id
+from file_watcher import FileWatcher
+from persistence import PersistenceWorker
+from ui_scheduler import TkScheduler
 from network_mode import MODE_CLIENT, MODE_HOST, MODE_STANDALONE, get_mode as get_network_mode
 from network_sync import (
     DEFAULT_EXPORT_PORT,
     DEFAULT_NETWORK_PORT,
+    NETWORK_SERVER_MODES,
     fetch_tracker_meta,
-    fetch_library_data,
+    fetch_catalog_changes,
+    fetch_library_changes,
     fetch_tracker_data,
+    fetch_tracker_ops,
     network_ping,
-    push_library_data,
+    push_library_entries,
     push_tracker_data,
+    push_tracker_ops,
+    notify_network_data_changed,
     start_network_data_server,
     stop_network_data_server,
+    wait_for_network_change,
 )
+from catalog_sync import apply_catalog_changes
+from library_sync import apply_library_changes, diff_library_entries
+from tracker_ops import apply_tracker_ops, diff_tracker_documents
 try:
     from PIL import Image, ImageDraw, ImageTk
 except ImportError:  # Pillow may not be installed; tray icon will be disabled
@@ -246,10 +269,28 @@ class CannabisTracker:
         self.network_port = DEFAULT_NETWORK_PORT
         self.network_access_key = ""
         self.network_rate_limit_requests_per_minute = 0
+        self.network_server_mode = "threaded"
         self.network_server = None
         self.network_server_thread = None
         self._network_error_shown = False
         self._network_tracker_mtime = 0.0
+        # Last tracker document known to match the host, and its position in the host op log.
+        self._network_sync_doc: dict | None = None
+        self._network_ops_seq: int | None = None
+        self._network_ops_epoch = ""
+        # Client-side replica of the host catalog (written to the local last parse file).
+        self._network_catalog_items: dict[str, dict] | None = None
+        self._network_catalog_version = 0
+        self._network_catalog_epoch = ""
+        self._network_catalog_ok = False
+        # Client-side replica of the host library, kept current from per-entry revisions.
+        self._network_library_entries: list[dict] | None = None
+        self._network_library_revision = 0
+        self._network_library_epoch = ""
+        self._network_library_lock = threading.Lock()
+        self._library_process_open = False
+        self._client_change_watch_thread: threading.Thread | None = None
+        self._client_change_watch_active = False
         self._client_disconnect_since = None
         self._client_disconnect_timeout_s = 30.0
         self._client_disconnect_closing = False
@@ -281,6 +322,12 @@ class CannabisTracker:
         self.current_date: date = date.today()
         self._last_seen_date: date = date.today()
         self._data_mtime: float | None = None
+        # Tracker data and config writes run off the Tk thread, debounced per file.
+        self._persistence = PersistenceWorker(on_error=self._on_persist_error)
+        # One timer for the window's periodic work; tasks are registered once the UI exists.
+        self.scheduler = TkScheduler(self.root)
+        self._persist_error_shown = False
+        self._saved_config: dict | None = None
         self._build_ui()
         self._ensure_storage_dirs()
         self._load_config()
@@ -302,6 +349,9 @@ class CannabisTracker:
         except Exception:
             self._restoring_split = False
         self._update_scraper_status_icon()
+        self.scheduler.add("clock", self._update_clock, 1.0, idle_interval=15.0)
+        self.scheduler.add("client_changes", self._poll_client_changes, 1.0, jitter=0.25, idle_interval=5.0)
+        self.scheduler.add("scraper_status", self._update_scraper_status_icon, 1.5, jitter=0.3, idle_interval=6.0)
 
     def _startup_data_init(self) -> None:
         try:
@@ -316,6 +366,7 @@ class CannabisTracker:
                 # Non-blocking client bootstrap: populate when network fetch completes.
                 self._network_bootstrap_ready = True
                 self._request_client_network_poll(initial=True)
+                self._start_client_change_watch()
             else:
                 self.load_data()
                 self._network_bootstrap_ready = True
@@ -380,13 +431,73 @@ class CannabisTracker:
 
         threading.Thread(target=worker, daemon=True, name="flowertrack-host-services").start()
 
-    def _request_client_network_poll(self, initial: bool = False) -> None:
+    def _start_client_change_watch(self) -> None:
+        """Hold a long-poll on the host so remote changes are pulled as soon as they happen.
+
+        While the watch is healthy the clock-driven meta polling is skipped; on errors it drops
+        back to polling, which also drives disconnect detection.
+        """
+        if self.network_mode != MODE_CLIENT:
+            return
+        existing = getattr(self, "_client_change_watch_thread", None)
+        if existing is not None and existing.is_alive():
+            return
+        host = (self.network_host or "").strip()
+        port = int(self.network_port)
+        access_key = str(getattr(self, "network_access_key", "") or "")
+
+        def worker() -> None:
+            epoch, tracker_seq, library_version = "", -1, -1
+            self._refresh_network_catalog()
+            while self.network_mode == MODE_CLIENT and not self._client_disconnect_closing:
+                reply = wait_for_network_change(
+                    host,
+                    port,
+                    tracker_seq,
+                    epoch,
+                    library_version,
+                    access_key=access_key,
+                    # Only watch the catalog once it has synced, so a failing fetch can't spin.
+                    catalog_version=self._network_catalog_version if self._network_catalog_ok else None,
+                )
+                if not isinstance(reply, dict):
+                    self._client_change_watch_active = False
+                    time.sleep(2.0)
+                    continue
+                if reply.get("error") == "rate_limited":
+                    time.sleep(max(1, int(reply.get("retry_after_seconds") or 2)))
+                    continue
+                if reply.get("error"):
+                    # Older host (404) or access problem: leave it to the regular poll.
+                    self._client_change_watch_active = False
+                    return
+                self._client_change_watch_active = True
+                epoch = str(reply.get("epoch") or "")
+                tracker_seq = int(reply.get("tracker_seq") or 0)
+                previous_library = library_version
+                library_version = int(reply.get("library_version") or 0)
+                if (epoch, tracker_seq) != (self._network_ops_epoch, self._network_ops_seq):
+                    try:
+                        self.root.after(0, lambda: self._request_client_network_poll(changed=True))
+                    except Exception:
+                        pass
+                if previous_library >= 0 and library_version != previous_library:
+                    self._refresh_network_library_cache()
+                catalog_version = reply.get("catalog_version")
+                if isinstance(catalog_version, int) and catalog_version != self._network_catalog_version:
+                    self._refresh_network_catalog()
+
+        thread = threading.Thread(target=worker, daemon=True, name="flowertrack-client-watch")
+        self._client_change_watch_thread = thread
+        thread.start()
+
+    def _request_client_network_poll(self, initial: bool = False, changed: bool = False) -> None:
         if self.network_mode != MODE_CLIENT:
             return
         # Throttle client polling so host-side optional rate limiting doesn't
         # trip during normal operation (clock tick can call this frequently).
         try:
-            if not initial:
+            if not initial and not changed:
                 min_interval = float(getattr(self, "_client_poll_min_interval_s", 2.0) or 2.0)
                 now = time.monotonic()
                 last = float(getattr(self, "_client_last_poll_request", 0.0) or 0.0)
@@ -403,6 +514,8 @@ class CannabisTracker:
         port = int(self.network_port)
         access_key = str(getattr(self, "network_access_key", "") or "")
         prev_mtime = float(getattr(self, "_network_tracker_mtime", 0.0) or 0.0)
+        ops_seq = getattr(self, "_network_ops_seq", None)
+        ops_epoch = str(getattr(self, "_network_ops_epoch", "") or "")
 
         def worker() -> None:
             result: dict[str, object] = {"ok": False, "initial": initial}
@@ -437,17 +550,35 @@ class CannabisTracker:
                     except Exception:
                         remote_mtime = 0.0
                     result = {"ok": True, "mtime": remote_mtime, "initial": initial}
-                    if initial or (remote_mtime > 0 and remote_mtime > prev_mtime):
-                        data = fetch_tracker_data(
+                    if initial or changed or (remote_mtime > 0 and remote_mtime > prev_mtime):
+                        delta = fetch_tracker_ops(
                             host,
                             port,
+                            since=ops_seq if ops_seq is not None else 0,
+                            epoch=ops_epoch if ops_seq is not None else "",
                             timeout=1.5 if initial else 1.0,
                             access_key=access_key,
                         )
-                        if isinstance(data, dict):
-                            result["data"] = data
+                        if isinstance(delta, dict):
+                            result["ops_since"] = ops_seq
+                            result["ops_seq"] = delta.get("seq")
+                            result["ops_epoch"] = delta.get("epoch")
+                            if isinstance(delta.get("snapshot"), dict):
+                                result["data"] = delta["snapshot"]
+                            else:
+                                result["ops"] = list(delta.get("ops") or [])
                         else:
-                            result = {"ok": False, "initial": initial}
+                            # Host without the ops endpoint: fall back to the full document.
+                            data = fetch_tracker_data(
+                                host,
+                                port,
+                                timeout=1.5 if initial else 1.0,
+                                access_key=access_key,
+                            )
+                            if isinstance(data, dict):
+                                result["data"] = data
+                            else:
+                                result = {"ok": False, "initial": initial}
             except Exception:
                 result = {"ok": False, "initial": initial}
             finally:
@@ -535,9 +666,29 @@ class CannabisTracker:
             remote_mtime = float(result.get("mtime") or 0.0)
         except Exception:
             remote_mtime = 0.0
+        data = result.get("data")
+        if "ops_seq" in result:
+            if result.get("ops_since") != getattr(self, "_network_ops_seq", None):
+                # A local save moved the op cursor while this poll was in flight; the next poll catches up.
+                return
+            ops = result.get("ops")
+            base = getattr(self, "_network_sync_doc", None)
+            if not isinstance(data, dict) and isinstance(ops, list) and ops:
+                try:
+                    data = apply_tracker_ops(base, ops) if isinstance(base, dict) else None
+                except ValueError:
+                    data = None
+                if data is None:
+                    # Cannot replay onto our copy; request a snapshot on the next poll.
+                    self._network_ops_seq = None
+                    return
+            try:
+                self._network_ops_seq = int(result.get("ops_seq") or 0)
+            except Exception:
+                self._network_ops_seq = None
+            self._network_ops_epoch = str(result.get("ops_epoch") or "")
         if remote_mtime > 0:
             self._network_tracker_mtime = remote_mtime
-        data = result.get("data")
         if isinstance(data, dict):
             self._apply_loaded_tracker_data(data, remote_mtime=remote_mtime)
             self._refresh_stock()
@@ -638,14 +789,14 @@ class CannabisTracker:
             return
         exports_dir = Path(EXPORTS_DIR_DEFAULT)
         exports_dir.mkdir(parents=True, exist_ok=True)
-        html_files = sorted(exports_dir.glob("export-*.html"), key=lambda p: p.stat().st_mtime, reverse=True)
+        latest = latest_export_path(exports_dir)
         def _needs_template_refresh(path: Path) -> bool:
             try:
                 text = path.read_text(encoding="utf-8", errors="ignore")
             except Exception:
                 return False
             return ("header-logo-link" not in text) or ("Medicann.png" not in text)
-        if not html_files:
+        if not latest:
             try:
                 data = load_last_parse(LAST_PARSE_FILE) or []
                 if not data:
@@ -655,17 +806,14 @@ class CannabisTracker:
                 warn = export_size_warning(latest)
                 if warn:
                     messagebox.showwarning("Export size warning", warn)
-                html_files = [latest]
             except Exception as exc:
                 messagebox.showinfo("Flower Browser", f"Unable to generate export: {exc}")
                 return
-        latest = html_files[0]
         if _needs_template_refresh(latest):
             try:
                 data = load_last_parse(LAST_PARSE_FILE) or []
                 if data:
                     latest = export_html_auto(data, exports_dir=exports_dir, open_file=False, fetch_images=False, max_files=1)
-                    html_files = [latest]
             except Exception:
                 pass
         url = latest.as_uri()
@@ -702,6 +850,12 @@ class CannabisTracker:
                 return True
             tracker_path = Path(self.data_path or TRACKER_DATA_FILE)
             library_path = Path(self.library_data_path or TRACKER_LIBRARY_FILE)
+            self._flush_persistence()
+            if tracker_journal_path(tracker_path).exists():
+                # Clients are served the snapshot, so fold in ops journaled in standalone mode.
+                folded = load_tracker_data(tracker_path, logger=self._log_network)
+                if folded:
+                    save_tracker_data(folded, path=tracker_path, logger=self._log_network)
             httpd, thread, port = start_network_data_server(
                 bind_host=self.network_bind_host,
                 preferred_port=self.network_port,
@@ -712,6 +866,8 @@ class CannabisTracker:
                 rate_limit_requests_per_minute=int(
                     max(0, int(getattr(self, "network_rate_limit_requests_per_minute", 0) or 0))
                 ),
+                server_mode=str(getattr(self, "network_server_mode", "threaded") or "threaded"),
+                catalog_path=Path(LAST_PARSE_FILE),
             )
             if httpd and port:
                 self.network_server = httpd
@@ -734,6 +890,18 @@ class CannabisTracker:
         host = (self.network_host or "").strip()
         if not host:
             return None
+        snapshot = fetch_tracker_ops(
+            host,
+            int(self.network_port),
+            since=0,
+            access_key=str(getattr(self, "network_access_key", "") or ""),
+        )
+        if isinstance(snapshot, dict) and isinstance(snapshot.get("snapshot"), dict):
+            self._network_ops_seq = int(snapshot.get("seq") or 0)
+            self._network_ops_epoch = str(snapshot.get("epoch") or "")
+            self._network_error_shown = False
+            return snapshot["snapshot"]
+        self._network_ops_seq = None
         data = fetch_tracker_data(
             host,
             int(self.network_port),
@@ -744,7 +912,7 @@ class CannabisTracker:
             return data
         return None
 
-    def _push_network_tracker_data(self, data: dict) -> bool:
+    def _push_network_tracker_data(self, data: dict, if_match: str | None = None) -> bool:
         host = (self.network_host or "").strip()
         if not host:
             return False
@@ -753,38 +921,148 @@ class CannabisTracker:
             int(self.network_port),
             data,
             access_key=str(getattr(self, "network_access_key", "") or ""),
+            if_match=if_match,
         )
         if ok:
             self._network_error_shown = False
         return ok
 
-    def _fetch_network_library_data(self) -> list[dict] | None:
+    def _push_network_tracker_changes(self, data: dict) -> bool:
+        """Send only the ops since the last synced document, falling back to a full upload."""
         host = (self.network_host or "").strip()
         if not host:
-            return None
-        data = fetch_library_data(
+            return False
+        data = compact_tracker_data(data)
+        base = getattr(self, "_network_sync_doc", None)
+        seq = getattr(self, "_network_ops_seq", None)
+        if isinstance(base, dict) and seq is not None:
+            ops = diff_tracker_documents(base, data)
+            if not ops:
+                return True
+            reply = push_tracker_ops(
+                host,
+                int(self.network_port),
+                ops,
+                base_seq=seq,
+                epoch=self._network_ops_epoch,
+                access_key=str(getattr(self, "network_access_key", "") or ""),
+            )
+            if isinstance(reply, dict) and reply.get("ok"):
+                self._network_error_shown = False
+                applied = list(reply.get("ops") or [])
+                try:
+                    merged = apply_tracker_ops(base, applied)
+                except ValueError:
+                    merged = data
+                self._network_ops_seq = int(reply.get("seq") or 0)
+                self._network_sync_doc = copy.deepcopy(merged)
+                if applied != ops:
+                    # Other clients wrote in between; show the host's merged document.
+                    mtime = self._network_tracker_mtime
+                    self.root.after(0, lambda d=merged, m=mtime: self._apply_network_tracker_doc(d, m))
+                return True
+        # Guard the full upload with the synced version so the host merges instead of clobbering.
+        if_match = f"{self._network_ops_epoch}.{seq}" if seq is not None and self._network_ops_epoch else None
+        ok = self._push_network_tracker_data(data, if_match=if_match)
+        if ok:
+            # Re-anchor on a host snapshot at the next poll.
+            self._network_sync_doc = copy.deepcopy(data)
+            self._network_ops_seq = None
+        return ok
+
+    def _apply_network_tracker_doc(self, data: dict, remote_mtime: float) -> None:
+        if self.network_mode != MODE_CLIENT:
+            return
+        self._apply_loaded_tracker_data(data, remote_mtime=remote_mtime)
+        self._refresh_stock()
+        self._refresh_log()
+
+    def _refresh_network_library_cache(self, write: bool = False) -> bool:
+        """Pull library entry changes from the host into the local replica (client mode).
+
+        The local library file is rewritten when something changed (or `write` is set), but
+        not while the library window is open: it owns the file until it exits.
+        """
+        host = (self.network_host or "").strip()
+        if not host:
+            return False
+        with self._network_library_lock:
+            payload = fetch_library_changes(
+                host,
+                int(self.network_port),
+                since=self._network_library_revision,
+                epoch=self._network_library_epoch,
+                access_key=str(getattr(self, "network_access_key", "") or ""),
+            )
+            if not isinstance(payload, dict):
+                return False
+            try:
+                entries = apply_library_changes(self._network_library_entries or [], payload)
+            except ValueError:
+                # Resync from scratch on the next refresh.
+                self._network_library_revision = 0
+                self._network_library_epoch = ""
+                return False
+            self._network_error_shown = False
+            self._network_library_entries = entries
+            self._network_library_revision = int(payload.get("revision") or 0)
+            self._network_library_epoch = str(payload.get("epoch") or "")
+            changed = bool(payload.get("full") or payload.get("entries") or payload.get("deleted"))
+            if (changed or write) and not self._library_process_open:
+                try:
+                    lib_path = Path(self.library_data_path or TRACKER_LIBRARY_FILE)
+                    lib_path.parent.mkdir(parents=True, exist_ok=True)
+                    lib_path.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+                except Exception:
+                    pass
+            return True
+
+    def _refresh_network_catalog(self) -> None:
+        """Pull catalog changes from the host into the local last parse replica (client mode)."""
+        if self.network_mode != MODE_CLIENT:
+            return
+        host = (self.network_host or "").strip()
+        if not host:
+            return
+        payload = fetch_catalog_changes(
             host,
             int(self.network_port),
+            since=self._network_catalog_version,
+            epoch=self._network_catalog_epoch,
             access_key=str(getattr(self, "network_access_key", "") or ""),
         )
-        if isinstance(data, list):
-            self._network_error_shown = False
-            return data
-        return None
+        if not isinstance(payload, dict):
+            self._network_catalog_ok = False
+            return
+        try:
+            items = apply_catalog_changes(self._network_catalog_items or {}, payload)
+        except ValueError:
+            # Resync from scratch on the next refresh.
+            self._network_catalog_version = 0
+            self._network_catalog_ok = False
+            return
+        self._network_catalog_items = items
+        self._network_catalog_version = int(payload.get("version") or 0)
+        self._network_catalog_epoch = str(payload.get("epoch") or "")
+        self._network_catalog_ok = True
+        if payload.get("full") or payload.get("upserts") or payload.get("removed"):
+            # Mixcalc, stock features and the local browser read this file.
+            save_last_parse(LAST_PARSE_FILE, list(items.values()))
 
-    def _push_network_library_data(self, data: list[dict]) -> bool:
+    def _push_network_library_entries(self, upserts: list[dict], deletes: list[dict]) -> dict | None:
         host = (self.network_host or "").strip()
         if not host:
-            return False
-        ok = push_library_data(
+            return None
+        reply = push_library_entries(
             host,
             int(self.network_port),
-            data,
+            upserts,
+            deletes,
             access_key=str(getattr(self, "network_access_key", "") or ""),
         )
-        if ok:
+        if isinstance(reply, dict) and reply.get("ok"):
             self._network_error_shown = False
-        return ok
+        return reply
 
     def _ensure_export_server(self) -> bool:
         try:
@@ -1097,6 +1375,9 @@ class CannabisTracker:
         ttk.Button(log_actions, text="Stats", width=8, command=lambda: self._show_stats_window("day")).grid(
             row=0, column=3, sticky="e"
         )
+        ttk.Button(log_actions, text="History", width=8, command=self._open_log_history).grid(
+            row=0, column=4, padx=(6, 0), sticky="e"
+        )
         self.stock_tree.bind("<<TreeviewSelect>>", self._on_stock_select)
         self.stock_tree.bind("<ButtonRelease-1>", self._maybe_clear_stock_selection)
         self.log_tree.bind("<ButtonRelease-1>", self._maybe_clear_log_selection)
@@ -1956,72 +2237,31 @@ class CannabisTracker:
 
     def _apply_stock_sort(self) -> None:
         _stock_apply_stock_sort(self)
+    def _usage_index(self) -> DailyUsageIndex:
+        index = getattr(self, "usage_index", None)
+        if index is None:
+            index = self.usage_index = DailyUsageIndex(self._log_is_cbd_dominant)
+        return index.sync(self.logs)
     def _grams_used_on_day(self, day: date) -> float:
-        day_str = day.isoformat()
-        return sum(
-            log.get("grams_used", 0.0)
-            for log in self.logs
-            if log.get("date") == day_str and self._log_counts_for_totals(log)
-        )
+        return self._usage_index().thc_grams(day, self._flower_counts_for_totals)
     def _grams_used_on_day_cbd(self, day: date) -> float:
-        day_str = day.isoformat()
-        return sum(
-            log.get("grams_used", 0.0)
-            for log in self.logs
-            if log.get("date") == day_str and self._log_counts_for_cbd(log)
-        )
-    def _average_daily_usage(self) -> float | None:
-        if not self.logs:
-            return None
-        cutoff = None
+        return self._usage_index().cbd_grams(day)
+    def _average_usage_cutoff(self) -> date | None:
         try:
             days = int(self.avg_usage_days)
         except Exception:
             days = 0
-        if days > 0:
-            cutoff = date.today() - timedelta(days=days - 1)
-        usage_by_day: dict[str, float] = {}
-        for log in self.logs:
-            if not self._log_counts_for_totals(log):
-                continue
-            day = log.get("date")
-            if cutoff is not None:
-                try:
-                    log_date = datetime.fromisoformat(day).date()
-                except Exception:
-                    continue
-                if log_date < cutoff:
-                    continue
-            usage_by_day[day] = usage_by_day.get(day, 0.0) + float(log.get("grams_used", 0.0))
-        if not usage_by_day:
+        return date.today() - timedelta(days=days - 1) if days > 0 else None
+    def _average_daily_usage(self) -> float | None:
+        totals = self._usage_index().daily_totals(self._flower_counts_for_totals, start=self._average_usage_cutoff())
+        if not totals:
             return None
-        return sum(usage_by_day.values()) / len(usage_by_day)
+        return sum(totals) / len(totals)
     def _average_daily_usage_cbd(self) -> float | None:
-        if not self.logs:
+        totals = self._usage_index().daily_totals(start=self._average_usage_cutoff())
+        if not totals:
             return None
-        cutoff = None
-        try:
-            days = int(self.avg_usage_days)
-        except Exception:
-            days = 0
-        if days > 0:
-            cutoff = date.today() - timedelta(days=days - 1)
-        usage_by_day: dict[str, float] = {}
-        for log in self.logs:
-            if not self._log_counts_for_cbd(log):
-                continue
-            day = log.get("date")
-            if cutoff is not None:
-                try:
-                    log_date = datetime.fromisoformat(day).date()
-                except Exception:
-                    continue
-                if log_date < cutoff:
-                    continue
-            usage_by_day[day] = usage_by_day.get(day, 0.0) + float(log.get("grams_used", 0.0))
-        if not usage_by_day:
-            return None
-        return sum(usage_by_day.values()) / len(usage_by_day)
+        return sum(totals) / len(totals)
     def _update_clock(self) -> None:
         now = datetime.now()
         self.clock_label.config(text=now.strftime("%H:%M"))
@@ -2033,17 +2273,11 @@ class CannabisTracker:
             # Recompute today-based metrics and refresh the displayed day
             self._refresh_stock()
             self._refresh_log()
-        self._maybe_reload_external()
-        self.root.after(1000, self._update_clock)
-    def _compute_stats(self, logs_subset: list[dict[str, float]]) -> dict[str, str]:
-        times = []
-        doses = []
-        for log in logs_subset:
-            try:
-                times.append(datetime.strptime(log["time"], "%Y-%m-%d %H:%M"))
-            except Exception:
-                continue
-            doses.append(float(log.get("grams_used", 0.0)))
+    def _poll_client_changes(self) -> None:
+        if self.network_mode == MODE_CLIENT:
+            # Local files are watched by the data file watcher instead.
+            self._maybe_reload_external()
+    def _compute_stats(self, series: UsageSeries) -> dict[str, str]:
         stats = {
             "first_time": "N/A",
             "last_time": "N/A",
@@ -2053,22 +2287,20 @@ class CannabisTracker:
             "min_dose": "N/A",
             "avg_dose": "N/A",
         }
-        if times:
-            times_sorted = sorted(times)
-            stats["first_time"] = times_sorted[0].strftime("%H:%M")
-            stats["last_time"] = times_sorted[-1].strftime("%H:%M")
-            if len(times_sorted) > 1:
-                intervals = [
-                    (t2 - t1).total_seconds() for t1, t2 in zip(times_sorted[:-1], times_sorted[1:])
-                ]
-                non_zero_intervals = [sec for sec in intervals if sec > 0]
-                if non_zero_intervals:
-                    stats["avg_interval"] = self._format_interval(sum(non_zero_intervals) / len(non_zero_intervals))
-                stats["max_interval"] = self._format_interval(max(intervals))
+        if series.minutes:
+            first, last = series.minutes[0] % 1440, series.minutes[-1] % 1440
+            stats["first_time"] = f"{first // 60:02d}:{first % 60:02d}"
+            stats["last_time"] = f"{last // 60:02d}:{last % 60:02d}"
+            avg_interval, max_interval = series.interval_stats()
+            if avg_interval is not None:
+                stats["avg_interval"] = self._format_interval(avg_interval)
+            if max_interval is not None:
+                stats["max_interval"] = self._format_interval(max_interval)
+        doses = series.dose_stats()
         if doses:
-            stats["max_dose"] = f"{max(doses):.3f} g"
-            stats["min_dose"] = f"{min(doses):.3f} g"
-            stats["avg_dose"] = f"{(sum(doses)/len(doses)):.3f} g"
+            stats["min_dose"] = f"{doses[0]:.3f} g"
+            stats["max_dose"] = f"{doses[1]:.3f} g"
+            stats["avg_dose"] = f"{doses[2]:.3f} g"
         return stats
     @staticmethod
     def _format_interval(seconds: float) -> str:
@@ -2093,7 +2325,7 @@ class CannabisTracker:
             ttk.Label(self.stats_frame, text=value, font=self.font_body, anchor="e").grid(
                 row=idx, column=1, sticky="e", padx=(0, 12), pady=(0, 2)
             )
-    def _logs_for_period(self, period: str) -> tuple[list[dict[str, float]], str, int]:
+    def _period_bounds(self, period: str) -> tuple[date, date, str]:
         end_date = self.current_date
         if period == "day":
             start_date = end_date
@@ -2110,29 +2342,58 @@ class CannabisTracker:
         else:
             start_date = end_date
             label = f"Day ({end_date.isoformat()})"
-        logs_subset = []
-        for log in self.logs:
-            try:
-                log_date = datetime.fromisoformat(log["date"]).date()
-            except Exception:
-                continue
-            if start_date <= log_date <= end_date:
-                logs_subset.append(log)
+        return start_date, end_date, label
+    def _logs_for_period(self, period: str) -> tuple[list[dict[str, float]], str, int]:
+        start_date, end_date, label = self._period_bounds(period)
+        logs_subset = [self.logs[idx] for idx in self._usage_index().indices_between(start_date, end_date)]
+        archive = self._log_archive()
+        if archive is not None:
+            # Older months are read from the archive only when a period reaches back into them.
+            logs_subset = archive.logs_between(start_date, end_date) + logs_subset
         days_count = (end_date - start_date).days + 1
         return logs_subset, label, max(days_count, 1)
+    def _usage_series(self) -> UsageSeries:
+        """Time-ordered usage arrays over the live logs, rebuilt only after the logs change."""
+        index = self._usage_index()
+        cached = getattr(self, "_usage_series_cache", None)
+        if cached is None or cached[0] is not index or cached[1] != index.generation:
+            cached = self._usage_series_cache = (
+                index,
+                index.generation,
+                UsageSeries.from_logs(self.logs, self._log_counts_for_cbd),
+            )
+        return cached[2]
+    def _usage_series_between(self, start_date: date, end_date: date) -> UsageSeries:
+        series = self._usage_series().between(start_date, end_date)
+        archive = self._log_archive()
+        if archive is not None:
+            archived = archive.logs_between(start_date, end_date)
+            if archived:
+                series = UsageSeries.from_logs(archived, self._log_counts_for_cbd).merge(series)
+        return series
+    def _log_history(self) -> LogHistory:
+        """Full-history log indexes for the dose history window, rebuilt only after the logs change."""
+        index = self._usage_index()
+        key = (index, index.generation)
+        if getattr(self, "_log_history_key", None) != key:
+            self._log_history_cache = LogHistory(self.logs, self._log_archive())
+            self._log_history_key = key
+        return self._log_history_cache
+    def _open_log_history(self) -> None:
+        _history_open_log_history(self)
+    def _series_for_period(self, period: str) -> tuple[UsageSeries, str, int]:
+        start_date, end_date, label = self._period_bounds(period)
+        days_count = (end_date - start_date).days + 1
+        return self._usage_series_between(start_date, end_date), label, max(days_count, 1)
     def _stats_text(
         self,
-        logs_subset: list[dict[str, float]],
+        series: UsageSeries,
         label: str,
         days_count: int,
         return_title: bool = False,
     ) -> str | tuple[str, list[tuple[str, str]]]:
-        stats = self._compute_stats(logs_subset)
-        thc_total = sum(
-            float(log.get("grams_used", 0.0))
-            for log in logs_subset
-            if not self._log_counts_for_cbd(log)
-        )
+        stats = self._compute_stats(series)
+        thc_total, cbd_total = series.totals()
         avg_daily = thc_total / max(days_count, 1)
         rows = [
             ("Average interval", stats["avg_interval"]),
@@ -2144,11 +2405,6 @@ class CannabisTracker:
             ("Total THC usage", f"{thc_total:.3f} g"),
         ]
         if getattr(self, "track_cbd_flower", False):
-            cbd_total = sum(
-                float(log.get("grams_used", 0.0))
-                for log in logs_subset
-                if self._log_counts_for_cbd(log)
-            )
             cbd_avg_daily = cbd_total / max(days_count, 1)
             rows.extend(
                 [
@@ -2162,8 +2418,8 @@ class CannabisTracker:
         return body
     def _copy_stats_to_clipboard(self, period: str) -> None:
         try:
-            logs_for_period, label, days_count = self._logs_for_period(period)
-            title, stats_list = self._stats_text(logs_for_period, label, days_count, return_title=True)
+            series, label, days_count = self._series_for_period(period)
+            title, stats_list = self._stats_text(series, label, days_count, return_title=True)
             lines = [title, ""]
             lines.extend(f"{label}: {value}" for label, value in stats_list)
             text = "\n".join(lines)
@@ -2173,8 +2429,9 @@ class CannabisTracker:
             messagebox.showinfo("Copy stats", "Copied stats to clipboard.")
         except Exception as exc:
             messagebox.showerror("Copy stats", f"Could not copy stats:\n{exc}")
-    def save_data(self) -> None:
-        data = {
+    def _tracker_document(self) -> dict:
+        """The in-memory tracker state as the document save_data writes."""
+        return {
             "flowers": [
                 {
                     "name": f.name,
@@ -2217,8 +2474,11 @@ class CannabisTracker:
             "enable_stock_coloring": self.enable_stock_coloring,
             "enable_usage_coloring": self.enable_usage_coloring,
         }
+
+    def save_data(self) -> None:
+        data = self._tracker_document()
         if self.network_mode == MODE_CLIENT:
-            ok = self._push_network_tracker_data(data)
+            ok = self._push_network_tracker_changes(data)
             if not ok:
                 if not self._network_error_shown:
                     self._network_error_shown = True
@@ -2230,10 +2490,56 @@ class CannabisTracker:
                 self._update_data_mtime(reset=True)
             self._save_config()
             return
-        save_tracker_data(data, path=Path(self.data_path), logger=lambda m: print(m))
+        # Log dicts are edited in place, so hand the worker copies of them.
+        data["logs"] = [dict(log) for log in self.logs]
+        path = Path(self.data_path)
+        store = self._tracker_store() if self.network_mode == MODE_STANDALONE else None
+
+        def write() -> None:
+            if store is not None:
+                # Appends the changed ops to the journal instead of rewriting the whole file.
+                store.save(data)
+            else:
+                # The host's data server reads the snapshot directly, so host mode writes it in full.
+                errors: list[str] = []
+                save_tracker_data(data, path=path, logger=errors.append)
+                if errors:
+                    raise OSError(errors[0])
+                notify_network_data_changed()
+            self._note_own_data_write(path)
+
+        self._persistence.submit(f"tracker:{path}", write)
         self._update_data_mtime()
         self._save_config()
-    def load_data(self) -> None:
+    def _note_own_data_write(self, path: Path) -> None:
+        """Record the mtime of a write we made (worker thread) so it isn't taken for an outside change."""
+        try:
+            if Path(self.data_path) == path:
+                self._data_mtime = os.path.getmtime(path)
+        except OSError:
+            pass
+        self._persist_error_shown = False
+    def _on_persist_error(self, key: str, exc: Exception) -> None:
+        try:
+            self.root.after(0, lambda: self._report_persist_error(key, exc))
+        except Exception:
+            print(f"Save failed ({key}): {exc}")
+    def _report_persist_error(self, key: str, exc: Exception) -> None:
+        print(f"Save failed ({key}): {exc}")
+        if self._persist_error_shown:
+            return
+        self._persist_error_shown = True
+        what = "settings" if key == "config" else "tracker data"
+        messagebox.showerror("Save failed", f"Could not save {what}:\n{exc}")
+    def _flush_persistence(self) -> None:
+        """Finish queued writes before reading the files back or handing them to another process."""
+        persistence = getattr(self, "_persistence", None)
+        if persistence is not None:
+            persistence.flush()
+    def load_data(self, data: dict | None = None) -> None:
+        """Load tracker data from the host or the local file; `data` is an already-parsed local document."""
+        if data is None:
+            self._flush_persistence()
         if self.network_mode == MODE_CLIENT:
             data = self._fetch_network_tracker_data()
             if not data:
@@ -2247,19 +2553,106 @@ class CannabisTracker:
                         f"Could not load tracker data from host {self.network_host}:{self.network_port}.",
                     )
                 return
-        else:
+        elif data is None:
             data = load_tracker_data(path=Path(self.data_path), logger=lambda m: print(m))
         if not data:
             messagebox.showwarning("No data", f"No tracker data found at {self.data_path}")
             self._update_data_mtime(reset=True)
             return
-        if self.network_mode != MODE_CLIENT:
-            loaded = load_tracker_data(path=Path(self.data_path), logger=lambda m: print(m))
-            if loaded:
-                data = loaded
+        if self.network_mode == MODE_HOST:
+            data = self._restore_archived_logs(data)
+        if self.network_mode == MODE_STANDALONE:
+            self._tracker_store().reset(data)
         self._apply_loaded_tracker_data(data)
+        if self.network_mode == MODE_STANDALONE:
+            self._archive_old_logs(data)
+
+    def _tracker_store(self) -> TrackerJournal:
+        """Journal-backed persistence for the local tracker file (standalone mode)."""
+        path = Path(self.data_path or TRACKER_DATA_FILE)
+        store = getattr(self, "_tracker_journal", None)
+        if store is None or store.path != path:
+            store = self._tracker_journal = TrackerJournal(path, logger=lambda m: print(m))
+        return store
+
+    def _log_archive(self) -> TrackerLogArchive | None:
+        """Month-partitioned archive of old logs next to the local tracker file (None for clients)."""
+        if self.network_mode == MODE_CLIENT:
+            return None
+        path = Path(self.data_path or TRACKER_DATA_FILE)
+        archive = getattr(self, "_tracker_log_archive", None)
+        if archive is None or archive.path != path:
+            archive = self._tracker_log_archive = TrackerLogArchive(path)
+        return archive
+
+    def _archive_old_logs(self, data: dict) -> None:
+        """Move logs from before the kept window into the archive and rewrite the snapshot."""
+        archive = self._log_archive()
+        if archive is None or not isinstance(data.get("logs"), list):
+            return
+        try:
+            kept = archive.archive(data["logs"], archive_cutoff(date.today()), self._log_is_cbd_dominant)
+        except Exception as exc:
+            print(f"Failed to archive old tracker logs: {exc}")
+            return
+        if kept is data["logs"]:
+            return
+        data["logs"] = self.logs = kept
+        save_tracker_data(data, path=Path(self.data_path), logger=lambda m: print(m))
+        self._tracker_store().reset(data)
+        self._usage_index().set_archived(archive.day_totals())
+        self._update_data_mtime()
+
+    def _restore_archived_logs(self, data: dict) -> dict:
+        """Fold archived logs back into the tracker file; the host serves clients the whole history."""
+        archive = self._log_archive()
+        if archive is None or not archive.months():
+            return data
+        logs = list(data.get("logs") or [])
+        try:
+            # Logs already folded in by a restore that stopped before clear() aren't added again.
+            restored = archive.logs_missing_from(logs)
+        except OSError as exc:
+            print(f"Failed to restore archived tracker logs: {exc}")
+            return data
+        data["logs"] = restored + logs
+        errors: list[str] = []
+        save_tracker_data(data, path=Path(self.data_path), logger=errors.append)
+        if errors:
+            print(errors[0])
+            return data
+        archive.clear()
+        notify_network_data_changed()
+        return data
+
+    def _archived_rows_on_day(self, day: date) -> list[tuple[str, dict]]:
+        archive = self._log_archive()
+        return archive.rows_on_day(day) if archive is not None else []
+
+    def _archived_log(self, row_id: str) -> dict | None:
+        archive = self._log_archive()
+        key = parse_archived_row_id(row_id)
+        return archive.log_at(*key) if archive is not None and key is not None else None
+
+    def _update_archived_log(self, row_id: str, log: dict | None) -> bool:
+        """Rewrite (or, with `log` None, delete) the archived log shown as `row_id`."""
+        archive = self._log_archive()
+        key = parse_archived_row_id(row_id)
+        if archive is None or key is None:
+            return False
+        try:
+            archive.update_log(key[0], key[1], log, self._log_is_cbd_dominant)
+        except OSError as exc:
+            print(f"Failed to update archived tracker log: {exc}")
+            return False
+        self._usage_index().set_archived(archive.day_totals())
+        return True
 
     def _apply_loaded_tracker_data(self, data: dict, remote_mtime: float | None = None) -> None:
+        if self.network_mode == MODE_CLIENT:
+            # The host serves logs in the compact on-disk form; keep that as the sync base.
+            self._network_sync_doc = copy.deepcopy(data)
+            expand_tracker_data(data)
         self.flowers = {}
         for item in data.get("flowers", []):
             self.flowers[item["name"]] = Flower(
@@ -2326,6 +2719,10 @@ class CannabisTracker:
                         log["is_cbd_dominant"] = float(log.get("cbd_mg", 0.0)) >= float(log.get("thc_mg", 0.0))
                     except Exception:
                         log["is_cbd_dominant"] = False
+        self.usage_index = DailyUsageIndex(self._log_is_cbd_dominant, self.logs)
+        archive = self._log_archive()
+        if archive is not None:
+            self.usage_index.set_archived(archive.day_totals())
         # Default to last logged day if available
         if self.logs:
             last_date = self.logs[-1].get("date")
@@ -2384,6 +2781,7 @@ class CannabisTracker:
         self._save_config()
         self._update_data_path_label()
     def _load_config(self) -> None:
+        self._flush_persistence()
         cfg = load_tracker_config(Path(TRACKER_CONFIG_FILE))
         self.data_path = cfg.get("data_path", str(TRACKER_DATA_FILE)) or str(TRACKER_DATA_FILE)
         self.library_data_path = cfg.get("library_data_path", str(TRACKER_LIBRARY_FILE)) or str(TRACKER_LIBRARY_FILE)
@@ -2416,6 +2814,8 @@ class CannabisTracker:
             )
         except Exception:
             self.network_rate_limit_requests_per_minute = 0
+        server_mode = str(cfg.get("network_server_mode", self.network_server_mode) or "").strip().lower()
+        self.network_server_mode = server_mode if server_mode in NETWORK_SERVER_MODES else "threaded"
         try:
             self.network_port = max(1, min(65535, int(cfg.get("network_port", self.network_port))))
         except Exception:
@@ -2584,10 +2984,16 @@ class CannabisTracker:
             "network_rate_limit_requests_per_minute": int(
                 max(0, int(getattr(self, "network_rate_limit_requests_per_minute", 0) or 0))
             ),
+            "network_server_mode": str(getattr(self, "network_server_mode", "threaded") or "threaded"),
             "network_port": int(self.network_port),
             "network_export_port": int(self.export_port),
         }
-        save_tracker_config(Path(TRACKER_CONFIG_FILE), cfg)
+        if cfg == getattr(self, "_saved_config", None):
+            # Nothing in the config changed since the last write.
+            return
+        snapshot = self._saved_config = copy.deepcopy(cfg)
+        config_path = Path(TRACKER_CONFIG_FILE)
+        self._persistence.submit("config", lambda: save_tracker_config(config_path, snapshot))
     def _settings_choose_data(self) -> None:
         self.choose_data_file()
     def _settings_export_data(self) -> None:
@@ -2646,6 +3052,7 @@ class CannabisTracker:
         except Exception as exc:
             messagebox.showerror("Backup failed", f"Could not create backup folder:\n{exc}")
             return
+        self._flush_persistence()
         try:
             count = self._write_backup_zip(zip_path)
         except Exception as exc:
@@ -2689,6 +3096,8 @@ class CannabisTracker:
         if confirmation != "CONFIRM":
             messagebox.showinfo("Import cancelled", "Backup import cancelled.")
             return
+        # Queued writes must not land on top of the restored files.
+        self._flush_persistence()
         try:
             self._restore_backup_zip(Path(path))
         except Exception as exc:
@@ -2979,23 +3388,74 @@ class CannabisTracker:
             self._data_mtime = os.path.getmtime(self.data_path)
         except OSError:
             self._data_mtime = None
+        self._ensure_data_watcher()
+    def _ensure_data_watcher(self) -> None:
+        """Watch the local tracker file for outside writes (mix calculator, restores, host clients)."""
+        watcher = getattr(self, "_data_watcher", None)
+        if self.network_mode == MODE_CLIENT or not self.data_path:
+            if watcher is not None:
+                watcher.stop()
+                self._data_watcher = None
+            return
+        path = Path(self.data_path)
+        if watcher is None:
+            def changed(_stamp) -> None:
+                try:
+                    self.root.after(0, self._maybe_reload_external)
+                except Exception:
+                    pass
+
+            self._data_watcher = FileWatcher(path, changed).start()
+        elif watcher.path != path:
+            watcher.set_path(path)
+    def _stop_data_watcher(self) -> None:
+        watcher = getattr(self, "_data_watcher", None)
+        if watcher is not None:
+            watcher.stop()
+            self._data_watcher = None
     def _maybe_reload_external(self) -> None:
         """Reload data if tracker file changed externally (e.g., mix calculator)."""
         if self.network_mode == MODE_CLIENT:
             if not bool(getattr(self, "_network_bootstrap_ready", False)):
                 return
+            if getattr(self, "_client_change_watch_active", False):
+                # The long-poll watch pulls changes as they happen; no need to poll meta.
+                return
             self._request_client_network_poll(initial=False)
             return
+        if self._persistence.pending():
+            # Our own write is queued or in flight; look again once it has landed.
+            self.root.after(300, self._maybe_reload_external)
+            return
         try:
             current = os.path.getmtime(self.data_path)
         except OSError:
             return
         prev = getattr(self, "_data_mtime", None)
+        store = getattr(self, "_tracker_journal", None)
+        if store is not None and store.snapshot_mtime == current:
+            # Our own journal compaction rewrote the snapshot.
+            self._data_mtime = current
+            return
         if prev is None or current > prev:
-            self.load_data()
-            self._refresh_stock()
-            self._refresh_log()
+            self._reload_external_data()
             self._data_mtime = current
+    def _reload_external_data(self) -> None:
+        """Parse the tracker file once and apply it only if it differs from what's on screen."""
+        self._flush_persistence()
+        data = load_tracker_data(path=Path(self.data_path), logger=lambda m: print(m))
+        if not data:
+            return
+        current = self._tracker_document()
+        # Keys the UI doesn't hold (schema_version, library_data_path, ...) can't change what it shows.
+        incoming = {key: value for key, value in data.items() if key in current}
+        if not diff_tracker_documents(current, incoming):
+            if self.network_mode == MODE_STANDALONE:
+                self._tracker_store().reset(data)
+            return
+        self.load_data(data)
+        self._refresh_stock()
+        self._refresh_log()
     def _place_window_at_pointer(self, win: tk.Toplevel) -> None:
         try:
             x = self.root.winfo_pointerx()
@@ -3088,8 +3548,8 @@ class CannabisTracker:
         except Exception as exc:
             messagebox.showerror("Export CSV", f"Could not export CSV:\n{exc}")
     def _show_stats_window(self, period: str = "day") -> None:
-        logs_for_period, label, days_count = self._logs_for_period(period)
-        title, stats_list = self._stats_text(logs_for_period, label, days_count, return_title=True)
+        series, label, days_count = self._series_for_period(period)
+        title, stats_list = self._stats_text(series, label, days_count, return_title=True)
         win = tk.Toplevel(self.root)
         win._stats_period = period
         win.title("Usage stats")
@@ -3117,8 +3577,9 @@ class CannabisTracker:
         self.stats_frame = ttk.Frame(frame)
         self.stats_frame.grid(row=2, column=0, sticky="ew", padx=(6, 0))
         self._render_stats_rows(stats_list)
+        _chart_build_usage_chart(self, frame).grid(row=3, column=0, sticky="ew", pady=(10, 0))
         actions = ttk.Frame(frame)
-        actions.grid(row=3, column=0, sticky="ew", pady=(8, 0))
+        actions.grid(row=4, column=0, sticky="ew", pady=(8, 0))
         actions.columnconfigure(0, weight=1)
         actions_right = ttk.Frame(actions)
         actions_right.grid(row=0, column=1, sticky="e")
@@ -3132,15 +3593,15 @@ class CannabisTracker:
         try:
             width = max(340, frame.winfo_reqwidth() + 12)
             height = frame.winfo_reqheight() + 18
-            height = max(230, min(420, height))
+            height = max(230, min(620, height))
             win.geometry(f"{width}x{height}")
         except Exception:
             pass
         self._prepare_toplevel(win)
     def _update_stats_display(self, period: str, win: tk.Toplevel) -> None:
         win._stats_period = period
-        logs_for_period, label, days_count = self._logs_for_period(period)
-        title, stats_list = self._stats_text(logs_for_period, label, days_count, return_title=True)
+        series, label, days_count = self._series_for_period(period)
+        title, stats_list = self._stats_text(series, label, days_count, return_title=True)
         if hasattr(self, "stats_title"):
             self.stats_title.config(text=title)
         if hasattr(self, "stats_frame"):
@@ -3205,7 +3666,9 @@ class CannabisTracker:
     def _log_counts_for_totals(self, log: dict) -> bool:
         if self._log_is_cbd_dominant(log):
             return False
-        name = str(log.get('flower', '')).strip()
+        return self._flower_counts_for_totals(log.get('flower', ''))
+    def _flower_counts_for_totals(self, name: str) -> bool:
+        name = str(name or '').strip()
         flower = self.flowers.get(name)
         if flower is None:
             for f in self.flowers.values():
@@ -3274,8 +3737,11 @@ class CannabisTracker:
             self._save_config()
         except Exception:
             pass
+        self.scheduler.stop()
+        self._persistence.stop()
         self._shutdown_children()
         self._destroy_child_windows()
+        self._stop_data_watcher()
         self._stop_network_server()
         self._stop_export_server()
         self._stop_tray_icon()
@@ -3378,6 +3844,8 @@ class CannabisTracker:
             env = os.environ.copy()
             env["FT_MIX_MODE"] = mode
             env["FT_MOUSE_LAUNCH"] = "1"
+            # The mix calculator reads the tracker file itself.
+            self._flush_persistence()
             proc = subprocess.Popen(args, cwd=cwd, env=env)
             self._watch_mixcalc_process(proc)
             if close_tools and self.tools_window and tk.Toplevel.winfo_exists(self.tools_window):
@@ -3435,9 +3903,8 @@ class CannabisTracker:
             except Exception:
                 return
             try:
-                self.load_data()
-                self._refresh_stock()
-                self._refresh_log()
+                self._reload_external_data()
+                self._update_data_mtime()
             except Exception:
                 pass
         try:
@@ -3475,17 +3942,7 @@ class CannabisTracker:
                 pass
             if self.network_mode == MODE_CLIENT:
                 # Client mode ignores stale local library data; refresh from host before opening.
-                try:
-                    remote_entries = self._fetch_network_library_data()
-                    if isinstance(remote_entries, list):
-                        lib_path = Path(self.library_data_path or TRACKER_LIBRARY_FILE)
-                        lib_path.parent.mkdir(parents=True, exist_ok=True)
-                        lib_path.write_text(
-                            json.dumps(remote_entries, ensure_ascii=False, indent=2),
-                            encoding="utf-8",
-                        )
-                except Exception:
-                    pass
+                self._refresh_network_library_cache()
             if getattr(sys, "frozen", False):
                 args = [sys.executable, "--run-library"]
                 cwd = os.path.dirname(sys.executable) or os.getcwd()
@@ -3495,15 +3952,19 @@ class CannabisTracker:
                     entry = Path(__file__).resolve()
                 args = [sys.executable, str(entry), "--run-library"]
                 cwd = os.path.dirname(str(entry)) or os.getcwd()
+            self._flush_persistence()
             proc = subprocess.Popen(args, cwd=cwd)
             if self.network_mode == MODE_CLIENT:
-                self._watch_library_process(proc)
+                # The library window syncs its own edits; anything it couldn't send is
+                # reconciled against the revision just fetched once it exits.
+                self._library_process_open = True
+                self._watch_library_process(proc, self._network_library_revision)
             if close_tools and self.tools_window and tk.Toplevel.winfo_exists(self.tools_window):
                 self.tools_window.destroy()
         except Exception as exc:
             messagebox.showerror("Cannot launch", f"Failed to launch flower library:\n{exc}")
 
-    def _watch_library_process(self, proc: subprocess.Popen) -> None:
+    def _watch_library_process(self, proc: subprocess.Popen, base_revision: int = 0) -> None:
         def poll() -> None:
             try:
                 if proc.poll() is None:
@@ -3511,15 +3972,26 @@ class CannabisTracker:
                     return
             except Exception:
                 return
+            self._library_process_open = False
             try:
                 if self.network_mode != MODE_CLIENT:
                     return
                 lib_path = Path(self.library_data_path or TRACKER_LIBRARY_FILE)
-                if not lib_path.exists():
+                if not lib_path.exists() or not self._refresh_network_library_cache():
                     return
                 payload = json.loads(lib_path.read_text(encoding="utf-8"))
-                if isinstance(payload, list):
-                    self._push_network_library_data(payload)
+                if not isinstance(payload, list):
+                    return
+                upserts, deletes = diff_library_entries(self._network_library_entries or [], payload, base_revision)
+                if upserts or deletes:
+                    reply = self._push_network_library_entries(upserts, deletes)
+                    if not (isinstance(reply, dict) and reply.get("ok")):
+                        messagebox.showwarning(
+                            "Flower Library",
+                            "Library changes could not be saved to the host; they may conflict with edits made on another device.",
+                        )
+                # Leave the local file matching the host.
+                self._refresh_network_library_cache(write=True)
             except Exception:
                 pass
         try:
@@ -3833,11 +4305,6 @@ class CannabisTracker:
                 pass
         except Exception:
             self.scraper_status_label.configure(image="", text="")
-        finally:
-            try:
-                self.root.after(1500, self._update_scraper_status_icon)
-            except Exception:
-                pass
 
     def _build_status_image(
         self,
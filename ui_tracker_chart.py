@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import tkinter as tk
+from datetime import timedelta
+from tkinter import ttk
+
+from usage_stats import downsample, rolling_average
+
+CHART_RANGES = (30, 90, 365)
+ROLLING_DAYS = 7
+CHART_WIDTH = 340
+CHART_HEIGHT = 150
+# Each drawn bar gets at least this many pixels; longer ranges are averaged into buckets.
+MIN_BAR_PIXELS = 3
+
+
+def build_usage_chart(app, parent: tk.Widget) -> ttk.Frame:
+    """Daily usage chart for the stats window: THC bars, rolling average, CBD and target lines."""
+    frame = ttk.Frame(parent)
+    frame.columnconfigure(len(CHART_RANGES), weight=1)
+    canvas = tk.Canvas(
+        frame,
+        width=CHART_WIDTH,
+        height=CHART_HEIGHT,
+        bg=app.current_base_color,
+        highlightthickness=0,
+        bd=0,
+    )
+    for idx, days in enumerate(CHART_RANGES):
+        ttk.Button(
+            frame,
+            text=f"{days}d",
+            width=5,
+            command=lambda d=days: draw_usage_chart(app, canvas, d),
+        ).grid(row=0, column=idx, padx=(0 if idx == 0 else 6, 0), pady=(0, 4), sticky="w")
+    canvas.grid(row=1, column=0, columnspan=len(CHART_RANGES) + 1, sticky="ew")
+    draw_usage_chart(app, canvas, CHART_RANGES[0])
+    return frame
+
+
+def draw_usage_chart(app, canvas: tk.Canvas, days: int) -> None:
+    canvas.delete("all")
+    width = int(canvas.cget("width"))
+    height = int(canvas.cget("height"))
+    left, right, top, bottom = 6, width - 6, 18, height - 16
+    end = app.current_date
+    start = end - timedelta(days=max(1, days) - 1)
+    series = app._usage_series_between(start, end)
+    track_cbd = getattr(app, "track_cbd_flower", False)
+    points = max(1, (right - left) // MIN_BAR_PIXELS)
+    daily = series.daily_totals(start, end)
+    thc = downsample(daily, points)
+    avg = downsample(rolling_average(daily, ROLLING_DAYS), points)
+    cbd = downsample(series.daily_totals(start, end, cbd=True), points) if track_cbd else []
+    target = float(getattr(app, "target_daily_grams", 0.0) or 0.0)
+    peak = max(thc + avg + cbd + [target]) or 1.0
+    step = (right - left) / len(thc)
+
+    def y_for(value: float) -> float:
+        return bottom - (bottom - top) * (value / peak)
+
+    for n, value in enumerate(thc):
+        if value > 0:
+            x0 = left + n * step
+            canvas.create_rectangle(
+                x0, y_for(value), x0 + max(1.0, step - 1), bottom, fill=app.used_thc_under_color, width=0
+            )
+    if target > 0:
+        canvas.create_line(left, y_for(target), right, y_for(target), fill=app.muted_color, dash=(2, 3))
+    if len(avg) > 1:
+        coords = [c for n, value in enumerate(avg) for c in (left + (n + 0.5) * step, y_for(value))]
+        canvas.create_line(*coords, fill=app.text_color, width=1.5)
+    if len(cbd) > 1 and any(cbd):
+        coords = [c for n, value in enumerate(cbd) for c in (left + (n + 0.5) * step, y_for(value))]
+        canvas.create_line(*coords, fill=app.used_cbd_under_color, dash=(4, 2))
+    canvas.create_line(left, bottom, right, bottom, fill=app.muted_color)
+    small = ("", 8)
+    canvas.create_text(left, 2, anchor="nw", text=f"{peak:.2f} g/day", fill=app.muted_color, font=small)
+    legend = f"THC/day, {ROLLING_DAYS}-day avg" + (", CBD" if track_cbd else "")
+    canvas.create_text(right, 2, anchor="ne", text=legend, fill=app.muted_color, font=small)
+    canvas.create_text(left, height - 2, anchor="sw", text=start.isoformat(), fill=app.muted_color, font=small)
+    canvas.create_text(right, height - 2, anchor="se", text=end.isoformat(), fill=app.muted_color, font=small)
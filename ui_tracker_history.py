@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import tkinter as tk
+from datetime import date
+from tkinter import messagebox, ttk
+
+from log_history import LogQuery
+from ui_tree_rows import tree_rows
+
+HISTORY_COLUMNS = (
+    ("date", "Date", 90),
+    ("time", "Time", 60),
+    ("flower", "Flower", 160),
+    ("roa", "ROA", 90),
+    ("grams", "Grams", 70),
+    ("thc_mg", "THC (mg)", 70),
+    ("cbd_mg", "CBD (mg)", 70),
+)
+VISIBLE_ROWS = 20
+ALL_FLOWERS = "All flowers"
+ALL_ROAS = "All ROAs"
+
+
+class VirtualLogView:
+    """Shows a window of a LogQuery in a Treeview, inserting only the rows on screen.
+
+    The tree itself never holds more than the visible rows; the scrollbar and mouse wheel
+    move an offset into the query, and each move reconciles the tree by row key, so a
+    one-row scroll is one delete and one insert however long the history is.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, visible: int = VISIBLE_ROWS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.visible = max(1, visible)
+        self.query: LogQuery | None = None
+        self.offset = 0
+        self.total = 0
+        self.shown: dict[str, dict] = {}
+        scrollbar.configure(command=self._on_scrollbar)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(sequence, self._on_wheel)
+        tree.bind("<Prior>", lambda _e: self.scroll_to(self.offset - self.visible))
+        tree.bind("<Next>", lambda _e: self.scroll_to(self.offset + self.visible))
+        tree.bind("<Home>", lambda _e: self.scroll_to(0))
+        tree.bind("<End>", lambda _e: self.scroll_to(self.total))
+        tree.bind("<Configure>", self._on_configure)
+
+    def set_query(self, query: LogQuery) -> None:
+        self.query = query
+        self.total = len(query)
+        self.offset = 0
+        self.render()
+
+    def scroll_to(self, offset: int) -> str:
+        offset = max(0, min(int(offset), self.total - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return "break"
+
+    def render(self) -> None:
+        rows = self.query.rows(self.offset, self.visible) if self.query is not None else []
+        self.shown = dict(rows)
+        tree_rows(self.tree).sync(
+            (
+                iid,
+                (
+                    log.get("date", ""),
+                    log.get("time_display") or str(log.get("time", "")).split(" ")[-1],
+                    log.get("flower", ""),
+                    log.get("roa", "Unknown"),
+                    f"{float(log.get('grams_used', 0.0)):.3f}",
+                    f"{float(log.get('thc_mg', 0.0)):.1f}",
+                    f"{float(log.get('cbd_mg', 0.0)):.1f}",
+                ),
+                (),
+            )
+            for iid, log in rows
+        )
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, min(1.0, (self.offset + self.visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * self.total))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        if getattr(event, "num", None) == 4:
+            steps = -1
+        elif getattr(event, "num", None) == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        return self.scroll_to(self.offset + steps * 3)
+
+    def _on_configure(self, _event: tk.Event) -> None:
+        children = self.tree.get_children()
+        if not children:
+            return
+        box = self.tree.bbox(children[0])
+        if not box or box[3] <= 0:
+            return
+        visible = max(1, (self.tree.winfo_height() - box[1]) // box[3])
+        if visible != self.visible:
+            self.visible = visible
+            self.offset = max(0, min(self.offset, self.total - self.visible))
+            self.render()
+
+
+def open_log_history(app) -> None:
+    """Full-history dose browser with flower, ROA and date-range filters."""
+    win = getattr(app, "history_window", None)
+    if win is not None:
+        try:
+            if win.winfo_exists():
+                win.deiconify()
+                win.lift()
+                return
+        except tk.TclError:
+            pass
+    win = app.history_window = tk.Toplevel(app.root)
+    win.title("Dose history")
+    try:
+        win.iconbitmap(app._resource_path("icon.ico"))
+    except Exception:
+        pass
+    frame = ttk.Frame(win, padding=12)
+    frame.grid(row=0, column=0, sticky="nsew")
+    win.columnconfigure(0, weight=1)
+    win.rowconfigure(0, weight=1)
+    frame.columnconfigure(0, weight=1)
+    frame.rowconfigure(1, weight=1)
+
+    filters = ttk.Frame(frame)
+    filters.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 8))
+    flower_var = tk.StringVar(value=ALL_FLOWERS)
+    roa_var = tk.StringVar(value=ALL_ROAS)
+    start_var = tk.StringVar()
+    end_var = tk.StringVar()
+    flower_box = ttk.Combobox(filters, textvariable=flower_var, state="readonly", width=22)
+    flower_box.grid(row=0, column=0, padx=(0, 6))
+    roa_box = ttk.Combobox(filters, textvariable=roa_var, state="readonly", width=12)
+    roa_box.grid(row=0, column=1, padx=(0, 10))
+    ttk.Label(filters, text="From", font=app.font_body).grid(row=0, column=2, padx=(0, 4))
+    ttk.Entry(filters, textvariable=start_var, width=11).grid(row=0, column=3, padx=(0, 6))
+    ttk.Label(filters, text="To", font=app.font_body).grid(row=0, column=4, padx=(0, 4))
+    ttk.Entry(filters, textvariable=end_var, width=11).grid(row=0, column=5, padx=(0, 10))
+    count_label = ttk.Label(filters, text="", font=app.font_body)
+    count_label.grid(row=0, column=8, sticky="e")
+    filters.columnconfigure(8, weight=1)
+
+    tree = ttk.Treeview(
+        frame, columns=[col for col, _text, _width in HISTORY_COLUMNS], show="headings", height=VISIBLE_ROWS
+    )
+    for col, text, width in HISTORY_COLUMNS:
+        tree.heading(col, text=text)
+        tree.column(col, width=width, anchor="w" if col == "flower" else "center")
+    tree.grid(row=1, column=0, sticky="nsew")
+    scroll = ttk.Scrollbar(frame, orient="vertical", style=app.vscroll_style)
+    scroll.grid(row=1, column=1, sticky="ns")
+    view = VirtualLogView(tree, scroll)
+    state = {"key": None}
+
+    def parse_day(text: str, label: str) -> date | None:
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"{label} must be a date like 2025-01-31.") from None
+
+    def apply_filters() -> None:
+        try:
+            start = parse_day(start_var.get(), "From")
+            end = parse_day(end_var.get(), "To")
+        except ValueError as exc:
+            messagebox.showerror("Dose history", str(exc), parent=win)
+            return
+        history = app._log_history()
+        state["key"] = app._log_history_key
+        flower_box["values"] = [ALL_FLOWERS] + history.flowers()
+        roa_box["values"] = [ALL_ROAS] + history.roas()
+        flower = flower_var.get()
+        roa = roa_var.get()
+        view.set_query(
+            history.query(
+                flower=None if flower == ALL_FLOWERS else flower,
+                roa=None if roa == ALL_ROAS else roa,
+                start=start,
+                end=end,
+            )
+        )
+        count_label.config(text=f"{view.total} doses")
+
+    def clear_filters() -> None:
+        flower_var.set(ALL_FLOWERS)
+        roa_var.set(ALL_ROAS)
+        start_var.set("")
+        end_var.set("")
+        apply_filters()
+
+    def refresh_if_changed(_event: tk.Event | None = None) -> None:
+        # Logs edited in the main window since the last query: re-run it, keeping the page.
+        app._log_history()
+        if state["key"] != app._log_history_key:
+            offset = view.offset
+            apply_filters()
+            view.scroll_to(offset)
+
+    def open_day(_event: tk.Event) -> None:
+        selection = tree.selection()
+        log = view.shown.get(selection[0]) if selection else None
+        if not log:
+            return
+        try:
+            day = date.fromisoformat(str(log.get("date", "")))
+        except ValueError:
+            return
+        app.current_date = day
+        app._refresh_log()
+        app._refresh_stock()
+        live = selection[0].removeprefix("live-")
+        if live.isdigit() and app.log_tree.exists(live):
+            app.log_tree.selection_set(live)
+            app.log_tree.see(live)
+
+    ttk.Button(filters, text="Apply", command=apply_filters).grid(row=0, column=6, padx=(0, 6))
+    ttk.Button(filters, text="Clear", command=clear_filters).grid(row=0, column=7)
+    flower_box.bind("<<ComboboxSelected>>", lambda _e: apply_filters())
+    roa_box.bind("<<ComboboxSelected>>", lambda _e: apply_filters())
+    tree.bind("<Double-1>", open_day)
+    win.bind("<FocusIn>", refresh_if_changed)
+    ttk.Button(frame, text="Close", command=win.destroy).grid(row=2, column=0, columnspan=2, sticky="e", pady=(8, 0))
+    apply_filters()
+    app._prepare_toplevel(win)
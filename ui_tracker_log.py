@@ -5,6 +5,7 @@ from datetime import date, datetime, timedelta
 from tkinter import messagebox, ttk
 
 from inventory import Flower, log_dose_entry
+from ui_tree_rows import tree_rows
 
 
 def log_dose(app) -> None:
@@ -36,6 +37,7 @@ def log_dose(app) -> None:
             grams_used=grams_used,
             roa=roa,
             roa_options=app.roa_options,
+            usage_index=app._usage_index(),
         )
     except ValueError as exc:
         messagebox.showerror("Cannot log dose", str(exc))
@@ -61,11 +63,21 @@ def edit_log_entry(app) -> None:
     if not selection:
         messagebox.showwarning("Select log", "Select a log entry to edit.")
         return
-    idx = int(selection[0])
-    if idx >= len(app.logs):
+    row_id = selection[0]
+    # Entries older than the kept window live in the log archive; they're edited on a copy
+    # that is written back to their month file.
+    archived = not row_id.isdigit()
+    if archived:
+        idx = -1
+        log = app._archived_log(row_id)
+        if log is not None:
+            log = dict(log)
+    else:
+        idx = int(row_id)
+        log = app.logs[idx] if idx < len(app.logs) else None
+    if log is None:
         messagebox.showerror("Not found", "Selected log entry is missing.")
         return
-    log = app.logs[idx]
     current_flower = log["flower"]
     current_roa = log.get("roa", "Smoking")
     current_grams = float(log.get("grams_used", 0.0))
@@ -130,6 +142,7 @@ def edit_log_entry(app) -> None:
             messagebox.showerror("Invalid time", "Enter time as HH:MM in 24-hour format.")
             return
         efficiency = app.roa_options.get(new_roa, 1.0)
+        stock = _stock_snapshot(app)
         old_flower = app.flowers.get(current_flower)
         new_flower = app.flowers[new_flower_name]
         if log.get("mix_sources") or log.get("mix_thc_pct") is not None:
@@ -146,6 +159,7 @@ def edit_log_entry(app) -> None:
                     pass
             messagebox.showerror("Not enough stock", str(exc))
             return
+        before = dict(log)
         log["flower"] = new_flower_name
         log["roa"] = new_roa
         log["efficiency"] = efficiency
@@ -156,6 +170,13 @@ def edit_log_entry(app) -> None:
         log["time"] = dt_obj.strftime("%Y-%m-%d %H:%M")
         log["time_display"] = dt_obj.strftime("%H:%M")
         log["is_cbd_dominant"] = app._is_cbd_dominant(new_flower)
+        if archived:
+            if not app._update_archived_log(row_id, log):
+                _restore_stock(app, stock)
+                messagebox.showerror("Cannot save", "The archived log entry could not be updated.")
+                return
+        else:
+            app._usage_index().replace(idx, before, log)
         app._refresh_stock()
         app._refresh_log()
         app.save_data()
@@ -165,6 +186,19 @@ def edit_log_entry(app) -> None:
     app._prepare_toplevel(dialog)
 
 
+def _stock_snapshot(app) -> dict[str, float]:
+    return {name: flower.grams_remaining for name, flower in app.flowers.items()}
+
+
+def _restore_stock(app, snapshot: dict[str, float]) -> None:
+    """Undo stock changes made since _stock_snapshot(), including flowers it re-created."""
+    for name in list(app.flowers):
+        if name in snapshot:
+            app.flowers[name].grams_remaining = snapshot[name]
+        else:
+            del app.flowers[name]
+
+
 def restore_mix_stock(app, log: dict) -> None:
     name = str(log.get("flower", "")).strip()
     if not name:
@@ -203,13 +237,22 @@ def delete_log_entry(app) -> None:
     if not selection:
         messagebox.showwarning("Select log", "Select a log entry to delete.")
         return
-    idx = int(selection[0])
-    if idx >= len(app.logs):
+    row_id = selection[0]
+    archived = not row_id.isdigit()
+    if archived:
+        idx = -1
+        log = app._archived_log(row_id)
+    else:
+        idx = int(row_id)
+        log = app.logs[idx] if idx < len(app.logs) else None
+    if log is None:
         messagebox.showerror("Not found", "Selected log entry is missing.")
         return
-    log = app.logs[idx]
     if not messagebox.askokcancel("Confirm delete", "Delete this log entry and restore its grams to stock?"):
         return
+    if archived and not app._update_archived_log(row_id, None):
+        messagebox.showerror("Cannot delete", "The archived log entry could not be deleted.")
+        return
     grams_used = float(log.get("grams_used", 0.0))
     flower_name = str(log.get("flower", "")).strip()
     if log.get("mix_sources") or log.get("mix_thc_pct") is not None:
@@ -224,19 +267,21 @@ def delete_log_entry(app) -> None:
                     break
         if flower:
             flower.grams_remaining += grams_used
-    del app.logs[idx]
+    if not archived:
+        usage_index = app._usage_index()
+        del app.logs[idx]
+        usage_index.delete(idx, log)
+    # Row ids are log (or month file) positions, so the selected id would now name the following entry.
+    app.log_tree.selection_set(())
     app._refresh_stock()
     app._refresh_log()
     app.save_data()
 
 
 def refresh_log(app) -> None:
-    for item in app.log_tree.get_children():
-        app.log_tree.delete(item)
-    day_str = app.current_date.isoformat()
-    day_logs = [log for log in app.logs if log.get("date") == day_str]
-    day_total = sum(float(log.get("grams_used", 0.0)) for log in day_logs if app._log_counts_for_totals(log))
-    day_total_cbd = sum(float(log.get("grams_used", 0.0)) for log in day_logs if app._log_counts_for_cbd(log))
+    day_indices = app._usage_index().day_indices(app.current_date)
+    day_total = app._grams_used_on_day(app.current_date)
+    day_total_cbd = app._grams_used_on_day_cbd(app.current_date)
     if hasattr(app, "day_total_label"):
         if app.current_date < date.today():
             remaining = app.target_daily_grams - day_total if app.target_daily_grams > 0 else None
@@ -263,25 +308,22 @@ def refresh_log(app) -> None:
         else:
             app.day_total_label.grid_remove()
             app.day_total_cbd_label.grid_remove()
-    for idx, log in enumerate(app.logs):
-        if log.get("date") != day_str:
-            continue
-        roa = log.get("roa", "Unknown")
-        app.log_tree.insert(
-            "",
-            tk.END,
-            iid=str(idx),
-            values=(
-                log.get("time_display") or log["time"].split(" ")[-1],
-                log["flower"],
-                roa,
-                f"{log['grams_used']:.3f}",
-                f"{log['thc_mg']:.1f}",
-                f"{log['cbd_mg']:.1f}",
-            ),
+    # Archived rows (days before the kept window) are keyed by their place in the month file.
+    rows = app._archived_rows_on_day(app.current_date)
+    rows += [(str(idx), app.logs[idx]) for idx in day_indices]
+    specs = []
+    for iid, log in rows:
+        values = (
+            log.get("time_display") or log["time"].split(" ")[-1],
+            log["flower"],
+            log.get("roa", "Unknown"),
+            f"{log['grams_used']:.3f}",
+            f"{log['thc_mg']:.1f}",
+            f"{log['cbd_mg']:.1f}",
         )
-    children = app.log_tree.get_children()
-    if children:
+        specs.append((iid, values, ()))
+    # Leave the scroll position alone when nothing on the day changed.
+    if tree_rows(app.log_tree).sync(specs) and specs:
         try:
             app.log_tree.yview_moveto(1.0)
         except Exception:
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import messagebox
 
 from inventory import add_stock_entry
+from ui_tree_rows import tree_rows
 
 
 def on_stock_select(app, _event: tk.Event) -> None:
@@ -111,47 +112,62 @@ def clear_stock_inputs(app) -> None:
     app.stock_form_dirty = False
 
 
+def _stock_row_color(app, flower) -> str:
+    if flower.grams_remaining <= 1e-6:
+        return app.muted_color
+    if not app.enable_stock_coloring:
+        return app.text_color
+    if app._is_cbd_dominant(flower):
+        green_thr = getattr(app, "cbd_single_green_threshold", app.single_green_threshold)
+        red_thr = getattr(app, "cbd_single_red_threshold", app.single_red_threshold)
+        high_color = app.single_cbd_high_color
+        low_color = app.single_cbd_low_color
+    else:
+        green_thr = app.single_green_threshold
+        red_thr = app.single_red_threshold
+        high_color = app.single_thc_high_color
+        low_color = app.single_thc_low_color
+    return app._color_for_value(flower.grams_remaining, green_thr, red_thr, high_color, low_color)
+
+
+def _sorted_flowers(app) -> list:
+    flowers = sorted(app.flowers.values(), key=lambda f: f.name.lower())
+    column = app.stock_sort_column
+    attr = {"thc": "thc_pct", "cbd": "cbd_pct", "grams": "grams_remaining"}.get(column)
+    if attr:
+        # Sort on the displayed precision so rows that look equal keep name order.
+        digits = 3 if column == "grams" else 1
+        return sorted(flowers, key=lambda f: round(float(getattr(f, attr)), digits), reverse=app.stock_sort_reverse)
+    return sorted(flowers, key=lambda f: (f.name.lower(), f.name), reverse=app.stock_sort_reverse)
+
+
+def _sync_stock_rows(app) -> None:
+    """Bring the stock table in line with app.flowers, touching only rows that changed."""
+    rows = tree_rows(app.stock_tree)
+    specs = []
+    for flower in _sorted_flowers(app):
+        color = _stock_row_color(app, flower)
+        tag = rows.tag(f"stock_fg_{color}", foreground=color)
+        values = (
+            flower.name,
+            f"{flower.thc_pct:.1f}",
+            f"{flower.cbd_pct:.1f}",
+            f"{flower.grams_remaining:.3f}",
+        )
+        specs.append((flower.name, values, (tag,)))
+    rows.sync(specs)
+
+
 def refresh_stock(app) -> None:
-    for item in app.stock_tree.get_children():
-        app.stock_tree.delete(item)
     total_all = 0.0
     total_counted = 0.0
     cbd_total = 0.0
-    for flower in sorted(app.flowers.values(), key=lambda f: f.name.lower()):
+    for flower in app.flowers.values():
         total_all += flower.grams_remaining
         if app._should_count_flower(flower):
             total_counted += flower.grams_remaining
         if app._is_cbd_dominant(flower):
             cbd_total += flower.grams_remaining
-        if app.enable_stock_coloring:
-            if app._is_cbd_dominant(flower):
-                green_thr = getattr(app, "cbd_single_green_threshold", app.single_green_threshold)
-                red_thr = getattr(app, "cbd_single_red_threshold", app.single_red_threshold)
-                high_color = app.single_cbd_high_color
-                low_color = app.single_cbd_low_color
-            else:
-                green_thr = app.single_green_threshold
-                red_thr = app.single_red_threshold
-                high_color = app.single_thc_high_color
-                low_color = app.single_thc_low_color
-            row_color = app._color_for_value(flower.grams_remaining, green_thr, red_thr, high_color, low_color)
-        else:
-            row_color = app.text_color
-        if flower.grams_remaining <= 1e-6:
-            row_color = app.muted_color
-        tag = f"stock_{flower.name}"
-        app.stock_tree.tag_configure(tag, foreground=row_color)
-        app.stock_tree.insert(
-            "",
-            tk.END,
-            tags=(tag,),
-            values=(
-                flower.name,
-                f"{flower.thc_pct:.1f}",
-                f"{flower.cbd_pct:.1f}",
-                f"{flower.grams_remaining:.3f}",
-            ),
-        )
     track_cbd = getattr(app, "track_cbd_flower", False)
     combined_total = total_counted
     if track_cbd:
@@ -287,21 +303,8 @@ def apply_stock_sort(app) -> None:
         else:
             suffix = ""
         app.stock_tree.heading(col, text=base + suffix)
-    children = list(app.stock_tree.get_children())
-    if not children:
-        return
-
-    def sort_key(item: str) -> tuple:
-        value = app.stock_tree.set(item, app.stock_sort_column)
-        if app.stock_sort_column in {"thc", "cbd", "grams"}:
-            try:
-                return (float(value), value)
-            except ValueError:
-                return (0.0, value)
-        return (value.lower(), value)
-
-    for index, iid in enumerate(sorted(children, key=sort_key, reverse=app.stock_sort_reverse)):
-        app.stock_tree.move(iid, "", index)
+    # Rows are ordered from the flowers in memory rather than read back out of the tree.
+    _sync_stock_rows(app)
 
 
 def mark_stock_form_dirty(app, _event: tk.Event) -> None:
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Iterable, Sequence, Tuple
+
+Row = Tuple[str, Sequence[Any], Sequence[str]]
+
+
+class TreeRows:
+    """Keeps the top-level rows of a ttk.Treeview in step with a keyed row list.
+
+    sync() takes the wanted rows as (iid, values, tags) in display order and only touches
+    what differs from the last sync: stale iids are deleted, new ones inserted, changed rows
+    re-set with item(), and out-of-order rows moved. tag() configures a tag only when its
+    options change, so per-row colour tags don't cost a Tk call on every refresh.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        # iid -> (values, tags) as last applied
+        self._rows: dict[str, tuple[tuple, tuple]] = {}
+        self._tags: dict[str, dict] = {}
+
+    def tag(self, name: str, **options) -> str:
+        if self._tags.get(name) != options:
+            self.tree.tag_configure(name, **options)
+            self._tags[name] = dict(options)
+        return name
+
+    def sync(self, rows: Iterable[Row]) -> bool:
+        """Reconcile the tree with `rows`; returns True if anything was changed."""
+        wanted: list[str] = []
+        specs: dict[str, tuple[tuple, tuple]] = {}
+        for iid, values, tags in rows:
+            iid = str(iid)
+            if iid in specs:
+                continue
+            wanted.append(iid)
+            specs[iid] = (tuple(_cell(v) for v in values), tuple(tags or ()))
+        # Read the live children so rows removed behind our back are simply re-inserted.
+        current = list(self.tree.get_children())
+        stale = [iid for iid in current if iid not in specs]
+        changed = bool(stale)
+        if stale:
+            self.tree.delete(*stale)
+        order = [iid for iid in current if iid in specs]
+        present = set(order)
+        for iid in wanted:
+            spec = specs[iid]
+            if iid not in present:
+                self.tree.insert("", "end", iid=iid, values=spec[0], tags=spec[1])
+                order.append(iid)
+                changed = True
+            elif self._rows.get(iid) != spec:
+                self.tree.item(iid, values=spec[0], tags=spec[1])
+                changed = True
+        self._rows = specs
+        if order != wanted:
+            self._reorder(order, wanted)
+            changed = True
+        return changed
+
+    def _reorder(self, order: list[str], wanted: list[str]) -> None:
+        # Rows on a longest run already in the right relative order stay put; every other
+        # row is moved right after its wanted predecessor, so a single re-sorted row costs
+        # one move rather than a shuffle of the whole table.
+        keep = _longest_ordered_run(order, wanted)
+        for n, iid in enumerate(wanted):
+            if iid in keep:
+                continue
+            order.remove(iid)
+            index = order.index(wanted[n - 1]) + 1 if n else 0
+            order.insert(index, iid)
+            self.tree.move(iid, "", index)
+
+
+def tree_rows(tree) -> TreeRows:
+    """The TreeRows bookkeeping attached to `tree`, created on first use."""
+    rows = getattr(tree, "_tree_rows", None)
+    if rows is None:
+        rows = TreeRows(tree)
+        tree._tree_rows = rows
+    return rows
+
+
+def _cell(value: Any) -> Any:
+    # Tk stores cells as strings; cache them in that form so e.g. 1 and "1" compare equal.
+    return value if isinstance(value, str) else str(value)
+
+
+def _longest_ordered_run(order: list[str], wanted: list[str]) -> set[str]:
+    """The largest set of iids whose relative order in `order` already matches `wanted`."""
+    position = {iid: n for n, iid in enumerate(order)}
+    seq = [position[iid] for iid in wanted]
+    tails: list[int] = []
+    tail_index: list[int] = []
+    parent = [-1] * len(seq)
+    for n, pos in enumerate(seq):
+        k = bisect_left(tails, pos)
+        if k == len(tails):
+            tails.append(pos)
+            tail_index.append(n)
+        else:
+            tails[k] = pos
+            tail_index[k] = n
+        parent[n] = tail_index[k - 1] if k else -1
+    keep: set[str] = set()
+    n = tail_index[-1] if tail_index else -1
+    while n >= 0:
+        keep.add(wanted[n])
+        n = parent[n]
+    return keep
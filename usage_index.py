@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Callable, Iterable, Optional
+
+
+class _DayUsage:
+    __slots__ = ("day", "indices", "thc", "cbd_grams", "cbd_count")
+
+    def __init__(self, day: Optional[date]):
+        self.day = day
+        # Positions in the log list, ascending.
+        self.indices: list[int] = []
+        # THC-side usage per flower name: [grams, count]. Whether a flower counts toward
+        # THC totals depends on current stock, so callers decide that at query time.
+        self.thc: dict[str, list] = {}
+        self.cbd_grams = 0.0
+        self.cbd_count = 0
+
+
+def _parse_day(value: str) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _grams(log: dict) -> float:
+    try:
+        return float(log.get("grams_used", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class DailyUsageIndex:
+    """Per-day usage aggregates over tracker logs, keyed by the log's `date` string.
+
+    Built once per loaded document and kept current with append/replace/delete, so day and
+    period views cost O(days in range) instead of a scan over every dose ever logged.
+    `is_cbd(log)` classifies a log as CBD-dominant when it is indexed.
+    """
+
+    def __init__(self, is_cbd: Callable[[dict], bool], logs: Optional[list] = None):
+        self._is_cbd = is_cbd
+        self._logs: Optional[list] = None
+        self._count = 0
+        self._days: dict[str, _DayUsage] = {}
+        # Totals for days whose logs were moved to the log archive (no indices).
+        self._archived: dict[str, _DayUsage] = {}
+        # Date keys that parse but aren't in YYYY-MM-DD form, so range lookups can't find them by key.
+        self._odd_keys: set[str] = set()
+        # Bumped on every change so derived caches (e.g. usage stats) know when to rebuild.
+        self.generation = 0
+        if logs is not None:
+            self.rebuild(logs)
+
+    def rebuild(self, logs: list) -> None:
+        self.generation += 1
+        self._logs = logs
+        self._count = 0
+        self._days = {}
+        self._odd_keys = set()
+        for log in logs:
+            self._account(self._count, log, 1)
+            self._count += 1
+
+    def sync(self, logs: list) -> "DailyUsageIndex":
+        """Rebuild if `logs` is not the list last indexed, or was resized behind the index's back."""
+        if logs is not self._logs or len(logs) != self._count:
+            self.rebuild(logs)
+        return self
+
+    def set_archived(self, days: dict) -> None:
+        """Fold in archived per-day totals: {date: {"thc": {flower: grams}, "cbd": grams, "cbd_count": n}}."""
+        archived: dict[str, _DayUsage] = {}
+        for key, totals in (days or {}).items():
+            if not isinstance(totals, dict):
+                continue
+            usage = archived[key] = _DayUsage(_parse_day(key))
+            thc = totals.get("thc") if isinstance(totals.get("thc"), dict) else {}
+            usage.thc = {name: [float(grams or 0.0), 1] for name, grams in thc.items()}
+            usage.cbd_grams = float(totals.get("cbd") or 0.0)
+            usage.cbd_count = int(totals.get("cbd_count") or 0)
+        self._archived = archived
+        self.generation += 1
+
+    def append(self, log: dict) -> None:
+        self._account(self._count, log, 1)
+        self._count += 1
+
+    def replace(self, index: int, old: dict, new: dict) -> None:
+        """Re-index the log at `index` after an in-place edit; `old` is a copy taken before it."""
+        self._account(index, old, -1)
+        self._account(index, new, 1)
+
+    def delete(self, index: int, log: dict) -> None:
+        """Drop the log that was at `index`; later positions shift down by one."""
+        self._account(index, log, -1)
+        self._count -= 1
+        for usage in self._days.values():
+            indices = usage.indices
+            if indices and indices[-1] > index:
+                usage.indices = [i - 1 if i > index else i for i in indices]
+
+    def _account(self, index: int, log: dict, sign: int) -> None:
+        if not isinstance(log, dict):
+            return
+        self.generation += 1
+        key = str(log.get("date") or "")
+        usage = self._days.get(key)
+        if usage is None:
+            if sign < 0:
+                return
+            usage = self._days[key] = _DayUsage(_parse_day(key))
+            if usage.day is not None and usage.day.isoformat() != key:
+                self._odd_keys.add(key)
+        grams = _grams(log)
+        if sign > 0:
+            if usage.indices and usage.indices[-1] > index:
+                usage.indices.append(index)
+                usage.indices.sort()
+            else:
+                usage.indices.append(index)
+        else:
+            try:
+                usage.indices.remove(index)
+            except ValueError:
+                pass
+        if self._is_cbd(log):
+            usage.cbd_grams += sign * grams
+            usage.cbd_count += sign
+        else:
+            name = str(log.get("flower", "")).strip()
+            slot = usage.thc.setdefault(name, [0.0, 0])
+            slot[0] += sign * grams
+            slot[1] += sign
+            if slot[1] <= 0:
+                del usage.thc[name]
+        if not usage.indices:
+            del self._days[key]
+            self._odd_keys.discard(key)
+
+    def day_indices(self, day: date | str) -> list[int]:
+        usage = self._days.get(day if isinstance(day, str) else day.isoformat())
+        return list(usage.indices) if usage else []
+
+    def _usages(self, key: str) -> list[_DayUsage]:
+        return [usage for usage in (self._days.get(key), self._archived.get(key)) if usage is not None]
+
+    def thc_grams(self, day: date | str, counts: Callable[[str], bool]) -> float:
+        """THC-side grams on `day` from flowers for which `counts(name)` holds."""
+        total = 0.0
+        for usage in self._usages(day if isinstance(day, str) else day.isoformat()):
+            total += sum(grams for name, (grams, _n) in usage.thc.items() if counts(name))
+        return total
+
+    def cbd_grams(self, day: date | str) -> float:
+        return sum(usage.cbd_grams for usage in self._usages(day if isinstance(day, str) else day.isoformat()))
+
+    def _days_between(self, start: Optional[date], end: Optional[date]) -> Iterable[_DayUsage]:
+        if start is not None and end is not None and (end - start).days + 1 < len(self._days):
+            # Short range: look the days up rather than walking the whole index.
+            keys = [(start + timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+            keys += [key for key in self._odd_keys if key not in keys]
+            candidates: Iterable[_DayUsage] = (self._days[key] for key in keys if key in self._days)
+        else:
+            candidates = self._days.values()
+        for usage in candidates:
+            if start is None and end is None:
+                yield usage
+            elif usage.day is not None and (start is None or usage.day >= start) and (end is None or usage.day <= end):
+                yield usage
+
+    def daily_totals(
+        self,
+        counts: Optional[Callable[[str], bool]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> list[float]:
+        """Per-day usage for days that have any counted log: THC via `counts`, or CBD when None.
+
+        Without bounds every day is included, even ones whose date doesn't parse.
+        """
+        groups: dict[object, list[_DayUsage]] = {}
+        for usage in self._days_between(start, end):
+            groups[id(usage)] = [usage]
+            if usage.day is not None and usage.day.isoformat() in self._archived:
+                groups[id(usage)].append(self._archived[usage.day.isoformat()])
+        covered = {usage.day.isoformat() for usages in groups.values() for usage in usages[1:]}
+        for key, usage in self._archived.items():
+            if key in covered or usage.day is None:
+                continue
+            if (start is None or usage.day >= start) and (end is None or usage.day <= end):
+                groups[key] = [usage]
+        out = []
+        for usages in groups.values():
+            if counts is None:
+                if any(usage.cbd_count for usage in usages):
+                    out.append(sum(usage.cbd_grams for usage in usages))
+                continue
+            counted = [grams for usage in usages for name, (grams, _n) in usage.thc.items() if counts(name)]
+            if counted:
+                out.append(sum(counted))
+        return out
+
+    def indices_between(self, start: date, end: date) -> list[int]:
+        """Positions of logs dated start..end inclusive, in log order."""
+        out: list[int] = []
+        for usage in self._days_between(start, end):
+            out.extend(usage.indices)
+        out.sort()
+        return out
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import operator
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array-module path gives the same results
+    np = None
+
+MINUTES_PER_DAY = 1440
+
+
+def log_minute(value: object) -> Optional[int]:
+    """Minutes since 0001-01-01 for a "YYYY-MM-DD HH:MM" log time, or None if it doesn't parse."""
+    text = str(value or "")
+    try:
+        if len(text) == 16 and text[4] == "-" and text[7] == "-" and text[10] == " " and text[13] == ":":
+            # Fast path for the canonical form; strptime costs far more per log.
+            day = date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+            hour, minute = int(text[11:13]), int(text[14:16])
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                return None
+        else:
+            parsed = datetime.strptime(text, "%Y-%m-%d %H:%M")
+            day, hour, minute = parsed.date(), parsed.hour, parsed.minute
+    except ValueError:
+        return None
+    return day.toordinal() * MINUTES_PER_DAY + hour * 60 + minute
+
+
+def _log_day(log: dict) -> Optional[int]:
+    try:
+        return date.fromisoformat(str(log.get("date") or "")).toordinal()
+    except ValueError:
+        return None
+
+
+def _grams(log: dict) -> float:
+    try:
+        return float(log.get("grams_used", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class UsageSeries:
+    """Dose times, grams and CBD flags of tracker logs in parallel arrays, ordered by time.
+
+    Built once from the log dicts (see from_logs) and then queried without touching them again:
+    between() slices a date range by bisection, and the interval, dose and daily-total queries
+    run as whole-array operations, on NumPy views of the same buffers when NumPy is installed.
+
+    Logs whose time doesn't parse but whose date does are kept apart in the `untimed_*` arrays
+    (day ordinals, grams, CBD flags): they count towards totals and dose stats, but not the
+    interval stats or daily totals, which need a time. Logs with neither are left out.
+    """
+
+    __slots__ = ("minutes", "grams", "cbd", "untimed_days", "untimed_grams", "untimed_cbd")
+
+    def __init__(
+        self,
+        minutes: Optional[array] = None,
+        grams: Optional[array] = None,
+        cbd: Optional[array] = None,
+        untimed: Optional[tuple[array, array, array]] = None,
+    ):
+        self.minutes = minutes if minutes is not None else array("q")
+        self.grams = grams if grams is not None else array("d")
+        self.cbd = cbd if cbd is not None else array("b")
+        self.untimed_days, self.untimed_grams, self.untimed_cbd = (
+            untimed if untimed is not None else (array("q"), array("d"), array("b"))
+        )
+
+    @classmethod
+    def from_logs(cls, logs: Iterable[dict], is_cbd: Callable[[dict], bool]) -> "UsageSeries":
+        rows = []
+        untimed = []
+        for log in logs:
+            if not isinstance(log, dict):
+                continue
+            minute = log_minute(log.get("time"))
+            if minute is not None:
+                rows.append((minute, _grams(log), 1 if is_cbd(log) else 0))
+            elif (day := _log_day(log)) is not None:
+                untimed.append((day, _grams(log), 1 if is_cbd(log) else 0))
+        return cls(*_columns(rows), untimed=_columns(untimed))
+
+    def __len__(self) -> int:
+        """Dose count, timed or not."""
+        return len(self.minutes) + len(self.untimed_days)
+
+    def between(self, start: date, end: date) -> "UsageSeries":
+        """The doses dated start..end inclusive."""
+        lo = bisect_left(self.minutes, start.toordinal() * MINUTES_PER_DAY)
+        hi = bisect_left(self.minutes, (end.toordinal() + 1) * MINUTES_PER_DAY)
+        ulo = bisect_left(self.untimed_days, start.toordinal())
+        uhi = bisect_left(self.untimed_days, end.toordinal() + 1)
+        return UsageSeries(
+            self.minutes[lo:hi],
+            self.grams[lo:hi],
+            self.cbd[lo:hi],
+            untimed=(self.untimed_days[ulo:uhi], self.untimed_grams[ulo:uhi], self.untimed_cbd[ulo:uhi]),
+        )
+
+    def merge(self, other: "UsageSeries") -> "UsageSeries":
+        return UsageSeries(
+            *_merged((self.minutes, self.grams, self.cbd), (other.minutes, other.grams, other.cbd)),
+            untimed=_merged(
+                (self.untimed_days, self.untimed_grams, self.untimed_cbd),
+                (other.untimed_days, other.untimed_grams, other.untimed_cbd),
+            ),
+        )
+
+    def totals(self) -> tuple[float, float]:
+        """(THC-side grams, CBD grams), untimed doses included."""
+        if np is not None and (self.grams or self.untimed_grams):
+            grams, cbd = self._np_doses()
+            cbd_total = float(grams[cbd].sum())
+            return float(grams.sum()) - cbd_total, cbd_total
+        grams = self.grams + self.untimed_grams
+        cbd_total = sum(g for g, flag in zip(grams, self.cbd + self.untimed_cbd) if flag)
+        return sum(grams) - cbd_total, cbd_total
+
+    def dose_stats(self) -> Optional[tuple[float, float, float]]:
+        """(smallest, largest, average) dose in grams, untimed doses included, or None without doses."""
+        if not self.grams and not self.untimed_grams:
+            return None
+        if np is not None:
+            grams = self._np_doses()[0]
+            return float(grams.min()), float(grams.max()), float(grams.mean())
+        grams = self.grams + self.untimed_grams
+        return min(grams), max(grams), sum(grams) / len(grams)
+
+    def interval_stats(self) -> tuple[Optional[float], Optional[float]]:
+        """(average non-zero gap, longest gap) between consecutive doses, in seconds."""
+        if len(self.minutes) < 2:
+            return None, None
+        if np is not None:
+            gaps = np.diff(self._np()[0]) * 60
+            nonzero = gaps[gaps > 0]
+            return (float(nonzero.mean()) if nonzero.size else None), float(gaps.max())
+        minutes = self.minutes
+        gaps = list(map(operator.sub, islice(minutes, 1, None), minutes))
+        nonzero = [gap for gap in gaps if gap > 0]
+        return (sum(nonzero) * 60 / len(nonzero) if nonzero else None), max(gaps) * 60.0
+
+    def daily_totals(self, start: date, end: date, cbd: bool = False) -> list[float]:
+        """Grams per calendar day start..end (zeros included), THC-side or CBD."""
+        first = start.toordinal()
+        days = max(0, end.toordinal() - first + 1)
+        span = self.between(start, end)
+        if np is not None and span.minutes:
+            minutes, grams, flags = span._np()
+            weights = np.where(flags if cbd else ~flags, grams, 0.0)
+            return np.bincount(minutes // MINUTES_PER_DAY - first, weights=weights, minlength=days)[:days].tolist()
+        out = [0.0] * days
+        want = 1 if cbd else 0
+        for minute, grams, flag in zip(span.minutes, span.grams, span.cbd):
+            if flag == want:
+                out[minute // MINUTES_PER_DAY - first] += grams
+        return out
+
+    def _np(self):
+        # Zero-copy views of the array buffers.
+        return (
+            np.frombuffer(self.minutes, dtype=np.int64),
+            np.frombuffer(self.grams, dtype=np.float64),
+            np.frombuffer(self.cbd, dtype=np.int8).astype(bool),
+        )
+
+    def _np_doses(self):
+        # (grams, CBD flags) of every dose; a copy only when there are untimed doses.
+        grams, cbd = self._np()[1:]
+        if not self.untimed_grams:
+            return grams, cbd
+        return (
+            np.concatenate((grams, np.frombuffer(self.untimed_grams, dtype=np.float64))),
+            np.concatenate((cbd, np.frombuffer(self.untimed_cbd, dtype=np.int8).astype(bool))),
+        )
+
+
+def _columns(rows: list) -> tuple[array, array, array]:
+    """(key, grams, cbd flag) rows as key-sorted parallel arrays."""
+    rows.sort(key=operator.itemgetter(0))
+    return (
+        array("q", (row[0] for row in rows)),
+        array("d", (row[1] for row in rows)),
+        array("b", (row[2] for row in rows)),
+    )
+
+
+def _merged(first: tuple[array, array, array], second: tuple[array, array, array]) -> tuple[array, array, array]:
+    """Two _columns() results as one, still key-sorted."""
+    keys, grams, cbd = (a + b for a, b in zip(first, second))
+    if first[0] and second[0] and second[0][0] < first[0][-1]:
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        keys = array("q", (keys[n] for n in order))
+        grams = array("d", (grams[n] for n in order))
+        cbd = array("b", (cbd[n] for n in order))
+    return keys, grams, cbd
+
+
+def rolling_average(values: Sequence[float], window: int) -> list[float]:
+    """Trailing mean over up to `window` values; the first entries average what is available."""
+    window = max(1, int(window))
+    if np is not None and len(values):
+        sums = np.cumsum(np.asarray(values, dtype=np.float64))
+        counts = np.minimum(np.arange(1, len(sums) + 1), window)
+        lagged = np.concatenate((np.zeros(window), sums))[: len(sums)]
+        return ((sums - lagged) / counts).tolist()
+    out = []
+    total = 0.0
+    for n, value in enumerate(values):
+        total += value
+        if n >= window:
+            total -= values[n - window]
+        out.append(total / min(n + 1, window))
+    return out
+
+
+def downsample(values: Sequence[float], max_points: int) -> list[float]:
+    """Bucket means reducing `values` to at most `max_points` points for drawing."""
+    count = len(values)
+    max_points = max(1, int(max_points))
+    if count <= max_points:
+        return list(values)
+    size = -(-count // max_points)
+    return [sum(values[n : n + size]) / len(values[n : n + size]) for n in range(0, count, size)]